@@ -1,8 +1,17 @@
 import os
+import threading
+from contextlib import contextmanager
+from six.moves import queue
 import numpy  # type: ignore
 import mantid.simpleapi as mantidsimple  # type: ignore
 from mantid.api import AlgorithmManager  # type: ignore
 from mantid.api import AnalysisDataService as ADS  # type: ignore
+from mantid.kernel import ConfigService  # type: ignore
+try:
+    from mantid.api import AnalysisDataServiceObserver  # type: ignore
+except ImportError:
+    # Mantid older than 4.0: new workspaces are found by polling ADS
+    AnalysisDataServiceObserver = None
 from pyvdrive.core import mantid_helper
 from pyvdrive.core import peak_util
 from pyvdrive.core import archivemanager
@@ -11,6 +20,9 @@ try:
 except ImportError:
     from PyQt4 import QtCore  # type: ignore
 
+# ADS observer base class: object if it is not supported by Mantid
+_ObserverBase = object if AnalysisDataServiceObserver is None else AnalysisDataServiceObserver
+
 # TODO/ISSUE/NEXT - Find out how to use log files
 # .. LOG_NAME = 'livereduce'  # constant for logging
 # .. LOG_FILE = '/var/log/SNS_applications/livereduce.log'
@@ -18,11 +30,107 @@ except ImportError:
 # .. logger.setLevel(logging.INFO)
 
 
+class LiveWorkspaceObserver(_ObserverBase):
+    """
+    Observer of ADS pushing the names of added or replaced live output workspaces to a thread-safe queue
+    """
+
+    def __init__(self, name_prefix_list):
+        """
+        initialization
+        :param name_prefix_list: list of prefixes of the workspace names to be notified
+        """
+        super(LiveWorkspaceObserver, self).__init__()
+
+        self._namePrefixes = tuple(name_prefix_list)
+        self._workspaceQueue = queue.Queue()
+        # notifications from the thread processing the workspaces (in place) are suppressed
+        self._threadState = threading.local()
+
+        return
+
+    def _push(self, ws_name):
+        """ push a workspace name to queue if it is not suppressed
+        :param ws_name:
+        :return:
+        """
+        if getattr(self._threadState, 'suppressed', False) or not ws_name.startswith(self._namePrefixes):
+            return
+
+        self._workspaceQueue.put(ws_name)
+
+        return
+
+    def addHandle(self, ws_name, workspace):
+        """ handle for a workspace added to ADS (called by Mantid)
+        :param ws_name:
+        :param workspace:
+        :return:
+        """
+        self._push(ws_name)
+
+    def replaceHandle(self, ws_name, workspace):
+        """ handle for a workspace replaced in ADS (called by Mantid)
+        :param ws_name:
+        :param workspace:
+        :return:
+        """
+        self._push(ws_name)
+
+    def pop_workspace_names(self):
+        """ get all the workspace names in queue (without duplicates) and empty the queue
+        :return: list of workspace names in the order of notification
+        """
+        ws_name_list = list()
+        while True:
+            try:
+                ws_name = self._workspaceQueue.get_nowait()
+            except queue.Empty:
+                break
+            if ws_name not in ws_name_list:
+                ws_name_list.append(ws_name)
+        # END-WHILE
+
+        return ws_name_list
+
+    def start(self):
+        """ start observing ADS
+        :return:
+        """
+        self.observeAdd(True)
+        self.observeReplace(True)
+
+        return
+
+    def stop(self):
+        """ stop observing ADS
+        :return:
+        """
+        self.observeAdd(False)
+        self.observeReplace(False)
+
+        return
+
+    @contextmanager
+    def suppress(self):
+        """ context in which the notifications from the current thread are ignored
+        :return:
+        """
+        self._threadState.suppressed = True
+        try:
+            yield
+        finally:
+            self._threadState.suppressed = False
+
+
 class LiveDataDriver(QtCore.QThread):
     """
     Driver/manager for live data monitoring and reduction
     """
     COUNTER_WORKSPACE_NAME = '_VULCAN_LIVE_COUNTER'
+    # an incremental workspace kept as the instrument template of the workspaces created from the accumulations
+    ACCUMULATION_TEMPLATE_NAME = '_VULCAN_LIVE_ACC_TEMPLATE'
+    LIVE_OUTPUT_PREFIXES = ['output']
     # TODO/FIXME/NOW - Make this script more robust and informative
     # LIVE_PROCESS_SCRIPTS = '/home/wzz/Mantid_Project/builds/vulcan_live_data_test.py'  # local test only
     # LIVE_PROCESS_SCRIPTS = '/SNS/VULCAN/shared/livereduce/vulcan_live_data_beta.py'
@@ -54,6 +162,11 @@ class LiveDataDriver(QtCore.QThread):
         # get the live reduction script
         self._live_reduction_script = LiveDataDriver.LIVE_PROCESS_SCRIPTS
 
+        # live data source: beamline listener or replay of a recorded event NeXus file
+        self._listener = 'SNSLiveEventDataListener'
+        self._listenerAddress = 'bl7-daq1.sns.gov:31415'
+        self._updatePeriod = 10
+
         self._thread_continue = True
 
         # more containers
@@ -61,13 +174,19 @@ class LiveDataDriver(QtCore.QThread):
         self._peakMaxD = None
         self._peakNormByVan = False
         # _peakParamDict: key = %.5f %.5f %d % (min-d, max-d, norm-by-van):  value: dictionary
-        #   level-2 dict: key: workspace name, value: dictionary for bank 1, bank 2, bank 3, time
+        #   level-2 dict: key: accumulation index, value: dictionary for bank 1, bank 2, bank 3, time
         #   level-3 dict: key: bank ID, value: 3-tuple as peak intensity, peak center, variance
         self._peakParamDict = dict()
         self._currPeakParamKey = None
 
         self._vanadiumWorkspaceDict = dict()  # key: bank ID.  value: workspace name
 
+        # observer of new live output workspaces
+        if AnalysisDataServiceObserver is None:
+            self._workspaceObserver = None
+        else:
+            self._workspaceObserver = LiveWorkspaceObserver(LiveDataDriver.LIVE_OUTPUT_PREFIXES)
+
         return
 
     @staticmethod
@@ -107,13 +226,24 @@ class LiveDataDriver(QtCore.QThread):
         # get workspace
         workspace = mantid_helper.retrieve_workspace(ws_name, True)
 
+        return self.calculate_peak_parameters(workspace.readX(ws_index), workspace.readY(ws_index), bank_id,
+                                              norm_by_van, d_min, d_max)
+
+    def calculate_peak_parameters(self, vec_d, vec_y, bank_id, norm_by_van, d_min, d_max):
+        """ calculate the peak parameters of a spectrum
+        :param vec_d: dSpacing (bin boundaries)
+        :param vec_y:
+        :param bank_id:
+        :param norm_by_van:
+        :param d_min:
+        :param d_max:
+        :return: 3-tuple as (peak integrated intensity, average dSpacing value, variance)
+        """
         # calculate x min and x max indexes
-        vec_d = workspace.readX(ws_index)
         min_x_index = max(0, numpy.searchsorted(vec_d, d_min) - 1)
         max_x_index = min(len(vec_d), numpy.searchsorted(vec_d, d_max) + 1)
 
         # get Y
-        vec_y = workspace.readY(ws_index)
         if norm_by_van and bank_id in self._vanadiumWorkspaceDict:
             # normalize vanadium if the flag is on AND vanadium is loaded
             vec_van = self.get_vanadium(bank_id)
@@ -198,6 +328,41 @@ class LiveDataDriver(QtCore.QThread):
 
         return new_ws, is_new_ws
 
+    @staticmethod
+    def set_accumulation_template(workspace_name):
+        """ keep (a copy of) an incremental workspace as the instrument template of the workspaces created from
+        the accumulations.  It is only set once
+        :param workspace_name: incremental workspace name
+        :return:
+        """
+        if not ADS.doesExist(LiveDataDriver.ACCUMULATION_TEMPLATE_NAME):
+            mantid_helper.clone_workspace(workspace_name, LiveDataDriver.ACCUMULATION_TEMPLATE_NAME)
+
+        return
+
+    @staticmethod
+    def create_accumulation_workspace(accumulation_buffer, acc_index, ws_name, unit='dSpacing'):
+        """ create a workspace from an accumulation in the live accumulation buffer (on demand only).
+        The instrument (for unit conversion) is copied from the accumulation template
+        :param accumulation_buffer: LiveAccumulationBuffer instance
+        :param acc_index: accumulation index
+        :param ws_name: output workspace name
+        :param unit: unit of X
+        :return: workspace
+        """
+        if not ADS.doesExist(LiveDataDriver.ACCUMULATION_TEMPLATE_NAME):
+            raise RuntimeError('There is no incremental workspace as the instrument template of accumulations')
+
+        matrix_y, matrix_e = accumulation_buffer.get_matrix(acc_index)
+        num_spec = matrix_y.shape[0]
+
+        mantidsimple.CreateWorkspace(DataX=numpy.tile(accumulation_buffer.vec_x, num_spec),
+                                     DataY=matrix_y.ravel(), DataE=matrix_e.ravel(), NSpec=num_spec,
+                                     UnitX=unit, ParentWorkspace=LiveDataDriver.ACCUMULATION_TEMPLATE_NAME,
+                                     OutputWorkspace=ws_name)
+
+        return ADS.retrieve(ws_name)
+
     # TODO - TONIGHT 3 - Consider to remove since mantid_helper is used
     @staticmethod
     def delete_workspace(workspace_name, no_throw=False):
@@ -270,6 +435,15 @@ class LiveDataDriver(QtCore.QThread):
 
         return live_events
 
+    def get_new_workspaces(self):
+        """ get the names of the live output workspaces added or replaced since last call
+        :return: list of workspace names or None if ADS observer is not supported (poll by get_workspaces())
+        """
+        if self._workspaceObserver is None:
+            return None
+
+        return self._workspaceObserver.pop_workspace_names()
+
     @staticmethod
     def get_workspaces():
         """get the workspace from Mantid ADS
@@ -348,18 +522,15 @@ class LiveDataDriver(QtCore.QThread):
 
         return vec_time, peak_value_bank_dict
 
-    def integrate_peaks(self, accumulated_workspace_list, d_min, d_max, norm_by_vanadium):
-        """ integrate peaks for a list of
-        :param accumulated_workspace_list:
+    def integrate_peaks(self, accumulation_buffer, d_min, d_max, norm_by_vanadium):
+        """ integrate peaks for all the accumulations in the live accumulation buffer
+        :param accumulation_buffer: LiveAccumulationBuffer instance
         :param d_min:
         :param d_max:
         :param norm_by_vanadium
         :return:
         """
         # check inputs
-        assert isinstance(accumulated_workspace_list, list), 'Accumulated workspace {0} must be given in a list but ' \
-                                                             'not by a {1}.'.format(accumulated_workspace_list,
-                                                                                    type(accumulated_workspace_list))
         assert isinstance(d_min, float), 'Min dSpacing {0} must be a float but not a {1}'.format(
             d_min, type(d_min))
         assert isinstance(d_max, float), 'Max dSpacing {0} must be a float but not a {1}'.format(
@@ -371,51 +542,32 @@ class LiveDataDriver(QtCore.QThread):
         peak_key = self._get_peak_key(d_min, d_max, norm_by_vanadium)
         if peak_key not in self._peakParamDict:
             self._peakParamDict[peak_key] = dict()
-            # key: workspace name, value: dictionary for bank 1, bank 2, bank 3 and time
+            # key: accumulation index, value: dictionary for bank 1, bank 2, bank 3 and time
         # update for the current peak parameter dictionary key
         self._currPeakParamKey = peak_key
 
-        # the last workspace might be partially accumulated
-        last_workspace_name = sorted(accumulated_workspace_list)[-1]
-
-        for ws_name in accumulated_workspace_list:
-            if ws_name is None:
-                # workspace name is None or not exist?
-                print('[WARNING] Found workspace None in given accumulated workspaces {0}'
-                      ''.format(accumulated_workspace_list))
-                continue
-
-            # integrate peak for the non-integrated workspace and LAST workspace only
-            if ws_name in self._peakParamDict[peak_key] and ws_name != last_workspace_name:
-                # integrated + not the last one
+        for acc_index in accumulation_buffer.get_accumulation_indexes(-1):
+            # integrate peak for the non-integrated accumulation and the one in progress only
+            if acc_index in self._peakParamDict[peak_key] and accumulation_buffer.is_complete(acc_index):
                 continue
 
-            # too old to be in ADS
-            if mantid_helper.workspace_does_exist(ws_name) is False:
-                print('[WARNING] Workspace {0} does not exist in ADS.'.format(ws_name))
+            time_stamp = accumulation_buffer.get_pulse_time(acc_index)
+            if time_stamp is None:
+                print('[WARNING] Accumulation {0} has no proton charge log.'.format(acc_index))
                 continue
 
-            # get workspace
-            workspace_i = mantid_helper.retrieve_workspace(ws_name, True)
-
             # calculate peak intensity
-            self._peakParamDict[peak_key][ws_name] = dict()
-            for iws in range(workspace_i.getNumberHistograms()):
-                value_tup = self.calculate_live_peak_parameters(ws_name=ws_name, bank_id=iws+1,
-                                                                norm_by_van=norm_by_vanadium,
-                                                                d_min=d_min, d_max=d_max)
+            self._peakParamDict[peak_key][acc_index] = dict()
+            for iws in range(accumulation_buffer.number_spectra):
                 bank_id = iws + 1
-                self._peakParamDict[peak_key][ws_name][bank_id] = value_tup
-                # intensity_i = value_tup[0]
-                # intensity_list.append(intensity_i)
-                #
-                # position_i = value_tup[1]
-                # position_list.append(position_i)
+                vec_d, vec_y, vec_e = accumulation_buffer.get_data(acc_index, iws, point_data=False)
+                value_tup = self.calculate_peak_parameters(vec_d, vec_y, bank_id, norm_by_van=norm_by_vanadium,
+                                                           d_min=d_min, d_max=d_max)
+                self._peakParamDict[peak_key][acc_index][bank_id] = value_tup
             # END-FOR (iws)
 
-            # get latest time
-            time_stamp = workspace_i.run().getProperty('proton_charge').times[-1]
-            self._peakParamDict[peak_key][ws_name]['time'] = time_stamp
+            # latest time
+            self._peakParamDict[peak_key][acc_index]['time'] = time_stamp
         # END-FOR
 
         return
@@ -540,6 +692,22 @@ class LiveDataDriver(QtCore.QThread):
 
         return
 
+    @staticmethod
+    def get_time_series_logs(workspace):
+        """ get all the time series sample logs of a workspace
+        :param workspace: MatrixWorkspace
+        :return: dictionary: key = log name, value = 2-tuple (vector of times (datetime64), vector of values)
+        """
+        log_dict = dict()
+        for log_property in workspace.run().getProperties():
+            if not hasattr(log_property, 'times'):
+                # single value log
+                continue
+            log_dict[log_property.name] = numpy.array(log_property.times), numpy.array(log_property.value)
+        # END-FOR
+
+        return log_dict
+
     @staticmethod
     def parse_sample_log(ws_name_list, sample_log_name):
         """parse the sample log time stamps and value from a series of workspaces
@@ -661,12 +829,14 @@ class LiveDataDriver(QtCore.QThread):
         :return:
         """
         print('[DB...BAT] reduction script: {}'.format(self._live_reduction_script))
+        if self._workspaceObserver is not None:
+            self._workspaceObserver.start()
         # Test for script: whatever has all the log information...
         # and output_1, output_2 will do good still
-        mantidsimple.StartLiveData(UpdateEvery=10,
+        mantidsimple.StartLiveData(UpdateEvery=self._updatePeriod,
                                    Instrument='VULCAN',
-                                   Listener='SNSLiveEventDataListener',
-                                   Address='bl7-daq1.sns.gov:31415',
+                                   Listener=self._listener,
+                                   Address=self._listenerAddress,
                                    StartTime='1990-01-01T00:00:00',
                                    ProcessingScriptFilename=self._live_reduction_script,
                                    PreserveEvents=False,
@@ -676,6 +846,30 @@ class LiveDataDriver(QtCore.QThread):
 
         return
 
+    def set_replay_source(self, nexus_file_name, num_chunks, update_period=10):
+        """ replay a recorded event NeXus file with Mantid's FileEventDataListener instead of listening to the
+        beamline.  The file is split to num_chunks chunks, one per update.
+        Speed-up is the run duration / (num_chunks * update_period)
+        :param nexus_file_name:
+        :param num_chunks:
+        :param update_period: time between updates (second)
+        :return:
+        """
+        if not os.path.exists(nexus_file_name):
+            raise RuntimeError('Event NeXus file {} to replay does not exist'.format(nexus_file_name))
+        assert isinstance(num_chunks, int) and num_chunks > 0, 'Number of chunks {} must be a positive ' \
+                                                               'integer'.format(num_chunks)
+
+        config = ConfigService.Instance()
+        config['fileeventdatalistener.filename'] = nexus_file_name
+        config['fileeventdatalistener.chunks'] = str(num_chunks)
+
+        self._listener = 'FileEventDataListener'
+        self._listenerAddress = 'localhost:31415'  # not used by FileEventDataListener
+        self._updatePeriod = update_period
+
+        return
+
     def stop(self):
         """
 
@@ -683,10 +877,25 @@ class LiveDataDriver(QtCore.QThread):
         """
         AlgorithmManager.cancelAll()
 
+        if self._workspaceObserver is not None:
+            self._workspaceObserver.stop()
+
         self._thread_continue = False
 
         return
 
+    @contextmanager
+    def suppress_workspace_notifications(self):
+        """ context in which the workspaces added or replaced by the current thread (e.g., unit conversion of the
+        live output workspaces in place) are not notified by get_new_workspaces()
+        :return:
+        """
+        if self._workspaceObserver is None:
+            yield
+        else:
+            with self._workspaceObserver.suppress():
+                yield
+
 
 def main():
     driver = LiveDataDriver()
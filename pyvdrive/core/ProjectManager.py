@@ -11,8 +11,17 @@ from pyvdrive.core import archivemanager
 from pyvdrive.core import loaded_data_manager
 from pyvdrive.core import vanadium_utility
 from pyvdrive.core import peak_util
+from pyvdrive.core import sequential_peak_fit
 from pyvdrive.core import vulcan_util
 from pyvdrive.core import reduce_adv_chop
+from pyvdrive.core import reduction_profiler
+from pyvdrive.core import parallel_reduction
+from pyvdrive.core.merge_accumulator import StreamingRunMerger
+from pyvdrive.core.chopped_data_cube import ChoppedDataCube
+from pyvdrive.core import reduce_VULCAN
+
+# sample logs (averaged in VULCAN sample log records) whose summaries are reported for merged runs
+MERGE_REPORT_LOG_NAMES = [log_item[1] for log_item in reduce_VULCAN.MTS_Header_List if len(log_item) == 3]
 
 
 # TODO... NEED A DOC FOR HOW TO STORE DATA KEY (WORKSPACE NAME) ..
@@ -63,6 +72,10 @@ class ProjectManager(object):
 
         # dictionary for sample run number to be flagged to reduce.
         self._sampleRunReductionFlagDict = dict()  # Key: run number. Value: boolean flag for reduction
+        # number of banks to prefetch calibration for runs marked to reduce.  None for no prefetch
+        self._prefetchCalibrationBanks = None
+        # number of worker processes to reduce runs (VBIN) in parallel.  1 for reducing runs one by one
+        self._numReductionWorkers = 1
 
         # name of the workspace for VDRIVE bins tempate
         # self._vdriveBinTemplateName = None
@@ -801,9 +814,25 @@ class ProjectManager(object):
         :return: 2-tuple (vector X and vector Y)
         """
         # check inputs
+        datatypeutility.check_int_variable('Bank ID', bank_id, (1, 999))
+
+        workspace_name = self._get_chopped_sequence_workspace(chop_data_key, chop_sequence)
+
+        data_set_dict, data_unit = mantid_helper.get_data_from_workspace(
+            workspace_name, bank_id, unit)
+        data_set = data_set_dict[bank_id]
+
+        return data_set[0], data_set[1]
+
+    def _get_chopped_sequence_workspace(self, chop_data_key, chop_sequence):
+        """ Get the workspace name of a sequence in a chopped run, which is either reduced in memory or loaded
+        from GSAS files
+        :param chop_data_key: run number (loaded from GSAS) or tuple (reduced in memory)
+        :param chop_sequence: sequence index in the chopped run
+        :return: workspace name
+        """
         datatypeutility.check_int_variable(
             'Chopped data sequence (index)', chop_sequence, (0, None))
-        datatypeutility.check_int_variable('Bank ID', bank_id, (1, 999))
 
         # check reduced data
         if isinstance(chop_data_key, tuple) and self._reductionManager.has_run_sliced_reduced(chop_data_key):
@@ -820,11 +849,69 @@ class ProjectManager(object):
             workspace_name = info_tuple[0]
         # END-IF
 
-        data_set_dict, data_unit = mantid_helper.get_data_from_workspace(
-            workspace_name, bank_id, unit)
-        data_set = data_set_dict[bank_id]
+        return workspace_name
 
-        return data_set[0], data_set[1]
+    def get_chopped_data_bank_list(self, chop_data_key, chop_sequence):
+        """ Get the banks of a sequence in a chopped run
+        :param chop_data_key: run number (loaded from GSAS) or tuple (reduced in memory)
+        :param chop_sequence: sequence index in the chopped run
+        :return: list of bank IDs
+        """
+        workspace_name = self._get_chopped_sequence_workspace(chop_data_key, chop_sequence)
+
+        return mantid_helper.get_data_banks(workspace_name, 1)
+
+    def get_chopped_data_cube(self, chop_data_key, chop_sequences, bank_id, unit='dSpacing'):
+        """ Get the data of a bank of multiple chopped sequences as a matrix (sequence x bin)
+        :param chop_data_key: very likely run number
+        :param chop_sequences: list of sequence indexes in the chopped run
+        :param bank_id: bank ID
+        :param unit: target unit
+        :return: 2-tuple: ChoppedDataCube (of the sequences loaded successfully) and error message
+        """
+        datatypeutility.check_list('Chopped data sequences', chop_sequences)
+
+        data_cube = None
+        loaded_rows = list()
+        error_msg = ''
+        for row_index, chop_seq_i in enumerate(chop_sequences):
+            try:
+                vec_x_i, vec_y_i = self.get_chopped_sequence_data(chop_data_key, chop_seq_i, bank_id, unit)
+                if data_cube is None:
+                    data_cube = ChoppedDataCube(vec_x_i, chop_sequences)
+                data_cube.set_sequence_data(row_index, vec_y_i)
+            except (RuntimeError, KeyError) as run_err_i:
+                error_msg += 'Unable to load chopped sequence {}: {}\n'.format(chop_seq_i, run_err_i)
+            else:
+                loaded_rows.append(row_index)
+        # END-FOR
+
+        if data_cube is None:
+            raise RuntimeError('There is no available data from {}:\n{}'.format(chop_data_key, error_msg))
+        if len(loaded_rows) < len(chop_sequences):
+            data_cube = data_cube.select(loaded_rows)
+
+        return data_cube, error_msg
+
+    def fit_peaks_sequentially(self, chop_data_key, chop_sequences, bank_id, peak_positions, resolution=0.005,
+                               fit_range_factor=peak_util.HALF_PEAK_FIT_RANGE_FACTOR, num_workers=1):
+        """ Fit peaks of a bank across the sequences of a chopped run.  Each sequence's fit starts from the result of
+        the previous sequence
+        :param chop_data_key: very likely run number
+        :param chop_sequences: list of sequence indexes in the chopped run
+        :param bank_id: bank ID
+        :param peak_positions: list of peak positions (d-spacing)
+        :param resolution: delta d / d to estimate peak width and group overlapped peaks
+        :param fit_range_factor: half fit range of a peak in unit of FWHM
+        :param num_workers: number of processes to fit peak groups in parallel
+        :return: 2-tuple: PeakFitTable and error message from loading data
+        """
+        data_cube, error_msg = self.get_chopped_data_cube(chop_data_key, chop_sequences, bank_id, 'dSpacing')
+
+        fitter = sequential_peak_fit.SequentialPeakFitter(peak_positions, resolution, fit_range_factor)
+        fit_table = fitter.fit(data_cube.vec_x, data_cube.matrix_y, data_cube.sequences.tolist(), num_workers)
+
+        return fit_table, error_msg
 
     # # TODO FIXME - TODAY - Find out how NOT to use this method
     # def get_loaded_chopped_reduced_runs(self):
@@ -1096,6 +1183,10 @@ class ProjectManager(object):
             else:
                 # mark runs to reduce
                 self._sampleRunReductionFlagDict[run_number] = True
+                # load calibration in background
+                if self._prefetchCalibrationBanks is not None:
+                    self._reductionManager.calibration_manager.prefetch_calibration(self.get_file_path(run_number),
+                                                                                    self._prefetchCalibrationBanks)
         # END-FOR
 
         return
@@ -1140,6 +1231,26 @@ class ProjectManager(object):
 
         return
 
+    def get_calibration_tag(self, log_ws_name, data_ws_name):
+        """ get the calibration file that a run is reduced with, e.g., to identify a processed vanadium
+        :param log_ws_name: workspace with the run's sample logs (run start)
+        :param data_ws_name: reduced data workspace (group) to tell the number of banks
+        :return: calibration file name
+        """
+        run_start_date = vulcan_util.get_run_date(log_ws_name, None)
+        if run_start_date is None:
+            raise RuntimeError('Unable to get run start date from workspace {}'.format(log_ws_name))
+        num_banks = mantid_helper.get_number_spectra(mantid_helper.retrieve_workspace(data_ws_name, True))
+
+        calib_manager = self._reductionManager.calibration_manager
+        try:
+            calib_file_name = calib_manager.get_calibration_file(run_start_date, num_banks)[1]
+        except (KeyError, AssertionError) as calib_err:
+            raise RuntimeError('Unable to find calibration file of {} banks for run started at {}: {}'
+                               ''.format(num_banks, run_start_date, calib_err))
+
+        return calib_file_name
+
     @property
     def reduction_manager(self):
         """
@@ -1380,7 +1491,8 @@ class ProjectManager(object):
         :param merge_runs: Flag to merge runs and
         :param roi_list:
         :param mask_list:
-        :return: 2-tuple: list (run number), list (error message for each run reduced)
+        :return: 3-tuple: list (run number), list (error message for each run reduced),
+                 list (reports such as merged runs' summary and timing of each run)
         """
         # check inputs
         datatypeutility.check_list('Run numbers', run_number_list)
@@ -1401,9 +1513,28 @@ class ProjectManager(object):
             binning_parameters = (0.3, -abs(float(bin_size)), 5.0)
         # END-IF
 
-        # reduce one by one
+        # reduce in parallel if runs are written to GSAS individually
+        if self._numReductionWorkers > 1 and gsas and not merge_runs and len(run_number_list) > 1:
+            return self._reduce_vulcan_runs_parallel(run_number_list, output_directory, d_spacing,
+                                                     binning_parameters, number_banks, vanadium_run,
+                                                     roi_list, mask_list, no_cal_mask)
+
+        # reduce one by one.  For merging, each reduced run is folded into the first one right away
         reduced_run_numbers = list()
         error_messages = list()
+        report_messages = list()
+        if gsas and merge_runs:
+            if binning_parameters is None:
+                # runs are merged on VDRIVE bins
+                gsas_writer = self._reductionManager.gsas_writer
+
+                def get_vdrive_bin_params(ws_name):
+                    return gsas_writer.get_vdrive_bin_params(vulcan_util.get_run_date(ws_name, None), number_banks)
+                run_merger = StreamingRunMerger(bin_params_method=get_vdrive_bin_params)
+            else:
+                run_merger = StreamingRunMerger()
+        else:
+            run_merger = None
         for run_number in run_number_list:
             raw_file_name, ipts_number = self._dataFileDict[run_number]
             print('[DB...BAT] Attempt to reduce run {0} from {1}... Binned to {2}'
@@ -1427,6 +1558,11 @@ class ProjectManager(object):
                                                                              mask_list=mask_list,
                                                                              no_cal_mask=no_cal_mask)
 
+                if run_merger is not None:
+                    with reduction_profiler.stage('MergeRuns', out_ws_name, key=run_number):
+                        run_merger.add_run(run_number, out_ws_name)
+                    out_ws_name = run_merger.workspace_name
+
                 reduced_run_numbers.append((run_number, out_ws_name))
             except RuntimeError as run_error:
                 error_messages.append(
@@ -1436,7 +1572,7 @@ class ProjectManager(object):
         # END-FOR
 
         if len(reduced_run_numbers) == 0:
-            return reduced_run_numbers, error_messages
+            return reduced_run_numbers, error_messages, report_messages
 
         # process reduced data
         if gsas and vanadium_run is not None:
@@ -1463,25 +1599,24 @@ class ProjectManager(object):
                 run_date_time = vulcan_util.get_run_date(out_ws_name, raw_file_name)
                 gsas_file_name = os.path.join(output_directory, '{}.gda'.format(run_number))
 
-                self._reductionManager.gsas_writer.save(out_ws_name, run_date_time=run_date_time,
-                                                        gsas_file_name=gsas_file_name,
-                                                        ipts_number=ipts_number,
-                                                        run_number=run_number,
-                                                        align_vdrive_bin=align_vdrive_bin,
-                                                        gsas_param_file_name=iparam_file_name,
-                                                        van_ws_name=van_ws_name,
-                                                        is_chopped_run=False,
-                                                        write_to_file=True)
+                with reduction_profiler.stage('SaveGSAS', key=run_number):
+                    self._reductionManager.gsas_writer.save(out_ws_name, run_date_time=run_date_time,
+                                                            gsas_file_name=gsas_file_name,
+                                                            ipts_number=ipts_number,
+                                                            run_number=run_number,
+                                                            align_vdrive_bin=align_vdrive_bin,
+                                                            gsas_param_file_name=iparam_file_name,
+                                                            van_ws_name=van_ws_name,
+                                                            is_chopped_run=False,
+                                                            write_to_file=True)
+                reduction_profiler.save_profile_next_to(run_number, gsas_file_name)
             # END-FOR
         elif gsas and merge_runs:
-            # merge and then save to GSAS file
-            ws_name_list = [item[1] for item in reduced_run_numbers]
-            # always merged to run_number_list[0]/ws_name_list[0]
+            # runs are merged to the first reduced run while being reduced.  save to GSAS file
             run_number, out_ws_name = reduced_run_numbers[0]
-            # print ('[DB...BAT] Input run numbers: {} --> Reduced runs: {}'
-            #        ''.format(run_number_list, reduced_run_numbers))
-            # merge runs
-            mantid_helper.merge_runs(ws_name_list, out_ws_name)
+            report_messages.append(run_merger.report(log_names=MERGE_REPORT_LOG_NAMES))
+            # merged runs are already rebinned to VDRIVE bins of each set of banks
+            rebinned_ws_names = run_merger.workspace_names if align_vdrive_bin else None
 
             raw_file_name, ipts_number = self._dataFileDict[run_number]
             run_date_time = vulcan_util.get_run_date(out_ws_name, raw_file_name)
@@ -1489,22 +1624,120 @@ class ProjectManager(object):
             # this is for VIEW,CHOPRUN=,RUNS=1
             vdrive_gsas_name = os.path.join(output_directory, '1.gda')
 
-            self._reductionManager.gsas_writer.save(out_ws_name, run_date_time=run_date_time,
-                                                    gsas_file_name=gsas_file_name,
-                                                    ipts_number=ipts_number,
-                                                    run_number=run_number,
-                                                    align_vdrive_bin=align_vdrive_bin,
-                                                    gsas_param_file_name=iparam_file_name,
-                                                    van_ws_name=van_ws_name,
-                                                    is_chopped_run=False,
-                                                    write_to_file=True)
+            with reduction_profiler.stage('SaveGSAS', key=run_number):
+                self._reductionManager.gsas_writer.save(out_ws_name, run_date_time=run_date_time,
+                                                        gsas_file_name=gsas_file_name,
+                                                        ipts_number=ipts_number,
+                                                        run_number=run_number,
+                                                        align_vdrive_bin=align_vdrive_bin,
+                                                        gsas_param_file_name=iparam_file_name,
+                                                        van_ws_name=van_ws_name,
+                                                        is_chopped_run=False,
+                                                        write_to_file=True,
+                                                        rebinned_ws_names=rebinned_ws_names)
+            reduction_profiler.save_profile_next_to(run_number, gsas_file_name)
             # copy the file
             shutil.copy(gsas_file_name, vdrive_gsas_name)
         else:
             # do nothing
             pass
 
-        return reduced_run_numbers, error_messages
+        # report timing of each run
+        for run_number, out_ws_name in reduced_run_numbers:
+            profiler = reduction_profiler.get_profiler(run_number)
+            if profiler is not None:
+                report_messages.append(profiler.report())
+        # END-FOR
+
+        return reduced_run_numbers, error_messages, report_messages
+
+    def _reduce_vulcan_runs_parallel(self, run_number_list, output_directory, d_spacing, binning_parameters,
+                                     number_banks, vanadium_run, roi_list, mask_list, no_cal_mask):
+        """ reduce runs to individual GSAS files by a pool of worker processes (VBIN without merging)
+        Note: the reduced workspaces are deleted in the worker processes once they are written to GSAS
+        :param run_number_list:
+        :param output_directory:
+        :param d_spacing:
+        :param binning_parameters:
+        :param number_banks:
+        :param vanadium_run:
+        :param roi_list:
+        :param mask_list:
+        :param no_cal_mask:
+        :return: 3-tuple: list of 2-tuple (run number, None), list (message for each run reduced),
+                 list (timing report of each run reduced)
+        """
+        # vanadium is located here and imported by each worker
+        if vanadium_run is not None:
+            van_gsas_name, iparam_file_name = self._parent.archive_manager.locate_process_vanadium(vanadium_run)
+        else:
+            van_gsas_name = None
+            iparam_file_name = 'vulcan.prm'
+
+        if d_spacing:
+            unit = 'dSpacing'
+        else:
+            unit = 'TOF'
+
+        task_list = list()
+        for run_number in run_number_list:
+            raw_file_name, ipts_number = self._dataFileDict[run_number]
+            gsas_file_name = os.path.join(output_directory, '{}.gda'.format(run_number))
+            task_list.append(parallel_reduction.RunReductionTask(ipts_number=ipts_number,
+                                                                 run_number=run_number,
+                                                                 raw_file_name=raw_file_name,
+                                                                 target_unit=unit,
+                                                                 binning_parameters=binning_parameters,
+                                                                 num_banks=number_banks,
+                                                                 roi_list=roi_list,
+                                                                 mask_list=mask_list,
+                                                                 no_cal_mask=no_cal_mask,
+                                                                 gsas_file_name=gsas_file_name,
+                                                                 align_vdrive_bin=binning_parameters is None,
+                                                                 iparam_file_name=iparam_file_name))
+        # END-FOR
+
+        reducer = parallel_reduction.ParallelRunReducer(self._numReductionWorkers)
+        result_list = reducer.reduce_runs(task_list, van_gsas_name)
+
+        # report in the order of the input runs
+        result_list.sort(key=lambda result: run_number_list.index(result.run_number))
+        reduced_run_numbers = list()
+        error_messages = list()
+        report_messages = list()
+        for result in result_list:
+            if result.status:
+                reduced_run_numbers.append((result.run_number, None))
+                error_messages.append('[INFO] {}'.format(result.message))
+                if result.profile is not None:
+                    report_messages.append(result.profile)
+            else:
+                error_messages.append(result.message)
+        # END-FOR
+
+        return reduced_run_numbers, error_messages, report_messages
+
+    def set_calibration_prefetch(self, num_banks):
+        """ Enable or disable loading calibration in background for the runs marked to reduce
+        :param num_banks: number of banks of calibration to prefetch.  None to disable
+        :return:
+        """
+        if num_banks is not None:
+            datatypeutility.check_int_variable('Number of banks', num_banks, (1, 28))
+        self._prefetchCalibrationBanks = num_banks
+
+        return
+
+    def set_reduction_workers(self, num_workers):
+        """ Set the number of worker processes to reduce runs in parallel (VBIN to GSAS without merging runs).
+        Each worker holds at most one event workspace in memory.
+        :param num_workers: 1 to reduce runs one by one
+        :return:
+        """
+        datatypeutility.check_int_variable('Number of reduction workers', num_workers, (1, None))
+        self._numReductionWorkers = num_workers
+
+        return
 
     def set_reduction_flag(self, run_number, flag):
         """ Set the  reduction flag for a file in SAMPLE run dictionary of this project
@@ -27,6 +27,15 @@ class VDriveAPI(object):
     It is a pure python layer that does not consider GUI.
     VDrivePlot is a GUI application built upon this class
     """
+    # phase type to unit cell type
+    PHASE_TYPE_DICT = {'BCC': crystal_helper.UnitCell.BCC,
+                       'FCC': crystal_helper.UnitCell.FCC,
+                       'HCP': crystal_helper.UnitCell.HCP,
+                       'Body-Center': crystal_helper.UnitCell.BC,
+                       'Face-Center': crystal_helper.UnitCell.FC}
+
+    # Bragg reflections shared by all the instances
+    REFLECTION_CACHE = crystal_helper.ReflectionCache()
 
     def __init__(self, instrument_name, module_location=None):
         """
@@ -63,6 +72,10 @@ class VDriveAPI(object):
         #     template_data_dir = None
         # REMOVED 2018 TODO self._myProject.load_standard_binning_workspace(template_data_dir)
         self._myArchiveManager = archivemanager.DataArchiveManager(self._myInstrument)
+        # keep proton charges read from archive in the user's configuration directory
+        config_dir = os.path.expanduser('~/.pyvdrive')
+        if os.path.isdir(config_dir) and os.access(config_dir, os.W_OK):
+            self._myArchiveManager.set_proton_charge_table_file(os.path.join(config_dir, 'ProtonChargeTable.txt'))
 
         # default working directory to current directory.
         #  if it is not writable, then use /tmp/
@@ -77,6 +90,8 @@ class VDriveAPI(object):
         # MTS file log
         self._mtsLogDict = dict()
         self._currentMTSLogFileName = None
+        # reports (such as timing of each run) of the last data reduction.  they are not errors
+        self._reductionReportList = list()
 
         return
 
@@ -187,84 +202,41 @@ class VDriveAPI(object):
         :param max_d:
         :return: list of 2-tuples.  Each tuple is a float as d-spacing and a list of HKL's
         """
+        return VDriveAPI.calculate_phases_peaks_position([phase], min_d, max_d)[0]
+
+    @staticmethod
+    def calculate_phases_peaks_position(phase_list, min_d, max_d):
+        """
+        Purpose: calculate the bragg peaks' position of several phases at once.  Reflections are cached by
+        lattice, space group and d-spacing range such that they are not recalculated when phases or d-spacing
+        range (zoom in) change
+        :param phase_list: list of phases as [name, type, a, b, c]
+        :param min_d: minimum d-spacing value
+        :param max_d:
+        :return: list (one per phase) of list of 2-tuples (d-spacing, list of HKL's) in decreasing d-spacing
+        """
         # Check requirements
-        assert isinstance(phase, list), 'Input Phase must be a list but not %s.' % (
-            str(type(phase)))
-        assert len(phase) == 5, 'Input phase  of type list must have 5 elements'
+        assert isinstance(phase_list, list), 'Input phases must be a list but not %s.' % (
+            str(type(phase_list)))
         assert min_d < max_d
         assert min_d > 0.01
 
-        # Get information
-        phase_type = phase[1]
-        lattice_a = phase[2]
-        lattice_b = phase[3]
-        lattice_c = phase[4]
-
-        # Convert phase type to
-        phase_type = phase_type.split()[0]
-        if phase_type == 'BCC':
-            phase_type = crystal_helper.UnitCell.BCC
-        elif phase_type == 'FCC':
-            phase_type = crystal_helper.UnitCell.FCC
-        elif phase_type == 'HCP':
-            phase_type = crystal_helper.UnitCell.HCP
-        elif phase_type == 'Body-Center':
-            phase_type = crystal_helper.UnitCell.BC
-        elif phase_type == 'Face-Center':
-            phase_type = crystal_helper.UnitCell.FC
-        else:
-            raise RuntimeError('Unit cell type %s is not supported.' % phase_type)
-
-        # Get reflections
-        unit_cell = crystal_helper.UnitCell(phase_type, lattice_a, lattice_b, lattice_c)
-        reflections = crystal_helper.calculate_reflections(unit_cell, min_d, max_d)
-
-        # Sort by d-space... NOT FINISHED YET
-        num_ref = len(reflections)
-        ref_dict = dict()
-        for i_ref in range(num_ref):
-            ref_tup = reflections[i_ref]
-            assert isinstance(ref_tup, tuple)
-            assert len(ref_tup) == 2
-            pos_d = ref_tup[1]
-            assert isinstance(pos_d, float)
-            assert pos_d > 0
-            # HKL should be an instance of mantid.kernel._kernel.V3D
-            hkl_v3d = ref_tup[0]
-            hkl = [hkl_v3d.X(), hkl_v3d.Y(), hkl_v3d.Z()]
-
-            # pos_d has not such key, then add it
-            if pos_d not in ref_dict:
-                ref_dict[pos_d] = list()
-            ref_dict[pos_d].append(hkl)
-        # END-FOR
-
-        # Merge all the peaks with peak position within tolerance
-        TOL = 0.0001
-        # sort the list again with peak positions...
-        peak_pos_list = ref_dict.keys()
-        peak_pos_list.sort()
-        curr_list = None
-        curr_pos = -1
-        for peak_pos in peak_pos_list:
-            if peak_pos - curr_pos < TOL:
-                # combine the element (list)
-                assert isinstance(curr_list, list)
-                curr_list.extend(ref_dict[peak_pos])
-                del ref_dict[peak_pos]
-            else:
-                curr_list = ref_dict[peak_pos]
-                curr_pos = peak_pos
+        unit_cell_list = list()
+        for phase in phase_list:
+            assert isinstance(phase, list), 'Input Phase must be a list but not %s.' % (
+                str(type(phase)))
+            assert len(phase) == 5, 'Input phase  of type list must have 5 elements'
+
+            # Convert phase type to unit cell type
+            phase_type = phase[1].split()[0]
+            if phase_type not in VDriveAPI.PHASE_TYPE_DICT:
+                raise RuntimeError('Unit cell type %s is not supported.' % phase_type)
+            unit_cell_list.append(crystal_helper.UnitCell(VDriveAPI.PHASE_TYPE_DICT[phase_type],
+                                                          phase[2], phase[3], phase[4]))
         # END-FOR
 
-        # Convert from dictionary to list as 2-tuples
-        d_list = ref_dict.keys()
-        d_list.sort(reverse=True)
-        reflection_list = list()
-        for peak_pos in d_list:
-            reflection_list.append((peak_pos, ref_dict[peak_pos]))
-
-        return reflection_list
+        # Get reflections with peaks within tolerance merged
+        return VDriveAPI.REFLECTION_CACHE.get_phases_reflections(unit_cell_list, min_d, max_d, tolerance=0.0001)
 
     @staticmethod
     def export_gsas_peak_file(bank_peak_dict, out_file_name):
@@ -1291,6 +1263,7 @@ class VDriveAPI(object):
         :return: 2-tuple (boolean, object)
         """
         # Check requirements
+        self._reductionReportList = list()
         runs_to_reduce = self._myProject.get_runs_to_reduce()
         num_runs_flagged = len(runs_to_reduce)
         if num_runs_flagged == 0:
@@ -1344,17 +1317,18 @@ class VDriveAPI(object):
                     runs_to_reduce.pop(run_index)
                     runs_to_reduce.insert(0, merged_run)
 
-            run_number_list, msg_list = self._myProject.reduce_vulcan_runs_v2(run_number_list=runs_to_reduce,
-                                                                              output_directory=output_directory,
-                                                                              d_spacing=True,
-                                                                              binning_parameters=binning_parameters,
-                                                                              number_banks=num_banks,
-                                                                              gsas=gsas,
-                                                                              vanadium_run=vanadium,
-                                                                              merge_runs=merge_runs,
-                                                                              roi_list=roi_list,
-                                                                              mask_list=mask_list,
-                                                                              no_cal_mask=no_cal_mask)
+            reduce_results = self._myProject.reduce_vulcan_runs_v2(run_number_list=runs_to_reduce,
+                                                                   output_directory=output_directory,
+                                                                   d_spacing=True,
+                                                                   binning_parameters=binning_parameters,
+                                                                   number_banks=num_banks,
+                                                                   gsas=gsas,
+                                                                   vanadium_run=vanadium,
+                                                                   merge_runs=merge_runs,
+                                                                   roi_list=roi_list,
+                                                                   mask_list=mask_list,
+                                                                   no_cal_mask=no_cal_mask)
+            run_number_list, msg_list, self._reductionReportList = reduce_results
 
             # post process:
 
@@ -1550,6 +1524,30 @@ class VDriveAPI(object):
 
         return status, err_msg
 
+    def get_reduction_report(self):
+        """ Get the reports of the last data reduction, such as the timing of each run reduced
+        :return: string (empty for no report)
+        """
+        return '\n'.join(self._reductionReportList)
+
+    def set_calibration_prefetch(self, num_banks):
+        """ Enable or disable loading calibration in background for the runs set to reduce
+        :param num_banks: number of banks of calibration to prefetch.  None to disable
+        :return:
+        """
+        self._myProject.set_calibration_prefetch(num_banks)
+
+        return
+
+    def set_reduction_workers(self, num_workers):
+        """ Set the number of worker processes to reduce runs in parallel
+        :param num_workers: 1 for reducing runs one by one
+        :return:
+        """
+        self._myProject.set_reduction_workers(num_workers)
+
+        return
+
     def set_runs_to_reduce(self, run_numbers):
         """ Set runs for reduction by turning on the reduction flag
         Purpose:
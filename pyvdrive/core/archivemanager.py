@@ -4,11 +4,10 @@
 import os
 import time
 import pickle
-import pandas
-from pyvdrive.core import mantid_helper
 from pyvdrive.core import vdrivehelper
 from pyvdrive.core import vulcan_util
 from pyvdrive.core import datatypeutility
+from pyvdrive.core import proton_charge
 
 SUPPORTED_INSTRUMENT = {'VULCAN': 'VULCAN'}
 SUPPORTED_INSTRUMENT_SHORT = {'VUL': 'VULCAN'}
@@ -63,6 +62,9 @@ class DataArchiveManager(object):
         # VULCAN auto record dictionary
         self._auto_record_dict = dict()
 
+        # proton charges of single and chopped runs
+        self._protonChargeTable = proton_charge.ProtonChargeTable(self._archiveRootDirectory)
+
         # Other class variables
         # # ipts number of type integer
         # self._iptsNo = None
@@ -125,6 +127,7 @@ class DataArchiveManager(object):
 
         # set root data directory
         self._archiveRootDirectory = root_dir
+        self._protonChargeTable = proton_charge.ProtonChargeTable(root_dir, self._protonChargeTable.table_file_name)
         # check whether it is local
         if self._archiveRootDirectory.startswith('/SNS/{0}'.format(self._dataArchiveInstrumentName)):
             self._isLocalArchive = False
@@ -463,13 +466,11 @@ class DataArchiveManager(object):
         :return:
         """
 
-    # TODO - FUTURE - Need to move this method to an appropriate module
-    @staticmethod
-    def get_proton_charge(ipts_number, run_number, chop_sequence):
+    def get_proton_charge(self, ipts_number, run_number, chop_sequence):
         """ get proton charge (single value) from a run
         :param ipts_number:
         :param run_number:
-        :param chop_sequence:
+        :param chop_sequence: None for single run
         :return:
         """
         # check inputs' types
@@ -478,50 +479,25 @@ class DataArchiveManager(object):
         assert isinstance(run_number, int), 'Run number {0} must be an integer but not a {1}.' \
                                             ''.format(run_number, type(run_number))
 
-        # file
-        if chop_sequence is None:
-            # regular run: load the NeXus file and find out
-            nexus_file = '/SNS/VULCAN/IPTS-{0}/nexus/VULCAN_{1}.nxs.h5'.format(
-                ipts_number, run_number)
-            if not os.path.exists(nexus_file):
-                nexus_file2 = '/SNS/VULCAN/IPTS-{0}/data/VULCAN_{1}_event.nxs'.format(
-                    ipts_number, run_number)
-                if os.path.exists(nexus_file2) is False:
-                    raise RuntimeError('Unable to locate NeXus file for IPTS-{0} Run {1} with name '
-                                       '{2} or {3}'.format(ipts_number, run_number, nexus_file, nexus_file2))
-                else:
-                    nexus_file = nexus_file2
-            # END-IF
+        return self._protonChargeTable.get_proton_charge(ipts_number, run_number, chop_sequence)
 
-            # load data, get proton charge and delete
-            out_name = '{0}_Meta'.format(run_number)
-            mantid_helper.load_nexus(data_file_name=nexus_file,
-                                     output_ws_name=out_name, meta_data_only=True)
-            proton_charge = mantid_helper.get_sample_log_value_single(out_name, 'gd_prtn_chrg')
-            # convert unit from picoCoulumb to uA.hour
-            proton_charge *= 1E6 * 3600.
-            mantid_helper.delete_workspace(out_name)
+    def get_proton_charges(self, ipts_number, run_number, chop_sequences):
+        """ get proton charges of multiple chopped sequences of a chopped run
+        :param ipts_number:
+        :param run_number:
+        :param chop_sequences: list or array of chop sequences
+        :return: numpy array
+        """
+        return self._protonChargeTable.get_proton_charges(ipts_number, run_number, chop_sequences)
 
-        else:
-            # chopped run: get the proton charge value from
-            record_file_name = '/SNS/VULCAN/IPTS-{0}/shared/ChoppedData/{1}/{1}sampleenv_chopped_mean.txt' \
-                               ''.format(ipts_number, run_number)
-            if os.path.exists(record_file_name) is False:
-                raise RuntimeError(
-                    'Unable to locate chopped data record file {0}'.format(record_file_name))
-
-            # import csv
-            data_set = pandas.read_csv(record_file_name, header=None,
-                                       delim_whitespace=True, index_col=0)
-            try:
-                proton_charge = data_set.loc[chop_sequence][1]
-                proton_charge = float(proton_charge)
-            except KeyError as key_err:
-                raise RuntimeError('Unable to find chop sequence {0} in {1} due to {2}'
-                                   ''.format(chop_sequence, record_file_name, key_err))
-        # END-IF
+    def set_proton_charge_table_file(self, table_file_name):
+        """ set the file to load proton charges from and save them to
+        :param table_file_name:
+        :return:
+        """
+        self._protonChargeTable = proton_charge.ProtonChargeTable(self._archiveRootDirectory, table_file_name)
 
-        return proton_charge
+        return
 
     @staticmethod
     def get_smoothed_vanadium(ipts_number, van_run_number, check_exist=True):
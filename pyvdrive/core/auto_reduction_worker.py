@@ -0,0 +1,298 @@
+# Long-lived auto reduction worker for VULCAN
+# reduce_VULCAN.main() is run in a new Python process for each run by the auto reduction service, and thus each run
+# pays for importing Mantid, loading the instrument, calibration, grouping, mask and vanadium.  This worker keeps
+# one Mantid process alive and reduces the NeXus files submitted to its queue (or found in a watched directory)
+# with the same outputs as reduce_VULCAN.main().  The calibration workspaces (<instrument>_cal, _group and _mask)
+# created by SNSPowderReduction and the characterization table are kept in ADS between runs and are only dropped
+# when a run requires another calibration file.  The vanadium workspace of the last run is kept too, such that
+# at most one vanadium is in ADS.  All the other workspaces created for a run are deleted after the run.
+# Example:
+#   python auto_reduction_worker.py --watch /SNS/VULCAN/IPTS-22752/nexus --latency /tmp/latency.txt
+import os
+import sys
+import time
+import argparse
+import threading
+from six.moves import queue
+from pyvdrive.core import datatypeutility
+from pyvdrive.core import lazy_import
+from pyvdrive.core import reduce_VULCAN
+
+# Mantid is imported at the first use
+AnalysisDataService = lazy_import.lazy_attribute('mantid.api', 'AnalysisDataService')
+mantidsimple = lazy_import.lazy_module('mantid.simpleapi')
+
+# workspaces kept in ADS between runs (warm)
+CALIBRATION_WS_SUFFIXES = ['_cal', '_group', '_mask']
+WARM_WORKSPACE_PREFIXES = ['characterizations']
+VANADIUM_WS_PREFIX = 'Vanadium_'
+# file names of event NeXus files to reduce in watch mode
+NEXUS_FILE_SUFFIXES = ['.nxs.h5', '_event.nxs']
+
+
+def get_auto_reduction_output_dir(nexus_file_name):
+    """ get the output directory of the auto reduction service from the NeXus file path, i.e.,
+    /SNS/VULCAN/IPTS-xxx/nexus/VULCAN_yyy.nxs.h5 -> /SNS/VULCAN/IPTS-xxx/shared/autoreduce/
+    :param nexus_file_name:
+    :return:
+    """
+    path_parts = reduce_VULCAN.MainUtility.split_all_path(os.path.abspath(nexus_file_name))
+    ipts_indexes = [index for index, part in enumerate(path_parts) if part.startswith('IPTS-')]
+    if len(ipts_indexes) == 0:
+        raise RuntimeError('Unable to find IPTS directory in path of NeXus file {}'.format(nexus_file_name))
+
+    ipts_dir = os.path.join(*path_parts[:ipts_indexes[-1] + 1])
+
+    return os.path.join(ipts_dir, 'shared', 'autoreduce')
+
+
+class AutoReductionWorker(object):
+    """ Reduce the submitted NeXus files one by one in the same (Mantid) process
+    """
+
+    def __init__(self, instrument='VULCAN', latency_file_name=None):
+        """
+        initialization
+        :param instrument:
+        :param latency_file_name: None or name of the text file to append the latency of each run to
+        """
+        datatypeutility.check_string_variable('Instrument', instrument)
+
+        self._instrument = instrument
+        self._latency_file_name = latency_file_name
+
+        # queue of 2-tuple (NeXus file name, output directory).  None to stop the worker
+        self._task_queue = queue.Queue()
+        # calibration file of the calibration workspaces in ADS
+        self._warm_focus_file = None
+        # records: list of 4-tuple (NeXus file name, latency (second), status, message)
+        self._record_list = list()
+
+        self._watch_thread = None
+        self._stop_event = threading.Event()
+
+        return
+
+    @property
+    def records(self):
+        """ records of reduced runs
+        :return: list of 4-tuple (NeXus file name, latency (second), status, message)
+        """
+        return self._record_list[:]
+
+    def _clear_workspaces(self, warm_names, keep_calibration, van_ws_name=None):
+        """ delete the workspaces created by a run
+        :param warm_names: set of workspace names in ADS before the run
+        :param keep_calibration: flag to keep the calibration workspaces
+        :param van_ws_name: name of the vanadium workspace to keep or None to delete all the vanadium workspaces
+        :return:
+        """
+        calib_ws_names = [self._instrument + suffix for suffix in CALIBRATION_WS_SUFFIXES]
+
+        for ws_name in AnalysisDataService.getObjectNames():
+            if ws_name in calib_ws_names:
+                keep = keep_calibration
+            elif ws_name.startswith(VANADIUM_WS_PREFIX):
+                keep = ws_name == van_ws_name
+            else:
+                keep = ws_name in warm_names or \
+                    any([ws_name.startswith(prefix) for prefix in WARM_WORKSPACE_PREFIXES])
+            if not keep and AnalysisDataService.doesExist(ws_name):
+                mantidsimple.DeleteWorkspace(Workspace=ws_name)
+        # END-FOR
+
+        return
+
+    def _record_latency(self, nexus_file_name, latency, status, message):
+        """ record latency of a run and append it to the latency file
+        :param nexus_file_name:
+        :param latency:
+        :param status:
+        :param message:
+        :return:
+        """
+        is_cold = len(self._record_list) == 0
+        self._record_list.append((nexus_file_name, latency, status, message))
+        print('[INFO] Auto reduction of {} ({}): {:.2f} seconds. Success = {}'
+              ''.format(nexus_file_name, 'cold' if is_cold else 'warm', latency, status))
+
+        if self._latency_file_name is not None:
+            with open(self._latency_file_name, 'a') as latency_file:
+                latency_file.write('{}\t{:.3f}\t{}\t{}\n'.format(nexus_file_name, latency, int(status),
+                                                                 'cold' if is_cold else 'warm'))
+
+        return
+
+    def process(self, nexus_file_name, output_dir=None, dry_run=False):
+        """ reduce a NeXus file as reduce_VULCAN.main() in auto reduction mode
+        :param nexus_file_name:
+        :param output_dir: None for the autoreduce directory of the IPTS
+        :param dry_run:
+        :return: 2-tuple (status, message)
+        """
+        start_time = time.time()
+        warm_names = set(AnalysisDataService.getObjectNames())
+        van_ws_name = None
+
+        try:
+            if output_dir is None:
+                output_dir = get_auto_reduction_output_dir(nexus_file_name)
+
+            reduction_setup = reduce_VULCAN.ReductionSetup()
+            reduction_setup.set_dry_run(dry_run)
+            reduction_setup.set_event_file(nexus_file_name)
+            reduction_setup.set_output_dir(output_dir)
+            reduction_setup.set_auto_reduction_mode()
+
+            reduction_setup.process_configurations()
+            reduction_setup.set_default_calibration_files()
+
+            # calibration workspaces of another calibration file cannot be reused
+            focus_file = reduction_setup.get_focus_file()
+            if focus_file != self._warm_focus_file:
+                self._clear_workspaces(warm_names, keep_calibration=False)
+                warm_names = set(AnalysisDataService.getObjectNames())
+                self._warm_focus_file = focus_file
+
+            # vanadium of this run, which is kept (warm) for the next run
+            van_info_tuple = reduction_setup.get_vanadium_info()
+            if van_info_tuple is not None:
+                van_run_number, van_gda_file, vanadium_tag = van_info_tuple
+                van_ws_name = '{}{}_{}'.format(VANADIUM_WS_PREFIX, van_run_number, vanadium_tag)
+
+            reducer = reduce_VULCAN.ReduceVulcanData(reduction_setup)
+            status, message = reduction_setup.check_validity()
+            if not status:
+                message = 'Reduction Setup is not valid:\n{}'.format(message)
+            elif dry_run:
+                reducer.dry_run()
+            else:
+                status, message = reducer.execute_vulcan_reduction(output_logs=True)
+        except (RuntimeError, IOError) as run_err:
+            # a bad run shall not stop the worker.  programming errors are not caught
+            status = False
+            message = 'Auto reduction error: {}'.format(run_err)
+        finally:
+            self._clear_workspaces(warm_names, keep_calibration=True, van_ws_name=van_ws_name)
+        # END-TRY
+
+        self._record_latency(nexus_file_name, time.time() - start_time, status, message)
+
+        return status, message
+
+    def run_forever(self):
+        """ process the submitted NeXus files until stop() is called
+        :return:
+        """
+        while True:
+            task = self._task_queue.get()
+            if task is None:
+                break
+            nexus_file_name, output_dir = task
+            try:
+                self.process(nexus_file_name, output_dir)
+            except (RuntimeError, IOError) as run_err:
+                print('[ERROR] Unable to process {}: {}'.format(nexus_file_name, run_err))
+        # END-WHILE
+
+        return
+
+    def stop(self):
+        """ stop watching directory and stop the worker after the runs submitted are reduced
+        :return:
+        """
+        self._stop_event.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+            self._watch_thread = None
+        self._task_queue.put(None)
+
+        return
+
+    def submit(self, nexus_file_name, output_dir=None):
+        """ submit a NeXus file to reduce
+        :param nexus_file_name:
+        :param output_dir: None for the autoreduce directory of the IPTS
+        :return:
+        """
+        datatypeutility.check_file_name(nexus_file_name, check_exist=True, note='Event NeXus file')
+        self._task_queue.put((nexus_file_name, output_dir))
+
+        return
+
+    def watch_directory(self, watch_dir, output_dir=None, poll_interval=5., reduce_existing=False):
+        """ watch a directory in a background thread and submit the new NeXus files once they are completely
+        written (i.e., size does not change between 2 polls)
+        :param watch_dir:
+        :param output_dir: None for the autoreduce directory of each run's IPTS
+        :param poll_interval: seconds between 2 scans of the directory
+        :param reduce_existing: flag to reduce the NeXus files existing in the directory
+        :return:
+        """
+        datatypeutility.check_file_name(watch_dir, check_exist=True, is_dir=True, note='Directory to watch')
+        datatypeutility.check_float_variable('Poll interval', poll_interval, (0., None))
+
+        def scan_nexus_files():
+            file_size_dict = dict()
+            for file_name in os.listdir(watch_dir):
+                if any([file_name.endswith(suffix) for suffix in NEXUS_FILE_SUFFIXES]):
+                    file_path = os.path.join(watch_dir, file_name)
+                    file_size_dict[file_path] = os.path.getsize(file_path)
+            return file_size_dict
+
+        def watch():
+            submitted_set = set() if reduce_existing else set(scan_nexus_files().keys())
+            prev_size_dict = dict()
+            while not self._stop_event.wait(poll_interval):
+                size_dict = scan_nexus_files()
+                for file_path in sorted(size_dict.keys()):
+                    if file_path not in submitted_set and prev_size_dict.get(file_path) == size_dict[file_path]:
+                        submitted_set.add(file_path)
+                        self.submit(file_path, output_dir)
+                prev_size_dict = size_dict
+            # END-WHILE
+
+        self._stop_event.clear()
+        self._watch_thread = threading.Thread(target=watch)
+        self._watch_thread.daemon = True
+        self._watch_thread.start()
+
+        return
+
+
+def main(argv):
+    """ reduce the given NeXus files, or the new NeXus files in a directory, in one process
+    :param argv:
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Long-lived VULCAN auto reduction worker')
+    parser.add_argument('nexus_files', nargs='*', help='NeXus files to reduce')
+    parser.add_argument('--output', default=None,
+                        help='output directory.  Default is .../IPTS-xxx/shared/autoreduce/ of each run')
+    parser.add_argument('--watch', default=None, help='directory to watch for new NeXus files')
+    parser.add_argument('--poll', type=float, default=5., help='seconds between 2 scans of watched directory')
+    parser.add_argument('--latency', default=None, help='text file to append the latency of each run')
+    parser.add_argument('--dryrun', action='store_true', help='dry run')
+    args = parser.parse_args(argv)
+
+    worker = AutoReductionWorker(latency_file_name=args.latency)
+
+    for nexus_file_name in args.nexus_files:
+        status, message = worker.process(nexus_file_name, args.output, args.dryrun)
+        if not status:
+            print('[ERROR] {}'.format(message))
+    # END-FOR
+
+    if args.watch is not None:
+        worker.watch_directory(args.watch, args.output, args.poll)
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            worker.stop()
+    # END-IF
+
+    return
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
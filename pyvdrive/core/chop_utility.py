@@ -4,7 +4,11 @@ import random
 import numpy
 from pyvdrive.core import mantid_helper
 from pyvdrive.core import datatypeutility
-from mantid.api import ITableWorkspace
+from pyvdrive.core import splitter_builder
+from pyvdrive.core import lazy_import
+
+# Mantid is imported at the first use
+ITableWorkspace = lazy_import.lazy_attribute('mantid.api', 'ITableWorkspace')
 
 FifteenYearsInSecond = 15*356*24*3600
 # MAX_CHOPPED_WORKSPACE_IN_MEM = 40
@@ -162,10 +166,26 @@ class DataChopper(object):
 
         return True, ''
 
+    def generate_events_filter_arrays(self, run_number, vec_start, vec_stop, vec_target=None, splitter_tag=None):
+        """ Generate a split workspace from arrays of start time, stop time and target (relative time in seconds)
+        :param run_number:
+        :param vec_start:
+        :param vec_stop:
+        :param vec_target: None for targets 1, 2, 3, ...
+        :param splitter_tag: None for the standard manual tag
+        :return: 2-tuple. boolean, string (splitter tag or error message)
+        """
+        try:
+            splitters = splitter_builder.SplitterArrays(vec_start, vec_stop, vec_target)
+        except RuntimeError as run_err:
+            return False, 'Invalid splitters: {}'.format(run_err)
+
+        return self.generate_events_filter_manual(run_number, splitters, True, splitter_tag)
+
     def generate_events_filter_manual(self, run_number, split_list, relative_time, splitter_tag):
         """ Generate a split workspace with arbitrary input time
         :param run_number:
-        :param split_list: list of 2-element or 3-element
+        :param split_list: list of 2-element or 3-element, or splitter_builder.SplitterArrays
         :param relative_time:
         :param splitter_tag: 2-tuple : split workspace, information workspace OR None
                 boolean, ???? (...)/string (error message)
@@ -183,12 +203,13 @@ class DataChopper(object):
                                               '' % str(type(splitter_tag))
 
         # Check split list
-        assert isinstance(split_list, list), 'Splitters {0} must be given by list but not {1}.' \
-                                             ''.format(split_list, type(split_list))
+        assert isinstance(split_list, (list, splitter_builder.SplitterArrays)), \
+            'Splitters {0} must be given by list or SplitterArrays but not {1}.'.format(split_list, type(split_list))
 
         # auto target (1, 2, 3, ...) or user specified target
-        # TODO - TONIGHT - better to check all the splitters
-        if len(split_list) == 0:
+        if isinstance(split_list, splitter_builder.SplitterArrays):
+            auto_target = False
+        elif len(split_list) == 0:
             raise RuntimeError('Splitter has zero size')
         else:
             splitter0 = split_list[0]
@@ -202,10 +223,13 @@ class DataChopper(object):
                 auto_target = False
 
         # Generate split workspace
-        status, ret_obj = mantid_helper.generate_event_filters_arbitrary(split_list,
-                                                                         relative_time=relative_time,
-                                                                         tag=splitter_tag,
-                                                                         auto_target=auto_target)
+        try:
+            status, ret_obj = mantid_helper.generate_event_filters_arbitrary(split_list,
+                                                                             relative_time=relative_time,
+                                                                             tag=splitter_tag,
+                                                                             auto_target=auto_target)
+        except RuntimeError as run_err:
+            return False, 'Unable to generate splitters {} due to {}'.format(splitter_tag, run_err)
 
         if status:
             split_ws_name, info_ws_name = ret_obj
@@ -487,39 +511,23 @@ class DataChopper(object):
             stop_time = mantid_helper.get_run_stop(self._meta_ws_name, 'second', is_relative=True)
         print('[DB...BAT] Run stop = {}'.format(stop_time))
 
-        split_list = list()
-        split_t0 = start_time
-        split_tf = -1
-        while split_tf < stop_time:
-            # get split stop time
-            split_tf = split_t0 + time_interval
-            if split_tf > stop_time:
-                split_tf = stop_time + 1.E-10
-            # add to list
-            split_list.append((split_t0, split_tf))
-            # advance the start time
-            split_t0 += overlap_time_interval
-        # END-WHILE
+        # t0, t0 + dt, ... until one reaches the stop time
+        splitters = splitter_builder.generate_constant_time_splitters(start_time, stop_time,
+                                                                      time_interval, overlap_time_interval)
 
         # Determine tag
         if splitter_tag is None:
             splitter_tag = get_standard_manual_tag(self._meta_ws_name)
 
-        # Generate split workspaces
+        # Generate split workspaces: each (overlapped) splitter has its own workspace
         splitter_tag_list = list()
-        for i_split, split_tup in enumerate(split_list):
+        for i_split in range(splitters.number_splitters):
             splitter_tag_i = splitter_tag + '_{:05}'.format(i_split)
             splitter_info_i = splitter_tag_i + '_info'
-            status, message = mantid_helper.generate_event_filters_by_time(self._meta_ws_name,
-                                                                           splitter_tag_i,
-                                                                           splitter_info_i,
-                                                                           split_tup[0],
-                                                                           split_tup[1],
-                                                                           delta_time=None,
-                                                                           time_unit='second')
-
-            if not status:
-                return False, message
+            split_i = splitter_builder.SplitterArrays(splitters.start_times[i_split:i_split + 1],
+                                                      splitters.stop_times[i_split:i_split + 1],
+                                                      numpy.array([i_split + 1]))
+            mantid_helper.create_splitters_from_arrays(split_i, splitter_tag_i, splitter_info_i)
 
             # good
             splitter_tag_list.append(splitter_tag_i)
@@ -557,13 +565,20 @@ class DataChopper(object):
         info_ws_name = tag + '_Info'
 
         assert self._meta_ws_name is not None, 'Mantid workspace has not been loaded yet.'
-        status, message = mantid_helper.generate_event_filters_by_time(self._meta_ws_name,
-                                                                       splitter_ws_name, info_ws_name,
-                                                                       start_time, stop_time,
-                                                                       time_step, 'Seconds')
-        # return with error message
-        if status is False:
-            return status, message
+        # splitters in relative time (seconds): whole run by default
+        split_start = 0. if start_time is None else start_time
+        if stop_time is None:
+            split_stop = mantid_helper.get_run_stop(self._meta_ws_name, 'second', is_relative=True) + 1.E-10
+        else:
+            split_stop = stop_time
+        if split_start >= split_stop:
+            return False, 'Slicer starting time {} is after stopping time {}'.format(split_start, split_stop)
+        split_step = split_stop - split_start if time_step is None else time_step
+        try:
+            splitters = splitter_builder.generate_constant_time_splitters(split_start, split_stop, split_step)
+        except (RuntimeError, ValueError, AssertionError) as slicer_err:
+            return False, 'Unable to generate time slicer due to {}'.format(slicer_err)
+        mantid_helper.create_splitters_from_arrays(splitters, splitter_ws_name, info_ws_name)
 
         # set up splitter record
         self._chopSetupDict[tag] = {'start': start_time, 'step': time_step, 'stop': stop_time,
@@ -694,11 +709,9 @@ def get_number_chopped_ws(split_ws_name):
 
         run_start_time = split_ws.cell(0, 0)
     else:
-        # matrix workspace case
-        target_set = set()
-        for y in split_ws.readY(0):
-            int_y = int(y + 0.1)
-            target_set.add(int_y)
+        # matrix workspace case: -1 for the gaps between splitters
+        vec_target = numpy.round(split_ws.readY(0)).astype('int64')
+        target_set = set(numpy.unique(vec_target[vec_target >= 0]))
 
         run_start_time = split_ws.readX(0)[0]
     # END-FOR
@@ -783,7 +796,7 @@ def get_splitters(split_ws):
         vec_y = split_ws.readY(0)
         for index in range(len(vec_x)-1):
             start_time = vec_x[index]
-            stop_time = vec_x[index]
+            stop_time = vec_x[index + 1]
             target = vec_y[index]
             splitter_vec.append((start_time, stop_time, target))
 
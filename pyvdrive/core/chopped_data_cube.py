@@ -0,0 +1,154 @@
+# Chopped run data as a matrix (chop sequence x bin) for contour, image and 3D views
+# Normalization by proton charge and vanadium is done by broadcasting on the whole matrix instead of
+# sequence by sequence.
+import numpy
+from pyvdrive.core import datatypeutility
+
+
+class ChoppedDataCube(object):
+    """ Reduced data of all the chopped sequences of one bank of a chopped run
+    """
+
+    def __init__(self, vec_x, sequences):
+        """
+        initialization: allocate the matrix
+        :param vec_x: numpy array, X values (point data) shared by all the sequences
+        :param sequences: list of chop sequences (integers)
+        """
+        datatypeutility.check_numpy_arrays('Vector X', vec_x, 1, False)
+        datatypeutility.check_list('Chop sequences', sequences)
+
+        self._vec_x = vec_x
+        self._sequences = numpy.array(sequences)
+        self._matrix_y = numpy.zeros((len(sequences), vec_x.shape[0]), dtype='float64')
+
+        # normalization
+        self._vec_proton_charge = None
+        self._vec_vanadium = None
+
+        return
+
+    @property
+    def matrix_y(self):
+        """ raw (not normalized) intensities of shape (number of sequences, number of bins)
+        :return:
+        """
+        return self._matrix_y
+
+    @property
+    def sequences(self):
+        return self._sequences
+
+    @property
+    def shape(self):
+        return self._matrix_y.shape
+
+    @property
+    def vec_x(self):
+        return self._vec_x
+
+    def get_index(self, sequence):
+        """ get the row index of a chop sequence
+        :param sequence:
+        :return:
+        """
+        row_indexes = numpy.where(self._sequences == sequence)[0]
+        if row_indexes.shape[0] == 0:
+            raise RuntimeError('Chop sequence {} is not in data cube (sequences: {})'
+                               ''.format(sequence, self._sequences))
+
+        return int(row_indexes[0])
+
+    def get_normalized_matrix(self, pc_norm, van_norm):
+        """ get the intensities normalized by proton charge and/or vanadium by broadcasting
+        :param pc_norm: flag to normalize by proton charge
+        :param van_norm: flag to normalize by vanadium
+        :return: numpy 2D array (the raw matrix if no normalization)
+        """
+        datatypeutility.check_bool_variable('Flag to normalize by proton charge', pc_norm)
+        datatypeutility.check_bool_variable('Flag to normalize by vanadium', van_norm)
+
+        matrix_y = self._matrix_y
+        if pc_norm:
+            if self._vec_proton_charge is None:
+                raise RuntimeError('Proton charges are not set to data cube')
+            matrix_y = matrix_y / self._vec_proton_charge[:, numpy.newaxis]
+        if van_norm:
+            if self._vec_vanadium is None:
+                raise RuntimeError('Vanadium spectrum is not set to data cube')
+            matrix_y = matrix_y / self._vec_vanadium[numpy.newaxis, :]
+
+        return matrix_y
+
+    def get_sequence_data(self, sequence, pc_norm=False, van_norm=False):
+        """ get the data of one chop sequence
+        :param sequence:
+        :param pc_norm:
+        :param van_norm:
+        :return: 2-tuple (vector X, vector Y)
+        """
+        row_index = self.get_index(sequence)
+        vec_y = self._matrix_y[row_index]
+        if pc_norm:
+            vec_y = vec_y / self._vec_proton_charge[row_index]
+        if van_norm:
+            vec_y = vec_y / self._vec_vanadium
+
+        return self._vec_x, vec_y
+
+    def select(self, row_indexes):
+        """ create a new data cube with a subset of sequences (rows)
+        :param row_indexes: list or array of row indexes
+        :return: ChoppedDataCube
+        """
+        row_indexes = numpy.asarray(row_indexes, dtype='int64')
+        sub_cube = ChoppedDataCube(self._vec_x, self._sequences[row_indexes].tolist())
+        sub_cube._matrix_y = self._matrix_y[row_indexes]
+        if self._vec_proton_charge is not None:
+            sub_cube._vec_proton_charge = self._vec_proton_charge[row_indexes]
+        sub_cube._vec_vanadium = self._vec_vanadium
+
+        return sub_cube
+
+    def set_proton_charges(self, vec_proton_charge):
+        """ set proton charge of each sequence
+        :param vec_proton_charge: array-like with the same size as sequences
+        :return:
+        """
+        vec_proton_charge = numpy.asarray(vec_proton_charge, dtype='float64')
+        if vec_proton_charge.shape != self._sequences.shape:
+            raise RuntimeError('Number of proton charges {} does not match number of sequences {}'
+                               ''.format(vec_proton_charge.shape, self._sequences.shape))
+
+        self._vec_proton_charge = vec_proton_charge
+
+        return
+
+    def set_sequence_data(self, row_index, vec_y):
+        """ set the intensities of a sequence (row)
+        :param row_index:
+        :param vec_y:
+        :return:
+        """
+        datatypeutility.check_int_variable('Row index', row_index, (0, self._matrix_y.shape[0]))
+        if len(vec_y) != self._matrix_y.shape[1]:
+            raise RuntimeError('Chop sequence {} has {} bins but data cube has {} bins'
+                               ''.format(self._sequences[row_index], len(vec_y), self._matrix_y.shape[1]))
+
+        self._matrix_y[row_index] = vec_y
+
+        return
+
+    def set_vanadium(self, vec_vanadium):
+        """ set vanadium spectrum shared by all sequences
+        :param vec_vanadium: array-like with the same size as number of bins
+        :return:
+        """
+        vec_vanadium = numpy.asarray(vec_vanadium, dtype='float64')
+        if vec_vanadium.shape[0] != self._matrix_y.shape[1]:
+            raise RuntimeError('Vanadium spectrum has {} bins but data cube has {} bins'
+                               ''.format(vec_vanadium.shape[0], self._matrix_y.shape[1]))
+
+        self._vec_vanadium = vec_vanadium
+
+        return
@@ -1,6 +1,13 @@
 __author__ = 'wzz'
 
-from mantid.geometry import CrystalStructure, ReflectionGenerator, ReflectionConditionFilter
+import numpy
+from pyvdrive.core import datatypeutility
+from pyvdrive.core import lazy_import
+
+# Mantid is imported at the first use
+CrystalStructure = lazy_import.lazy_attribute('mantid.geometry', 'CrystalStructure')
+ReflectionGenerator = lazy_import.lazy_attribute('mantid.geometry', 'ReflectionGenerator')
+ReflectionConditionFilter = lazy_import.lazy_attribute('mantid.geometry', 'ReflectionConditionFilter')
 
 
 class UnitCell(object):
@@ -31,8 +38,8 @@ class UnitCell(object):
         :param c:
         :return:
         """
-        # unit cell type, primitive, bcc or fcc
-        assert 0 <= unit_cell_type <= 4, 'Unit cell type %d is not supported.' % unit_cell_type
+        # unit cell type, primitive, bcc, fcc or hcp
+        assert unit_cell_type in UnitCell.SpaceGroupDict, 'Unit cell type %d is not supported.' % unit_cell_type
         self._unitCellType = unit_cell_type
 
         # lattice size
@@ -78,6 +85,136 @@ class UnitCell(object):
         """
         return self._isCubic
 
+    @property
+    def key(self):
+        """ Key of the unit cell for caching reflections: lattice parameters and space group
+        :return: tuple
+        """
+        return self._a, self._b, self._c, self.space_group
+
+
+class ReflectionCache(object):
+    """ Cache of Bragg reflections (d-spacing and HKL) keyed by lattice parameters, space group and d-spacing range.
+    A request within the d-spacing range of a cached entry of the same unit cell is served by selecting the
+    reflections in range, such that Mantid's CrystalStructure and ReflectionGenerator are created only once
+    for zooming in
+    """
+
+    def __init__(self, reflection_generator=None):
+        """
+        initialization
+        :param reflection_generator: method to calculate reflections as (unit cell, min d, max d) to
+                                     (vec_d, hkl_matrix).  None for Mantid's ReflectionGenerator
+        """
+        if reflection_generator is None:
+            reflection_generator = generate_reflections
+        self._reflection_generator = reflection_generator
+
+        # key: unit cell key, value: list of (min d, max d, vec_d, hkl_matrix)
+        self._cache_dict = dict()
+
+        return
+
+    def clear(self):
+        """ clear the cache
+        :return:
+        """
+        self._cache_dict.clear()
+
+    def get_reflections(self, unit_cell, min_d, max_d):
+        """ get the reflections of a unit cell within a d-spacing range
+        :param unit_cell: UnitCell instance
+        :param min_d:
+        :param max_d:
+        :return: 2-tuple: vec_d (N), hkl_matrix (N x 3)
+        """
+        assert isinstance(unit_cell, UnitCell), 'Input must be an instance of UnitCell but not %s.' % str(
+            type(unit_cell))
+        if min_d >= max_d:
+            raise RuntimeError('Minimum d-spacing {} must be smaller than maximum d-spacing {}'.format(min_d, max_d))
+
+        entry_list = self._cache_dict.setdefault(unit_cell.key, list())
+        for cached_min_d, cached_max_d, vec_d, hkl_matrix in entry_list:
+            if cached_min_d <= min_d and max_d <= cached_max_d:
+                in_range = (vec_d >= min_d) & (vec_d <= max_d)
+                return vec_d[in_range], hkl_matrix[in_range]
+        # END-FOR
+
+        vec_d, hkl_matrix = self._reflection_generator(unit_cell, min_d, max_d)
+        vec_d = numpy.asarray(vec_d, dtype='float64')
+        hkl_matrix = numpy.asarray(hkl_matrix, dtype='float64').reshape((-1, 3))
+        entry_list.append((min_d, max_d, vec_d, hkl_matrix))
+
+        return vec_d, hkl_matrix
+
+    def get_merged_reflections(self, unit_cell, min_d, max_d, tolerance=0.0001):
+        """ get the reflections of a unit cell with the degenerated ones merged
+        :param unit_cell:
+        :param min_d:
+        :param max_d:
+        :param tolerance: d-spacing tolerance to merge reflections
+        :return: list of 2-tuples (d-spacing, list of HKLs) in the order of decreasing d-spacing
+        """
+        vec_d, hkl_matrix = self.get_reflections(unit_cell, min_d, max_d)
+
+        return merge_reflections(vec_d, hkl_matrix, tolerance)
+
+    def get_phases_reflections(self, unit_cell_list, min_d, max_d, tolerance=0.0001):
+        """ get the merged reflections of several phases at once
+        :param unit_cell_list: list of UnitCell
+        :param min_d:
+        :param max_d:
+        :param tolerance:
+        :return: list (one per unit cell) of list of 2-tuples (d-spacing, list of HKLs)
+        """
+        datatypeutility.check_list('Unit cells', unit_cell_list)
+
+        return [self.get_merged_reflections(unit_cell, min_d, max_d, tolerance) for unit_cell in unit_cell_list]
+
+
+def merge_reflections(vec_d, hkl_matrix, tolerance=0.0001):
+    """ merge degenerated reflections, whose d-spacing are same after being rounded to the tolerance
+    :param vec_d: d-spacing of reflections
+    :param hkl_matrix: N x 3 HKLs
+    :param tolerance: d-spacing tolerance
+    :return: list of 2-tuples (d-spacing, list of HKLs) in the order of decreasing d-spacing
+    """
+    datatypeutility.check_numpy_arrays('Reflection d-spacing', vec_d, 1, False)
+    datatypeutility.check_float_variable('Tolerance', tolerance, (0., None))
+    if tolerance <= 0:
+        raise RuntimeError('Tolerance to merge reflections must be positive')
+    if vec_d.shape[0] == 0:
+        return list()
+
+    # sort by decreasing d-spacing and group by rounded d-spacing
+    vec_key = numpy.round(vec_d / tolerance).astype('int64')
+    sort_indexes = numpy.lexsort((numpy.arange(vec_d.shape[0]), -vec_key))
+    vec_key = vec_key[sort_indexes]
+    group_start = numpy.concatenate([[0], numpy.where(vec_key[1:] != vec_key[:-1])[0] + 1])
+    hkl_list = hkl_matrix[sort_indexes].tolist()
+    vec_group_d = vec_d[sort_indexes][group_start]
+
+    group_bounds = numpy.append(group_start, vec_d.shape[0]).tolist()
+    reflection_list = [(float(vec_group_d[i_group]), hkl_list[group_bounds[i_group]:group_bounds[i_group + 1]])
+                       for i_group in range(group_start.shape[0])]
+
+    return reflection_list
+
+
+def generate_reflections(unit_cell, min_d, max_d):
+    """ Calculate the unique reflections of a unit cell by Mantid's ReflectionGenerator
+    :param unit_cell: UnitCell instance
+    :param min_d:
+    :param max_d:
+    :return: 2-tuple: vec_d (N), hkl_matrix (N x 3)
+    """
+    reflections = list(calculate_reflections(unit_cell, min_d, max_d))
+    vec_d = numpy.array([ref_tup[1] for ref_tup in reflections], dtype='float64')
+    hkl_matrix = numpy.array([[ref_tup[0].X(), ref_tup[0].Y(), ref_tup[0].Z()] for ref_tup in reflections],
+                             dtype='float64').reshape((-1, 3))
+
+    return vec_d, hkl_matrix
+
 
 def calculate_reflections(unit_cell, min_d, max_d):
     """ Calculate reflections' position in d-spacing
@@ -0,0 +1,396 @@
+# Cyclic (fatigue, thermal cycling) event slicers from a sample log
+# Cycle boundaries are located on the smoothed log either by the crossings of a reference level (with hysteresis to
+# reject noise) or by its local maxima, keeping the highest one of each excursion above a lower limit.  The cycle
+# maxima and minima are then refined on the raw log.  Each cycle is split into phase bins (equal fractions of the
+# cycle time) or log value bins (on the rising or falling edge).
+# All the steps are vectorized over the whole log such that logs with millions of points and thousands of cycles
+# are processed without any loop over cycles, and the splitters are emitted as SplitterArrays.
+# Benchmark:
+#   python -m pyvdrive.core.cyclic_slicer --points 10000000 --cycles 5000
+import sys
+import time
+import argparse
+import numpy
+from pyvdrive.core import datatypeutility
+from pyvdrive.core import splitter_builder
+
+CROSSING_METHOD = 'crossing'
+PEAK_METHOD = 'peak'
+
+
+def smooth_log(vec_value, num_points):
+    """ smooth log value by boxcar (moving average) as Mantid SmoothData.  The points close to the edges are averaged
+    over the available neighbors
+    :param vec_value:
+    :param num_points: number of points to average.  Even number is increased by 1
+    :return: numpy array
+    """
+    datatypeutility.check_numpy_arrays('Log value', vec_value, 1, False)
+    datatypeutility.check_int_variable('Number of points to smooth', num_points, (1, None))
+
+    half_width = num_points // 2
+    if half_width == 0:
+        return vec_value.astype('float64')
+
+    vec_cumsum = numpy.concatenate([[0.], numpy.cumsum(vec_value, dtype='float64')])
+    vec_index = numpy.arange(vec_value.shape[0])
+    vec_left = numpy.maximum(vec_index - half_width, 0)
+    vec_right = numpy.minimum(vec_index + half_width + 1, vec_value.shape[0])
+
+    return (vec_cumsum[vec_right] - vec_cumsum[vec_left]) / (vec_right - vec_left)
+
+
+def find_level_crossings(vec_value, level, hysteresis=0.):
+    """ find the crossings of a reference level.  A crossing is counted only if the value moves from below
+    (level - hysteresis) to above (level + hysteresis) or vice versa, such that noise around the level is ignored
+    :param vec_value:
+    :param level:
+    :param hysteresis: half width of the dead band around the level
+    :return: 2-tuple: indexes of rising crossings, indexes of falling crossings.  The index is the first point
+             in the new state
+    """
+    datatypeutility.check_numpy_arrays('Log value', vec_value, 1, False)
+    datatypeutility.check_float_variable('Hysteresis', hysteresis, (0., None))
+
+    # state: 1 above, -1 below, 0 within the dead band which inherits the previous state
+    vec_state = numpy.zeros(vec_value.shape, dtype='int8')
+    vec_state[vec_value > level + hysteresis] = 1
+    vec_state[vec_value < level - hysteresis] = -1
+    vec_valid_index = numpy.where(vec_state != 0, numpy.arange(vec_state.shape[0]), 0)
+    numpy.maximum.accumulate(vec_valid_index, out=vec_valid_index)
+    vec_state = vec_state[vec_valid_index]
+
+    vec_change = numpy.where(vec_state[1:] != vec_state[:-1])[0] + 1
+    # a change from the undetermined beginning (0) is not a crossing
+    vec_change = vec_change[vec_state[vec_change - 1] != 0]
+    rising = vec_state[vec_change] > 0
+
+    return vec_change[rising], vec_change[~rising]
+
+
+def find_local_maxima(vec_value, lower_limit=None):
+    """ find local maxima (strictly larger than both neighbors as scipy.signal.argrelextrema)
+    :param vec_value:
+    :param lower_limit: if not None, local maxima with value not larger than this are ignored
+    :return: indexes
+    """
+    datatypeutility.check_numpy_arrays('Log value', vec_value, 1, False)
+
+    is_max = (vec_value[1:-1] > vec_value[:-2]) & (vec_value[1:-1] > vec_value[2:])
+    if lower_limit is not None:
+        is_max &= vec_value[1:-1] > lower_limit
+
+    return numpy.where(is_max)[0] + 1
+
+
+def select_highest_maxima(vec_value, vec_max_indexes, vec_boundaries):
+    """ keep only the highest local maximum within each segment between 2 adjacent boundaries, such that noise
+    wiggles on the top of a cycle do not count as cycles
+    :param vec_value:
+    :param vec_max_indexes: sorted indexes of local maxima
+    :param vec_boundaries: sorted indexes of segment boundaries (e.g., level crossings)
+    :return: sorted indexes
+    """
+    if vec_max_indexes.shape[0] == 0:
+        return vec_max_indexes
+
+    vec_segment = numpy.searchsorted(vec_boundaries, vec_max_indexes, side='right')
+    # sort by segment and then by descending value: the first one of each segment is the highest
+    order = numpy.lexsort((-vec_value[vec_max_indexes], vec_segment))
+    first_indexes = numpy.unique(vec_segment[order], return_index=True)[1]
+
+    return numpy.sort(vec_max_indexes[order[first_indexes]])
+
+
+def refine_local_maxima(vec_value, vec_indexes, num_neighbors):
+    """ move local maxima found from the smoothed log to the maxima of the raw log within +/- N neighbors
+    :param vec_value: raw log value
+    :param vec_indexes: indexes of local maxima
+    :param num_neighbors:
+    :return: sorted and unique indexes
+    """
+    datatypeutility.check_int_variable('Number of neighbors', num_neighbors, (0, None))
+    if vec_indexes.shape[0] == 0 or num_neighbors == 0:
+        return vec_indexes
+
+    window = numpy.arange(-num_neighbors, num_neighbors + 1)
+    index_matrix = numpy.clip(vec_indexes[:, numpy.newaxis] + window, 0, vec_value.shape[0] - 1)
+    vec_refined = index_matrix[numpy.arange(vec_indexes.shape[0]), numpy.argmax(vec_value[index_matrix], axis=1)]
+
+    return numpy.unique(vec_refined)
+
+
+def segment_arg_extrema(vec_value, vec_boundaries, find_max):
+    """ find the index of the maximum or minimum of each segment [b_i, b_i+1)
+    :param vec_value:
+    :param vec_boundaries: strictly increasing indexes.  The last one can be the size of vec_value
+    :param find_max: True for maximum and False for minimum
+    :return: indexes (first one if the extremum is not unique)
+    """
+    if (vec_boundaries[1:] <= vec_boundaries[:-1]).any():
+        raise RuntimeError('Segment boundaries must be strictly increasing')
+    vec_start = vec_boundaries[:-1]
+    vec_stop = vec_boundaries[1:]
+
+    # work on the points within the segments only
+    vec_sub = vec_value[vec_start[0]:vec_stop[-1]]
+    vec_start = vec_start - vec_boundaries[0]
+    reduce_func = numpy.maximum if find_max else numpy.minimum
+    vec_extreme = reduce_func.reduceat(vec_sub, vec_start)
+
+    vec_lengths = numpy.diff(numpy.append(vec_start, vec_sub.shape[0]))
+    vec_candidates = numpy.where(vec_sub == numpy.repeat(vec_extreme, vec_lengths))[0]
+    vec_segment = numpy.searchsorted(vec_start, vec_candidates, side='right') - 1
+    first_indexes = numpy.unique(vec_segment, return_index=True)[1]
+
+    return vec_candidates[first_indexes] + vec_boundaries[0]
+
+
+def locate_cycles(vec_value, num_smooth_points=5, method=CROSSING_METHOD, level=None, hysteresis=None,
+                  lower_limit=None, num_neighbors=5):
+    """ locate the cycles of a cyclic log.  Cycle i starts at minimum i, reaches maximum i and ends at minimum i + 1
+    :param vec_value: raw log value
+    :param num_smooth_points: number of points to smooth the log before finding crossings or maxima
+    :param method: 'crossing' (level crossings) or 'peak' (local maxima of the smoothed log)
+    :param level: reference level for crossing method.  None for the middle of the log range
+    :param hysteresis: dead band around the level (crossing method) or lower limit (peak method).
+                       None for 10% of the log range
+    :param lower_limit: peak method: only the highest local maximum above (lower_limit + hysteresis) between
+                        2 crossings of this value is a cycle maximum.  None for the middle of the log range
+    :param num_neighbors: number of neighbors to refine local maxima on the raw log by peak method
+    :return: 2-tuple: minima indexes (M + 1), maxima indexes (M)
+    """
+    datatypeutility.check_numpy_arrays('Log value', vec_value, 1, False)
+    datatypeutility.check_string_variable('Cycle locating method', method, [CROSSING_METHOD, PEAK_METHOD])
+
+    vec_smoothed = smooth_log(vec_value, num_smooth_points)
+    num_points = vec_value.shape[0]
+
+    min_value = vec_smoothed.min()
+    max_value = vec_smoothed.max()
+    if hysteresis is None:
+        hysteresis = 0.1 * (max_value - min_value)
+
+    if method == CROSSING_METHOD:
+        if level is None:
+            level = 0.5 * (min_value + max_value)
+        vec_rising, vec_falling = find_level_crossings(vec_smoothed, float(level), float(hysteresis))
+
+        # pair each rising crossing with the next falling crossing.  rising and falling crossings alternate
+        if vec_falling.shape[0] > 0 and vec_rising.shape[0] > 0 and vec_falling[0] < vec_rising[0]:
+            vec_falling = vec_falling[1:]
+        num_cycles = min(vec_rising.shape[0], vec_falling.shape[0])
+        if num_cycles == 0:
+            raise RuntimeError('Log value never crosses level {} +/- {}'.format(level, hysteresis))
+
+        # segments: [0, r0), [r0, f0), [f0, r1), ... [r(M-1), f(M-1)), [f(M-1), end)
+        vec_boundaries = numpy.empty(2 * num_cycles + 2, dtype='int64')
+        vec_boundaries[0] = 0
+        vec_boundaries[1:-1:2] = vec_rising[:num_cycles]
+        vec_boundaries[2:-1:2] = vec_falling[:num_cycles]
+        vec_boundaries[-1] = num_points
+        vec_max_indexes = segment_arg_extrema(vec_value, vec_boundaries[1:-1], True)[0::2]
+        vec_min_indexes = segment_arg_extrema(vec_value, vec_boundaries, False)[0::2]
+
+    else:
+        if lower_limit is None:
+            lower_limit = 0.5 * (min_value + max_value)
+        lower_limit = float(lower_limit)
+        vec_max_indexes = find_local_maxima(vec_smoothed, lower_limit + hysteresis)
+        # one maximum for each excursion above the lower limit
+        vec_rising, vec_falling = find_level_crossings(vec_smoothed, lower_limit, float(hysteresis))
+        vec_max_indexes = select_highest_maxima(vec_smoothed, vec_max_indexes,
+                                                numpy.sort(numpy.concatenate([vec_rising, vec_falling])))
+        vec_max_indexes = refine_local_maxima(vec_value, vec_max_indexes, num_neighbors)
+        vec_max_indexes = vec_max_indexes[(vec_max_indexes > 0) & (vec_max_indexes < num_points - 1)]
+        if vec_max_indexes.shape[0] == 0:
+            raise RuntimeError('No local maximum is found above {} + {}'.format(lower_limit, hysteresis))
+
+        # minima are located between 2 adjacent maxima
+        vec_boundaries = numpy.concatenate([[0], vec_max_indexes, [num_points]])
+        vec_min_indexes = segment_arg_extrema(vec_value, vec_boundaries, False)
+    # END-IF-ELSE
+
+    return vec_min_indexes, vec_max_indexes
+
+
+def generate_phase_splitters(vec_times, vec_min_indexes, num_phase_bins):
+    """ split each cycle (from a minimum to the next minimum) into phase bins of equal duration.
+    Target is the phase bin index 0, 1, ..., N - 1
+    :param vec_times: log times (relative, second)
+    :param vec_min_indexes: cycle boundaries
+    :param num_phase_bins:
+    :return: SplitterArrays
+    """
+    datatypeutility.check_int_variable('Number of phase bins', num_phase_bins, (1, None))
+    if vec_min_indexes.shape[0] < 2:
+        raise RuntimeError('At least 1 cycle (2 boundaries) is required')
+
+    vec_cycle_times = vec_times[vec_min_indexes].astype('float64')
+    vec_fraction = numpy.arange(num_phase_bins + 1) / float(num_phase_bins)
+    # matrix: cycle x phase bin boundaries
+    time_matrix = vec_cycle_times[:-1, numpy.newaxis] + \
+        (vec_cycle_times[1:] - vec_cycle_times[:-1])[:, numpy.newaxis] * vec_fraction
+    target_matrix = numpy.tile(numpy.arange(num_phase_bins), (time_matrix.shape[0], 1))
+
+    return _build_splitters(time_matrix[:, :-1], time_matrix[:, 1:], target_matrix)
+
+
+def generate_log_value_splitters(vec_times, vec_value, vec_min_indexes, vec_max_indexes, log_boundaries,
+                                 rising=True):
+    """ split the rising (minimum i to maximum i) or falling (maximum i to minimum i + 1) edge of each cycle
+    by log value.  Target j is for log value between log_boundaries[j] and log_boundaries[j + 1].
+    The time of a log boundary is the first point on the edge reaching it, or the end of the edge if the edge never
+    reaches it
+    :param vec_times:
+    :param vec_value:
+    :param vec_min_indexes: M + 1 cycle boundaries
+    :param vec_max_indexes: M cycle maxima
+    :param log_boundaries: increasing log values
+    :param rising: flag for rising edge
+    :return: SplitterArrays
+    """
+    datatypeutility.check_numpy_arrays('Log time and value', [vec_times, vec_value], 1, True)
+    log_boundaries = numpy.asarray(log_boundaries, dtype='float64')
+    if log_boundaries.ndim != 1 or log_boundaries.shape[0] < 2 or (log_boundaries[1:] <= log_boundaries[:-1]).any():
+        raise RuntimeError('Log boundaries {} must be increasing with at least 2 values'.format(log_boundaries))
+    if vec_min_indexes.shape[0] != vec_max_indexes.shape[0] + 1:
+        raise RuntimeError('Number of minima ({}) must be number of maxima ({}) + 1'
+                           ''.format(vec_min_indexes.shape[0], vec_max_indexes.shape[0]))
+
+    # edges: [start, stop] and edge values converted to be non-decreasing
+    if rising:
+        vec_edge_start = vec_min_indexes[:-1]
+        vec_edge_stop = vec_max_indexes
+        sign = 1.
+    else:
+        vec_edge_start = vec_max_indexes
+        vec_edge_stop = vec_min_indexes[1:]
+        sign = -1.
+    vec_edge_size = vec_edge_stop - vec_edge_start + 1
+    num_edges = vec_edge_start.shape[0]
+
+    # concatenate all the edges: offset of edge i in the concatenated array
+    vec_offset = numpy.concatenate([[0], numpy.cumsum(vec_edge_size)])
+    vec_point_index = numpy.arange(vec_offset[-1]) - numpy.repeat(vec_offset[:-1] - vec_edge_start, vec_edge_size)
+    vec_edge_value = sign * vec_value[vec_point_index].astype('float64')
+
+    # make the value of each edge non-decreasing and shift the edges such that the whole array is sorted
+    min_value = vec_edge_value.min()
+    span = vec_edge_value.max() - min_value + 1.
+    vec_edge_id = numpy.repeat(numpy.arange(num_edges), vec_edge_size)
+    vec_key = numpy.maximum.accumulate(vec_edge_value - min_value + vec_edge_id * span)
+
+    # first point reaching each log boundary on each edge: edge x boundary
+    vec_level = numpy.clip(numpy.sort(sign * log_boundaries) - min_value, 0., span - 1.)
+    query_matrix = numpy.arange(num_edges)[:, numpy.newaxis] * span + vec_level
+    position_matrix = numpy.searchsorted(vec_key, query_matrix, side='left')
+    position_matrix = numpy.clip(position_matrix, vec_offset[:-1, numpy.newaxis], vec_offset[1:, numpy.newaxis] - 1)
+    time_matrix = vec_times[vec_point_index[position_matrix]].astype('float64')
+
+    num_bins = log_boundaries.shape[0] - 1
+    target_matrix = numpy.tile(numpy.arange(num_bins), (num_edges, 1))
+    if rising:
+        return _build_splitters(time_matrix[:, :-1], time_matrix[:, 1:], target_matrix)
+
+    # falling edge reaches the higher boundary first: bin j starts at boundary j + 1 and stops at boundary j
+    time_matrix = time_matrix[:, ::-1]
+    return _build_splitters(time_matrix[:, 1:], time_matrix[:, :-1], target_matrix)
+
+
+def _build_splitters(start_matrix, stop_matrix, target_matrix):
+    """ build splitters from matrices (cycle x bin) and remove the empty ones
+    :param start_matrix:
+    :param stop_matrix:
+    :param target_matrix:
+    :return: SplitterArrays
+    """
+    valid = stop_matrix > start_matrix + splitter_builder.TIME_TOLERANCE
+    if not valid.any():
+        raise RuntimeError('All {} cyclic splitters are empty'.format(valid.size))
+
+    return splitter_builder.SplitterArrays(start_matrix[valid], stop_matrix[valid], target_matrix[valid])
+
+
+def generate_sine_log(num_points, num_cycles, amplitude=500., offset=600., noise=5., seed=0):
+    """ generate a synthetic cyclic log: sine wave with Gaussian noise at 1 point per second
+    :param num_points:
+    :param num_cycles:
+    :param amplitude:
+    :param offset:
+    :param noise: standard deviation of the noise
+    :param seed:
+    :return: 2-tuple: vec_times, vec_value
+    """
+    datatypeutility.check_int_variable('Number of points', num_points, (2, None))
+    datatypeutility.check_int_variable('Number of cycles', num_cycles, (1, None))
+
+    vec_times = numpy.arange(num_points, dtype='float64')
+    vec_value = offset - amplitude * numpy.cos(2. * numpy.pi * num_cycles / num_points * vec_times)
+    if noise > 0:
+        vec_value += numpy.random.RandomState(seed).normal(0., noise, num_points)
+
+    return vec_times, vec_value
+
+
+def benchmark_cyclic_slicer(num_points=10**7, num_cycles=5000, num_bins=10, num_smooth_points=11,
+                            method=CROSSING_METHOD):
+    """ benchmark locating cycles and generating phase and log value splitters on a synthetic sine log
+    :param num_points:
+    :param num_cycles:
+    :param num_bins: number of phase bins and log value bins
+    :param num_smooth_points:
+    :param method:
+    :return: dictionary: step name = time (second), number of cycles and splitters
+    """
+    vec_times, vec_value = generate_sine_log(num_points, num_cycles)
+    result_dict = dict()
+
+    t0 = time.time()
+    vec_min_indexes, vec_max_indexes = locate_cycles(vec_value, num_smooth_points, method=method,
+                                                     lower_limit=vec_value.mean())
+    t1 = time.time()
+    phase_splitters = generate_phase_splitters(vec_times, vec_min_indexes, num_bins)
+    t2 = time.time()
+    log_boundaries = numpy.linspace(vec_value.min(), vec_value.max(), num_bins + 1)
+    log_splitters = generate_log_value_splitters(vec_times, vec_value, vec_min_indexes, vec_max_indexes,
+                                                 log_boundaries, rising=True)
+    t3 = time.time()
+    phase_splitters.to_workspace_2d_vectors()
+    t4 = time.time()
+
+    result_dict['locate_cycles'] = t1 - t0
+    result_dict['phase_splitters'] = t2 - t1
+    result_dict['log_value_splitters'] = t3 - t2
+    result_dict['workspace_2d_vectors'] = t4 - t3
+    result_dict['number_cycles'] = vec_max_indexes.shape[0]
+    result_dict['number_phase_splitters'] = phase_splitters.number_splitters
+    result_dict['number_log_splitters'] = log_splitters.number_splitters
+
+    return result_dict
+
+
+def main(argv):
+    """ benchmark cyclic slicers
+    :param argv:
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark cyclic slicers on a synthetic sine wave log')
+    parser.add_argument('--points', type=int, default=10**7, help='number of log points')
+    parser.add_argument('--cycles', type=int, default=5000, help='number of cycles')
+    parser.add_argument('--bins', type=int, default=10, help='number of phase and log value bins')
+    parser.add_argument('--method', default=CROSSING_METHOD, choices=[CROSSING_METHOD, PEAK_METHOD])
+    args = parser.parse_args(argv)
+
+    result_dict = benchmark_cyclic_slicer(args.points, args.cycles, args.bins, method=args.method)
+    print('{} points, {} cycles found'.format(args.points, result_dict['number_cycles']))
+    for step in ['locate_cycles', 'phase_splitters', 'log_value_splitters', 'workspace_2d_vectors']:
+        print('{:24s}: {:.3f} s'.format(step, result_dict[step]))
+    print('Splitters: {} by phase, {} by log value'
+          ''.format(result_dict['number_phase_splitters'], result_dict['number_log_splitters']))
+
+    return
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
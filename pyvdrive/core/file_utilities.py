@@ -6,7 +6,11 @@ import platform
 import h5py
 from pyvdrive.core import datatypeutility
 from pyvdrive.core.chop_utility import TimeSegment
-from mantid.simpleapi import SaveNexusProcessed, LoadNexusProcessed
+from pyvdrive.core import lazy_import
+
+# Mantid is imported at the first use
+SaveNexusProcessed = lazy_import.lazy_attribute('mantid.simpleapi', 'SaveNexusProcessed')
+LoadNexusProcessed = lazy_import.lazy_attribute('mantid.simpleapi', 'LoadNexusProcessed')
 
 
 def check_file_creation_date(file_name):
@@ -0,0 +1,232 @@
+# Raster of reduced patterns (one row per pattern) for image plots of live and chopped data
+# Each row is rebinned to a uniform grid with one bin per canvas pixel such that imshow() only has to render
+# (number of rows) x (canvas width) values instead of contouring the full resolution matrix.
+# The full resolution rows are kept in a ring buffer such that a new row can be appended without touching the
+# others, and the raster can be rebuilt for a zoomed-in X range.
+import numpy
+from pyvdrive.core import datatypeutility
+
+
+def rebin_to_pixels(vec_x, matrix_y, x_min, x_max, num_pixels, mode='max'):
+    """ Rebin the columns of a matrix to a uniform grid of pixels in [x_min, x_max]
+    The pixel containing no data point takes the value of the next data point
+    :param vec_x: numpy array, sorted X values (point data) of the columns
+    :param matrix_y: numpy 1D or 2D array, a row for each pattern
+    :param x_min:
+    :param x_max:
+    :param num_pixels: number of pixels (usually the width of the canvas)
+    :param mode: 'max' to keep peaks or 'mean'
+    :return: numpy array with shape (number of rows, num_pixels)
+    """
+    datatypeutility.check_numpy_arrays('Vector X', vec_x, 1, False)
+    datatypeutility.check_int_variable('Number of pixels', num_pixels, (1, None))
+    datatypeutility.check_string_variable('Rebin mode', mode, ['max', 'mean'])
+    if x_max <= x_min:
+        raise RuntimeError('X range [{}, {}) for rebinning is invalid'.format(x_min, x_max))
+
+    matrix_y = numpy.atleast_2d(matrix_y)
+    if matrix_y.shape[1] != vec_x.shape[0]:
+        raise RuntimeError('Matrix has {} columns but vector X has {} values'
+                           ''.format(matrix_y.shape[1], vec_x.shape[0]))
+
+    # data points in range
+    i_start = int(numpy.searchsorted(vec_x, x_min, side='left'))
+    i_stop = int(numpy.searchsorted(vec_x, x_max, side='right'))
+    if i_stop - i_start == 0:
+        return numpy.zeros((matrix_y.shape[0], num_pixels), dtype=matrix_y.dtype)
+    vec_x = vec_x[i_start:i_stop]
+    matrix_y = matrix_y[:, i_start:i_stop]
+
+    # index of first data point of each pixel.  reduceat() of an empty pixel gives the value at its start
+    pixel_edges = numpy.linspace(x_min, x_max, num_pixels + 1)
+    pixel_starts = numpy.searchsorted(vec_x, pixel_edges[:-1], side='left')
+    pixel_starts = numpy.minimum(pixel_starts, vec_x.shape[0] - 1)
+
+    if mode == 'max':
+        image = numpy.maximum.reduceat(matrix_y, pixel_starts, axis=1)
+    else:
+        pixel_counts = numpy.maximum(numpy.diff(numpy.append(pixel_starts, vec_x.shape[0])), 1)
+        image = numpy.add.reduceat(matrix_y, pixel_starts, axis=1) / pixel_counts
+
+    return image
+
+
+class ImageRaster(object):
+    """ Ring buffer of the last N patterns sharing the same X and their raster image
+    Row 0 of the image is the oldest pattern and the last row is the newest one.
+    """
+
+    def __init__(self, vec_x, num_rows, num_pixels, mode='max', data_key=None):
+        """
+        initialization
+        :param vec_x: numpy array, X values (point data) shared by all the patterns
+        :param num_rows: maximum number of patterns (N)
+        :param num_pixels: number of pixels along X (usually the width of the canvas)
+        :param mode: rebin mode: max or mean
+        :param data_key: key of the data set (e.g., 2D plot mode) that the rows are from
+        """
+        datatypeutility.check_numpy_arrays('Vector X', vec_x, 1, False)
+        datatypeutility.check_int_variable('Number of rows', num_rows, (1, None))
+        datatypeutility.check_int_variable('Number of pixels', num_pixels, (1, None))
+
+        self._vec_x = vec_x
+        self._data_key = data_key
+        self._num_pixels = num_pixels
+        self._mode = mode
+        self._x_range = vec_x[0], vec_x[-1]
+
+        # full resolution rows, their labels (e.g., accumulation index) and the raster
+        self._matrix_y = numpy.zeros((num_rows, vec_x.shape[0]), dtype='float64')
+        self._row_labels = numpy.zeros(num_rows, dtype='int64')
+        self._image = numpy.zeros((num_rows, num_pixels), dtype='float64')
+        self._num_filled = 0
+
+        return
+
+    @property
+    def data_key(self):
+        """ key of the data set that the rows are from
+        :return:
+        """
+        return self._data_key
+
+    @property
+    def extent(self):
+        """ extent of the image for imshow (left, right, bottom, top) with one unit in Y for each row
+        :return:
+        """
+        return self._x_range[0], self._x_range[1], -0.5, self._num_filled - 0.5
+
+    @property
+    def image(self):
+        """ raster image of the filled rows (oldest first)
+        :return:
+        """
+        return self._image[self._image.shape[0] - self._num_filled:]
+
+    @property
+    def last_label(self):
+        """ label of the newest row. None for empty raster
+        :return:
+        """
+        if self._num_filled == 0:
+            return None
+        return int(self._row_labels[-1])
+
+    @property
+    def number_rows(self):
+        return self._matrix_y.shape[0]
+
+    @property
+    def row_labels(self):
+        return self._row_labels[self._row_labels.shape[0] - self._num_filled:]
+
+    @property
+    def vec_x(self):
+        return self._vec_x
+
+    @property
+    def x_range(self):
+        return self._x_range
+
+    def append_row(self, label, vec_y):
+        """ append a new pattern as the newest row.  The oldest row is dropped if the buffer is full.
+        Only the new row is rebinned.
+        :param label: integer label of the row
+        :param vec_y:
+        :return:
+        """
+        if len(vec_y) != self._vec_x.shape[0]:
+            raise RuntimeError('Pattern {} has {} points but raster has {} points'
+                               ''.format(label, len(vec_y), self._vec_x.shape[0]))
+
+        # shift the rows up by one in place
+        self._matrix_y[:-1] = self._matrix_y[1:]
+        self._image[:-1] = self._image[1:]
+        self._row_labels[:-1] = self._row_labels[1:]
+
+        self._matrix_y[-1] = vec_y
+        self._row_labels[-1] = label
+        self._image[-1] = rebin_to_pixels(self._vec_x, self._matrix_y[-1], self._x_range[0], self._x_range[1],
+                                          self._num_pixels, self._mode)[0]
+        self._num_filled = min(self._num_filled + 1, self._matrix_y.shape[0])
+
+        return
+
+    def replace_last_row(self, vec_y):
+        """ replace the newest row, e.g., by the accumulation in progress with more data
+        :param vec_y:
+        :return:
+        """
+        if self._num_filled == 0:
+            raise RuntimeError('Raster is empty.  No row can be replaced')
+        if len(vec_y) != self._vec_x.shape[0]:
+            raise RuntimeError('Pattern has {} points but raster has {} points'
+                               ''.format(len(vec_y), self._vec_x.shape[0]))
+
+        self._matrix_y[-1] = vec_y
+        self._image[-1] = rebin_to_pixels(self._vec_x, self._matrix_y[-1], self._x_range[0], self._x_range[1],
+                                          self._num_pixels, self._mode)[0]
+
+        return
+
+    def set_x_range(self, x_min, x_max, num_pixels=None):
+        """ set the X range (zoom) and/or number of pixels and rebuild the raster from the full resolution rows
+        :param x_min:
+        :param x_max:
+        :param num_pixels: None for not changed
+        :return:
+        """
+        if num_pixels is not None:
+            datatypeutility.check_int_variable('Number of pixels', num_pixels, (1, None))
+            self._num_pixels = num_pixels
+        self._x_range = x_min, x_max
+
+        self._image = rebin_to_pixels(self._vec_x, self._matrix_y, x_min, x_max, self._num_pixels, self._mode)
+
+        return
+
+
+def update_raster(raster, data_set_dict, num_rows, num_pixels, x_range, data_key=None):
+    """ Update a raster with the patterns newer than its newest row.  The newest row itself is replaced as it might
+    be updated with more data (accumulation in progress).  A new raster is created if the raster does not exist,
+    or X, number of rows or data set key is changed such that rows from different data sets are not mixed.
+    :param raster: ImageRaster or None
+    :param data_set_dict: dictionary such that key = integer label (e.g., accumulation index),
+                          value = (vec_x, vec_y, ...)
+    :param num_rows: number of patterns (last N) on the raster
+    :param num_pixels: number of pixels along X for a new raster
+    :param x_range: (x_min, x_max) of a new raster
+    :param data_key: key of the data set, such as 2D plot mode
+    :return: 2-tuple: ImageRaster, boolean (True for a new raster)
+    """
+    datatypeutility.check_dict('Input data set', data_set_dict)
+    if len(data_set_dict) == 0:
+        raise RuntimeError('Data set to update raster is empty')
+
+    label_list = sorted(data_set_dict.keys())
+    vec_x = data_set_dict[label_list[0]][0]
+
+    if raster is None or raster.number_rows != num_rows or raster.data_key != data_key or \
+            raster.vec_x.shape != vec_x.shape or not numpy.allclose(raster.vec_x, vec_x):
+        raster = ImageRaster(vec_x, num_rows, num_pixels, data_key=data_key)
+        raster.set_x_range(x_range[0], x_range[1])
+        is_new = True
+    else:
+        is_new = False
+
+    last_label = raster.last_label
+    for label in label_list:
+        if last_label is not None and label < last_label:
+            continue
+        vec_x_i, vec_y_i = data_set_dict[label][:2]
+        if len(vec_x_i) != vec_x.shape[0]:
+            raise RuntimeError('Unable to form a raster because {0}-th vector has a different size {1} '
+                               'than first size {2}'.format(label, len(vec_x_i), vec_x.shape[0]))
+        if label == last_label:
+            raster.replace_last_row(vec_y_i)
+        else:
+            raster.append_row(label, vec_y_i)
+    # END-FOR
+
+    return raster, is_new
@@ -0,0 +1,214 @@
+# Import-time (cold start) benchmark of the GUI launcher (Lava.py) and the VDRIVE command line path
+# Each target is imported in a new Python process with "python -X importtime" (Python 3.7+), whose report
+# (import time: self [us] | cumulative | imported package) is parsed to the total import time and the slowest
+# modules.  Results can be saved to a JSON file and compared with a saved baseline to track the start time.
+# Example:
+#   python -m pyvdrive.core.import_benchmark --repeat 5 --baseline import_time.json
+#   python -m pyvdrive.core.import_benchmark --save import_time.json
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import namedtuple
+from pyvdrive.core import datatypeutility
+
+# import statements of the benchmarked start paths
+IMPORT_TARGETS = {
+    # modules imported by scripts/Lava.py before the user chooses a tool
+    'lava': 'import sys\n'
+            'try:\n'
+            '    from PyQt5.QtWidgets import QDialog, QApplication\n'
+            '    from PyQt5.uic import loadUi\n'
+            'except ImportError:\n'
+            '    from PyQt4.QtGui import QDialog, QApplication\n'
+            '    from PyQt4.uic import loadUi\n'
+            'from pyvdrive.core import lazy_import\n',
+    # VDRIVE command line: command processor and the API
+    'vdrive': 'import pyvdrive.interface.vcommand_processor\n'
+              'import pyvdrive.core.VDriveAPI\n',
+    # VDRIVE API only (no GUI library)
+    'vdrive_api': 'import pyvdrive.core.VDriveAPI\n',
+    # headless VDRIVE command engine (no Qt)
+    'vdrive_headless': 'import pyvdrive.interface.vdrive_commands.command_engine\n'
+}
+
+# heavy packages that shall not be imported at start
+HEAVY_MODULES = ['mantid', 'mantid.simpleapi', 'IPython', 'qtconsole', 'matplotlib', 'pandas']
+
+# one line of the import time report
+ImportRecord = namedtuple('ImportRecord', ['module', 'self_us', 'cumulative_us', 'depth'])
+
+
+def parse_import_time(report):
+    """ parse the import time report written by python -X importtime to stderr
+    :param report: string
+    :return: list of ImportRecord in the order of the report
+    """
+    datatypeutility.check_string_variable('Import time report', report)
+
+    record_list = list()
+    for line in report.split('\n'):
+        if not line.startswith('import time:'):
+            continue
+        terms = line[len('import time:'):].split('|')
+        if len(terms) != 3:
+            continue
+        try:
+            self_us = int(terms[0])
+            cumulative_us = int(terms[1])
+        except ValueError:
+            # header line: self [us] | cumulative | imported package
+            continue
+        name_term = terms[2].rstrip()
+        module_name = name_term.lstrip()
+        # nested imports are indented by 2 spaces per level after 1 space
+        depth = (len(name_term) - len(module_name) - 1) // 2
+        record_list.append(ImportRecord(module_name, self_us, cumulative_us, depth))
+    # END-FOR
+
+    return record_list
+
+
+def summarize_import_time(record_list, num_top=10):
+    """ summarize the import time records
+    :param record_list: list of ImportRecord
+    :param num_top: number of the slowest modules (by self time) to report
+    :return: dictionary: total (second), number of modules, top modules [(name, self time (second))] and
+             heavy modules imported
+    """
+    datatypeutility.check_list('Import records', record_list)
+    datatypeutility.check_int_variable('Number of top modules', num_top, (0, None))
+
+    total_us = sum([record.cumulative_us for record in record_list if record.depth == 0])
+    slow_records = sorted(record_list, key=lambda record: record.self_us, reverse=True)[:num_top]
+    module_set = set([record.module for record in record_list])
+
+    summary = {'total': total_us * 1.E-6,
+               'number_modules': len(record_list),
+               'top_modules': [(record.module, record.self_us * 1.E-6) for record in slow_records],
+               'heavy_modules': [name for name in HEAVY_MODULES if name in module_set]}
+
+    return summary
+
+
+def measure_import_time(statement, python_exe=None, num_top=10):
+    """ measure the import time of a statement in a new Python process
+    :param statement: Python statements to import modules
+    :param python_exe: Python executable.  None for the current one
+    :param num_top: number of the slowest modules to report
+    :return: summary dictionary (see summarize_import_time)
+    """
+    datatypeutility.check_string_variable('Import statement', statement)
+    if python_exe is None:
+        python_exe = sys.executable
+
+    env = os.environ.copy()
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    process = subprocess.Popen([python_exe, '-X', 'importtime', '-c', statement], env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    std_out, std_err = process.communicate()
+    if process.returncode != 0:
+        error_lines = [line for line in std_err.split('\n') if not line.startswith('import time:')]
+        raise RuntimeError('Unable to import:\n{}\n{}'.format(statement, '\n'.join(error_lines)))
+
+    return summarize_import_time(parse_import_time(std_err), num_top)
+
+
+def benchmark_targets(target_names=None, repeat=3, python_exe=None):
+    """ benchmark the import time of the start paths.  The median of the repeats is reported
+    :param target_names: None for all the targets in IMPORT_TARGETS
+    :param repeat: number of processes per target
+    :param python_exe:
+    :return: dictionary: key = target name, value = summary of the median repeat or error message (string)
+    """
+    if target_names is None:
+        target_names = sorted(IMPORT_TARGETS.keys())
+    datatypeutility.check_list('Import targets', target_names)
+    datatypeutility.check_int_variable('Repeat', repeat, (1, None))
+
+    result_dict = dict()
+    for target_name in target_names:
+        if target_name not in IMPORT_TARGETS:
+            raise RuntimeError('Import target {} is not supported. Supported: {}'
+                               ''.format(target_name, sorted(IMPORT_TARGETS.keys())))
+        try:
+            summary_list = [measure_import_time(IMPORT_TARGETS[target_name], python_exe) for _ in range(repeat)]
+        except RuntimeError as import_err:
+            result_dict[target_name] = str(import_err)
+            continue
+        summary_list.sort(key=lambda summary: summary['total'])
+        result_dict[target_name] = summary_list[len(summary_list) // 2]
+    # END-FOR
+
+    return result_dict
+
+
+def compare_to_baseline(result_dict, baseline_dict):
+    """ compare import times to a baseline
+    :param result_dict: benchmark results
+    :param baseline_dict: benchmark results of the baseline
+    :return: string
+    """
+    report = ''
+    for target_name in sorted(result_dict.keys()):
+        result = result_dict[target_name]
+        baseline = baseline_dict.get(target_name, None)
+        if not isinstance(result, dict) or not isinstance(baseline, dict):
+            continue
+        report += '{}: {:.3f} s (baseline {:.3f} s, {:+.1f}%)\n' \
+                  ''.format(target_name, result['total'], baseline['total'],
+                            (result['total'] / baseline['total'] - 1.) * 100.)
+    # END-FOR
+
+    return report
+
+
+def format_results(result_dict):
+    """ format the benchmark results
+    :param result_dict:
+    :return: string
+    """
+    report = ''
+    for target_name in sorted(result_dict.keys()):
+        result = result_dict[target_name]
+        if not isinstance(result, dict):
+            report += '{}: failed. {}\n'.format(target_name, result)
+            continue
+        report += '{}: {:.3f} s for {} modules.  Heavy modules imported: {}\n' \
+                  ''.format(target_name, result['total'], result['number_modules'], result['heavy_modules'])
+        for module_name, self_time in result['top_modules']:
+            report += '    {:8.4f} s  {}\n'.format(self_time, module_name)
+    # END-FOR
+
+    return report
+
+
+def main(argv):
+    """ benchmark the cold start import time
+    :param argv:
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Import time benchmark of Lava and VDRIVE command line')
+    parser.add_argument('targets', nargs='*', default=None, help='targets: {}'.format(sorted(IMPORT_TARGETS)))
+    parser.add_argument('--repeat', type=int, default=3, help='number of processes per target (median reported)')
+    parser.add_argument('--save', default=None, help='JSON file to save the results to')
+    parser.add_argument('--baseline', default=None, help='JSON file of a saved baseline to compare with')
+    args = parser.parse_args(argv)
+
+    result_dict = benchmark_targets(args.targets if args.targets else None, args.repeat)
+    print(format_results(result_dict))
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as baseline_file:
+            print(compare_to_baseline(result_dict, json.load(baseline_file)))
+
+    if args.save is not None:
+        with open(args.save, 'w') as result_file:
+            json.dump(result_dict, result_file, indent=2)
+
+    return
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
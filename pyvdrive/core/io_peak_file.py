@@ -30,6 +30,16 @@
 # $2 	fcc331	2	0.8038	0.83	0.02
 # $2 	bcc321	1	0.768	0.02
 ########
+import numpy
+from numpy.lib import recfunctions
+
+# peaks are stored in a structured array, one row per peak.  overlap is the tuple of the overlapped peaks' positions
+# given by the peak file (or client), which may not have their own lines
+PEAK_DTYPE = [('bank', 'i4'), ('name', 'U64'), ('position', 'f8'), ('width', 'f8'), ('group', 'i8'),
+              ('overlap', 'O')]
+BANK_HEADER = '$ bank, name, number of peak, position, width'
+# positions within this tolerance are regarded as the same peak to locate overlapped peaks' group
+POSITION_TOLERANCE = 1.E-4
 
 
 class GSASPeakFileManager(object):
@@ -37,14 +47,27 @@ class GSASPeakFileManager(object):
         """ Initialization
         :return:
         """
-        # This is a dictionary of dictionary
-        # level-1 key: bank ID, level-2 key: group ID, value: (peak name, peak center, peak width)
-        self._peakDict = dict()
-        # List of bank numbers
-        self._bankNumberList = list()
+        # peaks: structured array of PEAK_DTYPE.  Peaks of the same bank and group are overlapped
+        self._peakArray = numpy.zeros(0, dtype=PEAK_DTYPE)
+        # peaks added one by one, which are appended to the array at the next bulk operation
+        self._pendingPeakList = list()
+        # key: (bank, rounded position), value: group ID.  for locating the group of overlapped peaks
+        self._positionGroupDict = dict()
+        self._nextGroupID = 0
 
         return
 
+    def _get_peak_array(self):
+        """ Get the peak array with all the pending peaks appended
+        :return:
+        """
+        if len(self._pendingPeakList) > 0:
+            pending_array = numpy.array(self._pendingPeakList, dtype=PEAK_DTYPE)
+            self._pendingPeakList = list()
+            self._peakArray = numpy.concatenate([self._peakArray, pending_array])
+
+        return self._peakArray
+
     def add_peak(self, bank, name, position, width, group_id):
         """ Add a peak
         Purpose: add a peak to the object
@@ -54,7 +77,7 @@ class GSASPeakFileManager(object):
         :param name:
         :param position:
         :param width:
-        :param group_id: list of positions of the overlapped peaks OR None for no overlapped
+        :param group_id: group ID (integer) OR list of positions of the overlapped peaks OR None for no overlapped
         :return:
         """
         # Check requirements
@@ -65,29 +88,72 @@ class GSASPeakFileManager(object):
         assert isinstance(
             width, float), 'Peak width must be a string but not %s.' % str(type(width))
         assert width > 0., 'Peak width must be greater than 0 but not %f.' % width
-        assert isinstance(group_id, int), 'Group ID (%s) must be an integer but not %s.' \
-                                          '' % (str(group_id), str(type(group_id)))
-
-        # Locate the level-1 and level-2 keys: bank and group ID
-        if bank not in self._peakDict:
-            self._peakDict[bank] = dict()
-        if group_id not in self._peakDict[bank]:
-            self._peakDict[bank][group_id] = list()
+        assert isinstance(group_id, int) or isinstance(group_id, list) or group_id is None, \
+            'Group ID (%s) must be an integer, a list of overlapped peaks\' positions or None but not %s.' \
+            '' % (str(group_id), str(type(group_id)))
+
+        # Locate group ID
+        overlap_positions = tuple()
+        if isinstance(group_id, list):
+            overlap_positions = tuple(float(overlap_pos) for overlap_pos in group_id)
+            # overlapped peaks: same group as any overlapped peak added before
+            group_id_list = [self._positionGroupDict.get((bank, round(overlap_pos / POSITION_TOLERANCE)))
+                             for overlap_pos in group_id]
+            group_id_list = [group_i for group_i in group_id_list if group_i is not None]
+            if len(group_id_list) > 0:
+                group_id = group_id_list[0]
+            else:
+                group_id = None
+        if group_id is None:
+            group_id = self._nextGroupID
+        self._nextGroupID = max(self._nextGroupID, group_id + 1)
+        self._positionGroupDict[(bank, round(position / POSITION_TOLERANCE))] = group_id
 
         # peak name
         assert isinstance(name, str) or name is None, 'Peak name must be a string or None but not %s.' \
                                                       '' % str(type(name))
         if name == '' or name is None:
             # automatic peak name
-            peak_index = len(self._peakDict[bank][group_id]) + 1
+            peak_index = len(self._pendingPeakList) + self._peakArray.shape[0] + 1
             name = 'Peak-B%dG%d-%d' % (bank, group_id, peak_index)
 
-        self._peakDict[bank][group_id].append((name, position, width))
+        self._pendingPeakList.append((bank, name, position, width, group_id, overlap_positions))
 
-        # Update bank number
-        if bank not in self._bankNumberList:
-            self._bankNumberList.append(bank)
-            self._bankNumberList.sort()
+        return
+
+    def add_peaks(self, vec_bank, vec_name, vec_position, vec_width, vec_group, overlap_list=None):
+        """ Add peaks in bulk
+        :param vec_bank: array of bank numbers
+        :param vec_name: array of peak names
+        :param vec_position: array of peak positions
+        :param vec_width: array of peak widths
+        :param vec_group: array of group IDs (integer).  Peaks with same bank and group ID are overlapped
+        :param overlap_list: None or list of tuples of overlapped peaks' positions, which may not be added as peaks
+        :return:
+        """
+        new_array = numpy.zeros(len(vec_bank), dtype=PEAK_DTYPE)
+        new_array['bank'] = vec_bank
+        new_array['name'] = vec_name
+        new_array['position'] = vec_position
+        new_array['width'] = vec_width
+        new_array['group'] = vec_group
+        if overlap_list is None:
+            overlap_list = [tuple()] * new_array.shape[0]
+        elif len(overlap_list) != new_array.shape[0]:
+            raise RuntimeError('Number of overlapped positions tuples ({}) and number of peaks ({}) are different'
+                               ''.format(len(overlap_list), new_array.shape[0]))
+        for peak_index, overlap_positions in enumerate(overlap_list):
+            new_array['overlap'][peak_index] = tuple(overlap_positions)
+        peak_array = numpy.concatenate([self._get_peak_array(), new_array])
+        check_peaks(peak_array)
+
+        self._peakArray = peak_array
+        if new_array.shape[0] > 0:
+            self._nextGroupID = max(self._nextGroupID, int(peak_array['group'].max()) + 1)
+            # overlapped peaks added later by add_peak() can join these groups
+            position_keys = numpy.round(new_array['position'] / POSITION_TOLERANCE).astype('int64')
+            self._positionGroupDict.update(zip(zip(new_array['bank'].tolist(), position_keys.tolist()),
+                                               new_array['group'].tolist()))
 
         return
 
@@ -99,9 +165,12 @@ class GSASPeakFileManager(object):
         """
         assert isinstance(bank, int), 'Bank number must be an integer but not %s.' % str(type(bank))
         assert isinstance(name, str), 'Peak name must be a string but not %s.' % str(type(name))
-        assert (bank, name) in self._peakDict, 'Bank %d peak %s is not found.' % (bank, name)
 
-        del self._peakDict[(bank, name)]
+        peak_array = self._get_peak_array()
+        is_peak = (peak_array['bank'] == bank) & (peak_array['name'] == name)
+        assert is_peak.any(), 'Bank %d peak %s is not found.' % (bank, name)
+
+        self._peakArray = peak_array[~is_peak]
 
         return
 
@@ -116,83 +185,10 @@ class GSASPeakFileManager(object):
         # Check requirements
         assert isinstance(peak_file, str), 'Peak file path must be a string but not %s.' % str(
             type(peak_file))
-        assert len(self._peakDict) > 0, 'There must be at least one peak added.'
-
-        # For each bank, create a list sortable by group positions
-        # by assuming that there is no peak of another group inside any group
-        group_pos_dict = dict()
-        for bank in self._peakDict.keys():
-            group_pos_list = list()
-            for group_id in self._peakDict[bank].keys():
-                group_pos = -1
-                for peak_info_tup in self._peakDict[bank][group_id]:
-                    peak_pos = peak_info_tup[1]
-                    group_pos = peak_pos
-                    break
-                # END-FOR (peak)
-
-                # append to group_position list for sorting
-                group_pos_list.append((group_pos, group_id))
-            # END-FOR (group)
-
-            # sort group list in reverse order and add to dictionary for this bank
-            group_pos_list.sort(reverse=True)
-            group_pos_dict[bank] = group_pos_list
-        # END-FOR (bank)
-
-        # Init writing
-        w_buf = ''
-
-        # Write
-        for bank in self._bankNumberList:
-            # NOTE: the following codes are good, and will be kept!
-            w_buf += '$ bank, name, number of peak, position, width\n'
-
-            # loop over each group from high-D to low-D
-            for g_tup in group_pos_dict[bank]:
-                # get group ID
-                group_id = g_tup[1]
-
-                # sort peaks in reverse order
-                peak_info_list = self._peakDict[bank][group_id]
-                peak_info_list.sort(reverse=True)
-
-                # get a list peak of peak positions
-                overlapped_peaks = list()
-                for peak_tup in peak_info_list:
-                    overlapped_peaks.append(peak_tup[1])
-                num_peaks = len(overlapped_peaks)
-
-                # write peak to file
-                for peak_tup in peak_info_list:
-                    # get all necessary value
-                    peak_name = peak_tup[0]
-                    peak_pos = peak_tup[1]
-                    peak_width = peak_tup[2]
-
-                    # write bank name and peak name
-                    w_buf += '%d\t%s\t%d\t' % (bank, peak_name, num_peaks)
-
-                    # write this peak
-                    peak_pos_str = format_significant_4(peak_pos)
-                    w_buf += '%s\t' % peak_pos_str
-
-                    # write other peaks
-                    if num_peaks > 1:
-                        other_peaks = overlapped_peaks[:]
-                        other_peaks.pop(overlapped_peaks.index(peak_pos))
-                        for p_pos in other_peaks:
-                            temp_pos_str = format_significant_4(p_pos)
-                            w_buf += '%s\t' % temp_pos_str
-                    # END-IF
-
-                    # write peak width
-                    # TODO - NIGHT - peak width shall be close to 0.03
-                    peak_width = 0.03
-                    w_buf += '%.3f\n' % peak_width
-                # END-FOR (peak-tup)
-            # END-FOR (group)
-        # END-FOR (bank)
+        peak_array = self.get_peak_array()
+        assert peak_array.shape[0] > 0, 'There must be at least one peak added.'
+
+        w_buf = format_peak_lines(peak_array)
 
         try:
             out_file = open(peak_file, 'w')
@@ -208,24 +204,35 @@ class GSASPeakFileManager(object):
         :param peak_file:
         :return:
         """
-        return len(self._peakDict)
+        return self._peakArray.shape[0] + len(self._pendingPeakList)
+
+    def get_peak_array(self):
+        """ Get all the peaks validated and sorted in the order of the peak file: by bank, group (from high-d to
+        low-d) and peak position (from high-d to low-d)
+        :return: structured array of PEAK_DTYPE
+        """
+        peak_array = self._get_peak_array()
+        check_peaks(peak_array)
+        self._peakArray = peak_array = peak_array[sort_peaks(peak_array)]
+
+        return peak_array
 
     def get_peaks(self):
         """ Return all peaks
         Purpose: get all peaks to client
         Requirements: None
         Guarantees: peaks are exported as a list of list.  Each sub list is for one peak as
-            [bank, name, centre, width, overlapped positions]
-        Get all peaks by transforming ... self._peakDict = dict()
+            [bank, name, centre, width, overlapped positions (list or None)]
         :return:
         """
+        peak_array = self.get_peak_array()
+        overlap_list = get_overlapped_positions(peak_array)
+
         peak_list = list()
-        for key_tup in self._peakDict.keys():
-            bank = key_tup[0]
-            name = key_tup[1]
-            peak_info = [bank, name]
-            peak_info.extend(self._peakDict[key_tup])
-            peak_list.append(peak_info)
+        for i_peak, (bank, name, position, width, _, _) in enumerate(peak_array.tolist()):
+            overlapped_list = overlap_list[i_peak] if len(overlap_list[i_peak]) > 0 else None
+            peak_list.append([bank, name, position, width, overlapped_list])
+        # END-FOR
 
         return peak_list
 
@@ -242,47 +249,199 @@ class GSASPeakFileManager(object):
 
         # Get the file
         in_file = open(peak_file, 'r')
-        raw_lines = in_file.readlines()
+        raw_lines = in_file.read()
         in_file.close()
 
-        for raw_line in raw_lines:
-            line = raw_line.strip()
-
-            # skip empty line and comment line
-            if len(line) == 0:
-                continue
-            elif line.startswith('$'):
-                continue
-
-            terms = line.split()
-            try:
-                bank_number = int(terms[0])
-                assert bank_number >= 0
-                peak_name = terms[1]
-                num_peaks = int(terms[2])
-                assert num_peaks >= 1
-                peak_pos = float(terms[3])
-                if num_peaks == 1:
-                    overlapped_peak_list = None
-                else:
-                    overlapped_peak_list = list()
-                    for i_peak in range(num_peaks-1):
-                        over_peak_pos = float(terms[4+i_peak])
-                        overlapped_peak_list.append(over_peak_pos)
-                # END-IF
-                peak_width = float(terms[3+num_peaks])
-
-                # add peak
-                self.add_peak(bank_number, peak_name, peak_pos, peak_width, overlapped_peak_list)
-            except IndexError:
-                raise IndexError('Number of items in line "%s" is not right!' % line)
-            except TypeError as err:
-                raise TypeError('Line {} is not in a supported format but of type {}. FYI: {}.'
-                                ''.format(line, type(line), err))
+        peak_array = parse_peak_lines(raw_lines)
+        # group IDs in file are local to this file
+        peak_array['group'] += self._nextGroupID
+        self.add_peaks(peak_array['bank'], peak_array['name'], peak_array['position'], peak_array['width'],
+                       peak_array['group'], peak_array['overlap'])
 
         return
 
 
+def check_peaks(peak_array):
+    """ Check peaks: positive positions and widths, non-negative banks and unique (bank, name)
+    :param peak_array: structured array of PEAK_DTYPE
+    :return:
+    """
+    bad_rows = numpy.where((peak_array['position'] <= 0.) | (peak_array['width'] <= 0.) |
+                           (peak_array['bank'] < 0) | ~numpy.isfinite(peak_array['position']))[0]
+    if bad_rows.shape[0] > 0:
+        raise RuntimeError('{} peaks have invalid bank, position or width. First: {}'
+                           ''.format(bad_rows.shape[0], peak_array[bad_rows[0]]))
+
+    unique_keys, counts = numpy.unique(recfunctions.repack_fields(peak_array[['bank', 'name']]), return_counts=True)
+    if (counts > 1).any():
+        raise RuntimeError('Peaks {} are not unique by bank and name'.format(unique_keys[counts > 1].tolist()))
+
+    return
+
+
+def sort_peaks(peak_array):
+    """ Sort peaks by bank, group (by the highest position in group from high-d to low-d) and position
+    (from high-d to low-d)
+    :param peak_array:
+    :return: sorting indexes
+    """
+    if peak_array.shape[0] == 0:
+        return numpy.zeros(0, dtype='int64')
+
+    # highest position of each (bank, group)
+    group_keys, vec_inverse = numpy.unique(recfunctions.repack_fields(peak_array[['bank', 'group']]),
+                                           return_inverse=True)
+    vec_group_max = numpy.full(group_keys.shape[0], -numpy.inf)
+    numpy.maximum.at(vec_group_max, vec_inverse.reshape(-1), peak_array['position'])
+
+    return numpy.lexsort((-peak_array['position'], vec_inverse.reshape(-1), -vec_group_max[vec_inverse.reshape(-1)],
+                          peak_array['bank']))
+
+
+def get_group_bounds(peak_array):
+    """ Get the start and size of each group of sorted peaks
+    :param peak_array: sorted peaks
+    :return: 2-tuple: array of group start indexes, array of group sizes
+    """
+    is_new_group = numpy.ones(peak_array.shape[0], dtype=bool)
+    is_new_group[1:] = (peak_array['bank'][1:] != peak_array['bank'][:-1]) | \
+        (peak_array['group'][1:] != peak_array['group'][:-1])
+    group_start = numpy.where(is_new_group)[0]
+    group_size = numpy.diff(numpy.append(group_start, peak_array.shape[0]))
+
+    return group_start, group_size
+
+
+def get_overlapped_positions(peak_array):
+    """ Get the positions of the peaks overlapped with each peak: the overlapped positions given with the peak
+    followed by the positions of the other peaks in the same group that are not given
+    :param peak_array: sorted peaks
+    :return: list of list of positions
+    """
+    group_start, group_size = get_group_bounds(peak_array)
+    position_list = peak_array['position'].tolist()
+
+    overlap_list = list()
+    for start, size in zip(group_start.tolist(), group_size.tolist()):
+        for peak_index in range(start, start + size):
+            given_positions = list(peak_array['overlap'][peak_index])
+            given_keys = set([round(pos / POSITION_TOLERANCE) for pos in given_positions])
+            other_positions = [position_list[other_index] for other_index in range(start, start + size)
+                               if other_index != peak_index and
+                               round(position_list[other_index] / POSITION_TOLERANCE) not in given_keys]
+            overlap_list.append(given_positions + other_positions)
+    # END-FOR
+
+    return overlap_list
+
+
+def format_peak_lines(peak_array):
+    """ Format sorted peaks to the lines of GSAS peak file.  Each line is
+    bank, name, number of peaks in group, position, positions of the overlapped peaks, width
+    :param peak_array: sorted peaks
+    :return: string
+    """
+    overlap_list = get_overlapped_positions(peak_array)
+    vec_size = numpy.array([len(overlap_positions) + 1 for overlap_positions in overlap_list])
+
+    # format positions of all lines in one call
+    vec_all_pos = numpy.concatenate([[position] + overlap_positions for position, overlap_positions in
+                                     zip(peak_array['position'].tolist(), overlap_list)])
+    vec_pos_str = format_significant_4_array(vec_all_pos).tolist()
+    vec_pos_end = numpy.cumsum(vec_size).tolist()
+    pos_str_list = ['\t'.join(vec_pos_str[end - size:end]) for end, size in zip(vec_pos_end, vec_size.tolist())]
+
+    vec_lines = numpy.char.add(numpy.char.mod('%d\t', peak_array['bank']), peak_array['name'])
+    vec_lines = numpy.char.add(vec_lines, numpy.char.mod('\t%d\t', vec_size))
+    vec_lines = numpy.char.add(vec_lines, numpy.char.add(numpy.array(pos_str_list), '\t'))
+    vec_lines = numpy.char.add(vec_lines, numpy.char.mod('%.3f', peak_array['width']))
+
+    # bank header before the first peak of each bank
+    bank_start = numpy.where(numpy.append([True], peak_array['bank'][1:] != peak_array['bank'][:-1]))[0]
+    vec_lines = numpy.insert(vec_lines.astype(object), bank_start, BANK_HEADER)
+
+    return '\n'.join(vec_lines.tolist()) + '\n'
+
+
+def parse_peak_lines(raw_text):
+    """ Parse the lines of GSAS peak file.  Lines starting with $ are comments.  Overlapped peaks are in the same
+    group if they have the same bank and the same set of positions
+    :param raw_text:
+    :return: structured array of PEAK_DTYPE with group IDs 0, 1, 2, ...
+    """
+    line_list = [line for line in raw_text.split('\n') if len(line.strip()) > 0 and not line.strip().startswith('$')]
+    if len(line_list) == 0:
+        return numpy.zeros(0, dtype=PEAK_DTYPE)
+
+    term_list = [line.split() for line in line_list]
+    vec_num_terms = numpy.array([len(terms) for terms in term_list])
+    if (vec_num_terms < 5).any():
+        bad_line = line_list[int(numpy.where(vec_num_terms < 5)[0][0])]
+        raise IndexError('Number of items in line "%s" is not right!' % bad_line)
+    vec_terms = numpy.array([term for terms in term_list for term in terms])
+    vec_offset = numpy.concatenate([[0], numpy.cumsum(vec_num_terms)[:-1]])
+
+    try:
+        vec_bank = vec_terms[vec_offset].astype('int64')
+        vec_num_peaks = vec_terms[vec_offset + 2].astype('int64')
+    except ValueError as value_err:
+        raise TypeError('Bank or number of peaks cannot be parsed: {}'.format(value_err))
+    bad_lines = numpy.where((vec_num_peaks < 1) | (vec_num_terms != vec_num_peaks + 4) | (vec_bank < 0))[0]
+    if bad_lines.shape[0] > 0:
+        raise IndexError('Number of items in line "%s" is not right!' % line_list[int(bad_lines[0])])
+
+    # positions of all the peaks listed in each line
+    vec_pos_index = numpy.repeat(vec_offset + 3, vec_num_peaks) + \
+        numpy.arange(vec_num_peaks.sum()) - numpy.repeat(numpy.cumsum(vec_num_peaks) - vec_num_peaks, vec_num_peaks)
+    try:
+        vec_all_pos = vec_terms[vec_pos_index].astype('float64')
+        vec_width = vec_terms[vec_offset + 3 + vec_num_peaks].astype('float64')
+    except ValueError as value_err:
+        raise TypeError('Peak position or width cannot be parsed: {}'.format(value_err))
+    vec_pos_start = numpy.cumsum(vec_num_peaks) - vec_num_peaks
+
+    peak_array = numpy.zeros(len(line_list), dtype=PEAK_DTYPE)
+    peak_array['bank'] = vec_bank
+    peak_array['name'] = vec_terms[vec_offset + 1]
+    peak_array['position'] = vec_all_pos[vec_pos_start]
+    peak_array['width'] = vec_width
+
+    # overlapped positions of each line
+    for line_index, line_positions in enumerate(numpy.split(vec_all_pos, vec_pos_start[1:])):
+        peak_array['overlap'][line_index] = tuple(line_positions[1:].tolist())
+
+    # group: same bank and same set of (rounded) positions.  single peaks are in their own groups
+    num_lines = len(line_list)
+    vec_line_index = numpy.repeat(numpy.arange(num_lines), vec_num_peaks)
+    position_matrix = numpy.full((num_lines, int(vec_num_peaks.max())), -1, dtype='int64')
+    position_matrix[vec_line_index, numpy.arange(vec_all_pos.shape[0]) - vec_pos_start[vec_line_index]] = \
+        numpy.round(vec_all_pos / POSITION_TOLERANCE)
+    position_matrix.sort(axis=1)
+    vec_single = numpy.where(vec_num_peaks == 1, numpy.arange(num_lines), -1)
+    group_keys = numpy.column_stack([vec_bank, vec_single, position_matrix])
+    peak_array['group'] = numpy.unique(group_keys, axis=0, return_inverse=True)[1].reshape(-1)
+
+    return peak_array
+
+
+def format_significant_4_array(vec_number):
+    """
+    Format float numbers with 4 significant digit if they are between 0.01 and 10.
+    :param vec_number:
+    :return: numpy array of strings
+    """
+    vec_number = numpy.asarray(vec_number, dtype='float64')
+    out_of_range = (vec_number < 0.01) | (vec_number >= 10.)
+    if out_of_range.any():
+        raise RuntimeError('Float numbers {} are not within range.'.format(vec_number[out_of_range]))
+
+    vec_formatted = numpy.char.mod('%.3f', vec_number)
+    vec_formatted = numpy.where(vec_number < 1.0, numpy.char.mod('%.4f', vec_number), vec_formatted)
+    vec_formatted = numpy.where(vec_number < 0.1, numpy.char.mod('%.5f', vec_number), vec_formatted)
+
+    return vec_formatted
+
+
 def format_significant_4(float_number):
     """
     Format a float number with 4 significant digit if it is between 0.01 and 10.
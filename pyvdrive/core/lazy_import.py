@@ -0,0 +1,125 @@
+# Lazy import of heavy modules (Mantid and the GUI windows)
+# A module (or an attribute of a module, e.g., a Mantid algorithm or class) is imported when it is used for the
+# first time instead of when the importing module is imported, such that starting the GUI launcher or the VDRIVE
+# command line only pays for what is used.
+# Example:
+#   mantidapi = lazy_import.lazy_module('mantid.simpleapi')
+#   ADS = lazy_import.lazy_attribute('mantid.api', 'AnalysisDataService')
+import sys
+import importlib
+
+
+def is_imported(module_name):
+    """ check whether a module has been imported (e.g., to verify that a module is not imported at startup)
+    :param module_name:
+    :return:
+    """
+    return module_name in sys.modules
+
+
+class LazyModule(object):
+    """ Proxy of a module that is imported at the first attribute access
+    """
+
+    def __init__(self, module_name, submodule_names=None):
+        """
+        initialization
+        :param module_name:
+        :param submodule_names: None or list of the sub modules to import along (e.g., mantid.api)
+        """
+        self.__dict__['_module_name'] = module_name
+        self.__dict__['_submodule_names'] = list() if submodule_names is None else submodule_names
+        self.__dict__['_module'] = None
+
+        return
+
+    def __getattr__(self, attr_name):
+        return getattr(self._load(), attr_name)
+
+    def __setattr__(self, attr_name, value):
+        setattr(self._load(), attr_name, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        if self._module is None:
+            return '<lazy module {} (not imported)>'.format(self._module_name)
+        return repr(self._module)
+
+    def _load(self):
+        """ import the module if it is not
+        :return: module
+        """
+        if self._module is None:
+            for submodule_name in self._submodule_names:
+                importlib.import_module(submodule_name)
+            self.__dict__['_module'] = importlib.import_module(self._module_name)
+
+        return self._module
+
+
+class LazyAttribute(object):
+    """ Proxy of a function or class of a module that is imported at the first use.
+    The proxy can be called, its attributes can be accessed and it can be used in isinstance()
+    """
+
+    def __init__(self, module_name, attr_name):
+        """
+        initialization
+        :param module_name:
+        :param attr_name:
+        """
+        self._module_name = module_name
+        self._attr_name = attr_name
+        self._attr = None
+
+        return
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, attr_name):
+        # only called for the attributes other than _module_name, _attr_name and _attr
+        if attr_name.startswith('_') and attr_name in ['_module_name', '_attr_name', '_attr']:
+            raise AttributeError(attr_name)
+        return getattr(self._load(), attr_name)
+
+    def __instancecheck__(self, instance):
+        return isinstance(instance, self._load())
+
+    def __subclasscheck__(self, subclass):
+        return issubclass(subclass, self._load())
+
+    def __repr__(self):
+        if self._attr is None:
+            return '<lazy {}.{} (not imported)>'.format(self._module_name, self._attr_name)
+        return repr(self._attr)
+
+    def _load(self):
+        """ import the module if it is not and get the attribute
+        :return:
+        """
+        if self._attr is None:
+            module = importlib.import_module(self._module_name)
+            self._attr = getattr(module, self._attr_name)
+
+        return self._attr
+
+
+def lazy_attribute(module_name, attr_name):
+    """ get a lazy proxy of an attribute (function, class or object) of a module
+    :param module_name:
+    :param attr_name:
+    :return: LazyAttribute
+    """
+    return LazyAttribute(module_name, attr_name)
+
+
+def lazy_module(module_name, submodule_names=None):
+    """ get a lazy proxy of a module
+    :param module_name:
+    :param submodule_names: None or list of the sub modules to import along
+    :return: LazyModule
+    """
+    return LazyModule(module_name, submodule_names)
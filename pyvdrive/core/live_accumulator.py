@@ -0,0 +1,216 @@
+# Accumulation of live data in memory
+# Each incremental (live output) workspace is summed in place into preallocated numpy slabs: the last N
+# accumulations are kept in a ring buffer of shape (N, number of spectra, number of bins) for Y and E^2.
+# Sample logs of the increments are kept as lists of vectors per accumulation.  Mantid workspaces are only
+# created on demand from the buffer (see LiveDataDriver.create_accumulation_workspace)
+import numpy
+from pyvdrive.core import datatypeutility
+
+
+class LiveAccumulationBuffer(object):
+    """ Ring buffer of the last N accumulations of live data
+    """
+
+    def __init__(self, max_accumulations, max_increments):
+        """
+        initialization.  the slabs are allocated when the first increment is added
+        :param max_accumulations: number of accumulations (N) kept in memory
+        :param max_increments: number of incremental workspaces summed to an accumulation
+        """
+        datatypeutility.check_int_variable('Maximum number of accumulations', max_accumulations, (2, None))
+        datatypeutility.check_int_variable('Maximum number of increments', max_increments, (1, None))
+
+        self._max_accumulations = max_accumulations
+        self._max_increments = max_increments
+
+        # slabs
+        self._vec_x = None
+        self._matrix_y = None
+        self._matrix_e2 = None
+
+        # record of each slot: accumulation index (-1 for empty), number of increments, last pulse time
+        # and sample logs (key: log name, value: list of 2-tuple (times, values))
+        self._acc_indexes = numpy.zeros(max_accumulations, dtype='int64') - 1
+        self._increment_counts = numpy.zeros(max_accumulations, dtype='int64')
+        self._pulse_times = [None] * max_accumulations
+        self._log_dicts = [dict() for _ in range(max_accumulations)]
+
+        # index of the accumulation in progress (-1 for none)
+        self._current_index = -1
+
+        return
+
+    def _get_slot(self, acc_index):
+        """ get the slot of an accumulation in the ring buffer
+        :param acc_index:
+        :return:
+        """
+        slot = acc_index % self._max_accumulations
+        if acc_index < 0 or self._acc_indexes[slot] != acc_index:
+            raise RuntimeError('Accumulation {} is not in buffer (range {})'
+                               ''.format(acc_index, self.get_accumulation_indexes(-1)))
+
+        return slot
+
+    @property
+    def current_index(self):
+        """ index of the accumulation in progress. -1 for no data
+        :return:
+        """
+        return self._current_index
+
+    @property
+    def max_increments(self):
+        return self._max_increments
+
+    @property
+    def number_spectra(self):
+        if self._matrix_y is None:
+            return 0
+        return self._matrix_y.shape[1]
+
+    @property
+    def vec_x(self):
+        """ X (bin boundaries or points as the incremental workspaces) shared by all the accumulations
+        :return:
+        """
+        return self._vec_x
+
+    def add_increment(self, vec_x, matrix_y, matrix_e, pulse_time=None, log_dict=None):
+        """ add an incremental workspace's data to the accumulation in progress.  A new accumulation is started
+        (and the oldest one is dropped) if the accumulation in progress has max_increments increments.
+        :param vec_x: X shared by all spectra
+        :param matrix_y: 2D array (number of spectra, number of bins)
+        :param matrix_e: 2D array (number of spectra, number of bins)
+        :param pulse_time: time of the last pulse of the increment
+        :param log_dict: None or dictionary: key = log name, value = 2-tuple (vector of times, vector of values)
+        :return: boolean: a new accumulation is started
+        """
+        datatypeutility.check_numpy_arrays('Y and E of increment', [matrix_y, matrix_e], 2, True)
+
+        if self._matrix_y is None:
+            # allocate on the first increment
+            self._vec_x = numpy.array(vec_x)
+            self._matrix_y = numpy.zeros((self._max_accumulations,) + matrix_y.shape, dtype='float64')
+            self._matrix_e2 = numpy.zeros((self._max_accumulations,) + matrix_y.shape, dtype='float64')
+        elif matrix_y.shape != self._matrix_y.shape[1:] or not numpy.allclose(vec_x, self._vec_x):
+            raise RuntimeError('Increment of shape {} or its X cannot be added to accumulations of shape {}'
+                               ''.format(matrix_y.shape, self._matrix_y.shape[1:]))
+
+        # start a new accumulation
+        is_new = self._current_index < 0 or \
+            self._increment_counts[self._current_index % self._max_accumulations] >= self._max_increments
+        if is_new:
+            self._current_index += 1
+            slot = self._current_index % self._max_accumulations
+            self._acc_indexes[slot] = self._current_index
+            self._increment_counts[slot] = 0
+            self._matrix_y[slot] = 0.
+            self._matrix_e2[slot] = 0.
+            self._pulse_times[slot] = None
+            self._log_dicts[slot] = dict()
+        else:
+            slot = self._current_index % self._max_accumulations
+
+        # sum in place
+        self._matrix_y[slot] += matrix_y
+        self._matrix_e2[slot] += matrix_e ** 2
+        self._increment_counts[slot] += 1
+        if pulse_time is not None:
+            self._pulse_times[slot] = pulse_time
+        if log_dict is not None:
+            for log_name in log_dict:
+                self._log_dicts[slot].setdefault(log_name, list()).append(log_dict[log_name])
+
+        return is_new
+
+    def get_accumulation_indexes(self, last_n):
+        """ get the indexes of the last N accumulations (including the one in progress) in buffer
+        :param last_n: number of accumulations.  non-positive for all
+        :return: list of accumulation indexes from the oldest to the newest
+        """
+        datatypeutility.check_int_variable('Last N accumulations', last_n, (None, None))
+        if last_n <= 0 or last_n > self._max_accumulations:
+            last_n = self._max_accumulations
+
+        first_index = max(self._current_index - last_n + 1, 0)
+
+        return list(range(first_index, self._current_index + 1))
+
+    def get_data(self, acc_index, spec_index, point_data=True):
+        """ get the data of one spectrum of an accumulation
+        :param acc_index:
+        :param spec_index: workspace index
+        :param point_data: convert bin boundaries to bin centers
+        :return: 3-tuple (vector X, vector Y, vector E)
+        """
+        slot = self._get_slot(acc_index)
+        datatypeutility.check_int_variable('Spectrum index', spec_index, (0, self.number_spectra))
+
+        vec_x = self._vec_x
+        if point_data and vec_x.shape[0] == self._matrix_y.shape[2] + 1:
+            vec_x = 0.5 * (vec_x[:-1] + vec_x[1:])
+
+        return vec_x, self._matrix_y[slot, spec_index], numpy.sqrt(self._matrix_e2[slot, spec_index])
+
+    def get_last_n_data(self, last_n, spec_index, point_data=True):
+        """ get the data of one spectrum of the last N accumulations
+        :param last_n:
+        :param spec_index:
+        :param point_data:
+        :return: dictionary: key = accumulation index, value = 3-tuple (vector X, vector Y, vector E)
+        """
+        data_dict = dict()
+        for acc_index in self.get_accumulation_indexes(last_n):
+            data_dict[acc_index] = self.get_data(acc_index, spec_index, point_data)
+
+        return data_dict
+
+    def get_matrix(self, acc_index):
+        """ get Y and E of all the spectra of an accumulation
+        :param acc_index:
+        :return: 2-tuple (2D array Y, 2D array E)
+        """
+        slot = self._get_slot(acc_index)
+
+        return self._matrix_y[slot], numpy.sqrt(self._matrix_e2[slot])
+
+    def get_pulse_time(self, acc_index):
+        """ get the time of the last pulse of an accumulation
+        :param acc_index:
+        :return:
+        """
+        return self._pulse_times[self._get_slot(acc_index)]
+
+    def get_sample_log(self, log_name, last_n):
+        """ get a sample log of the last N accumulations
+        :param log_name:
+        :param last_n: number of accumulations.  non-positive for all
+        :return: 2-tuple (vector of times, vector of values). (None, None) if the log is not recorded
+        """
+        time_list = list()
+        value_list = list()
+        for acc_index in self.get_accumulation_indexes(last_n):
+            for vec_times, vec_value in self._log_dicts[self._get_slot(acc_index)].get(log_name, list()):
+                time_list.append(vec_times)
+                value_list.append(vec_value)
+        # END-FOR
+
+        if len(time_list) == 0:
+            return None, None
+
+        return numpy.concatenate(time_list), numpy.concatenate(value_list)
+
+    def has_accumulation(self, acc_index):
+        """ check whether an accumulation is in buffer
+        :param acc_index:
+        :return:
+        """
+        return acc_index >= 0 and self._acc_indexes[acc_index % self._max_accumulations] == acc_index
+
+    def is_complete(self, acc_index):
+        """ check whether an accumulation has all its increments
+        :param acc_index:
+        :return:
+        """
+        return self._increment_counts[self._get_slot(acc_index)] >= self._max_increments
@@ -0,0 +1,458 @@
+# Replay of live data without the beamline, and measurement of the live view updates
+# A replay source emits chunks (as the live listener does every UpdateEvery seconds) either from a recorded event
+# NeXus file, histogrammed by numpy to d-spacing with the binning of the live view, or from synthetic diffraction
+# patterns.  LiveUpdateMonitor records the latency of each update of the live view and the updates that are
+# dropped, i.e., replaced by the next live output before they are processed.
+# LiveViewProcessor runs the in-memory part of a live view update with the same objects as LiveDataView
+# (LiveAccumulationBuffer, image_raster.update_raster for the 2D view and the sample log of the accumulations),
+# such that it is benchmarked without GUI or Mantid:
+#   python -m pyvdrive.core.live_replay [--nexus VULCAN_xxx_event.nxs] [--speedup 100]
+# The real live view (LiveDataView) is benchmarked by replaying a NeXus file through Mantid's
+# FileEventDataListener: Lava.py --replay VULCAN_xxx_event.nxs [number of chunks].  The statistics are written
+# to the live view's log when the live view is stopped.
+import sys
+import math
+import time
+import argparse
+from collections import namedtuple
+import numpy
+import h5py
+from pyvdrive.core import datatypeutility
+from pyvdrive.core import image_raster
+from pyvdrive.core import live_accumulator
+from pyvdrive.core import mantid_helper
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+# chunk of live data: the same as an incremental (live output) workspace
+LiveChunk = namedtuple('LiveChunk', ['index', 'pulse_time', 'vec_x', 'matrix_y', 'matrix_e', 'log_dict'])
+
+# d-spacing binning of the live view: 0.3, -0.001, 3.5
+LIVE_D_BINNING = 0.3, -0.001, 3.5
+
+
+def create_log_binning(x_min, log_step, x_max):
+    """ create the bin boundaries of logarithm binning as Mantid Rebin with a negative step
+    :param x_min:
+    :param log_step: negative step
+    :param x_max:
+    :return: numpy array
+    """
+    num_bins = int(numpy.ceil(numpy.log(x_max / x_min) / numpy.log(1 - log_step)))
+    vec_x = x_min * (1 - log_step) ** numpy.arange(num_bins + 1)
+    vec_x[-1] = min(vec_x[-1], x_max)
+
+    return vec_x
+
+
+class SyntheticLiveSource(object):
+    """ Source of synthetic live data: a few Gaussian peaks shifting slowly with temperature on each bank
+    """
+
+    def __init__(self, num_chunks, chunk_seconds=10., num_banks=3, counts_per_chunk=100000, seed=0):
+        """
+        initialization
+        :param num_chunks: number of chunks to emit
+        :param chunk_seconds: time (second) of data in each chunk
+        :param num_banks: number of banks (spectra)
+        :param counts_per_chunk: number of counts of each bank in each chunk
+        :param seed: random seed
+        """
+        datatypeutility.check_int_variable('Number of chunks', num_chunks, (1, None))
+        datatypeutility.check_int_variable('Number of banks', num_banks, (1, None))
+
+        self._num_chunks = num_chunks
+        self._chunk_seconds = float(chunk_seconds)
+        self._num_banks = num_banks
+        self._counts = counts_per_chunk
+        self._random = numpy.random.RandomState(seed)
+
+        self._vec_x = create_log_binning(*LIVE_D_BINNING)
+        self._start_time = numpy.datetime64('2020-01-01T00:00:00', 'ns')
+
+        return
+
+    @property
+    def chunk_seconds(self):
+        return self._chunk_seconds
+
+    @property
+    def number_chunks(self):
+        return self._num_chunks
+
+    def iter_chunks(self):
+        """ generate the chunks
+        :return: iterator of LiveChunk
+        """
+        vec_d = 0.5 * (self._vec_x[1:] + self._vec_x[:-1])
+        peak_centers = numpy.array([0.78, 0.89, 1.08, 1.26, 2.06])
+        pulse_per_chunk = int(self._chunk_seconds * 60)
+
+        for chunk_index in range(self._num_chunks):
+            # temperature ramp expands the lattice
+            temperature = 300. + chunk_index * 0.1
+            centers = peak_centers * (1. + 1.E-5 * (temperature - 300.))
+            sigmas = 0.002 * centers
+            profile = numpy.exp(-0.5 * ((vec_d[numpy.newaxis, :] - centers[:, numpy.newaxis]) /
+                                        sigmas[:, numpy.newaxis]) ** 2).sum(axis=0) + 0.05
+            profile /= profile.sum()
+
+            matrix_y = self._random.poisson(self._counts * profile,
+                                            size=(self._num_banks, vec_d.shape[0])).astype('float64')
+            matrix_e = numpy.sqrt(matrix_y)
+
+            # sample log and pulse time of the chunk
+            chunk_start = self._start_time + numpy.timedelta64(int(chunk_index * self._chunk_seconds * 1.E9), 'ns')
+            vec_times = chunk_start + (numpy.arange(pulse_per_chunk) * (self._chunk_seconds / pulse_per_chunk * 1.E9)
+                                       ).astype('timedelta64[ns]')
+            log_dict = {'temperature': (vec_times[::60], numpy.zeros(vec_times[::60].shape[0]) + temperature),
+                        'proton_charge': (vec_times, numpy.zeros(pulse_per_chunk) + 1.E7)}
+
+            yield LiveChunk(chunk_index, vec_times[-1], self._vec_x, matrix_y, matrix_e, log_dict)
+        # END-FOR
+
+        return
+
+
+def calculate_bank_difc(two_theta, l2=2.0):
+    """ calculate DIFC of a (focused) VULCAN bank, i.e., TOF (micro-second) = DIFC * d (Angstrom)
+    :param two_theta: 2theta (degree)
+    :param l2: L2 (meter)
+    :return:
+    """
+    return 252.816 * 2. * math.sin(math.radians(abs(two_theta)) * 0.5) * (mantid_helper.VULCAN_L1 + l2)
+
+
+class EventNexusReplaySource(object):
+    """ Source of live data replayed from a recorded event NeXus file.  Events are histogrammed to d-spacing
+    by numpy with the focused geometry of each output spectrum (bank) and the binning of the live view
+    """
+
+    def __init__(self, nexus_file_name, chunk_seconds=10., bank_groups=None, two_theta_list=None):
+        """
+        initialization: read pulse times and sample logs
+        :param nexus_file_name:
+        :param chunk_seconds: time (second) of data in each chunk
+        :param bank_groups: list of list of NeXus bank names (as 'bank1') for each output spectrum.
+                            None for one spectrum per NeXus bank
+        :param two_theta_list: 2theta of each output spectrum.  None for VULCAN's (west, east and high angle)
+        """
+        datatypeutility.check_file_name(nexus_file_name, check_exist=True, note='Event NeXus file')
+
+        self._nexus_file_name = nexus_file_name
+        self._chunk_seconds = float(chunk_seconds)
+        self._vec_x = create_log_binning(*LIVE_D_BINNING)
+
+        with h5py.File(nexus_file_name, 'r') as nexus_h5:
+            entry = nexus_h5['entry']
+            bank_names = sorted([name[:-len('_events')] for name in entry.keys() if name.endswith('_events')
+                                 and 'event_time_offset' in entry[name]])
+            if len(bank_names) == 0:
+                raise RuntimeError('No event bank found in {}'.format(nexus_file_name))
+
+            self._start_time = numpy.datetime64(entry['start_time'][0].decode().split('+')[0][:26], 'ns')
+            self._vec_pulse = entry['{}_events/event_time_zero'.format(bank_names[0])][:]
+
+            # sample logs
+            self._log_dict = dict()
+            if 'DASlogs' in entry:
+                for log_name in entry['DASlogs']:
+                    log_group = entry['DASlogs'][log_name]
+                    if 'time' in log_group and 'value' in log_group and len(log_group['value'].shape) == 1:
+                        self._log_dict[log_name] = log_group['time'][:], log_group['value'][:]
+            # END-IF
+        # END-WITH
+
+        if bank_groups is None:
+            bank_groups = [[bank_name] for bank_name in bank_names]
+        self._bank_groups = bank_groups
+
+        # TOF bin boundaries of each output spectrum
+        if two_theta_list is None:
+            two_theta_list = [-90., 90., mantid_helper.HIGH_ANGLE_BANK_2THETA][:len(bank_groups)]
+            two_theta_list.extend([90.] * (len(bank_groups) - len(two_theta_list)))
+        elif len(two_theta_list) != len(bank_groups):
+            raise RuntimeError('Number of 2theta {} does not match number of bank groups {}'
+                               ''.format(len(two_theta_list), len(bank_groups)))
+        self._tof_bins_list = [self._vec_x * calculate_bank_difc(two_theta) for two_theta in two_theta_list]
+
+        return
+
+    @property
+    def chunk_seconds(self):
+        return self._chunk_seconds
+
+    @property
+    def number_chunks(self):
+        if self._vec_pulse.shape[0] == 0:
+            return 0
+        return int(self._vec_pulse[-1] // self._chunk_seconds) + 1
+
+    def iter_chunks(self):
+        """ generate the chunks by reading events of each time interval
+        :return: iterator of LiveChunk
+        """
+        # pulse index of the chunk boundaries
+        chunk_edges = numpy.arange(self.number_chunks + 1) * self._chunk_seconds
+        pulse_edges = numpy.searchsorted(self._vec_pulse, chunk_edges)
+
+        with h5py.File(self._nexus_file_name, 'r') as nexus_h5:
+            entry = nexus_h5['entry']
+            for chunk_index in range(self.number_chunks):
+                i_start, i_stop = pulse_edges[chunk_index], pulse_edges[chunk_index + 1]
+                if i_stop == i_start:
+                    continue
+
+                matrix_y = numpy.zeros((len(self._bank_groups), self._vec_x.shape[0] - 1), dtype='float64')
+                for group_index, bank_group in enumerate(self._bank_groups):
+                    for bank_name in bank_group:
+                        events = entry['{}_events'.format(bank_name)]
+                        event_index = events['event_index']
+                        first_event = int(event_index[i_start])
+                        last_event = int(event_index[i_stop]) if i_stop < event_index.shape[0] \
+                            else events['event_time_offset'].shape[0]
+                        matrix_y[group_index] += numpy.histogram(events['event_time_offset'][first_event:last_event],
+                                                                 bins=self._tof_bins_list[group_index])[0]
+                # END-FOR
+
+                # sample logs in the chunk
+                chunk_start, chunk_stop = chunk_edges[chunk_index], chunk_edges[chunk_index + 1]
+                log_dict = dict()
+                for log_name, (vec_time, vec_value) in self._log_dict.items():
+                    j_start, j_stop = numpy.searchsorted(vec_time, [chunk_start, chunk_stop])
+                    vec_offsets = (vec_time[j_start:j_stop] * 1.E9).astype('timedelta64[ns]')
+                    log_dict[log_name] = self._start_time + vec_offsets, vec_value[j_start:j_stop]
+                pulse_time = self._start_time + numpy.timedelta64(int(self._vec_pulse[i_stop - 1] * 1.E9), 'ns')
+
+                yield LiveChunk(chunk_index, pulse_time, self._vec_x, matrix_y, numpy.sqrt(matrix_y), log_dict)
+            # END-FOR
+        # END-WITH
+
+        return
+
+
+class LiveUpdateMonitor(object):
+    """ Latencies of the updates of a live view and the number of updates dropped, i.e., live outputs replaced by
+    the next ones before they are processed
+    """
+
+    def __init__(self):
+        """
+        initialization
+        """
+        self._latency_list = list()
+        self._num_dropped = 0
+        self._last_counter = None
+
+        return
+
+    @property
+    def dropped_updates(self):
+        return self._num_dropped
+
+    @property
+    def latencies(self):
+        return numpy.array(self._latency_list)
+
+    @property
+    def processed_updates(self):
+        return len(self._latency_list)
+
+    def record(self, latency, live_counter=None, num_updates=1):
+        """ record an update of the live view
+        :param latency: time (second) to process the update
+        :param live_counter: None or number of live outputs so far (e.g., counter of the live reduction script).
+                             The outputs not processed since the previous update are counted as dropped
+        :param num_updates: number of live outputs processed in this update
+        :return:
+        """
+        self._latency_list.append(latency)
+        if live_counter is not None:
+            if self._last_counter is not None:
+                self._num_dropped += max(0, int(live_counter - self._last_counter) - num_updates)
+            self._last_counter = live_counter
+
+        return
+
+    def record_dropped(self, num_dropped=1):
+        """ record live outputs that are dropped
+        :param num_dropped:
+        :return:
+        """
+        self._num_dropped += num_dropped
+
+        return
+
+    def report(self):
+        """ report the statistics
+        :return: str
+        """
+        report = 'Processed updates: {}  Dropped updates: {}'.format(self.processed_updates, self._num_dropped)
+        if self.processed_updates > 0:
+            latencies = self.latencies
+            report += '\nLatency (ms): mean = {:.3f}  median = {:.3f}  max = {:.3f}' \
+                      ''.format(latencies.mean() * 1000., numpy.median(latencies) * 1000., latencies.max() * 1000.)
+
+        return report
+
+
+class LiveViewProcessor(object):
+    """ In-memory processing of a live view update as LiveDataView: sum the chunk into the accumulation buffer,
+    update the 2D image of the last N accumulations of each bank and retrieve a sample log of the accumulations
+    """
+
+    def __init__(self, max_accumulations=360, increments_per_accumulation=3, last_n_2d=10, num_pixels=1000,
+                 log_name='temperature'):
+        """
+        initialization
+        :param max_accumulations: number of accumulations in memory
+        :param increments_per_accumulation: number of chunks in an accumulation
+        :param last_n_2d: number of accumulations in the 2D view
+        :param num_pixels: number of pixels along X of the 2D view
+        :param log_name: sample log to retrieve on each update
+        """
+        datatypeutility.check_int_variable('Last N accumulations in 2D view', last_n_2d, (2, None))
+
+        self._buffer = live_accumulator.LiveAccumulationBuffer(max_accumulations, increments_per_accumulation)
+        self._last_n_2d = last_n_2d
+        self._num_pixels = num_pixels
+        self._log_name = log_name
+
+        # key = workspace index (bank ID - 1), value = ImageRaster
+        self._raster_dict = dict()
+
+        return
+
+    @property
+    def accumulation_buffer(self):
+        return self._buffer
+
+    def get_raster(self, spec_index):
+        """ get the 2D image of a bank
+        :param spec_index: workspace index
+        :return: ImageRaster or None
+        """
+        return self._raster_dict.get(spec_index, None)
+
+    def process(self, chunk):
+        """ process a chunk as an incremental workspace
+        :param chunk: LiveChunk
+        :return:
+        """
+        self._buffer.add_increment(chunk.vec_x, chunk.matrix_y, chunk.matrix_e, pulse_time=chunk.pulse_time,
+                                   log_dict=chunk.log_dict)
+
+        # 2D view (LiveDataView.update_2d_plot): only the newest 2 are retrieved once the image has N rows
+        for spec_index in range(self._buffer.number_spectra):
+            raster = self._raster_dict.get(spec_index, None)
+            if raster is not None and raster.number_rows == self._last_n_2d:
+                data_set_dict = self._buffer.get_last_n_data(2, spec_index)
+            else:
+                data_set_dict = self._buffer.get_last_n_data(self._last_n_2d, spec_index)
+            if len(data_set_dict) < 2:
+                continue
+            vec_x = data_set_dict[min(data_set_dict.keys())][0]
+            self._raster_dict[spec_index] = image_raster.update_raster(raster, data_set_dict, self._last_n_2d,
+                                                                       self._num_pixels, (vec_x[0], vec_x[-1]),
+                                                                       'acc')[0]
+        # END-FOR
+
+        # sample log of all the accumulations
+        self._buffer.get_sample_log(self._log_name, -1)
+
+        return
+
+
+BenchmarkResult = namedtuple('BenchmarkResult', ['latencies', 'memory_growth', 'memory_peak', 'dropped_updates',
+                                                 'processed_updates'])
+
+
+def benchmark_live_processing(source, process_function=None, speedup=None, clock=time):
+    """ replay a live source and measure the processing
+    Chunks arrive every chunk_seconds / speedup seconds.  As the live output workspaces in ADS, a chunk not
+    processed before the next one arrives is replaced by it and thus dropped.
+    :param source: SyntheticLiveSource or EventNexusReplaySource
+    :param process_function: method to process a LiveChunk.  None for LiveViewProcessor with default setup
+    :param speedup: replay speed-up.  None for as fast as possible (no dropped update)
+    :param clock: object with methods time() and sleep() as the time module
+    :return: BenchmarkResult: latencies (second, numpy array), memory growth and peak memory (bytes, None if not
+             traced) allocated during the replay, number of dropped updates and number of processed updates
+    """
+    if process_function is None:
+        process_function = LiveViewProcessor().process
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+        memory_start = tracemalloc.get_traced_memory()[0]
+
+    monitor = LiveUpdateMonitor()
+    time_start = clock.time()
+    for chunk in source.iter_chunks():
+        if speedup is not None:
+            arrival_time = time_start + chunk.index * source.chunk_seconds / speedup
+            if clock.time() < arrival_time:
+                # consumer is faster than the source: wait for the chunk
+                clock.sleep(arrival_time - clock.time())
+            elif chunk.index + 1 < source.number_chunks and \
+                    clock.time() >= arrival_time + source.chunk_seconds / speedup:
+                # the next chunk has arrived already and replaces this one
+                monitor.record_dropped()
+                continue
+        # END-IF
+
+        t0 = clock.time()
+        process_function(chunk)
+        monitor.record(clock.time() - t0)
+    # END-FOR
+
+    if tracemalloc is not None:
+        memory_current, memory_peak = tracemalloc.get_traced_memory()
+        memory_growth = memory_current - memory_start
+        memory_peak -= memory_start
+        tracemalloc.stop()
+    else:
+        memory_growth = memory_peak = None
+
+    return BenchmarkResult(monitor.latencies, memory_growth, memory_peak, monitor.dropped_updates,
+                           monitor.processed_updates)
+
+
+def main(argv):
+    """ benchmark live view processing on a replayed NeXus file or synthetic data
+    :param argv:
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Replay live data and benchmark live view processing')
+    parser.add_argument('--nexus', default=None, help='event NeXus file to replay')
+    parser.add_argument('--synthetic', type=int, default=100, help='number of synthetic chunks if no NeXus file')
+    parser.add_argument('--chunk-seconds', type=float, default=10., help='time of data in each update (second)')
+    parser.add_argument('--speedup', type=float, default=None, help='replay speed-up (default: as fast as possible)')
+    parser.add_argument('--accumulations', type=int, default=360, help='number of accumulations in memory')
+    args = parser.parse_args(argv)
+
+    if args.nexus is None:
+        source = SyntheticLiveSource(args.synthetic, chunk_seconds=args.chunk_seconds)
+        log_name = 'temperature'
+    else:
+        source = EventNexusReplaySource(args.nexus, chunk_seconds=args.chunk_seconds)
+        log_name = 'proton_charge'
+    processor = LiveViewProcessor(max_accumulations=args.accumulations, log_name=log_name)
+
+    result = benchmark_live_processing(source, processor.process, args.speedup)
+    monitor = LiveUpdateMonitor()
+    for latency in result.latencies:
+        monitor.record(latency)
+    monitor.record_dropped(result.dropped_updates)
+    print(monitor.report())
+    if result.memory_peak is not None:
+        print('Memory (MB): peak = {:.3f}  growth = {:.3f}'
+              ''.format(result.memory_peak / 1024. ** 2, result.memory_growth / 1024. ** 2))
+
+    return
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,208 @@
+# Decimation of sample logs for plotting
+# A log is decimated by buckets: from each bucket, the first, the minimum, the maximum and the last points are kept
+# (M4 decimation) such that the plotted line has the same envelope as the raw data, i.e., spikes are not lost.
+# A multi-resolution pyramid of bucket indexes is built once per log such that any zoom or pan can be served by
+# the level with the resolution of the canvas.
+# A log split by slicers is shown as one segment per slicer, which are built from the boundaries with one search.
+import numpy
+from pyvdrive.core import datatypeutility
+
+
+def decimate_min_max(vec_x, vec_y, num_buckets):
+    """ Decimate a log by keeping the first, minimum, maximum and last points in each bucket
+    :param vec_x: numpy array, sorted time
+    :param vec_y: numpy array, log value
+    :param num_buckets: number of buckets (usually number of pixels of the canvas)
+    :return: 2-tuple (decimated vector X, decimated vector Y)
+    """
+    datatypeutility.check_numpy_arrays('Vector X and Y', [vec_x, vec_y], 1, True)
+    datatypeutility.check_int_variable('Number of buckets', num_buckets, (1, None))
+
+    if vec_x.shape[0] <= 4 * num_buckets:
+        return vec_x, vec_y
+
+    # buckets with equal number of points
+    bucket_starts = numpy.linspace(0, vec_x.shape[0], num_buckets + 1).astype('int64')[:-1]
+    indexes = _bucket_min_max_indexes(vec_y, bucket_starts, vec_x.shape[0])
+
+    return vec_x[indexes], vec_y[indexes]
+
+
+def _bucket_min_max_indexes(vec_y, bucket_starts, num_points):
+    """ get the indexes of the first, minimum, maximum and last points in each bucket
+    :param vec_y:
+    :param bucket_starts: starting indexes of each bucket (increasing and unique)
+    :param num_points: number of points of vec_y
+    :return: sorted unique indexes
+    """
+    bucket_stops = numpy.append(bucket_starts[1:], num_points)
+    min_values = numpy.minimum.reduceat(vec_y, bucket_starts)
+    max_values = numpy.maximum.reduceat(vec_y, bucket_starts)
+
+    # locate the first index of min/max in each bucket
+    bucket_ids = numpy.repeat(numpy.arange(bucket_starts.shape[0]), bucket_stops - bucket_starts)
+    point_indexes = numpy.arange(num_points)
+    min_indexes = _first_in_bucket(point_indexes[vec_y == min_values[bucket_ids]],
+                                   bucket_ids[vec_y == min_values[bucket_ids]], bucket_starts.shape[0])
+    max_indexes = _first_in_bucket(point_indexes[vec_y == max_values[bucket_ids]],
+                                   bucket_ids[vec_y == max_values[bucket_ids]], bucket_starts.shape[0])
+
+    indexes = numpy.concatenate((bucket_starts, min_indexes, max_indexes, bucket_stops - 1))
+
+    return numpy.unique(indexes)
+
+
+def _first_in_bucket(indexes, bucket_ids, num_buckets):
+    """ get the first index in each bucket
+    :param indexes: sorted indexes
+    :param bucket_ids: bucket ID of each index (sorted)
+    :param num_buckets:
+    :return:
+    """
+    first_indexes = numpy.zeros(num_buckets, dtype='int64')
+    is_first = numpy.ones(bucket_ids.shape[0], dtype=bool)
+    is_first[1:] = bucket_ids[1:] != bucket_ids[:-1]
+    first_indexes[bucket_ids[is_first]] = indexes[is_first]
+
+    return first_indexes
+
+
+class LogDecimationPyramid(object):
+    """ Multi-resolution pyramid of min/max decimated sample log.
+    Level 0 has buckets of base_bucket_size points; each level above merges 2 neighboring buckets.
+    Each level stores the indexes of first, minimum, maximum and last point of every bucket in the raw log.
+    """
+
+    def __init__(self, vec_x, vec_y, base_bucket_size=4):
+        """
+        initialization: build the pyramid
+        :param vec_x: numpy array, sorted time
+        :param vec_y: numpy array, log value
+        :param base_bucket_size: number of raw points in each bucket of level 0
+        """
+        datatypeutility.check_numpy_arrays('Vector X and Y', [vec_x, vec_y], 1, True)
+        datatypeutility.check_int_variable('Base bucket size', base_bucket_size, (2, None))
+
+        self._vec_x = vec_x
+        self._vec_y = vec_y
+        self._base_bucket_size = base_bucket_size
+
+        # list of levels: each level is a 2D array (num buckets, 4) of indexes as first, min, max, last
+        self._level_list = list()
+        self._build()
+
+        return
+
+    def _build(self):
+        """ build all the levels of pyramid
+        :return:
+        """
+        num_points = self._vec_y.shape[0]
+        if num_points == 0:
+            return
+
+        # level 0
+        bucket_starts = numpy.arange(0, num_points, self._base_bucket_size)
+        bucket_stops = numpy.append(bucket_starts[1:], num_points)
+        min_indexes = bucket_starts.copy()
+        max_indexes = bucket_starts.copy()
+        for offset in range(1, self._base_bucket_size):
+            candidates = numpy.minimum(bucket_starts + offset, bucket_stops - 1)
+            min_indexes = numpy.where(self._vec_y[candidates] < self._vec_y[min_indexes], candidates, min_indexes)
+            max_indexes = numpy.where(self._vec_y[candidates] > self._vec_y[max_indexes], candidates, max_indexes)
+        level = numpy.column_stack((bucket_starts, min_indexes, max_indexes, bucket_stops - 1))
+        self._level_list.append(level)
+
+        # upper levels: merge 2 neighboring buckets
+        while level.shape[0] > 1:
+            if level.shape[0] % 2 == 1:
+                level = numpy.concatenate((level, level[-1:]))
+            left = level[0::2]
+            right = level[1::2]
+            min_indexes = numpy.where(self._vec_y[right[:, 1]] < self._vec_y[left[:, 1]], right[:, 1], left[:, 1])
+            max_indexes = numpy.where(self._vec_y[right[:, 2]] > self._vec_y[left[:, 2]], right[:, 2], left[:, 2])
+            level = numpy.column_stack((left[:, 0], min_indexes, max_indexes, right[:, 3]))
+            self._level_list.append(level)
+        # END-WHILE
+
+        return
+
+    @property
+    def number_levels(self):
+        return len(self._level_list)
+
+    @property
+    def x_range(self):
+        return self._vec_x[0], self._vec_x[-1]
+
+    def query(self, min_x, max_x, num_buckets):
+        """ get the decimated log in range [min_x, max_x] with about num_buckets to num_buckets * 2 buckets
+        :param min_x: None for the beginning
+        :param max_x: None for the end
+        :param num_buckets: number of buckets (usually number of pixels on canvas)
+        :return: 2-tuple (vector X, vector Y)
+        """
+        datatypeutility.check_int_variable('Number of buckets', num_buckets, (1, None))
+
+        # range in index: include one point out side of range such that the line goes to the edge of canvas
+        i_start = 0 if min_x is None else max(int(numpy.searchsorted(self._vec_x, min_x)) - 1, 0)
+        i_stop = self._vec_x.shape[0] if max_x is None else \
+            min(int(numpy.searchsorted(self._vec_x, max_x, side='right')) + 1, self._vec_x.shape[0])
+        if i_stop - i_start <= 4 * num_buckets:
+            # raw data is sparse enough
+            return self._vec_x[i_start:i_stop], self._vec_y[i_start:i_stop]
+
+        # select level: number of buckets in range shall be at least num_buckets
+        bucket_size = self._base_bucket_size
+        level_index = 0
+        while level_index + 1 < len(self._level_list) and (i_stop - i_start) // (bucket_size * 2) >= num_buckets:
+            bucket_size *= 2
+            level_index += 1
+
+        level = self._level_list[level_index]
+        level_starts = level[:, 0]
+        first_bucket = max(int(numpy.searchsorted(level_starts, i_start, side='right')) - 1, 0)
+        last_bucket = int(numpy.searchsorted(level_starts, i_stop, side='left'))
+        indexes = numpy.unique(level[first_bucket:last_bucket].ravel())
+
+        return self._vec_x[indexes], self._vec_y[indexes]
+
+
+def is_ignored_target(vec_targets):
+    """ check whether the slicers' targets are -1 (not interested)
+    :param vec_targets: numpy array of integer or string
+    :return: numpy array of boolean
+    """
+    vec_targets = numpy.asarray(vec_targets)
+    if numpy.issubdtype(vec_targets.dtype, numpy.number):
+        return vec_targets == -1
+
+    return vec_targets.astype(str) == '-1'
+
+
+def build_slicer_segments(vec_x, vec_y, vec_times, vec_targets):
+    """ Build the segments of a sample log split by slicers for a line collection.
+    All the slicers' boundaries are located with one search.  The log value at each boundary is interpolated
+    such that neighboring segments are connected even if there is no log entry within a slicer.
+    :param vec_x: sample log time (sorted)
+    :param vec_y: sample log value
+    :param vec_times: slicers' boundaries (histogram, sorted)
+    :param vec_targets: target of each slicer.  -1 or '-1' for not interested
+    :return: 2-tuple: list of 2D array (N x 2) for each segment to show and numpy array of their slicer indexes
+    """
+    vec_times = numpy.clip(numpy.asarray(vec_times, dtype='float64'), vec_x[0], vec_x[-1])
+    vec_targets = numpy.asarray(vec_targets)
+
+    # insert the boundaries to the log: boundary i is at position bound_indexes[i] + i of merged vectors
+    bound_indexes = numpy.searchsorted(vec_x, vec_times)
+    bound_values = numpy.interp(vec_times, vec_x, vec_y)
+    merged_x = numpy.insert(vec_x, bound_indexes, vec_times)
+    merged_y = numpy.insert(vec_y, bound_indexes, bound_values)
+    merged_points = numpy.column_stack((merged_x, merged_y))
+    bound_positions = bound_indexes + numpy.arange(vec_times.shape[0])
+
+    # skip the not-interested and out-of-log slicers
+    seg_indexes = numpy.where(~is_ignored_target(vec_targets) & (vec_times[1:] > vec_times[:-1]))[0]
+    segment_list = [merged_points[bound_positions[i_seg]:bound_positions[i_seg + 1] + 1] for i_seg in seg_indexes]
+
+    return segment_list, seg_indexes
@@ -2,16 +2,17 @@ import os
 import random
 import numpy
 
-import mantid
-import mantid.api
-import mantid.dataobjects
-import mantid.geometry
-import mantid.simpleapi as mantidapi
-from mantid.api import AnalysisDataService as ADS
+from pyvdrive.core import lazy_import
 from pyvdrive.core import vdrivehelper
 from pyvdrive.core import datatypeutility
+from pyvdrive.core import splitter_builder
 import datetime
 
+# Mantid is imported at the first use
+mantid = lazy_import.lazy_module('mantid', ['mantid.simpleapi'])
+mantidapi = lazy_import.lazy_module('mantid.simpleapi')
+ADS = lazy_import.lazy_attribute('mantid.api', 'AnalysisDataService')
+
 EVENT_WORKSPACE_ID = "EventWorkspace"
 WORKSPACE_2D_ID = 'Workspace2D'
 MASK_WORKSPACE_ID = 'MaskWorkspace'
@@ -321,9 +322,9 @@ def convert_splitters_workspace_to_vectors(split_ws, run_start_time=None):
         vec_times = numpy.array(time_list)
         vec_ws = numpy.array(ws_list)
     else:
-        # for matrix workspace splitter
-        # TODO - TONIGHT -1 - Make this method work with Matrix
-        raise RuntimeError('TODO FUTURE Implement matrix parser')
+        # for matrix workspace splitter: time boundaries (relative time in seconds) and target (-1 for gap)
+        vec_times = numpy.array(split_ws.readX(0))
+        vec_ws = numpy.round(split_ws.readY(0)).astype('int64')
 
     # reset to run start time
     if run_start_time is not None and is_splitter_ws:
@@ -355,21 +356,29 @@ def create_table_workspace(table_ws_name, column_def_list):
     return table_ws
 
 
-def create_workspace_2d(vec_x, vec_y, vec_e, output_ws_name):
+def create_workspace_2d(vec_x, vec_y, vec_e, output_ws_name, unit_x=None, parent_ws_name=None):
     """
 
     :param vec_x:
     :param vec_y:
     :param vec_e:
     :param output_ws_name:
+    :param unit_x: None (default) or unit of X axis
+    :param parent_ws_name: None or name of the workspace to copy instrument and sample logs from
     :return: reference to the generated workspace
     """
     # check size
     assert len(vec_x) == len(vec_y) or len(vec_x) == len(vec_y) + 1, 'blabla'
     assert len(vec_y) == len(vec_e), 'blabla'
 
+    optional_args = dict()
+    if unit_x is not None:
+        optional_args['UnitX'] = unit_x
+    if parent_ws_name is not None:
+        optional_args['ParentWorkspace'] = parent_ws_name
+
     mantidapi.CreateWorkspace(DataX=vec_x, DataY=vec_y, DataE=vec_e, NSpec=1,
-                              OutputWorkspace=output_ws_name)
+                              OutputWorkspace=output_ws_name, **optional_args)
 
     return ADS.retrieve(output_ws_name)
 
@@ -524,9 +533,49 @@ def find_peaks(diff_data, ws_index, is_high_background, background_type, peak_pr
     return peak_list
 
 
+def create_splitters_from_arrays(splitters, splitter_ws_name, info_ws_name):
+    """ Create splitters workspace and information workspace from array-based splitters in one shot:
+    a Workspace2D (X: time boundaries, Y: target index or -1) if the splitters do not overlap.  Otherwise a table
+    workspace with columns start, stop and target
+    :param splitters: splitter_builder.SplitterArrays
+    :param splitter_ws_name:
+    :param info_ws_name:
+    :return: 2-tuple as splitter workspace's name and information (table) workspace's name
+    """
+    assert isinstance(splitters, splitter_builder.SplitterArrays), \
+        'Splitters {} must be a SplitterArrays but not a {}'.format(splitters, type(splitters))
+    datatypeutility.check_string_variable('Splitters workspace name', splitter_ws_name)
+    datatypeutility.check_string_variable('Splitters information workspace name', info_ws_name)
+
+    if splitters.has_overlap():
+        # overlapped splitters can only be expressed by table
+        create_table_workspace(splitter_ws_name, [('float', 'start'), ('float', 'stop'), ('str', 'target')])
+        splitter_ws = retrieve_workspace(splitter_ws_name)
+        for start_time, stop_time, target in zip(splitters.start_times, splitters.stop_times, splitters.targets):
+            splitter_ws.addRow([float(start_time), float(stop_time), str(target)])
+
+        create_table_workspace(info_ws_name, [('str', 'target'), ('str', 'description')])
+        info_ws = retrieve_workspace(info_ws_name)
+        for target in splitters.target_names:
+            info_ws.addRow([str(target), ''])
+    else:
+        vec_x, vec_y = splitters.to_workspace_2d_vectors()
+        create_workspace_2d(vec_x, vec_y, numpy.zeros_like(vec_y), splitter_ws_name)
+
+        vec_target_index, target_names = splitters.get_target_indexes()
+        unique_index, first_indexes = numpy.unique(vec_target_index, return_index=True)
+        create_table_workspace(info_ws_name, [('int', 'workspacegroup'), ('str', 'title')])
+        info_ws = retrieve_workspace(info_ws_name)
+        for target_index, first_index in zip(unique_index, first_indexes):
+            info_ws.addRow([int(target_index), str(splitters.targets[first_index])])
+    # END-IF-ELSE
+
+    return splitter_ws_name, info_ws_name
+
+
 def generate_event_filters_arbitrary(split_list, relative_time, tag, auto_target):
     """ Generate event filter (splitters workspace) by arbitrary time stamps
-    :param split_list: list of 2-element or 3-element
+    :param split_list: list of 2-element or 3-element, or a splitter_builder.SplitterArrays
     :param relative_time:
     :param tag: string for tag name
     :return: 2-tuple
@@ -534,53 +583,23 @@ def generate_event_filters_arbitrary(split_list, relative_time, tag, auto_target
         2. 2-tuple as splitter workspace's name and information (table) workspace's name
     """
     # check
-    datatypeutility.check_list('Splitters', split_list)
     datatypeutility.check_string_variable('Splitter tag', tag, None)
     if len(tag) == 0:
         raise RuntimeError('Split tag cannot be empty for generate_event_filters_arbitrary')
 
-    # create an empty workspace
+    if isinstance(split_list, splitter_builder.SplitterArrays):
+        splitters = split_list
+    else:
+        datatypeutility.check_list('Splitters', split_list)
+        if len(split_list) == 0:
+            return False, 'Empty time slice list'
+        # in some case, such as VDRIVE chopper file, only contains start and stop time. then use sequence number
+        splitters = splitter_builder.SplitterArrays.from_list(split_list, auto_target)
+
+    # create workspaces (relative time in default)
     splitters_ws_name = tag
     info_ws_name = tag + '_Info'
-
-    # use table workspace (relative time in default)
-    create_table_workspace(splitters_ws_name, [(
-        'float', 'start'), ('float', 'stop'), ('str', 'target')])
-    create_table_workspace(info_ws_name, [('str', 'target'), ('str', 'description')])
-
-    # get handler on splitters workspace and info workspace
-    splitter_ws = retrieve_workspace(splitters_ws_name)
-    info_ws = retrieve_workspace(info_ws_name)
-    target_set = set()
-
-    if len(split_list) == 0:
-        return False, 'Empty time slice list'
-
-    for index, split_tup in enumerate(split_list):
-        # print '[DB...BAT] Splitter {0}: start = {1}, stop = {2}.'.format(index, split_tup[0], split_tup[1])
-        start_time = split_tup[0]
-        stop_time = split_tup[1]
-
-        if len(split_tup) >= 3:
-            # user specified target
-            target = str(split_tup[2])
-        elif auto_target:
-            # in some case, such as VDRIVE chopper file, only contains start and stop time. then use sequence number
-            target = '{0}'.format(index + 1)
-        else:
-            # not allowing auto target, then must have a coding error
-            raise RuntimeError('Splitter tuple has only 2 entries but auto target is turned on!')
-
-        # add splitter
-        splitter_ws.addRow([start_time, stop_time, target])
-
-        # add information
-        if target not in target_set:
-            info_ws.addRow([target, ''])
-            target_set.add(target)
-        # END-IF
-
-    # END-FOR
+    create_splitters_from_arrays(splitters, splitters_ws_name, info_ws_name)
 
     return True, (splitters_ws_name, info_ws_name)
 
@@ -713,13 +732,24 @@ def get_ads_memory(unit='MB'):
     :param unit: unit of memory.  By default it is MB
     :return: memory size (float) in Bytes, KB or MB depending on unit
     """
-    total_mem = 0
-    for ws_name in ADS.getObjectNames():
-        wksp = ADS[ws_name]
-        total_mem += wksp.getMemorySize()
+    return get_workspaces_memory(list(ADS.getObjectNames()), unit)
 
+
+def get_workspaces_memory(ws_name_list, unit='MB'):
+    """ calculate the memory of a list of workspaces in ADS.  Workspaces that do not exist are skipped.
+    :param ws_name_list: list of workspace names
+    :param unit: unit of memory.  By default it is MB
+    :return: memory size (float) in Bytes, KB or MB depending on unit
+    """
+    datatypeutility.check_list('Workspace names', ws_name_list)
     datatypeutility.check_string_variable('Memory unit', unit, ['MB', 'KB', 'B'])
 
+    total_mem = 0
+    for ws_name in ws_name_list:
+        if ws_name is None or not ADS.doesExist(ws_name):
+            continue
+        total_mem += ADS.retrieve(ws_name).getMemorySize()
+
     if unit == 'MB':
         total_mem = total_mem / 1024.0**2
     elif unit == 'KB':
@@ -854,6 +884,22 @@ def get_sample_log_tsp(src_workspace, sample_log_name):
     return tsp_property
 
 
+def get_sample_log_arrays(src_workspace):
+    """ Get the values of all the float time series sample logs
+    :param src_workspace: workspace name
+    :return: dictionary: key = log name, value = numpy array of log values
+    """
+    workspace = retrieve_workspace(src_workspace, raise_if_not_exist=True)
+
+    log_value_dict = dict()
+    for property_i in workspace.run().getProperties():
+        if isinstance(property_i, mantid.kernel.FloatTimeSeriesProperty):
+            log_value_dict[property_i.name] = numpy.array(property_i.value)
+    # END-FOR
+
+    return log_value_dict
+
+
 def get_sample_log_info(src_workspace):
     """ Ger sample log information including size of log and name of log
     :param src_workspace: workspace which the sample logs are from
@@ -1189,6 +1235,28 @@ def get_data_from_workspace(workspace_name, bank_id=None, target_unit=None, poin
     return data_set_dict, current_unit
 
 
+def get_number_events(workspace_name):
+    """ Get number of events of an EventWorkspace or the total number of events of a WorkspaceGroup
+    containing EventWorkspaces
+    :param workspace_name:
+    :return: integer or None (not an event workspace)
+    """
+    if not ADS.doesExist(workspace_name):
+        return None
+
+    workspace = ADS.retrieve(workspace_name)
+    if workspace.id() == 'WorkspaceGroup':
+        num_events_list = [get_number_events(sub_ws.name()) for sub_ws in workspace]
+        num_events_list = [num_events for num_events in num_events_list if num_events is not None]
+        num_events = sum(num_events_list) if len(num_events_list) > 0 else None
+    elif workspace.id() == EVENT_WORKSPACE_ID:
+        num_events = workspace.getNumberEvents()
+    else:
+        num_events = None
+
+    return num_events
+
+
 def get_number_spectra(workspace):
     """ Get number of histograms/spectra from a single-multi-spectra workspace or a WorkspaceGroup containing a
     set of single spectrum workspaces
@@ -1765,6 +1833,24 @@ def load_nexus(data_file_name, output_ws_name, meta_data_only, max_time=None):
     return True, out_ws
 
 
+def load_nexus_instrument(nexus_file_name, output_ws_name):
+    """ Load the instrument and sample logs (without events) from an event NeXus file.
+    The output workspace has the instrument geometry of the run and thus can be used as the reference workspace
+    to load calibration files
+    :param nexus_file_name:
+    :param output_ws_name:
+    :return: workspace
+    """
+    datatypeutility.check_file_name(nexus_file_name, check_exist=True, note='Event NeXus file')
+    datatypeutility.check_string_variable('Output workspace name', output_ws_name)
+
+    out_ws = mantidapi.LoadEventNexus(Filename=nexus_file_name,
+                                      OutputWorkspace=output_ws_name,
+                                      MetaDataOnly=True)
+
+    return out_ws
+
+
 def load_nexus_processed(nexus_name, workspace_name):
     """
 
@@ -2018,6 +2104,37 @@ def merge_runs(ws_name_list, out_ws_name):
     return
 
 
+def plus_workspaces(lhs_ws_name, rhs_ws_name, out_ws_name, clear_rhs=False):
+    """
+    Add 2 workspaces including their events and sample logs (proton charge is summed)
+    :param lhs_ws_name:
+    :param rhs_ws_name:
+    :param out_ws_name:
+    :param clear_rhs: flag to clear the events of the RHS event workspace while being added to save memory
+    :return:
+    """
+    datatypeutility.check_string_variable('LHS workspace name', lhs_ws_name)
+    datatypeutility.check_string_variable('RHS workspace name', rhs_ws_name)
+    datatypeutility.check_string_variable('Output workspace name', out_ws_name)
+
+    mantidapi.Plus(LHSWorkspace=lhs_ws_name, RHSWorkspace=rhs_ws_name, OutputWorkspace=out_ws_name,
+                   ClearRHSWorkspace=clear_rhs)
+
+    return
+
+
+def rename_workspace(ws_name, new_ws_name):
+    """
+    Rename a workspace
+    :param ws_name:
+    :param new_ws_name:
+    :return:
+    """
+    mantidapi.RenameWorkspace(InputWorkspace=ws_name, OutputWorkspace=new_ws_name)
+
+    return
+
+
 def map_sample_logs(meta_ws_name, log_name_x, log_name_y):
     """
     Map 2 sample logs by aligning them on the same time stamps
@@ -2207,6 +2324,21 @@ def normalize_by_vanadium(data_ws_name, van_ws_name):
     return
 
 
+def convert_to_matrix_workspace(ws_name, out_ws_name):
+    """
+    convert a workspace (such as EventWorkspace) to a histogram Workspace2D without changing binning
+    :param ws_name:
+    :param out_ws_name:
+    :return:
+    """
+    datatypeutility.check_string_variable('Input workspace name', ws_name)
+    datatypeutility.check_string_variable('Output workspace name', out_ws_name)
+
+    mantidapi.ConvertToMatrixWorkspace(InputWorkspace=ws_name, OutputWorkspace=out_ws_name)
+
+    return
+
+
 def rebin(workspace_name, params, preserve, output_ws_name=None):
     """
     rebin the workspace
@@ -1,11 +1,15 @@
 """
 Mantid reduction scripts
 """
-import mantid.simpleapi as mantidapi
+from pyvdrive.core import lazy_import
 import numpy
 import os
 from pyvdrive.core import datatypeutility
 from pyvdrive.core import mantid_helper
+from pyvdrive.core import reduction_profiler
+
+# Mantid is imported at the first use
+mantidapi = lazy_import.lazy_module('mantid.simpleapi')
 
 
 class VulcanBinningHelper(object):
@@ -111,17 +115,19 @@ def align_and_focus_event_ws(event_ws_name, output_ws_name, binning_params,
     datatypeutility.check_dict('Reduction parameter dictionary', reduction_params_dict)
 
     # Align detector
-    mantidapi.AlignDetectors(InputWorkspace=event_ws_name,
-                             OutputWorkspace=output_ws_name,
-                             CalibrationWorkspace=diff_cal_ws_name)
+    with reduction_profiler.stage('AlignDetectors', output_ws_name):
+        mantidapi.AlignDetectors(InputWorkspace=event_ws_name,
+                                 OutputWorkspace=output_ws_name,
+                                 CalibrationWorkspace=diff_cal_ws_name)
 
     # # Mask detectors
     # mantid_helper.mask_workspace(to_mask_workspace_name=output_ws_name,
     #                              mask_workspace_name=mask_ws_name)
 
     # Sort events
-    mantidapi.SortEvents(InputWorkspace=output_ws_name,
-                         SortBy='X Value')
+    with reduction_profiler.stage('SortEvents'):
+        mantidapi.SortEvents(InputWorkspace=output_ws_name,
+                             SortBy='X Value')
 
     # Diffraction focus
     event_ws = mantid_helper.retrieve_workspace(output_ws_name)
@@ -130,13 +136,14 @@ def align_and_focus_event_ws(event_ws_name, output_ws_name, binning_params,
         error_message = 'Unable to reduced {} as number of events = 0'.format(event_ws_name)
         raise RuntimeError(error_message)
 
-    mantidapi.DiffractionFocussing(InputWorkspace=output_ws_name,
-                                   OutputWorkspace=output_ws_name,
-                                   GroupingWorkspace=grouping_ws_name,
-                                   PreserveEvents=True)
-    # Sort again!
-    mantidapi.SortEvents(InputWorkspace=output_ws_name,
-                         SortBy='X Value')
+    with reduction_profiler.stage('DiffractionFocussing', output_ws_name):
+        mantidapi.DiffractionFocussing(InputWorkspace=output_ws_name,
+                                       OutputWorkspace=output_ws_name,
+                                       GroupingWorkspace=grouping_ws_name,
+                                       PreserveEvents=True)
+        # Sort again!
+        mantidapi.SortEvents(InputWorkspace=output_ws_name,
+                             SortBy='X Value')
 
     # Compress events as an option
     if 'CompressEvents' in reduction_params_dict:
@@ -148,8 +155,9 @@ def align_and_focus_event_ws(event_ws_name, output_ws_name, binning_params,
 
     # rebin
     if binning_params is not None:
-        mantid_helper.rebin(workspace_name=output_ws_name,
-                            params=binning_params, preserve=not convert_to_matrix)
+        with reduction_profiler.stage('Rebin'):
+            mantid_helper.rebin(workspace_name=output_ws_name,
+                                params=binning_params, preserve=not convert_to_matrix)
 
     # Edit instrument as an option
     if 'EditInstrumentGeometry' in reduction_params_dict:
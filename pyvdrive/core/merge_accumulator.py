@@ -0,0 +1,208 @@
+# Streaming merge of reduced runs (VBIN with MERGE and VMERGE)
+# Each focused run is rebinned to histograms (for example, the VDRIVE bins of each set of banks) and folded into
+# running sums as soon as it is reduced.  The run's events are deleted from ADS right away, such that the memory
+# does not grow with the number of merged runs as keeping all the events until MergeRuns.
+# Summaries (count, mean, minimum, maximum) of the sample logs of all the runs are accumulated along.
+import numpy
+from collections import OrderedDict
+from pyvdrive.core import datatypeutility
+
+
+class SampleLogSummary(object):
+    """ Running summary of numeric sample logs of multiple runs
+    """
+
+    def __init__(self):
+        """
+        initialization
+        """
+        # key: log name, value: numpy array [count, sum, sum of squares, minimum, maximum]
+        self._log_dict = OrderedDict()
+        self._num_runs = 0
+
+        return
+
+    @property
+    def log_names(self):
+        return list(self._log_dict.keys())
+
+    @property
+    def number_runs(self):
+        return self._num_runs
+
+    def add_run(self, log_value_dict):
+        """ fold the sample logs of one run into the summary
+        :param log_value_dict: dictionary: key = log name, value = numpy array of log values
+        :return:
+        """
+        datatypeutility.check_dict('Sample log values', log_value_dict)
+
+        for log_name, vec_values in log_value_dict.items():
+            vec_values = numpy.asarray(vec_values, dtype='float64')
+            if vec_values.shape[0] == 0:
+                continue
+
+            stats = numpy.array([vec_values.shape[0], vec_values.sum(), (vec_values ** 2).sum(),
+                                 vec_values.min(), vec_values.max()])
+            if log_name in self._log_dict:
+                prev_stats = self._log_dict[log_name]
+                prev_stats[0:3] += stats[0:3]
+                prev_stats[3] = min(prev_stats[3], stats[3])
+                prev_stats[4] = max(prev_stats[4], stats[4])
+            else:
+                self._log_dict[log_name] = stats
+        # END-FOR
+
+        self._num_runs += 1
+
+        return
+
+    def get_summary(self, log_name):
+        """ get the summary of a sample log
+        :param log_name:
+        :return: dictionary with keys count, mean, std, min and max
+        """
+        if log_name not in self._log_dict:
+            raise RuntimeError('Sample log {} is not summarized. Available logs: {}'
+                               ''.format(log_name, self.log_names))
+
+        count, value_sum, square_sum, min_value, max_value = self._log_dict[log_name]
+        mean = value_sum / count
+        std = numpy.sqrt(max(square_sum / count - mean ** 2, 0.))
+
+        return {'count': int(count), 'mean': mean, 'std': std, 'min': min_value, 'max': max_value}
+
+
+class StreamingRunMerger(object):
+    """ Merge reduced runs one by one into histogram workspaces, one for each binning
+    """
+
+    def __init__(self, merged_ws_name=None, bin_params_method=None):
+        """
+        initialization
+        :param merged_ws_name: name of the merged workspace.  None for using the first run's workspace
+        :param bin_params_method: None for keeping the binning of the reduced runs, or a method with the first
+                                  run's workspace name as argument to return a list of (TOF) binning parameters,
+                                  one for each set of banks (such as VDRIVE bins of low and high resolution banks)
+        """
+        if merged_ws_name is not None:
+            datatypeutility.check_string_variable('Merged workspace name', merged_ws_name)
+
+        self._merged_ws_name = merged_ws_name
+        self._bin_params_method = bin_params_method
+        self._bin_params_list = None
+        self._merged_ws_names = list()
+        self._run_number_list = list()
+        self._log_summary = SampleLogSummary()
+
+        return
+
+    @property
+    def log_summary(self):
+        return self._log_summary
+
+    @property
+    def run_numbers(self):
+        """ run numbers merged in the order of being added
+        :return:
+        """
+        return self._run_number_list[:]
+
+    @property
+    def workspace_name(self):
+        """ name of the merged workspace (of the first binning).  None before any run is added
+        :return:
+        """
+        return self._merged_ws_name
+
+    @property
+    def workspace_names(self):
+        """ names of the merged histogram workspaces, one for each binning parameters
+        :return:
+        """
+        return self._merged_ws_names[:]
+
+    def _rebin_run(self, ws_name, bin_params, hist_ws_name):
+        """ rebin a reduced run to a histogram workspace
+        :param ws_name: reduced (event) workspace
+        :param bin_params: binning parameters or None for keeping the binning
+        :param hist_ws_name: output histogram workspace
+        :return:
+        """
+        from pyvdrive.core import mantid_helper
+
+        if bin_params is None:
+            mantid_helper.convert_to_matrix_workspace(ws_name, hist_ws_name)
+        else:
+            mantid_helper.rebin(ws_name, bin_params, preserve=False, output_ws_name=hist_ws_name)
+
+        return
+
+    def add_run(self, run_number, ws_name):
+        """ fold a reduced run into the merged histograms and delete it from ADS
+        :param run_number:
+        :param ws_name: reduced workspace of the run
+        :return:
+        """
+        from pyvdrive.core import mantid_helper
+
+        datatypeutility.check_string_variable('Reduced workspace name', ws_name)
+        if not mantid_helper.workspace_does_exist(ws_name):
+            raise RuntimeError('Reduced workspace {} of run {} does not exist'.format(ws_name, run_number))
+
+        # summarize sample logs before the workspace is folded
+        self._log_summary.add_run(mantid_helper.get_sample_log_arrays(ws_name))
+
+        if len(self._run_number_list) == 0:
+            # binning is determined by the first run
+            if self._bin_params_method is None:
+                self._bin_params_list = [None]
+            else:
+                self._bin_params_list = list(self._bin_params_method(ws_name))
+            if self._merged_ws_name is None:
+                self._merged_ws_name = ws_name
+            self._merged_ws_names = [self._merged_ws_name] + ['{}_{}'.format(self._merged_ws_name, index)
+                                                              for index in range(1, len(self._bin_params_list))]
+
+        if self._bin_params_list[0] is not None:
+            mantid_helper.mtd_convert_units(ws_name, 'TOF')
+
+        # the run's workspace itself is replaced by the histogram of the first binning at the end
+        for index in reversed(range(len(self._bin_params_list))):
+            merged_ws_name = self._merged_ws_names[index]
+            if len(self._run_number_list) == 0:
+                self._rebin_run(ws_name, self._bin_params_list[index], merged_ws_name)
+            else:
+                hist_ws_name = '{}_hist'.format(ws_name)
+                self._rebin_run(ws_name, self._bin_params_list[index], hist_ws_name)
+                mantid_helper.plus_workspaces(merged_ws_name, hist_ws_name, merged_ws_name)
+                mantid_helper.delete_workspace(hist_ws_name)
+        # END-FOR
+        if ws_name not in self._merged_ws_names:
+            mantid_helper.delete_workspace(ws_name)
+
+        self._run_number_list.append(run_number)
+
+        return
+
+    def report(self, log_names=None):
+        """ report the merged runs and the sample logs' summaries
+        :param log_names: list of log names to report.  None for only the number of logs summarized
+        :return: string
+        """
+        report = 'Merged {} runs {} to {} with {} sample logs summarized' \
+                 ''.format(len(self._run_number_list), self._run_number_list, self._merged_ws_name,
+                           len(self._log_summary.log_names))
+        if log_names is None:
+            return report
+
+        for log_name in log_names:
+            if log_name not in self._log_summary.log_names:
+                continue
+            summary = self._log_summary.get_summary(log_name)
+            report += '\n  {}: mean = {:.5g}, std = {:.5g}, range = [{:.5g}, {:.5g}], {} values' \
+                      ''.format(log_name, summary['mean'], summary['std'], summary['min'], summary['max'],
+                                summary['count'])
+        # END-FOR
+
+        return report
@@ -0,0 +1,164 @@
+# Parallel reduction of multiple runs (VBIN) by a bounded pool of worker processes
+# Worker processes are spawned but not forked from the (GUI) process, whose Mantid thread pools and background
+# threads cannot be safely forked.  Thus each worker has its own ReductionManager (and thus its own ADS).
+# A worker loads, focuses and writes one run to GSAS at a time and deletes its event workspace afterwards,
+# such that at most (number of workers) event workspaces are in memory.  The calibration workspaces (calibration
+# pool of the worker) and the vanadium are loaded once per worker and shared by all the runs that the worker reduces.
+# With a single worker the runs are reduced serially in the calling process.
+import os
+import multiprocessing
+from collections import namedtuple
+from pyvdrive.core import datatypeutility
+from pyvdrive.core import mantid_helper
+from pyvdrive.core import reduction_profiler
+from pyvdrive.core import reductionmanager
+from pyvdrive.core import vulcan_util
+
+# reduction of one run to GSAS file
+RunReductionTask = namedtuple('RunReductionTask', ['ipts_number', 'run_number', 'raw_file_name', 'target_unit',
+                                                   'binning_parameters', 'num_banks', 'roi_list', 'mask_list',
+                                                   'no_cal_mask', 'gsas_file_name', 'align_vdrive_bin',
+                                                   'iparam_file_name'])
+# result of a task: status (bool), message (str) and profiling report (str or None)
+RunReductionResult = namedtuple('RunReductionResult', ['run_number', 'status', 'message', 'profile'])
+
+# reduction manager and imported vanadium workspace of a worker process
+_worker_reduction_manager = None
+_worker_vanadium_ws_name = None
+
+
+def _init_worker(instrument, van_gsas_name):
+    """ initialize a worker process: create the reduction manager and import vanadium once
+    :param instrument:
+    :param van_gsas_name: processed vanadium GSAS file or None for not normalizing by vanadium
+    :return:
+    """
+    global _worker_reduction_manager
+    global _worker_vanadium_ws_name
+
+    _worker_reduction_manager = reductionmanager.ReductionManager(instrument=instrument)
+    if van_gsas_name is None:
+        _worker_vanadium_ws_name = None
+    else:
+        _worker_vanadium_ws_name = _worker_reduction_manager.gsas_writer.import_vanadium(van_gsas_name)
+
+    return
+
+
+def reduce_run_to_gsas(task):
+    """ load, focus and write a run to GSAS in a worker process.  The event workspace is deleted afterwards.
+    :param task: RunReductionTask
+    :return: RunReductionResult
+    """
+    red_manager = _worker_reduction_manager
+    out_ws_name = None
+    try:
+        out_ws_name, msg = red_manager.reduce_event_nexus(ipts_number=task.ipts_number,
+                                                          run_number=task.run_number,
+                                                          event_nexus_name=task.raw_file_name,
+                                                          target_unit=task.target_unit,
+                                                          binning_parameters=task.binning_parameters,
+                                                          num_banks=task.num_banks,
+                                                          roi_list=task.roi_list,
+                                                          mask_list=task.mask_list,
+                                                          no_cal_mask=task.no_cal_mask)
+
+        run_date_time = vulcan_util.get_run_date(out_ws_name, task.raw_file_name)
+        with reduction_profiler.stage('SaveGSAS', key=task.run_number):
+            red_manager.gsas_writer.save(out_ws_name, run_date_time=run_date_time,
+                                         gsas_file_name=task.gsas_file_name,
+                                         ipts_number=task.ipts_number,
+                                         run_number=task.run_number,
+                                         align_vdrive_bin=task.align_vdrive_bin,
+                                         gsas_param_file_name=task.iparam_file_name,
+                                         van_ws_name=_worker_vanadium_ws_name,
+                                         is_chopped_run=False,
+                                         write_to_file=True)
+        reduction_profiler.save_profile_next_to(task.run_number, task.gsas_file_name)
+    except Exception as run_error:
+        # any failure of a run shall be reported instead of terminating the other runs in the pool
+        result = RunReductionResult(task.run_number, False,
+                                    'Failed to reduce run {0} due to {1}'.format(task.run_number, run_error), None)
+    else:
+        profiler = reduction_profiler.get_profiler(task.run_number)
+        result = RunReductionResult(task.run_number, True,
+                                    'For {}: {}. Saved to {}'.format(task.run_number, msg, task.gsas_file_name),
+                                    None if profiler is None else profiler.report())
+    finally:
+        # keep memory bounded: one event workspace per worker
+        if out_ws_name is not None and mantid_helper.workspace_does_exist(out_ws_name):
+            mantid_helper.delete_workspace(out_ws_name)
+    # END-TRY
+
+    return result
+
+
+class ParallelRunReducer(object):
+    """ Reduce runs to GSAS files with a pool of worker processes
+    """
+
+    def __init__(self, num_workers, instrument='VULCAN'):
+        """
+        initialization
+        :param num_workers: number of worker processes, i.e., maximum number of event workspaces in memory
+        :param instrument:
+        """
+        datatypeutility.check_int_variable('Number of reduction workers', num_workers,
+                                           (1, multiprocessing.cpu_count() + 1))
+        datatypeutility.check_string_variable('Instrument', instrument)
+
+        self._num_workers = num_workers
+        self._instrument = instrument
+
+        return
+
+    @property
+    def number_workers(self):
+        return self._num_workers
+
+    def reduce_runs(self, task_list, van_gsas_name=None):
+        """ reduce runs in parallel.  Results are reported in the order that the runs are finished
+        :param task_list: list of RunReductionTask
+        :param van_gsas_name: processed vanadium GSAS file or None
+        :return: list of RunReductionResult
+        """
+        datatypeutility.check_list('Run reduction tasks', task_list)
+        if van_gsas_name is not None:
+            datatypeutility.check_file_name(van_gsas_name, check_exist=True, note='Vanadium GSAS file')
+        for task in task_list:
+            if not isinstance(task, RunReductionTask):
+                raise RuntimeError('Task {} must be a RunReductionTask but not a {}'.format(task, type(task)))
+            if not os.path.exists(task.raw_file_name):
+                raise RuntimeError('Event NeXus file {} of run {} does not exist'
+                                   ''.format(task.raw_file_name, task.run_number))
+        # END-FOR
+
+        num_workers = min(self._num_workers, len(task_list))
+        result_list = list()
+        if num_workers == 0:
+            return result_list
+
+        if num_workers == 1:
+            # serial: reduce in this process
+            _init_worker(self._instrument, van_gsas_name)
+            for task in task_list:
+                result_list.append(reduce_run_to_gsas(task))
+            return result_list
+
+        pool = multiprocessing.get_context('spawn').Pool(processes=num_workers, initializer=_init_worker,
+                                                         initargs=(self._instrument, van_gsas_name))
+        try:
+            for result in pool.imap_unordered(reduce_run_to_gsas, task_list):
+                print('[INFO] Run {} is reduced ({}/{}): {}'.format(result.run_number, len(result_list) + 1,
+                                                                    len(task_list), result.status))
+                result_list.append(result)
+            # END-FOR
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        # END-TRY
+
+        return result_list
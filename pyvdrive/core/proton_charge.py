@@ -0,0 +1,235 @@
+# Look up table of proton charges of single runs and chopped runs
+# Proton charge of a single run is read from NeXus /entry/proton_charge (picoCoulomb) with h5py and
+# proton charges of a chopped run are read from its sampleenv_chopped_mean.txt record file.  Each file is
+# read once.  The table is kept in memory and optionally in a text file on disk.
+import os
+import threading
+import numpy
+import h5py
+import pandas
+from pyvdrive.core import datatypeutility
+
+# sequence used in the table for a single (not chopped) run
+SINGLE_RUN_SEQUENCE = -1
+
+
+class ProtonChargeTable(object):
+    """ Proton charge table keyed by (IPTS, run, chop sequence)
+    """
+
+    def __init__(self, archive_root='/SNS/VULCAN', table_file_name=None):
+        """
+        initialization
+        :param archive_root: root directory of the instrument's data archive
+        :param table_file_name: None for in-memory only.  Otherwise, the table is loaded from and saved to it
+        """
+        datatypeutility.check_string_variable('Archive root directory', archive_root)
+
+        self._archive_root = archive_root
+        self._table_file_name = table_file_name
+
+        # single runs: key: (IPTS, run), value: proton charge
+        self._run_dict = dict()
+        # chopped runs: key: (IPTS, run), value: 2-tuple (sorted vector of sequences, vector of proton charges)
+        self._chopped_dict = dict()
+
+        self._lock = threading.Lock()
+
+        if table_file_name is not None and os.path.exists(table_file_name):
+            self.load(table_file_name)
+
+        return
+
+    @property
+    def table_file_name(self):
+        return self._table_file_name
+
+    def _get_chopped_table(self, ipts_number, run_number):
+        """ get the (sequences, proton charges) vectors of a chopped run.  read the record file if not in table
+        :param ipts_number:
+        :param run_number:
+        :return: 2-tuple of numpy arrays
+        """
+        datatypeutility.check_int_variable('IPTS number', ipts_number, (1, None))
+        datatypeutility.check_int_variable('Run number', run_number, (1, None))
+
+        with self._lock:
+            if (ipts_number, run_number) in self._chopped_dict:
+                return self._chopped_dict[ipts_number, run_number]
+
+        vec_seq, vec_pc = self.read_chopped_record(self.get_chopped_record_name(ipts_number, run_number))
+        with self._lock:
+            self._chopped_dict[ipts_number, run_number] = vec_seq, vec_pc
+        if self._table_file_name is not None:
+            self.save(self._table_file_name)
+
+        return vec_seq, vec_pc
+
+    def get_chopped_record_name(self, ipts_number, run_number):
+        """ get the chopped data record file name of a chopped run
+        :param ipts_number:
+        :param run_number:
+        :return:
+        """
+        return os.path.join(self._archive_root, 'IPTS-{0}/shared/ChoppedData/{1}/{1}sampleenv_chopped_mean.txt'
+                                                ''.format(ipts_number, run_number))
+
+    def get_nexus_name(self, ipts_number, run_number):
+        """ locate the NeXus file of a run
+        :param ipts_number:
+        :param run_number:
+        :return:
+        """
+        nexus_file = os.path.join(self._archive_root,
+                                  'IPTS-{0}/nexus/VULCAN_{1}.nxs.h5'.format(ipts_number, run_number))
+        if not os.path.exists(nexus_file):
+            nexus_file2 = os.path.join(self._archive_root, 'IPTS-{0}/data/VULCAN_{1}_event.nxs'
+                                                           ''.format(ipts_number, run_number))
+            if os.path.exists(nexus_file2) is False:
+                raise RuntimeError('Unable to locate NeXus file for IPTS-{0} Run {1} with name '
+                                   '{2} or {3}'.format(ipts_number, run_number, nexus_file, nexus_file2))
+            nexus_file = nexus_file2
+        # END-IF
+
+        return nexus_file
+
+    def get_proton_charge(self, ipts_number, run_number, chop_sequence=None):
+        """ get proton charge (single value) of a run or a chopped sequence
+        :param ipts_number:
+        :param run_number:
+        :param chop_sequence: None for single run
+        :return: float
+        """
+        if chop_sequence is not None:
+            return float(self.get_proton_charges(ipts_number, run_number, [chop_sequence])[0])
+
+        datatypeutility.check_int_variable('IPTS number', ipts_number, (1, None))
+        datatypeutility.check_int_variable('Run number', run_number, (1, None))
+        with self._lock:
+            if (ipts_number, run_number) in self._run_dict:
+                return self._run_dict[ipts_number, run_number]
+
+        proton_charge = self.read_nexus_proton_charge(self.get_nexus_name(ipts_number, run_number))
+        with self._lock:
+            self._run_dict[ipts_number, run_number] = proton_charge
+        if self._table_file_name is not None:
+            self.save(self._table_file_name)
+
+        return proton_charge
+
+    def has_run(self, ipts_number, run_number, chopped):
+        """ check whether the proton charge(s) of a run is in table
+        :param ipts_number:
+        :param run_number:
+        :param chopped:
+        :return:
+        """
+        if chopped:
+            return (ipts_number, run_number) in self._chopped_dict
+
+        return (ipts_number, run_number) in self._run_dict
+
+    def get_proton_charges(self, ipts_number, run_number, chop_sequences):
+        """ get proton charges of multiple chopped sequences of a run
+        :param ipts_number:
+        :param run_number:
+        :param chop_sequences: array-like of chop sequences
+        :return: numpy array of proton charges
+        """
+        vec_seq, vec_pc = self._get_chopped_table(ipts_number, run_number)
+
+        chop_sequences = numpy.asarray(chop_sequences, dtype=vec_seq.dtype)
+        indexes = numpy.searchsorted(vec_seq, chop_sequences)
+        indexes = numpy.minimum(indexes, vec_seq.shape[0] - 1)
+        missing = vec_seq[indexes] != chop_sequences
+        if missing.any():
+            raise RuntimeError('Unable to find chop sequences {} of IPTS-{} Run {} in proton charge table'
+                               ''.format(chop_sequences[missing], ipts_number, run_number))
+
+        return vec_pc[indexes]
+
+    def load(self, table_file_name):
+        """ load the table from a text file with columns IPTS, run, sequence and proton charge
+        :param table_file_name:
+        :return:
+        """
+        datatypeutility.check_file_name(table_file_name, check_exist=True, note='Proton charge table')
+
+        table = numpy.loadtxt(table_file_name, ndmin=2)
+        if table.shape[0] == 0:
+            return
+
+        ipts_run_array = table[:, 0:2].astype('int64')
+        vec_seq = table[:, 2].astype('int64')
+        is_single = vec_seq == SINGLE_RUN_SEQUENCE
+        with self._lock:
+            for row_index in numpy.where(is_single)[0]:
+                ipts_number, run_number = ipts_run_array[row_index]
+                self._run_dict[int(ipts_number), int(run_number)] = float(table[row_index, 3])
+            for ipts_number, run_number in set(map(tuple, ipts_run_array[~is_single])):
+                rows = (ipts_run_array[:, 0] == ipts_number) & (ipts_run_array[:, 1] == run_number) & ~is_single
+                order = numpy.argsort(vec_seq[rows])
+                self._chopped_dict[int(ipts_number), int(run_number)] = vec_seq[rows][order], table[rows, 3][order]
+        # END-WITH
+
+        return
+
+    @staticmethod
+    def read_chopped_record(record_file_name):
+        """ read the chopped sequences and proton charges from a chopped data record file
+        :param record_file_name:
+        :return: 2-tuple: vector of sequences (sorted) and vector of proton charges
+        """
+        if os.path.exists(record_file_name) is False:
+            raise RuntimeError('Unable to locate chopped data record file {0}'.format(record_file_name))
+
+        data_set = pandas.read_csv(record_file_name, header=None, sep=r'\s+', index_col=0)
+        vec_seq = data_set.index.values.astype('int64')
+        vec_pc = data_set[1].values.astype('float64')
+        order = numpy.argsort(vec_seq)
+
+        return vec_seq[order], vec_pc[order]
+
+    @staticmethod
+    def read_nexus_proton_charge(nexus_file_name):
+        """ read the proton charge (picoCoulomb) of a run from its NeXus file without Mantid
+        :param nexus_file_name:
+        :return: float
+        """
+        try:
+            nexus_h5 = h5py.File(nexus_file_name, 'r')
+            proton_charge = float(nexus_h5['entry']['proton_charge'][0])
+            nexus_h5.close()
+        except (IOError, OSError, KeyError) as read_err:
+            raise RuntimeError('Unable to read proton charge from {}: {}'.format(nexus_file_name, read_err))
+
+        return proton_charge
+
+    def save(self, table_file_name):
+        """ save the table to a text file with columns IPTS, run, sequence and proton charge
+        :param table_file_name:
+        :return:
+        """
+        datatypeutility.check_file_name(table_file_name, check_exist=False, check_writable=True,
+                                        is_dir=False, note='Proton charge table')
+
+        with self._lock:
+            row_list = [numpy.array([[ipts_number, run_number, SINGLE_RUN_SEQUENCE, proton_charge]])
+                        for (ipts_number, run_number), proton_charge in sorted(self._run_dict.items())]
+            for ipts_number, run_number in sorted(self._chopped_dict.keys()):
+                vec_seq, vec_pc = self._chopped_dict[ipts_number, run_number]
+                rows = numpy.zeros((vec_seq.shape[0], 4), dtype='float64')
+                rows[:, 0] = ipts_number
+                rows[:, 1] = run_number
+                rows[:, 2] = vec_seq
+                rows[:, 3] = vec_pc
+                row_list.append(rows)
+            # END-FOR
+        # END-WITH
+        table = numpy.concatenate(row_list) if len(row_list) > 0 else numpy.zeros((0, 4))
+
+        numpy.savetxt(table_file_name, table, fmt=['%d', '%d', '%d', '%.9e'],
+                      header='IPTS  Run  Sequence  ProtonCharge (sequence {} for single run)'
+                             ''.format(SINGLE_RUN_SEQUENCE))
+
+        return
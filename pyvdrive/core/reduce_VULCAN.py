@@ -46,9 +46,8 @@
 #
 ################################################################################
 from pyvdrive.core import save_vulcan_gsas
-from mantid.api import AnalysisDataService
-import mantid
-import mantid.simpleapi as mantidsimple
+from pyvdrive.core import reduction_profiler
+from pyvdrive.core import lazy_import
 import getopt
 import os
 import datetime
@@ -60,6 +59,11 @@ import numpy
 import bisect
 import h5py
 
+# Mantid is imported at the first use
+AnalysisDataService = lazy_import.lazy_attribute('mantid.api', 'AnalysisDataService')
+mantid = lazy_import.lazy_module('mantid', ['mantid.simpleapi'])
+mantidsimple = lazy_import.lazy_module('mantid.simpleapi')
+
 sys.path.insert(0, "/opt/mantid50/bin")
 sys.path.insert(1, "/opt/mantid50/core")
 
@@ -1709,10 +1713,12 @@ class ReduceVulcanData(object):
 
         # configure the ReductionSetup
         self._reductionSetup.process_configurations()
+        profiler = reduction_profiler.start_profiling(self._reductionSetup.get_run_number())
 
         # reduce and write to GSAS file ... it is reduced HERE!
         if not self._reductionSetup._autoReduceLogOnly:
-            return_list = self.reduce_powder_diffraction_data()
+            with reduction_profiler.stage('ReducePowderDiffraction'):
+                return_list = self.reduce_powder_diffraction_data()
             reduction_is_successful = return_list[0]
             msg_gsas = return_list[1]
             final_message += '{0}\n'.format(msg_gsas)
@@ -1746,7 +1752,8 @@ class ReduceVulcanData(object):
         # load the sample run as an option
         if output_logs:
             # load data again with meta data only
-            is_load_good, msg_load_file = self.load_meta_data_from_file()
+            with reduction_profiler.stage('LoadMetaData'):
+                is_load_good, msg_load_file = self.load_meta_data_from_file()
             if not is_load_good:
                 raise RuntimeError('It is not likely to be unable to load {0} at this stage'
                                    ''.format(self._reductionSetup.get_event_file()))
@@ -1755,11 +1762,13 @@ class ReduceVulcanData(object):
             self._reductionSetup.is_alignment_run = self.check_alignment_run()
 
             # export the sample log record file: AutoRecord.txt and etc.
-            is_record_good, msg_record = self.export_experiment_records()
+            with reduction_profiler.stage('ExportRecords'):
+                is_record_good, msg_record = self.export_experiment_records()
             final_message += msg_record + '\n'
 
             # write experiment files
-            is_log_good, msg_log = self.export_log_files()
+            with reduction_profiler.stage('ExportLogs'):
+                is_log_good, msg_log = self.export_log_files()
             final_message += msg_log + '\n'
 
             is_log_good = is_load_good and is_record_good
@@ -1769,9 +1778,15 @@ class ReduceVulcanData(object):
         # END-IF
 
         # special operations for auto reduction
-        is_auto_good, msg_auto = self.special_operation_auto_reduction_service()
+        with reduction_profiler.stage('AutoReductionService'):
+            is_auto_good, msg_auto = self.special_operation_auto_reduction_service()
         final_message += msg_auto + '\n'
 
+        # timing of the reduction stages
+        if self._reductionSetup.get_gsas_dir() is not None:
+            reduction_profiler.save_profile_next_to(profiler.key, self._reductionSetup.get_gsas_dir())
+        final_message += profiler.report()
+
         return is_log_good and is_auto_good, final_message
 
     def _export_experiment_log(self, target_file, sample_name_list,
@@ -2310,20 +2325,22 @@ class ReduceVulcanData(object):
 
         # reduce data
         try:
-            mantidsimple.SNSPowderReduction(Filename=raw_event_file,
-                                            PreserveEvents=True,
-                                            CalibrationFile=self._reductionSetup.get_focus_file(),
-                                            CharacterizationRunsFile=self._reductionSetup.get_characterization_file(),
-                                            Binning=binning_parameter,
-                                            BinInDspace=bin_in_d,
-                                            SaveAS="",
-                                            OutputDirectory=self._reductionSetup.get_gsas_dir(),
-                                            NormalizeByCurrent=False,
-                                            FilterBadPulses=0,
-                                            CompressTOFTolerance=0.,
-                                            FrequencyLogNames="skf1.speed",
-                                            WaveLengthLogNames="lambda",
-                                            FinalDataUnits='dSpacing')
+            with reduction_profiler.stage('SNSPowderReduction'):
+                mantidsimple.SNSPowderReduction(Filename=raw_event_file,
+                                                PreserveEvents=True,
+                                                CalibrationFile=self._reductionSetup.get_focus_file(),
+                                                CharacterizationRunsFile=(
+                                                    self._reductionSetup.get_characterization_file()),
+                                                Binning=binning_parameter,
+                                                BinInDspace=bin_in_d,
+                                                SaveAS="",
+                                                OutputDirectory=self._reductionSetup.get_gsas_dir(),
+                                                NormalizeByCurrent=False,
+                                                FilterBadPulses=0,
+                                                CompressTOFTolerance=0.,
+                                                FrequencyLogNames="skf1.speed",
+                                                WaveLengthLogNames="lambda",
+                                                FinalDataUnits='dSpacing')
 
             # reduced workspace should be in unit as dSpacing
             reduced_ws_name = 'VULCAN_%d' % self._reductionSetup.get_run_number()
@@ -2344,11 +2361,12 @@ class ReduceVulcanData(object):
 
         # Save to GSAS file
         # TODO/NEXT - vulcan.prm should be input as an argument
-        self.export_to_gsas(reduced_workspace=reduced_ws_name,
-                            gsas_file_name=gsas_file_name,
-                            gsas_iparm_file_name='vulcan.prm',
-                            delete_exist_gsas_file=del_exist,
-                            east_west_binning_parameters='5000.,-0.001,70000.')
+        with reduction_profiler.stage('SaveGSAS'):
+            self.export_to_gsas(reduced_workspace=reduced_ws_name,
+                                gsas_file_name=gsas_file_name,
+                                gsas_iparm_file_name='vulcan.prm',
+                                delete_exist_gsas_file=del_exist,
+                                east_west_binning_parameters='5000.,-0.001,70000.')
 
         if output_access_error:
             error_message = 'Code001: Unable to write GSAS file to {0}. Write to {1} instead.\n' \
@@ -6,14 +6,20 @@ import pandas as pd
 import numpy
 import datetime
 from pyvdrive.core import save_vulcan_gsas
-import mantid.simpleapi as mantidsimple
-from mantid.api import AnalysisDataService, ITableWorkspace, MatrixWorkspace
-from mantid.dataobjects import SplittersWorkspace
+from pyvdrive.core import lazy_import
 from pyvdrive.core import reduce_VULCAN
 from pyvdrive.core import chop_utility
 from pyvdrive.core import mantid_helper
 from pyvdrive.core import vulcan_slice_reduce
 from pyvdrive.core import datatypeutility
+from pyvdrive.core import reduction_profiler
+
+# Mantid is imported at the first use
+mantidsimple = lazy_import.lazy_module('mantid.simpleapi')
+AnalysisDataService = lazy_import.lazy_attribute('mantid.api', 'AnalysisDataService')
+ITableWorkspace = lazy_import.lazy_attribute('mantid.api', 'ITableWorkspace')
+MatrixWorkspace = lazy_import.lazy_attribute('mantid.api', 'MatrixWorkspace')
+SplittersWorkspace = lazy_import.lazy_attribute('mantid.dataobjects', 'SplittersWorkspace')
 
 MAX_ALLOWED_WORKSPACES = 200
 MAX_CHOPPED_WORKSPACE_IN_MEM = 200
@@ -213,7 +219,9 @@ class AdvancedChopReduce(reduce_VULCAN.ReduceVulcanData):
         args['WaveLengthLogNames'] = "skf12.lambda"
         args['SplittersWorkspace'] = split_ws_name
         args['SplitInformationWorkspace'] = split_info_table
-        mantidsimple.SNSPowderReduction(**args)
+        profiler = reduction_profiler.start_profiling(self._reductionSetup.get_run_number())
+        with reduction_profiler.stage('SNSPowderReduction'):
+            mantidsimple.SNSPowderReduction(**args)
 
         # create GSAS file for split workspaces
         # convert the chopped data to GSAS file in VULCAN's special bin
@@ -278,12 +286,13 @@ class AdvancedChopReduce(reduce_VULCAN.ReduceVulcanData):
                 gsas_file_name = os.path.join(chop_dir, '{0}.gda'.format(ws_index))
 
             # save to VULCAN GSAS and add a property as Note
-            mantidsimple.SaveVulcanGSS(InputWorkspace=tof_ws_name,
-                                       BinFilename=self._reductionSetup.get_vulcan_bin_file(),
-                                       OutputWorkspace=vdrive_bin_ws_name,
-                                       GSSFilename=gsas_file_name,
-                                       IPTS=self._reductionSetup.get_ipts_number(),
-                                       GSSParmFilename="Vulcan.prm")
+            with reduction_profiler.stage('SaveVulcanGSS'):
+                mantidsimple.SaveVulcanGSS(InputWorkspace=tof_ws_name,
+                                           BinFilename=self._reductionSetup.get_vulcan_bin_file(),
+                                           OutputWorkspace=vdrive_bin_ws_name,
+                                           GSSFilename=gsas_file_name,
+                                           IPTS=self._reductionSetup.get_ipts_number(),
+                                           GSSParmFilename="Vulcan.prm")
 
             # Add special property to output workspace
             final_ws = AnalysisDataService.retrieve(vdrive_bin_ws_name)
@@ -294,6 +303,10 @@ class AdvancedChopReduce(reduce_VULCAN.ReduceVulcanData):
 
         # END-FOR
 
+        # timing
+        reduction_profiler.save_profile_next_to(profiler.key, chop_dir)
+        message += profiler.report()
+
         return everything_is_right, message, chopped_ws_name_list
 
     def chop_and_reduce_large_output(self, chop_dir):
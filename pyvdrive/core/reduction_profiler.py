@@ -0,0 +1,290 @@
+# Instrumentation of the reduction stages: wall time, CPU time, ADS memory and number of events of each stage
+# Profilers are registered by key (run number or run number with slicer tag) such that the timing of the
+# (auto) reduction can be reported run by run.
+import os
+import json
+import time
+import datetime
+import functools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pyvdrive.core import datatypeutility
+
+# maximum number of profilers kept in registry
+MAX_PROFILERS = 100
+
+
+class StageRecord(object):
+    """ Record of one reduction stage
+    """
+
+    def __init__(self, name, level):
+        """
+        initialization
+        :param name: stage name
+        :param level: nesting level of the stage (0 for top level)
+        """
+        self.name = name
+        self.level = level
+        self.wall_time = None
+        self.cpu_time = None
+        self.memory_before = None    # ADS memory (MB) before the stage
+        self.memory_after = None     # ADS memory (MB) after the stage
+        self.num_events = None       # number of events of the workspace processed
+        self.error = None
+
+    def to_dict(self):
+        """ convert to dictionary for JSON
+        :return:
+        """
+        return OrderedDict([('name', self.name), ('level', self.level),
+                            ('wall_time', self.wall_time), ('cpu_time', self.cpu_time),
+                            ('memory_before', self.memory_before), ('memory_after', self.memory_after),
+                            ('num_events', self.num_events), ('error', self.error)])
+
+
+class ReductionProfiler(object):
+    """ Timer and resource recorder of reduction stages
+    """
+
+    def __init__(self, key, record_memory=True):
+        """
+        initialization
+        :param key: key of the profiler such as run number
+        :param record_memory: flag to record ADS memory (requires Mantid) before and after each stage
+        """
+        datatypeutility.check_bool_variable('Flag to record ADS memory', record_memory)
+
+        self._key = key
+        self._record_memory = record_memory
+        self._start_time = datetime.datetime.now()
+        self._stage_records = list()
+        self._level = 0
+
+        self._lock = threading.Lock()
+
+        return
+
+    def __str__(self):
+        return self.report()
+
+    @property
+    def key(self):
+        return self._key
+
+    @property
+    def records(self):
+        """ list of StageRecord in order of the start of each stage
+        :return:
+        """
+        return self._stage_records[:]
+
+    @property
+    def total_wall_time(self):
+        """ total wall time of top level stages
+        :return:
+        """
+        return sum([record.wall_time for record in self._stage_records
+                    if record.level == 0 and record.wall_time is not None])
+
+    def _get_ads_memory(self):
+        if not self._record_memory:
+            return None
+
+        from pyvdrive.core import mantid_helper
+        return mantid_helper.get_ads_memory(unit='MB')
+
+    @staticmethod
+    def _get_number_events(workspace_name):
+        from pyvdrive.core import mantid_helper
+        return mantid_helper.get_number_events(workspace_name)
+
+    @contextmanager
+    def stage(self, stage_name, workspace_name=None):
+        """ context manager to record a stage
+        :param stage_name: name of the stage
+        :param workspace_name: name of the workspace whose number of events are recorded at the end of stage
+        :return:
+        """
+        datatypeutility.check_string_variable('Stage name', stage_name)
+
+        with self._lock:
+            record = StageRecord(stage_name, self._level)
+            self._stage_records.append(record)
+            self._level += 1
+
+        record.memory_before = self._get_ads_memory()
+        wall_time0 = time.time()
+        cpu_time0 = time.process_time()
+        try:
+            yield record
+        except Exception as any_err:
+            record.error = str(any_err)
+            raise
+        finally:
+            record.wall_time = time.time() - wall_time0
+            record.cpu_time = time.process_time() - cpu_time0
+            record.memory_after = self._get_ads_memory()
+            if workspace_name is not None and record.error is None:
+                record.num_events = self._get_number_events(workspace_name)
+            with self._lock:
+                self._level -= 1
+        # END-TRY
+
+    def to_dict(self):
+        """ convert to dictionary for JSON
+        :return:
+        """
+        return OrderedDict([('key', str(self._key)),
+                            ('start_time', self._start_time.isoformat()),
+                            ('total_wall_time', self.total_wall_time),
+                            ('stages', [record.to_dict() for record in self._stage_records])])
+
+    def report(self):
+        """ timing report as a table in plain text
+        :return: string
+        """
+        report = 'Timing of {}: total = {:.3f} s\n'.format(self._key, self.total_wall_time)
+        report += '{:<32}{:>12}{:>12}{:>14}{:>16}\n'.format('Stage', 'Wall (s)', 'CPU (s)', 'Memory (MB)',
+                                                            'Events')
+        for record in self._stage_records:
+            name = '  ' * record.level + record.name
+            if record.error is not None:
+                name += ' (failed)'
+            memory = '' if record.memory_after is None else '{:.1f}'.format(record.memory_after)
+            num_events = '' if record.num_events is None else '{}'.format(record.num_events)
+            wall_time = float('nan') if record.wall_time is None else record.wall_time
+            cpu_time = float('nan') if record.cpu_time is None else record.cpu_time
+            report += '{:<32}{:>12.3f}{:>12.3f}{:>14}{:>16}\n'.format(name[:31], wall_time, cpu_time, memory,
+                                                                      num_events)
+        # END-FOR
+
+        return report
+
+    def save_json(self, json_file_name):
+        """ export the stage records to a JSON file
+        :param json_file_name:
+        :return:
+        """
+        datatypeutility.check_file_name(json_file_name, check_exist=False, check_writable=True,
+                                        is_dir=False, note='Timing JSON file')
+
+        with open(json_file_name, 'w') as json_file:
+            json.dump(self.to_dict(), json_file, indent=2)
+
+        return
+
+
+# registry of profilers: key = run key, value = ReductionProfiler
+_profiler_dict = OrderedDict()
+_registry_lock = threading.Lock()
+# current profiler of each thread, such that runs reduced concurrently do not record to each other's profiler
+_thread_state = threading.local()
+
+
+def start_profiling(key, record_memory=True):
+    """ create a new profiler for a run and set it as the current one of the calling thread such that all the
+    stages recorded by stage() and profile_stage() in this thread are recorded to it
+    :param key: run number or any key
+    :param record_memory: flag to record ADS memory
+    :return: ReductionProfiler
+    """
+    profiler = ReductionProfiler(key, record_memory=record_memory)
+    with _registry_lock:
+        if key in _profiler_dict:
+            del _profiler_dict[key]
+        _profiler_dict[key] = profiler
+        while len(_profiler_dict) > MAX_PROFILERS:
+            _profiler_dict.popitem(last=False)
+    _thread_state.profiler = profiler
+
+    return profiler
+
+
+def get_profiler(key=None):
+    """ get a profiler
+    :param key: None for the current profiler of the calling thread
+    :return: ReductionProfiler or None
+    """
+    if key is None:
+        return getattr(_thread_state, 'profiler', None)
+
+    with _registry_lock:
+        return _profiler_dict.get(key, None)
+
+
+def get_profiler_keys():
+    """ get the keys of all the registered profilers in order of creation
+    :return:
+    """
+    with _registry_lock:
+        return list(_profiler_dict.keys())
+
+
+def clear_profilers():
+    """ remove all the profilers
+    :return:
+    """
+    with _registry_lock:
+        _profiler_dict.clear()
+    _thread_state.profiler = None
+
+    return
+
+
+@contextmanager
+def stage(stage_name, workspace_name=None, key=None):
+    """ record a stage to a profiler.  Nothing is recorded if there is no such profiler
+    :param stage_name:
+    :param workspace_name: name of the workspace whose number of events are recorded at the end of stage
+    :param key: key of the profiler.  None for the current profiler of the calling thread
+    :return:
+    """
+    profiler = get_profiler(key)
+    if profiler is None:
+        yield None
+    else:
+        with profiler.stage(stage_name, workspace_name) as record:
+            yield record
+
+
+def profile_stage(stage_name, workspace_arg=None):
+    """ decorator to record a method or function as a stage to the current profiler
+    :param stage_name: name of the stage
+    :param workspace_arg: name of the keyword argument of the workspace whose number of events shall be recorded
+    :return:
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            workspace_name = None if workspace_arg is None else kwargs.get(workspace_arg, None)
+            with stage(stage_name, workspace_name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def save_profile_next_to(key, output_file_name):
+    """ save the profile of a run as JSON next to an output (GSAS) file as [GSAS base name]_timing.json
+    :param key: key of the profiler
+    :param output_file_name: output (GSAS) file name or output directory
+    :return: JSON file name or None if no profiler or the directory is not writable
+    """
+    profiler = get_profiler(key)
+    if profiler is None:
+        return None
+
+    if os.path.isdir(output_file_name):
+        json_file_name = os.path.join(output_file_name, '{}_timing.json'.format(key))
+    else:
+        json_file_name = os.path.splitext(output_file_name)[0] + '_timing.json'
+
+    try:
+        profiler.save_json(json_file_name)
+    except (AssertionError, RuntimeError, IOError, OSError) as io_err:
+        print('[WARNING] Unable to save reduction timing to {}: {}'.format(json_file_name, io_err))
+        return None
+
+    return json_file_name
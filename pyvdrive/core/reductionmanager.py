@@ -3,6 +3,9 @@
 ################################################################################
 import os
 import datetime
+import threading
+from collections import OrderedDict
+from six.moves import queue
 from pyvdrive.core import reduce_VULCAN
 from pyvdrive.core import mantid_helper
 from pyvdrive.core import reduce_adv_chop
@@ -10,7 +13,11 @@ from pyvdrive.core import mantid_reduction
 from pyvdrive.core import datatypeutility
 from pyvdrive.core import save_vulcan_gsas
 from pyvdrive.core import vulcan_util
-import mantid.simpleapi as mantid_api
+from pyvdrive.core import reduction_profiler
+from pyvdrive.core import lazy_import
+
+# Mantid is imported at the first use
+mantid_api = lazy_import.lazy_module('mantid.simpleapi')
 
 EVENT_WORKSPACE_ID = "EventWorkspace"
 
@@ -20,9 +27,10 @@ class CalibrationManager(object):
     A container and manager for calibration files loaded, number of banks of groupings and etc
     """
 
-    def __init__(self):
+    def __init__(self, calibration_pool=None):
         """
         initialization
+        :param calibration_pool: CalibrationWorkspacePool or None to share the pool among all the managers
         """
         # important dates
         self._ned_date = '2017-06-01'  # string only
@@ -34,9 +42,18 @@ class CalibrationManager(object):
         self._vdrive_binning_ref_dict = dict()   # [date, num_banks] ...
         self._default_tof_bins_dict = None   # [cal_date, num_banks]
 
-        self._loaded_calibration_file_dict = dict()
+        # loaded calibration workspaces: key = (calibration date index, number of banks)
+        if calibration_pool is None:
+            calibration_pool = SHARED_CALIBRATION_POOL
+        assert isinstance(calibration_pool, CalibrationWorkspacePool), 'Calibration pool {} must be a ' \
+            'CalibrationWorkspacePool but not a {}'.format(calibration_pool, type(calibration_pool))
+        self._calibration_pool = calibration_pool
         self._focus_instrument_dict = dict()
 
+        # background prefetch of calibration files for runs queued to reduce
+        self._prefetch_queue = None
+        self._prefetch_thread = None
+
         # set up
         self._init_vulcan_calibration_files()
         # self._init_vdrive_binning_refs()
@@ -324,11 +341,10 @@ class CalibrationManager(object):
         """
         cal_date, cal_file_name = self.get_calibration_file(run_start_date, num_banks)
 
-        try:
-            calib_ws_collection = self._loaded_calibration_file_dict[cal_date][num_banks]
-        except KeyError as key_err:
+        calib_ws_collection = self._calibration_pool.get((cal_date, num_banks))
+        if calib_ws_collection is None:
             error_msg = 'File {0} is not loaded yet! Client shall check the loaded workspace first.' \
-                        'FYI: {1}'.format(cal_file_name, key_err)
+                        ''.format(cal_file_name)
             print('[Crash Error] {}'.format(error_msg))
             raise RuntimeError(error_msg)
 
@@ -372,16 +388,13 @@ class CalibrationManager(object):
         print('[DB...BAT] CalibrationMananger: ID/Date: {}; Calibration file name: {}'
               ''.format(calib_file_date, calib_file_name))
 
-        # regular check with dictionary
-        has_them = True
-        if calib_file_date not in self._loaded_calibration_file_dict:
-            has_them = False
-        elif num_banks not in self._loaded_calibration_file_dict[calib_file_date]:
-            has_them = False
+        # regular check with calibration pool
+        calib_ws_collection = self._calibration_pool.get((calib_file_date, num_banks))
+        has_them = calib_ws_collection is not None
 
         # search for unregistered
         if has_them:
-            calib_ws_collection = self._loaded_calibration_file_dict[calib_file_date][num_banks]
+            pass
 
         elif search_unregistered_workspaces:
             # search un-registered calibration workspace by workspace names
@@ -400,15 +413,13 @@ class CalibrationManager(object):
                 raise RuntimeError(
                     'Problematic case: Some calibration workspace existed but not all!')
             elif has_all:
-                # add to dictionary
+                # add to pool
                 has_them = True
-                if calib_file_date not in self._loaded_calibration_file_dict:
-                    self._loaded_calibration_file_dict[calib_file_date] = dict()
                 calib_ws_collection = DetectorCalibrationWorkspaces()
                 calib_ws_collection.calibration = '{}_{}'.format(base_ws_name, 'calib')
                 calib_ws_collection.mask = '{}_{}'.format(base_ws_name, 'mask')
                 calib_ws_collection.grouping = '{}_{}'.format(base_ws_name, 'grouping')
-                self._loaded_calibration_file_dict[calib_file_date][num_banks] = calib_ws_collection
+                self._calibration_pool.add((calib_file_date, num_banks), calib_ws_collection)
             else:
                 # has none
                 calib_ws_collection = None
@@ -424,53 +435,126 @@ class CalibrationManager(object):
         """ load calibration file with
         :return:
         """
+        # load calibration
+        calib_ws_collection = self._load_calibration_workspaces(calibration_file_name, num_banks, ref_ws_name)
+
+        # add to loaded calibration pool
+        self._calibration_pool.add((cal_date_index, num_banks), calib_ws_collection)
+
+        return calib_ws_collection
+
+    def search_load_calibration_file(self, run_start_date, bank_numbers, ref_workspace_name, acquire=False):
+        """
+        search for calibration and load it
+        :param run_start_date: string in YYYY-MM-DD format
+        :param bank_numbers:
+        :param acquire: if True, hold a reference to the calibration workspaces in the same operation as loading
+        :return: calibration workspace collection
+        """
+        # use run_start_date (str) to search in the calibration date time string
+        cal_date_index, calibration_file_name = self.get_calibration_file(
+            run_start_date, bank_numbers)
+        print('[DB...BAT] Located calibration file {0} with reference ID {1}'
+              ''.format(calibration_file_name, cal_date_index))
+
+        # load calibration file if it is not in the pool.  It waits if the file is being loaded in background
+        calib_ws_collection = self._calibration_pool.load(
+            (cal_date_index, bank_numbers),
+            lambda: self._load_calibration_workspaces(calibration_file_name, bank_numbers, ref_workspace_name),
+            acquire=acquire)
+
+        return calib_ws_collection
+
+    def _load_calibration_workspaces(self, calibration_file_name, num_banks, ref_ws_name):
+        """ load calibration file to workspaces without registering to the calibration pool
+        :param calibration_file_name:
+        :param num_banks:
+        :param ref_ws_name:
+        :return: calibration workspace collection
+        """
         # check inputs
         datatypeutility.check_file_name(
             calibration_file_name, check_exist=True, note='Calibration file')
         datatypeutility.check_int_variable('Number of banks', num_banks, (1, None))
 
-        # load calibration
         base_name = self.get_base_name(calibration_file_name, num_banks)
         outputs, offset_ws = mantid_helper.load_calibration_file(
             calibration_file_name, base_name, ref_ws_name)
-        # get output workspaces for their names
+
         calib_ws_collection = DetectorCalibrationWorkspaces()
         calib_ws_collection.calibration = outputs.OutputCalWorkspace.name()
         calib_ws_collection.mask = outputs.OutputMaskWorkspace.name()
         calib_ws_collection.grouping = outputs.OutputGroupingWorkspace.name()
 
-        # add to loaded calibration file container
-        if cal_date_index not in self._loaded_calibration_file_dict:
-            self._loaded_calibration_file_dict[cal_date_index] = dict()
-        self._loaded_calibration_file_dict[cal_date_index][num_banks] = calib_ws_collection
-
         return calib_ws_collection
 
-    def search_load_calibration_file(self, run_start_date, bank_numbers, ref_workspace_name):
+    def acquire_calibration_workspaces(self, run_start_date, num_banks, ref_ws_name):
+        """ get the calibration workspaces for a run (load them if necessary) and hold a reference to them
+        such that they won't be evicted from the calibration pool until they are released
+        :param run_start_date: run start date
+        :param num_banks: number of banks
+        :param ref_ws_name: reference workspace (with instrument) to load calibration file
+        :return: calibration workspace collection
         """
-        search for calibration and load it
-        :param run_start_date: string in YYYY-MM-DD format
-        :param bank_numbers:
+        return self.search_load_calibration_file(run_start_date, num_banks, ref_ws_name, acquire=True)
+
+    def release_calibration_workspaces(self, run_start_date, num_banks):
+        """ release the reference to the calibration workspaces for a run
+        :param run_start_date: run start date
+        :param num_banks: number of banks
         :return:
         """
-        # check whether this file has been loaded
-        if self.has_loaded(run_start_date, bank_numbers)[0]:
-            print('[INFO] Calibration file for run on and before {} has been loaded'
-                  ''.format(run_start_date))
-            return
+        cal_date_index = self.get_calibration_file(run_start_date, num_banks)[0]
+        self._calibration_pool.release((cal_date_index, num_banks))
 
-        # use run_start_date (str) to search in the calibration date time string
-        cal_date_index, calibration_file_name = self.get_calibration_file(
-            run_start_date, bank_numbers)
-        print('[DB...BAT] Located calibration file {0} with reference ID {1}'
-              ''.format(calibration_file_name, cal_date_index))
+        return
 
-        # load calibration file
-        self.load_calibration_file(calibration_file_name, cal_date_index,
-                                   bank_numbers, ref_workspace_name)
+    @property
+    def calibration_pool(self):
+        """ Calibration workspace pool
+        :return:
+        """
+        return self._calibration_pool
+
+    def prefetch_calibration(self, nexus_file_name, num_banks):
+        """ load the calibration for a run that is queued to reduce in background
+        :param nexus_file_name: event NeXus file of the run
+        :param num_banks: number of banks
+        :return:
+        """
+        datatypeutility.check_string_variable('Event NeXus file', nexus_file_name)
+        datatypeutility.check_int_variable('Number of banks', num_banks, (1, 28))
+
+        # start the prefetching thread on demand
+        if self._prefetch_thread is None:
+            self._prefetch_queue = queue.Queue()
+            self._prefetch_thread = threading.Thread(target=self._prefetch_calibration_worker)
+            self._prefetch_thread.daemon = True
+            self._prefetch_thread.start()
+
+        self._prefetch_queue.put((nexus_file_name, num_banks))
 
         return
 
+    def _prefetch_calibration_worker(self):
+        """ (background thread) load calibration files for the runs in the prefetch queue
+        :return:
+        """
+        while True:
+            nexus_file_name, num_banks = self._prefetch_queue.get()
+            ref_ws_name = '_prefetch_calib_{}'.format(os.path.basename(nexus_file_name).split('.')[0])
+            try:
+                mantid_helper.load_nexus_instrument(nexus_file_name, ref_ws_name)
+                run_start_date = mantid_helper.get_run_start(ref_ws_name, time_unit=None)
+                self.search_load_calibration_file(run_start_date, num_banks, ref_ws_name)
+            except (RuntimeError, AssertionError, KeyError) as run_err:
+                print('[WARNING] Unable to prefetch calibration for {}: {}'.format(nexus_file_name, run_err))
+            finally:
+                if mantid_helper.workspace_does_exist(ref_ws_name):
+                    mantid_helper.delete_workspace(ref_ws_name)
+                self._prefetch_queue.task_done()
+        # END-WHILE
+
     @staticmethod
     def vdrive_binning_ref_ws_name(file_name):
         """
@@ -485,6 +569,198 @@ class CalibrationManager(object):
         return ws_name
 
 
+class CalibrationWorkspacePool(object):
+    """
+    A pool of loaded calibration workspaces (calibration, mask and grouping) keyed by
+    (calibration date index, number of banks).
+    Calibration workspaces are reference counted.  When the total memory exceeds the budget, the least recently
+    used calibration workspaces that are not referenced are deleted from ADS.
+    """
+
+    def __init__(self, memory_budget=2048.):
+        """
+        initialization
+        :param memory_budget: memory budget in MB
+        """
+        # key = (cal_date_index, num_banks), value = [DetectorCalibrationWorkspaces, reference count, memory (MB)]
+        # ordered from the least recently used to the most recently used
+        self._pool_dict = OrderedDict()
+        # calibrations being loaded: key = (cal_date_index, num_banks), value = threading.Event
+        self._loading_dict = dict()
+
+        self._lock = threading.RLock()
+
+        self._memory_budget = None
+        self.memory_budget = memory_budget
+
+        return
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._pool_dict
+
+    @property
+    def memory_budget(self):
+        """ memory budget in MB
+        :return:
+        """
+        return self._memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, memory_mb):
+        """ set memory budget and evict calibration workspaces if necessary
+        :param memory_mb:
+        :return:
+        """
+        datatypeutility.check_float_variable('Calibration pool memory budget (MB)', memory_mb, (0., None))
+        self._memory_budget = memory_mb
+        self._evict()
+
+    @property
+    def total_memory(self):
+        """ total memory (MB) of all the calibration workspaces in the pool
+        :return:
+        """
+        with self._lock:
+            return sum([entry[2] for entry in self._pool_dict.values()])
+
+    def acquire(self, key):
+        """ hold a reference to a calibration workspace collection
+        :param key: (cal_date_index, num_banks)
+        :return: calibration workspace collection
+        """
+        with self._lock:
+            if key not in self._pool_dict:
+                raise RuntimeError('Calibration {} is not in pool. Available: {}'
+                                   ''.format(key, list(self._pool_dict.keys())))
+            self._pool_dict[key][1] += 1
+            self._pool_dict[key] = self._pool_dict.pop(key)
+
+            return self._pool_dict[key][0]
+
+    def add(self, key, calib_ws_collection, acquire=False):
+        """ add a loaded calibration workspace collection to pool
+        :param key: (cal_date_index, num_banks)
+        :param calib_ws_collection: DetectorCalibrationWorkspaces
+        :param acquire: if True, hold a reference to it before any eviction
+        :return:
+        """
+        assert isinstance(calib_ws_collection, DetectorCalibrationWorkspaces), \
+            'Calibration workspaces {} must be a DetectorCalibrationWorkspaces but not a {}' \
+            ''.format(calib_ws_collection, type(calib_ws_collection))
+
+        memory_size = mantid_helper.get_workspaces_memory([calib_ws_collection.calibration,
+                                                           calib_ws_collection.mask,
+                                                           calib_ws_collection.grouping], unit='MB')
+
+        with self._lock:
+            ref_count = self._pool_dict[key][1] if key in self._pool_dict else 0
+            if acquire:
+                ref_count += 1
+            self._pool_dict[key] = [calib_ws_collection, ref_count, memory_size]
+            self._pool_dict[key] = self._pool_dict.pop(key)
+            # the caller gets the workspace names back and thus they must not be deleted right away
+            self._evict(pinned_key=key)
+
+        return
+
+    def get(self, key):
+        """ get a calibration workspace collection without holding a reference
+        :param key: (cal_date_index, num_banks)
+        :return: DetectorCalibrationWorkspaces or None (not in pool)
+        """
+        with self._lock:
+            if key not in self._pool_dict:
+                return None
+            self._pool_dict[key] = self._pool_dict.pop(key)
+
+            return self._pool_dict[key][0]
+
+    def load(self, key, load_method, acquire=False):
+        """ get a calibration workspace collection and load it if it is not in the pool.
+        If the same calibration is being loaded by another thread, wait for it instead of loading it twice
+        :param key: (cal_date_index, num_banks)
+        :param load_method: method without argument to load calibration and return DetectorCalibrationWorkspaces
+        :param acquire: if True, hold a reference under the same lock such that it cannot be evicted in between
+        :return: DetectorCalibrationWorkspaces
+        """
+        while True:
+            with self._lock:
+                if key in self._pool_dict:
+                    if acquire:
+                        return self.acquire(key)
+                    self._pool_dict[key] = self._pool_dict.pop(key)
+                    return self._pool_dict[key][0]
+                elif key in self._loading_dict:
+                    loading_event = self._loading_dict[key]
+                    is_loader = False
+                else:
+                    loading_event = threading.Event()
+                    self._loading_dict[key] = loading_event
+                    is_loader = True
+            # END-WITH
+
+            if not is_loader:
+                # wait for the other thread and check again
+                loading_event.wait()
+                continue
+
+            try:
+                calib_ws_collection = load_method()
+                self.add(key, calib_ws_collection, acquire=acquire)
+            finally:
+                with self._lock:
+                    del self._loading_dict[key]
+                loading_event.set()
+
+            return calib_ws_collection
+        # END-WHILE
+
+    def release(self, key):
+        """ release a reference to a calibration workspace collection
+        :param key: (cal_date_index, num_banks)
+        :return:
+        """
+        with self._lock:
+            if key not in self._pool_dict:
+                print('[WARNING] Calibration {} is not in pool and cannot be released'.format(key))
+                return
+            self._pool_dict[key][1] = max(self._pool_dict[key][1] - 1, 0)
+            self._evict()
+
+        return
+
+    def _evict(self, pinned_key=None):
+        """ delete the least recently used calibration workspaces that are not referenced until the total memory
+        is within budget
+        :param pinned_key: key of the calibration that cannot be evicted, such as the one just added
+        :return:
+        """
+        with self._lock:
+            total_memory = self.total_memory
+            for key in list(self._pool_dict.keys()):
+                if total_memory <= self._memory_budget:
+                    break
+                calib_ws_collection, ref_count, memory_size = self._pool_dict[key]
+                if ref_count > 0 or key == pinned_key:
+                    continue
+
+                print('[INFO] Evict calibration workspaces {} ({:.1f} MB) from pool'.format(key, memory_size))
+                for ws_name in [calib_ws_collection.calibration, calib_ws_collection.mask,
+                                calib_ws_collection.grouping]:
+                    if ws_name is not None and mantid_helper.workspace_does_exist(ws_name):
+                        mantid_helper.delete_workspace(ws_name)
+                del self._pool_dict[key]
+                total_memory -= memory_size
+            # END-FOR
+
+        return
+
+
+# calibration workspaces are in ADS and thus shared by all the reduction sessions
+SHARED_CALIBRATION_POOL = CalibrationWorkspacePool()
+
+
 class DataReductionTracker(object):
     """ Record tracker of data reduction for an individual run.
     """
@@ -982,6 +1258,8 @@ class ReductionManager(object):
 
         # calibration file and workspaces management
         self._calibrationFileManager = CalibrationManager()   # key = calibration file name
+        # calibration workspaces held by workspaces being reduced: [ws name] = run start date, number of banks
+        self._acquired_calibration_dict = dict()
 
         # init standard diffraction focus parameters: instrument geometry parameters
         self._diff_focus_params = self._init_vulcan_diff_focus_params()
@@ -1100,8 +1378,10 @@ class ReductionManager(object):
         :return: 2-tuple (string: regular message, string: error message)
         """
         # Load data
+        profiler = reduction_profiler.start_profiling(run_number)
         event_ws_name = self.get_event_workspace_name(run_number=run_number)
-        mantid_helper.load_nexus(raw_file_name, event_ws_name, meta_data_only=False)
+        with reduction_profiler.stage('LoadEventNexus', event_ws_name):
+            mantid_helper.load_nexus(raw_file_name, event_ws_name, meta_data_only=False)
         print('[INFO] Successfully loaded {0} to {1}'.format(raw_file_name, event_ws_name))
 
         # Load user specified masks/ROIs
@@ -1118,123 +1398,131 @@ class ReductionManager(object):
             user_mask_name = None
         # END-IF-ELSE
 
-        # Load geometry calibration file
-        calib_ws_name, group_ws_name, mask_ws_name = self._get_calibration_workspaces_names(
-            event_ws_name, number_banks)
-
-        # apply mask
-        if user_mask_name:
-            mantid_helper.mask_workspace(event_ws_name, user_mask_name)
-        if not no_cal_mask:
-            mantid_helper.mask_workspace(event_ws_name, mask_ws_name)
-
-        # create a reduction setup instance
-        reduction_setup = reduce_VULCAN.ReductionSetup()
-        # set up reduction parameters
-        reduction_setup.set_ipts_number(ipts_number)
-        reduction_setup.set_run_number(run_number)
-        reduction_setup.set_event_file(raw_file_name)
-
-        # splitters workspace suite
-        reduction_setup.set_splitters(split_ws_name, split_info_name)
-
-        # option to save to archive
-        if output_directory is None:
-            # save to SNS archive.
-            reduction_setup.set_chopped_output_to_archive(create_parent_directories=True)
-        else:
-            # save to user-specified directories. GSAS and NeXus will be in the same directory
-            reduction_setup.set_output_dir(output_directory)
-            reduction_setup.set_gsas_dir(output_directory, main_gsas=True)
-            reduction_setup.set_chopped_nexus_dir(output_directory)
-
-        # create an AdavancedChopReduce instance
-        chop_reducer = reduce_adv_chop.AdvancedChopReduce(reduction_setup)
-        # set calibrated instrument
-        chop_reducer.set_focus_virtual_instrument(
-            self._calibrationFileManager.get_focused_instrument_parameters(number_banks))
-        if reduce_data_flag:
-            # chop and reduce chopped data to GSAS: NOW, it is Version 2.0 speedup
-            reduction_setup.set_calibration_workspaces(calib_ws_name, group_ws_name, mask_ws_name)
-
-            # initialize tracker
-            tracker = self.init_tracker(ipts_number, run_number, slice_key)
-            tracker.is_reduced = False
-
-            # set up the flag to save chopped raw data
-            reduction_setup.save_chopped_workspace = save_chopped_nexus
-
-            # set the flag for not being an auto reduction
-            reduction_setup.is_auto_reduction_service = False
-
-            # set up reducer
-            reduction_setup.process_configurations()
-
-            # Slice and focus the data *** V2.0
-            # determine the binning for output GSAS workspace
-            if user_binning_parameter is None:
-                binning_param_dict = None
+        try:
+            # Load geometry calibration file
+            with reduction_profiler.stage('LoadCalibration'):
+                calib_ws_name, group_ws_name, mask_ws_name = self._get_calibration_workspaces_names(
+                    event_ws_name, number_banks)
+
+            # apply mask
+            with reduction_profiler.stage('MaskDetectors', event_ws_name):
+                if user_mask_name:
+                    mantid_helper.mask_workspace(event_ws_name, user_mask_name)
+                if not no_cal_mask:
+                    mantid_helper.mask_workspace(event_ws_name, mask_ws_name)
+
+            # create a reduction setup instance
+            reduction_setup = reduce_VULCAN.ReductionSetup()
+            # set up reduction parameters
+            reduction_setup.set_ipts_number(ipts_number)
+            reduction_setup.set_run_number(run_number)
+            reduction_setup.set_event_file(raw_file_name)
+
+            # splitters workspace suite
+            reduction_setup.set_splitters(split_ws_name, split_info_name)
+
+            # option to save to archive
+            if output_directory is None:
+                # save to SNS archive.
+                reduction_setup.set_chopped_output_to_archive(create_parent_directories=True)
             else:
-                binning_param_dict = user_binning_parameter
-
-            # END-IF-ELSE
-            # virtual_geometry_dict = self._calibrationFileManager.get_focused_instrument_parameters(num_banks)
-
-            gsas_info = {'IPTS': ipts_number, 'parm file': gsas_parm_name, 'vanadium': van_gda_name}
-            status, message = chop_reducer.execute_chop_reduction_v2(event_ws_name=event_ws_name,
-                                                                     calib_ws_name=calib_ws_name,
-                                                                     group_ws_name=group_ws_name,
-                                                                     binning_parameters=binning_param_dict,
-                                                                     gsas_info_dict=gsas_info,
-                                                                     fullprof=fullprof,
-                                                                     clear_workspaces=True,
-                                                                     gsas_writer=self._gsas_writer,
-                                                                     num_reduced_banks=number_banks,
-                                                                     chop_overlap_mode=bin_overlap_mode,
-                                                                     gsas_file_index_start=gda_file_start)
-
-            # set up the reduced file names and workspaces and add to reduction tracker dictionary
-            tracker.set_reduction_status(status, message, True)
-
-            reduced, workspace_name_list = chop_reducer.get_reduced_workspaces(chopped=True)
-            chop_message = 'Output GSAS: {}.gda - {}.gda'.format(gda_file_start,
-                                                                 gda_file_start - 1 + len(workspace_name_list))
-
-            error_message = self.set_chopped_reduced_workspaces(
-                run_number, slice_key, workspace_name_list, append=True)
-            self.set_chopped_reduced_files(
-                run_number, slice_key, chop_reducer.get_reduced_files(), append=True)
-
-            tracker.is_reduced = True
+                # save to user-specified directories. GSAS and NeXus will be in the same directory
+                reduction_setup.set_output_dir(output_directory)
+                reduction_setup.set_gsas_dir(output_directory, main_gsas=True)
+                reduction_setup.set_chopped_nexus_dir(output_directory)
+
+            # create an AdavancedChopReduce instance
+            chop_reducer = reduce_adv_chop.AdvancedChopReduce(reduction_setup)
+            # set calibrated instrument
+            chop_reducer.set_focus_virtual_instrument(
+                self._calibrationFileManager.get_focused_instrument_parameters(number_banks))
+            if reduce_data_flag:
+                # chop and reduce chopped data to GSAS: NOW, it is Version 2.0 speedup
+                reduction_setup.set_calibration_workspaces(calib_ws_name, group_ws_name, mask_ws_name)
+
+                # initialize tracker
+                tracker = self.init_tracker(ipts_number, run_number, slice_key)
+                tracker.is_reduced = False
+
+                # set up the flag to save chopped raw data
+                reduction_setup.save_chopped_workspace = save_chopped_nexus
+
+                # set the flag for not being an auto reduction
+                reduction_setup.is_auto_reduction_service = False
+
+                # set up reducer
+                reduction_setup.process_configurations()
+
+                # Slice and focus the data *** V2.0
+                # determine the binning for output GSAS workspace
+                if user_binning_parameter is None:
+                    binning_param_dict = None
+                else:
+                    binning_param_dict = user_binning_parameter
+
+                # END-IF-ELSE
+                # virtual_geometry_dict = self._calibrationFileManager.get_focused_instrument_parameters(num_banks)
+
+                gsas_info = {'IPTS': ipts_number, 'parm file': gsas_parm_name, 'vanadium': van_gda_name}
+                status, message = chop_reducer.execute_chop_reduction_v2(event_ws_name=event_ws_name,
+                                                                         calib_ws_name=calib_ws_name,
+                                                                         group_ws_name=group_ws_name,
+                                                                         binning_parameters=binning_param_dict,
+                                                                         gsas_info_dict=gsas_info,
+                                                                         fullprof=fullprof,
+                                                                         clear_workspaces=True,
+                                                                         gsas_writer=self._gsas_writer,
+                                                                         num_reduced_banks=number_banks,
+                                                                         chop_overlap_mode=bin_overlap_mode,
+                                                                         gsas_file_index_start=gda_file_start)
+
+                # set up the reduced file names and workspaces and add to reduction tracker dictionary
+                tracker.set_reduction_status(status, message, True)
+
+                reduced, workspace_name_list = chop_reducer.get_reduced_workspaces(chopped=True)
+                chop_message = 'Output GSAS: {}.gda - {}.gda'.format(gda_file_start,
+                                                                     gda_file_start - 1 + len(workspace_name_list))
+                reduction_profiler.save_profile_next_to(run_number, reduction_setup.get_chopped_directory()[0])
+                chop_message += '\n{}'.format(profiler.report())
+
+                error_message = self.set_chopped_reduced_workspaces(
+                    run_number, slice_key, workspace_name_list, append=True)
+                self.set_chopped_reduced_files(
+                    run_number, slice_key, chop_reducer.get_reduced_files(), append=True)
+
+                tracker.is_reduced = True
 
-        else:
-            # chop data only without reduction
-            raise NotImplementedError('This branch is temporarily disabled')
-            # status, ret_obj = chop_reducer.chop_data()
-            #
-            # if not status:
-            #     return False, ('', 'Unable to chop run {0} due to {1}.'.format(run_number, ret_obj))
-            #
-            # # get chopped workspaces' names, saved NeXus file name; check them and store to lists
-            # chopped_ws_name_list = list()
-            # chopped_file_list = list()
-            # for file_name, ws_name in ret_obj:
-            #     if file_name is not None:
-            #         chopped_file_list.append(file_name)
-            #     if isinstance(ws_name, str) and mantid_helper.workspace_does_exist(ws_name):
-            #         chopped_ws_name_list.append(ws_name)
-            # # END-FOR
-            # chop_message = '{}'.format(chopped_file_list)
-            #
-            # # initialize tracker
-            # tracker = self.init_tracker(ipts_number=ipts_number, run_number=run_number, slicer_key=slice_key)
-            # tracker.is_reduced = False
-            # tracker.is_chopped = True
-            # if len(chopped_ws_name_list) > 0:
-            #     tracker.set_chopped_workspaces(chopped_ws_name_list, append=True)
-            # if len(chopped_file_list) > 0:
-            #     tracker.set_chopped_nexus_files(chopped_file_list, append=True)
-        # END-IF
+            else:
+                # chop data only without reduction
+                raise NotImplementedError('This branch is temporarily disabled')
+                # status, ret_obj = chop_reducer.chop_data()
+                #
+                # if not status:
+                #     return False, ('', 'Unable to chop run {0} due to {1}.'.format(run_number, ret_obj))
+                #
+                # # get chopped workspaces' names, saved NeXus file name; check them and store to lists
+                # chopped_ws_name_list = list()
+                # chopped_file_list = list()
+                # for file_name, ws_name in ret_obj:
+                #     if file_name is not None:
+                #         chopped_file_list.append(file_name)
+                #     if isinstance(ws_name, str) and mantid_helper.workspace_does_exist(ws_name):
+                #         chopped_ws_name_list.append(ws_name)
+                # # END-FOR
+                # chop_message = '{}'.format(chopped_file_list)
+                #
+                # # initialize tracker
+                # tracker = self.init_tracker(ipts_number=ipts_number, run_number=run_number, slicer_key=slice_key)
+                # tracker.is_reduced = False
+                # tracker.is_chopped = True
+                # if len(chopped_ws_name_list) > 0:
+                #     tracker.set_chopped_workspaces(chopped_ws_name_list, append=True)
+                # if len(chopped_file_list) > 0:
+                #     tracker.set_chopped_nexus_files(chopped_file_list, append=True)
+            # END-IF
+        finally:
+            # release calibration workspaces even if reduction fails
+            self._release_calibration_workspaces(event_ws_name)
 
         return True, (chop_message, error_message)
 
@@ -1745,23 +2033,31 @@ class ReductionManager(object):
         # use the simple but fragile method first
         run_start_date = mantid_helper.get_run_start(ws_name, time_unit=None)
 
-        has_loaded_cal, workspaces = self._calibrationFileManager.has_loaded(
-            run_start_date, num_banks)
-        if not has_loaded_cal:
-            print('[DB...BAT...INFO] Calibration file has not been loaded')
-            self._calibrationFileManager.search_load_calibration_file(
-                run_start_date, num_banks, ws_name)
-            workspaces = self._calibrationFileManager.get_loaded_calibration_workspaces(
-                run_start_date, num_banks)
-        else:
-            print('[DB...BAT...INFO] Calibration file for {} has been loaded to {}'.format(
-                run_start_date, workspaces))
+        # load calibration if it is not in the pool and hold it until released
+        workspaces = self._calibrationFileManager.acquire_calibration_workspaces(
+            run_start_date, num_banks, ws_name)
+        self._acquired_calibration_dict[ws_name] = run_start_date, num_banks
+        print('[DB...BAT...INFO] Calibration file for {} has been loaded to {}'.format(
+            run_start_date, workspaces))
         calib_ws_name = workspaces.calibration
         group_ws_name = workspaces.grouping
         mask_ws_name = workspaces.mask
 
         return calib_ws_name, group_ws_name, mask_ws_name
 
+    def _release_calibration_workspaces(self, ws_name):
+        """ Release the calibration workspaces acquired for a workspace such that they can be evicted
+        :param ws_name:
+        :return:
+        """
+        if ws_name not in self._acquired_calibration_dict:
+            return
+
+        run_start_date, num_banks = self._acquired_calibration_dict.pop(ws_name)
+        self._calibrationFileManager.release_calibration_workspaces(run_start_date, num_banks)
+
+        return
+
     def reduce_event_2theta_group(self, run_number, event_nexus_name, ws_index_range,
                                   two_theta_range, two_theta_step,
                                   binning_parameters, van_run_number,
@@ -1782,23 +2078,31 @@ class ReductionManager(object):
                                                   two_theta_step=two_theta_step)
         two_theta_array, group_ws, num_pixels_array = results
 
-        # Regular calibration workspace
-        calib_ws_name, no_use_grp, mask_ws_name = self._get_calibration_workspaces_names(
-            event_ws_name, 3)
-        template_virtual_geometry_dict = self._calibrationFileManager.get_focused_instrument_parameters(
-            3)
-        virtual_geometry_dict = vulcan_util.group_pixels_2theta_geometry(template_virtual_geometry_dict,
-                                                                         ws_index_range, num_pixels_array.shape[0])
-
-        # Reduce to Rietveld
-        red_message = self.diffraction_focus_workspace(event_ws_name=event_ws_name,
-                                                       output_ws_name=event_ws_name,  # keep the workspace name
-                                                       binning_params=binning_parameters,
-                                                       target_unit='TOF',
-                                                       calibration_workspace=calib_ws_name,
-                                                       grouping_workspace=group_ws_name,
-                                                       virtual_instrument_geometry=virtual_geometry_dict,
-                                                       keep_raw_ws=False)
+        try:
+            # Regular calibration workspace
+            calib_ws_name, no_use_grp, mask_ws_name = self._get_calibration_workspaces_names(
+                event_ws_name, 3)
+            template_virtual_geometry_dict = self._calibrationFileManager.get_focused_instrument_parameters(
+                3)
+            # only 2theta bins with pixels are focused to spectra
+            group_2theta_array = two_theta_array[:-1][num_pixels_array[:-1] > 0] + 0.5 * two_theta_step
+            virtual_geometry_dict = vulcan_util.group_pixels_2theta_geometry(template_virtual_geometry_dict,
+                                                                             ws_index_range,
+                                                                             group_2theta_array.shape[0],
+                                                                             group_2theta_array)
+
+            # Reduce to Rietveld
+            red_message = self.diffraction_focus_workspace(event_ws_name=event_ws_name,
+                                                           output_ws_name=event_ws_name,  # keep the workspace name
+                                                           binning_params=binning_parameters,
+                                                           target_unit='TOF',
+                                                           calibration_workspace=calib_ws_name,
+                                                           grouping_workspace=group_ws_name,
+                                                           virtual_instrument_geometry=virtual_geometry_dict,
+                                                           keep_raw_ws=False)
+        finally:
+            # release calibration workspaces even if reduction fails
+            self._release_calibration_workspaces(event_ws_name)
 
         return event_ws_name, two_theta_array, num_pixels_array, red_message
 
@@ -1827,8 +2131,10 @@ class ReductionManager(object):
                 'It is not allowed to define ROI or Mask with NO-CALIBRATION-MASK simultaneously')
 
         # Load data
+        reduction_profiler.start_profiling(run_number)
         event_ws_name = self.get_event_workspace_name(run_number=run_number)
-        mantid_helper.load_nexus(event_nexus_name, event_ws_name, meta_data_only=False)
+        with reduction_profiler.stage('LoadEventNexus', event_ws_name):
+            mantid_helper.load_nexus(event_nexus_name, event_ws_name, meta_data_only=False)
 
         # Mask data
         datatypeutility.check_list('Region of interest file list', roi_list)
@@ -1844,41 +2150,48 @@ class ReductionManager(object):
             user_mask_name = None
         # END-IF-ELSE
 
-        calib_ws_name, group_ws_name, mask_ws_name = self._get_calibration_workspaces_names(
-            event_ws_name, num_banks)
-
-        # apply mask
-        if user_mask_name:
-            mantid_helper.mask_workspace(event_ws_name, user_mask_name)
-        if not no_cal_mask:
-            mantid_helper.mask_workspace(event_ws_name, mask_ws_name)
-
-        # set tracker
-        tracker = self.init_tracker(ipts_number=ipts_number, run_number=run_number, slicer_key=None)
-        tracker.is_reduced = False
-
-        # diffraction focus
-        virtual_geometry_dict = self._calibrationFileManager.get_focused_instrument_parameters(
-            num_banks)
-
-        red_message = self.diffraction_focus_workspace(event_ws_name=event_ws_name,
-                                                       output_ws_name=event_ws_name,  # keep the workspace name
-                                                       binning_params=binning_parameters,
-                                                       target_unit=target_unit,
-                                                       calibration_workspace=calib_ws_name,
-                                                       grouping_workspace=group_ws_name,
-                                                       virtual_instrument_geometry=virtual_geometry_dict,
-                                                       keep_raw_ws=False)
-
-        if target_unit.lower().count('d'):
-            tracker.set_reduced_workspaces(vdrive_bin_ws=None, tof_ws=None, dspace_ws=event_ws_name)
-        else:
-            tracker.set_reduced_workspaces(vdrive_bin_ws=None, tof_ws=event_ws_name, dspace_ws=None)
+        try:
+            with reduction_profiler.stage('LoadCalibration'):
+                calib_ws_name, group_ws_name, mask_ws_name = self._get_calibration_workspaces_names(
+                    event_ws_name, num_banks)
+
+            # apply mask
+            with reduction_profiler.stage('MaskDetectors', event_ws_name):
+                if user_mask_name:
+                    mantid_helper.mask_workspace(event_ws_name, user_mask_name)
+                if not no_cal_mask:
+                    mantid_helper.mask_workspace(event_ws_name, mask_ws_name)
+
+            # set tracker
+            tracker = self.init_tracker(ipts_number=ipts_number, run_number=run_number, slicer_key=None)
+            tracker.is_reduced = False
 
-        # set tracker
-        tracker.is_reduced = True
+            # diffraction focus
+            virtual_geometry_dict = self._calibrationFileManager.get_focused_instrument_parameters(
+                num_banks)
+
+            with reduction_profiler.stage('DiffractionFocus', event_ws_name):
+                red_message = self.diffraction_focus_workspace(event_ws_name=event_ws_name,
+                                                               output_ws_name=event_ws_name,  # keep the workspace name
+                                                               binning_params=binning_parameters,
+                                                               target_unit=target_unit,
+                                                               calibration_workspace=calib_ws_name,
+                                                               grouping_workspace=group_ws_name,
+                                                               virtual_instrument_geometry=virtual_geometry_dict,
+                                                               keep_raw_ws=False)
+
+            if target_unit.lower().count('d'):
+                tracker.set_reduced_workspaces(vdrive_bin_ws=None, tof_ws=None, dspace_ws=event_ws_name)
+            else:
+                tracker.set_reduced_workspaces(vdrive_bin_ws=None, tof_ws=event_ws_name, dspace_ws=None)
 
-        # END-IF
+            # set tracker
+            tracker.is_reduced = True
+
+            # END-IF
+        finally:
+            # release calibration workspaces even if reduction fails
+            self._release_calibration_workspaces(event_ws_name)
 
         return event_ws_name, red_message
 
@@ -1,11 +1,19 @@
 from datetime import datetime
 import os
+import io
 import os.path
 import h5py
 import math
+import numpy
 from pyvdrive.core import datatypeutility
 from pyvdrive.core import mantid_helper
-from mantid.simpleapi import ConvertToHistogram, ConvertUnits, Rebin, Divide
+from pyvdrive.core import lazy_import
+
+# Mantid is imported at the first use
+ConvertToHistogram = lazy_import.lazy_attribute('mantid.simpleapi', 'ConvertToHistogram')
+ConvertUnits = lazy_import.lazy_attribute('mantid.simpleapi', 'ConvertUnits')
+Rebin = lazy_import.lazy_attribute('mantid.simpleapi', 'Rebin')
+Divide = lazy_import.lazy_attribute('mantid.simpleapi', 'Divide')
 
 PHASE_NED = datetime(2017, 6, 1)
 PHASE_X1 = datetime(2019, 7, 1)
@@ -258,6 +266,16 @@ class SaveVulcanGSS(object):
 
         return bank_tof_sets
 
+    def get_vdrive_bin_params(self, run_date_time, num_banks):
+        """
+        get the binning parameters of VDRIVE bins of each set of banks in the order as they are saved to GSAS
+        :param run_date_time: date and time of the run
+        :param num_banks: number of banks
+        :return: list of binning parameters
+        """
+        return [bin_params for _, bin_params, _ in self._get_tof_bin_params(self._get_vulcan_phase(run_date_time),
+                                                                            num_banks)]
+
     @staticmethod
     def _get_vulcan_phase(run_date_time):
         """
@@ -372,16 +390,7 @@ class SaveVulcanGSS(object):
         :return:
         """
         # check vanadium: if not None, assume that number of bins and bin edges are correct
-        if van_ws is not None:
-            if van_ws.id() == 'WorkspaceGroup':
-                van_vec_y = van_ws[bank_id-1].readY(0)
-                van_vec_e = van_ws[bank_id-1].readE(0)
-            else:
-                van_vec_y = van_ws.readY(bank_id - 1)
-                van_vec_e = van_ws.readE(bank_id - 1)
-        else:
-            van_vec_y = None
-            van_vec_e = None
+        van_vec_y, van_vec_e = self._get_vanadium_vectors(van_ws, bank_id)
 
         # get workspace
         diff_ws = mantid_helper.retrieve_workspace(ws_name)
@@ -390,74 +399,112 @@ class SaveVulcanGSS(object):
         else:
             vec_x = vulcan_tof_vector
         vec_y = diff_ws.readY(bank_id - 1)  # convert to workspace index
-        # print ('[DB...BAT] Bank {}  Max Y = {}'.format(bank_id, vec_y.max()))
+        vec_e = diff_ws.readE(bank_id - 1)
+
+        # get geometry information
+        l1 = self._cal_l1(diff_ws)
+        two_theta, difc = self._get_2theta_difc(diff_ws, l1, bank_id-1)
+
+        return self._write_slog_bank_gsas_arrays(vec_x, vec_y, vec_e, van_vec_y, van_vec_e,
+                                                 geometry=(l1, two_theta, difc),
+                                                 spectrum_index=bank_id - 1,
+                                                 gsas_bank_id=bank_id if gsas_bank_id is None else gsas_bank_id,
+                                                 norm_factor=norm_factor, scale_factor=scale_factor)
+
+    @staticmethod
+    def _get_vanadium_vectors(van_ws, bank_id):
+        """ Get vanadium Y and E vectors of a bank
+        :param van_ws: vanadium workspace or WorkspaceGroup. None for no vanadium
+        :param bank_id: bank ID (from 1)
+        :return: 2-tuple as vector Y and vector E (None and None for no vanadium)
+        """
+        if van_ws is None:
+            return None, None
+
+        if van_ws.id() == 'WorkspaceGroup':
+            van_vec_y = van_ws[bank_id-1].readY(0)
+            van_vec_e = van_ws[bank_id-1].readE(0)
+        else:
+            van_vec_y = van_ws.readY(bank_id - 1)
+            van_vec_e = van_ws.readE(bank_id - 1)
+
+        return van_vec_y, van_vec_e
+
+    @staticmethod
+    def _write_slog_bank_gsas_arrays(vec_x, vec_y, vec_e, van_vec_y, van_vec_e, geometry, spectrum_index,
+                                     gsas_bank_id, norm_factor=None, scale_factor=10000.):
+        """ Write a GSAS SLOG bank from arrays with all data lines formatted at once
+        :param vec_x: TOF vector (bin boundaries or point data)
+        :param vec_y: intensity vector
+        :param vec_e: error vector
+        :param van_vec_y: vanadium intensity vector or None
+        :param van_vec_e: vanadium error vector or None
+        :param geometry: 3-tuple as L1, 2theta (degree) and DIFC
+        :param spectrum_index: index of the source spectrum for information
+        :param gsas_bank_id: bank ID to write to GSAS
+        :param norm_factor: normalization factor
+        :param scale_factor: scale factor applied with normalization factor
+        :return: string
+        """
+        data_size = len(vec_y)
+        vec_x = numpy.asarray(vec_x)[:data_size]
+        vec_y = numpy.asarray(vec_y)
+        vec_e = numpy.asarray(vec_e)
+
         # normalization
         if norm_factor is not None:
-            # print ('[DB...BAT] Bank {}  Norm Factor = {}'.format(bank_id, norm_factor))
             if norm_factor <= 0.00000001:
                 vec_y = vec_y * 0
             else:
                 vec_y = vec_y / (1. * norm_factor) * scale_factor
         # END-IF-ELSE
 
-        vec_e = diff_ws.readE(bank_id - 1)
-        data_size = len(vec_y)
-
-        # get geometry information
-        l1 = self._cal_l1(diff_ws)
-        two_theta, difc = self._get_2theta_difc(diff_ws, l1, bank_id-1)
-
-        bank_buffer = ''
-
         # write the virtual detector geometry information
         # Example:
         # Total flight path 45.754m, tth 90deg, DIFC 16356.3
         # Data for spectrum :0
-        bank_buffer += '%-80s\n' % '# Total flight path {}m, tth {}deg, DIFC {}'.format(
+        l1, two_theta, difc = geometry
+        bank_buffer = '%-80s\n' % '# Total flight path {}m, tth {}deg, DIFC {}'.format(
             l1, two_theta, difc)
         if norm_factor is None:
-            bank_buffer += '%-80s\n' % '# Data for spectrum :{}'.format(bank_id - 1)
+            bank_buffer += '%-80s\n' % '# Data for spectrum :{}'.format(spectrum_index)
         else:
             bank_buffer += '%-80s\n' % '# Data for spectrum :{}.  Inverse Norm factor = {}  Scale Factor = {}' \
-                                       ''.format(bank_id - 1, norm_factor, scale_factor)
+                                       ''.format(spectrum_index, norm_factor, scale_factor)
 
         # bank header: min TOF, max TOF, delta TOF
+        if vec_x[0] <= 0:
+            raise RuntimeError('Cannot write out logarithmic data starting at zero or less')
         bc1 = '%.1f' % (vec_x[0])
         bc2 = '%.1f' % (vec_x[-1])
         bc3 = '%.7f' % ((vec_x[1] - vec_x[0])/vec_x[0])
-        # check
-        if bc1 < 0:
-            raise RuntimeError('Cannot write out logarithmic data starting at zero or less')
 
-        if gsas_bank_id is None:
-            gsas_bank_id = bank_id
         bank_header = 'BANK %d %d %d %s %s %s %s 0 FXYE' % (
             gsas_bank_id, data_size, data_size, 'SLOG', bc1, bc2, bc3)
         bank_buffer += '%-80s\n' % bank_header
 
         # write lines: not multiplied by bin width
         if van_vec_y is None:
-            for index in range(data_size):
-                x_i = '%.1f' % vec_x[index]
-                y_i = '%.1f' % vec_y[index]
-                e_i = '%.2f' % vec_e[index]
-                data_line_i = '%12s%12s%12s' % (x_i, y_i, e_i)
-                bank_buffer += '%-80s\n' % data_line_i
-            # END-FOR
+            line_format = '%12.1f%12.1f%12.2f'
+            data_matrix = numpy.column_stack((vec_x, vec_y, vec_e))
         else:
             # normalize by vanadium
-            for index in range(data_size):
-                x_i = '%.1f' % vec_x[index]
-                y_i = '%.5f' % (vec_y[index] / van_vec_y[index])
-                if vec_y[index] < 1.E-10:
-                    alpha = 1.
-                else:
-                    alpha = vec_e[index] / vec_y[index]
-                beta = van_vec_e[index] / van_vec_y[index]
-                e_i = '%.5f' % (abs(vec_y[index]/van_vec_y[index]) * math.sqrt(alpha**2 + beta**2))
-                data_line_i = '%12s%12s%12s' % (x_i, y_i, e_i)
-                bank_buffer += '%-80s\n' % data_line_i
-            # END-FOR
+            van_vec_y = numpy.asarray(van_vec_y)[:data_size]
+            van_vec_e = numpy.asarray(van_vec_e)[:data_size]
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                norm_vec_y = vec_y / van_vec_y
+                alpha = numpy.where(vec_y < 1.E-10, 1., vec_e / vec_y)
+                beta = van_vec_e / van_vec_y
+                norm_vec_e = numpy.abs(norm_vec_y) * numpy.sqrt(alpha**2 + beta**2)
+            line_format = '%12.1f%12.5f%12.5f'
+            data_matrix = numpy.column_stack((vec_x, norm_vec_y, norm_vec_e))
+        # END-IF-ELSE
+
+        # each line is padded to 80 characters
+        data_buffer = io.StringIO()
+        numpy.savetxt(data_buffer, data_matrix, fmt=line_format)
+        data_lines = data_buffer.getvalue().splitlines()
+        bank_buffer += ''.join(['%-80s\n' % line for line in data_lines])
 
         return bank_buffer
 
@@ -544,6 +591,9 @@ class SaveVulcanGSS(object):
                           gsas_param_file_name, van_ws_name, two_theta_array, tth_pixels_num_array,
                           target_bank_id, scale_factor):
         """ Save workspace from 2theta grouped
+        Each bank set is rebinned once; then the GSAS files of all 2theta groups are written from arrays.
+        Only the 2theta bins with pixels are focused.  The GSAS file of the i-th 2theta bin (from 1) is named
+        i.gda such that the file names do not depend on which bins are empty.
         :param diff_ws_name:
         :param output_dir:
         :param run_date_time:
@@ -551,7 +601,7 @@ class SaveVulcanGSS(object):
         :param run_number:
         :param gsas_param_file_name:
         :param van_ws_name:
-        :param two_theta_array:
+        :param two_theta_array: 2theta bins' boundaries
         :param tth_pixels_num_array: array of integers for number of pixels of 2theta range for normalization
         :param target_bank_id:
         :return:
@@ -582,55 +632,72 @@ class SaveVulcanGSS(object):
         if not os.path.exists(output_dir):
             os.mkdir(output_dir)
 
-        # For each 2theta bin / spectrum, create a GSAS file
-        for tth_id in range(diff_ws.getNumberHistograms()):
-            # rebin and then write output
-            gsas_bank_buffer_dict = dict()
-            num_bank_sets = len(bin_params_set)
-
-            for bank_set_index in range(num_bank_sets):
-                # get value
-                bank_id_list, bin_params, tof_vector = bin_params_set[bank_set_index]
-
-                # Rebin to these banks' parameters (output = Histogram)
-                if bin_params is not None:
-                    Rebin(InputWorkspace=diff_ws_name, OutputWorkspace=diff_ws_name,
-                          Params=bin_params, PreserveEvents=True)
-
-                # Create output
-                for bank_id_i in bank_id_list:
-                    # check vanadium bin edges
-                    if van_ws is not None:
-                        # check whether the bins are same between GSAS workspace and vanadium workspace
-                        unmatched, reason = self._compare_workspaces_dimension(
-                            van_ws, bank_id_i, tof_vector)
-                        if unmatched:
-                            raise RuntimeError('Vanadium GSAS workspace {} does not match workspace {}: {}'
-                                               ''.format(van_ws_name, diff_ws_name, reason))
-                    # END-IF
-
-                    # write GSAS head considering vanadium
-                    if bank_id_i == target_bank_id:
-                        # target bank to write: east/west
-                        source_bank_id = tth_id + 1
-                        norm_factor = tth_pixels_num_array[tth_id]
-                    else:
-                        source_bank_id = bank_id_i
-                        norm_factor = -1
-
-                    gsas_section_i = self._write_slog_bank_gsas(diff_ws_name, source_bank_id, tof_vector, van_ws,
-                                                                gsas_bank_id=bank_id_i,
-                                                                norm_factor=norm_factor,
-                                                                scale_factor=scale_factor)
-                    gsas_bank_buffer_dict[bank_id_i] = gsas_section_i
-                    print('[DB...BAT] Write bank {} to GSAS bank {}'.format(source_bank_id, bank_id_i))
+        # focused spectra are of the 2theta bins with pixels only
+        tth_pixels_num_array = numpy.asarray(tth_pixels_num_array)
+        tth_bin_indexes = numpy.where(tth_pixels_num_array[:len(two_theta_array) - 1] > 0)[0]
+
+        # geometry of all spectra
+        diff_ws = mantid_helper.retrieve_workspace(diff_ws_name)
+        num_spectra = diff_ws.getNumberHistograms()
+        if num_spectra != tth_bin_indexes.shape[0]:
+            raise RuntimeError('Workspace {} has {} spectra but there are {} non-empty 2theta groups'
+                               ''.format(diff_ws_name, num_spectra, tth_bin_indexes.shape[0]))
+        l1 = self._cal_l1(diff_ws)
+        geometry_list = [(l1,) + self._get_2theta_difc(diff_ws, l1, iws) for iws in range(num_spectra)]
+
+        # rebin once for each bank set and cache the arrays
+        bank_data_dict = dict()  # key: GSAS bank ID, value: tof vector, Y matrix, E matrix, van Y, van E
+        for bank_id_list, bin_params, tof_vector in bin_params_set:
+            # Rebin to these banks' parameters (output = Histogram)
+            if bin_params is not None:
+                Rebin(InputWorkspace=diff_ws_name, OutputWorkspace=diff_ws_name,
+                      Params=bin_params, PreserveEvents=True)
+            diff_ws = mantid_helper.retrieve_workspace(diff_ws_name)
+            matrix_y = diff_ws.extractY()
+            matrix_e = diff_ws.extractE()
+            if tof_vector is None:
+                tof_vector = diff_ws.readX(0)
+
+            for bank_id_i in bank_id_list:
+                # check vanadium bin edges
+                if van_ws is not None:
+                    # check whether the bins are same between GSAS workspace and vanadium workspace
+                    unmatched, reason = self._compare_workspaces_dimension(van_ws, bank_id_i, tof_vector)
+                    if unmatched:
+                        raise RuntimeError('Vanadium GSAS workspace {} does not match workspace {}: {}'
+                                           ''.format(van_ws_name, diff_ws_name, reason))
+                # END-IF
+                van_vec_y, van_vec_e = self._get_vanadium_vectors(van_ws, bank_id_i)
+                bank_data_dict[bank_id_i] = tof_vector, matrix_y, matrix_e, van_vec_y, van_vec_e
             # END-FOR
+        # END-FOR
+
+        # non-target banks are written as zero-normalized spectra which do not depend on 2theta group
+        static_bank_buffer_dict = dict()
+        for bank_id_i in bank_data_dict:
+            if bank_id_i == target_bank_id:
+                continue
+            tof_vector, matrix_y, matrix_e, van_vec_y, van_vec_e = bank_data_dict[bank_id_i]
+            source_iws = bank_id_i - 1
+            static_bank_buffer_dict[bank_id_i] = self._write_slog_bank_gsas_arrays(
+                tof_vector, matrix_y[source_iws], matrix_e[source_iws], van_vec_y, van_vec_e,
+                geometry=geometry_list[source_iws], spectrum_index=source_iws, gsas_bank_id=bank_id_i,
+                norm_factor=-1, scale_factor=scale_factor)
+        # END-FOR
+
+        # For each 2theta bin / spectrum, create a GSAS file
+        tof_vector, matrix_y, matrix_e, van_vec_y, van_vec_e = bank_data_dict[target_bank_id]
+        for tth_id in range(num_spectra):
+            tth_bin_index = tth_bin_indexes[tth_id]
+            gsas_bank_buffer_dict = static_bank_buffer_dict.copy()
+            gsas_bank_buffer_dict[target_bank_id] = self._write_slog_bank_gsas_arrays(
+                tof_vector, matrix_y[tth_id], matrix_e[tth_id], van_vec_y, van_vec_e,
+                geometry=geometry_list[tth_id], spectrum_index=tth_id, gsas_bank_id=target_bank_id,
+                norm_factor=tth_pixels_num_array[tth_bin_index], scale_factor=scale_factor)
 
             # header
-            diff_ws = mantid_helper.retrieve_workspace(diff_ws_name)
-            gsas_file_name = os.path.join(output_dir, '{}.gda'.format(tth_id+1))
-            extra_info = '2theta {} to {}'.format(
-                two_theta_array[tth_id], two_theta_array[[tth_id+1]])
+            gsas_file_name = os.path.join(output_dir, '{}.gda'.format(tth_bin_index + 1))
+            extra_info = '2theta {} to {}'.format(two_theta_array[tth_bin_index], two_theta_array[tth_bin_index+1])
             gsas_header = self._generate_vulcan_gda_header(diff_ws, gsas_file_name, ipts_number, run_number,
                                                            gsas_param_file_name, True, extra_info)
 
@@ -645,13 +712,12 @@ class SaveVulcanGSS(object):
             g_file = open(gsas_file_name, 'w')
             g_file.write(gsas_buffer)
             g_file.close()
-
         # END-FOR (tth_id)
 
         return
 
     def save(self, diff_ws_name, run_date_time, gsas_file_name, ipts_number, run_number, gsas_param_file_name,
-             align_vdrive_bin, van_ws_name, is_chopped_run, write_to_file=True):
+             align_vdrive_bin, van_ws_name, is_chopped_run, write_to_file=True, rebinned_ws_names=None):
         """
         Save a workspace to a GSAS file or a string
         :param diff_ws_name: diffraction data workspace
@@ -664,6 +730,8 @@ class SaveVulcanGSS(object):
         :param van_ws_name: name of vanadium workspaces loaded from GSAS (replacing vanadium_gsas_file)
         :param is_chopped_run: Flag such that the input workspaces is from an event-sliced workspace
         :param write_to_file: flag to write the text buffer to file
+        :param rebinned_ws_names: None or list of TOF histogram workspaces already rebinned to the VDRIVE bins
+                                  of each set of banks (see get_vdrive_bin_params), such as merged runs
         :return: string as the file content
         """
         diff_ws = mantid_helper.retrieve_workspace(diff_ws_name)
@@ -706,14 +774,23 @@ class SaveVulcanGSS(object):
         gsas_bank_buffer_dict = dict()
         num_bank_sets = len(bin_params_set)
 
+        if rebinned_ws_names is not None and len(rebinned_ws_names) != num_bank_sets:
+            raise RuntimeError('{} rebinned workspaces are given for {} sets of banks'
+                               ''.format(len(rebinned_ws_names), num_bank_sets))
+
         for bank_set_index in range(num_bank_sets):
             # get value
             bank_id_list, bin_params, tof_vector = bin_params_set[bank_set_index]
 
             # Rebin to these banks' parameters (output = Histogram)
-            if bin_params is not None:
+            if rebinned_ws_names is not None:
+                bank_ws_name = rebinned_ws_names[bank_set_index]
+            elif bin_params is not None:
                 Rebin(InputWorkspace=diff_ws_name, OutputWorkspace=diff_ws_name,
                       Params=bin_params, PreserveEvents=True)
+                bank_ws_name = diff_ws_name
+            else:
+                bank_ws_name = diff_ws_name
 
             # Create output
             for bank_id in bank_id_list:
@@ -729,7 +806,7 @@ class SaveVulcanGSS(object):
 
                 # write GSAS head considering vanadium
                 gsas_section_i = self._write_slog_bank_gsas(
-                    diff_ws_name, bank_id, tof_vector, van_ws)
+                    bank_ws_name, bank_id, tof_vector, van_ws)
                 gsas_bank_buffer_dict[bank_id] = gsas_section_i
         # END-FOR
 
@@ -0,0 +1,336 @@
+# Sequential fitting of peak groups across the sequences of a chopped run (in-situ strain mapping)
+# Each peak group (overlapped peaks grouped by peak_util.group_peaks_to_fit) is fitted by Gaussians on a linear
+# background, sequence by sequence.  The fit of a sequence starts from the result of the previous sequence such that
+# peaks shifting with time (strain, temperature) are followed.  Peak groups are independent and are fitted in
+# parallel by a pool of spawned worker processes; each worker fits one peak group through all the sequences.
+# The fitted parameters are stored in a columnar table as a 3D array: sequence x peak x parameter.
+import multiprocessing
+import numpy
+from scipy.optimize import curve_fit  # type: ignore
+from pyvdrive.core import datatypeutility
+from pyvdrive.core import peak_util
+
+# parameters of each peak in the table.  Background (a0 + a1 * x) and chi2 are shared by the peaks of a group
+PARAMETER_NAMES = ['height', 'centre', 'sigma', 'intensity', 'a0', 'a1', 'chi2']
+FWHM_TO_SIGMA = 1. / (2. * numpy.sqrt(2. * numpy.log(2.)))
+
+# data (vec_x, matrix_y) of a worker process
+_worker_vec_x = None
+_worker_matrix_y = None
+
+
+def multi_gaussian(vec_x, *params):
+    """ sum of Gaussians on a linear background
+    :param vec_x:
+    :param params: a0, a1, (height, centre, sigma) of each peak
+    :return:
+    """
+    vec_y = params[0] + params[1] * vec_x
+    for i_peak in range((len(params) - 2) // 3):
+        height, centre, sigma = params[2 + 3 * i_peak: 5 + 3 * i_peak]
+        vec_y = vec_y + height * numpy.exp(-0.5 * ((vec_x - centre) / sigma) ** 2)
+
+    return vec_y
+
+
+class PeakFitTable(object):
+    """ Fitted peak parameters of all the sequences in a columnar table (sequence x peak x parameter)
+    """
+
+    def __init__(self, sequences, peak_positions):
+        """
+        initialization
+        :param sequences: list of chop sequences
+        :param peak_positions: list of (reference) peak positions
+        """
+        datatypeutility.check_list('Chop sequences', sequences)
+        datatypeutility.check_list('Peak positions', peak_positions)
+
+        self._sequences = numpy.array(sequences)
+        self._peak_positions = numpy.array(peak_positions, dtype='float64')
+        self._values = numpy.full((len(sequences), len(peak_positions), len(PARAMETER_NAMES)), numpy.nan)
+        self._status = numpy.zeros((len(sequences), len(peak_positions)), dtype=bool)
+
+        return
+
+    @property
+    def peak_positions(self):
+        return self._peak_positions
+
+    @property
+    def sequences(self):
+        return self._sequences
+
+    @property
+    def status(self):
+        """ flag whether the fit of each sequence and peak succeeded: 2D array (sequence x peak)
+        :return:
+        """
+        return self._status
+
+    @property
+    def values(self):
+        """ fitted parameters: 3D array (sequence x peak x parameter).  NaN for failed fits
+        :return:
+        """
+        return self._values
+
+    def get_parameter(self, param_name):
+        """ get a parameter of all the sequences and peaks
+        :param param_name:
+        :return: 2D array (sequence x peak)
+        """
+        datatypeutility.check_string_variable('Peak parameter name', param_name, PARAMETER_NAMES)
+
+        return self._values[:, :, PARAMETER_NAMES.index(param_name)]
+
+    def set_peaks(self, peak_indexes, values, status):
+        """ set the fitted parameters of some peaks (a peak group) of all the sequences
+        :param peak_indexes: list of peak indexes
+        :param values: 3D array (sequence x peak in group x parameter)
+        :param status: 2D array (sequence x peak in group)
+        :return:
+        """
+        self._values[:, peak_indexes, :] = values
+        self._status[:, peak_indexes] = status
+
+        return
+
+    def save(self, file_name):
+        """ save the table to a column ASCII file: one line per sequence and peak
+        :param file_name:
+        :return:
+        """
+        datatypeutility.check_file_name(file_name, check_exist=False, check_writable=True, is_dir=False,
+                                        note='Sequential peak fitting output file')
+
+        num_seq, num_peaks, num_params = self._values.shape
+        vec_seq = numpy.repeat(self._sequences, num_peaks)
+        vec_peak = numpy.tile(numpy.arange(num_peaks), num_seq)
+        matrix = numpy.column_stack([vec_seq, vec_peak, numpy.tile(self._peak_positions, num_seq),
+                                     self._values.reshape((num_seq * num_peaks, num_params)),
+                                     self._status.reshape(-1)])
+        header = '\t'.join(['sequence', 'peak', 'position'] + PARAMETER_NAMES + ['status'])
+        fmt = ['%d', '%d', '%.5f'] + ['%.7g'] * num_params + ['%d']
+        numpy.savetxt(file_name, matrix, fmt=fmt, delimiter='\t', header=header)
+
+        return
+
+
+def get_group_specs(peak_group, peak_positions):
+    """ convert a PeakGroupCollection to picklable peak group specifications
+    :param peak_group: PeakGroupCollection, whose peak IDs are the indexes in peak_positions
+    :param peak_positions:
+    :return: list of 2-tuple: (fit range (left, right), list of peak indexes)
+    """
+    assert isinstance(peak_group, peak_util.PeakGroupCollection), 'Peak group {} must be a PeakGroupCollection ' \
+                                                                  'but not a {}'.format(peak_group, type(peak_group))
+
+    spec_list = list()
+    for group_id in sorted(peak_group.get_group_ids()):
+        peak_indexes = sorted([peak_id for peak_id, _ in peak_group.get_peaks(group_id)],
+                              key=lambda peak_index: peak_positions[peak_index])
+        spec_list.append((peak_group.get_fit_range(group_id), peak_indexes))
+
+    return spec_list
+
+
+def fit_peak_group(vec_x, vec_y, fit_range, init_params):
+    """ fit a peak group of one spectrum
+    :param vec_x:
+    :param vec_y:
+    :param fit_range: 2-tuple (left, right)
+    :param init_params: a0, a1, (height, centre, sigma) of each peak
+    :return: 2-tuple: fitted parameters (None if failed) and reduced chi2
+    """
+    i_left, i_right = numpy.searchsorted(vec_x, fit_range)
+    vec_x = vec_x[i_left:i_right]
+    vec_y = vec_y[i_left:i_right]
+    num_params = len(init_params)
+    if vec_x.shape[0] <= num_params:
+        return None, numpy.nan
+
+    # bounds: height >= 0, centre within fit range and sigma within (0, range width]
+    num_peaks = (num_params - 2) // 3
+    width = fit_range[1] - fit_range[0]
+    lower = [-numpy.inf, -numpy.inf] + [0., fit_range[0], 1.E-6 * width] * num_peaks
+    upper = [numpy.inf, numpy.inf] + [numpy.inf, fit_range[1], width] * num_peaks
+    init_params = numpy.clip(init_params, lower, upper)
+
+    vec_e = numpy.sqrt(numpy.maximum(numpy.abs(vec_y), 1.))
+    try:
+        params, _ = curve_fit(multi_gaussian, vec_x, vec_y, p0=init_params, sigma=vec_e, bounds=(lower, upper))
+    except (RuntimeError, ValueError):
+        return None, numpy.nan
+    if not numpy.isfinite(params).all():
+        return None, numpy.nan
+
+    chi2 = (((vec_y - multi_gaussian(vec_x, *params)) / vec_e) ** 2).sum() / (vec_x.shape[0] - num_params)
+
+    return params, chi2
+
+
+def estimate_peak_group(vec_x, vec_y, fit_range, centres, resolution):
+    """ estimate the starting parameters of a peak group from the spectrum
+    :param vec_x:
+    :param vec_y:
+    :param fit_range:
+    :param centres: peak positions
+    :param resolution: delta d / d
+    :return: a0, a1, (height, centre, sigma) of each peak
+    """
+    i_left, i_right = numpy.searchsorted(vec_x, fit_range)
+    background = vec_y[i_left:i_right].min() if i_right > i_left else 0.
+
+    init_params = [background, 0.]
+    for centre in centres:
+        i_centre = min(numpy.searchsorted(vec_x, centre), vec_x.shape[0] - 1)
+        sigma = peak_util.calculate_vulcan_resolution(centre, resolution) * FWHM_TO_SIGMA
+        init_params.extend([max(vec_y[i_centre] - background, 0.), centre, sigma])
+
+    return numpy.array(init_params)
+
+
+def fit_group_sequentially(vec_x, matrix_y, group_spec, init_params, chi2_limit=None):
+    """ fit a peak group through all the sequences.  The fit of each sequence starts from the last successful fit
+    :param vec_x:
+    :param matrix_y: 2D array (sequence x bin)
+    :param group_spec: 2-tuple: (fit range, peak indexes)
+    :param init_params: starting parameters of the first sequence
+    :param chi2_limit: fits with larger reduced chi2 are regarded as failed.  None for no limit
+    :return: 2-tuple: values (sequence x peak x parameter), status (sequence x peak)
+    """
+    fit_range, peak_indexes = group_spec
+    num_peaks = len(peak_indexes)
+    values = numpy.full((matrix_y.shape[0], num_peaks, len(PARAMETER_NAMES)), numpy.nan)
+    status = numpy.zeros((matrix_y.shape[0], num_peaks), dtype=bool)
+
+    seed_params = init_params
+    for i_seq in range(matrix_y.shape[0]):
+        params, chi2 = fit_peak_group(vec_x, matrix_y[i_seq], fit_range, seed_params)
+        if params is None or (chi2_limit is not None and chi2 > chi2_limit):
+            # keep the seed of the last successful fit
+            continue
+
+        peak_params = params[2:].reshape((num_peaks, 3))
+        values[i_seq, :, 0:3] = peak_params
+        values[i_seq, :, 3] = peak_params[:, 0] * peak_params[:, 2] * numpy.sqrt(2. * numpy.pi)
+        values[i_seq, :, 4] = params[0]
+        values[i_seq, :, 5] = params[1]
+        values[i_seq, :, 6] = chi2
+        status[i_seq] = True
+        seed_params = params
+    # END-FOR
+
+    return values, status
+
+
+def _init_worker(vec_x, matrix_y):
+    """ initialize a worker process with the data shared by all the peak groups
+    :param vec_x:
+    :param matrix_y:
+    :return:
+    """
+    global _worker_vec_x
+    global _worker_matrix_y
+
+    _worker_vec_x = vec_x
+    _worker_matrix_y = matrix_y
+
+    return
+
+
+def _fit_group_in_worker(task):
+    """ fit a peak group in a worker process
+    :param task: 4-tuple: group index, group spec, starting parameters, chi2 limit
+    :return: 3-tuple: group index, values, status
+    """
+    group_index, group_spec, init_params, chi2_limit = task
+    values, status = fit_group_sequentially(_worker_vec_x, _worker_matrix_y, group_spec, init_params, chi2_limit)
+
+    return group_index, values, status
+
+
+class SequentialPeakFitter(object):
+    """ Fit peak groups across all the sequences of a chopped run
+    """
+
+    def __init__(self, peak_positions, resolution=0.005, fit_range_factor=peak_util.HALF_PEAK_FIT_RANGE_FACTOR,
+                 chi2_limit=None):
+        """
+        initialization: group the peaks
+        :param peak_positions: list of peak positions (d-spacing) of the first sequence
+        :param resolution: delta d / d to estimate peak width
+        :param fit_range_factor: half fit range of a peak in unit of peak FWHM
+        :param chi2_limit: fits with larger reduced chi2 are regarded as failed.  None for no limit
+        """
+        datatypeutility.check_list('Peak positions', peak_positions)
+        if len(peak_positions) == 0:
+            raise RuntimeError('At least one peak position must be given')
+        datatypeutility.check_float_variable('Resolution', resolution, (0., None))
+
+        self._peak_positions = [float(peak_pos) for peak_pos in peak_positions]
+        self._resolution = float(resolution)
+        self._chi2_limit = chi2_limit
+
+        peak_tuple_list = [(peak_pos, index) for index, peak_pos in enumerate(self._peak_positions)]
+        peak_group = peak_util.group_peaks_to_fit(peak_tuple_list, self._resolution, fit_range_factor)
+        self._group_specs = get_group_specs(peak_group, self._peak_positions)
+
+        return
+
+    @property
+    def group_specs(self):
+        """ peak groups: list of 2-tuple (fit range, peak indexes)
+        :return:
+        """
+        return self._group_specs[:]
+
+    def fit(self, vec_x, matrix_y, sequences, num_workers=1):
+        """ fit all the peak groups across the sequences
+        :param vec_x: X values (d-spacing) shared by all the sequences
+        :param matrix_y: 2D array (sequence x bin)
+        :param sequences: list of chop sequences (rows of matrix_y)
+        :param num_workers: number of worker processes
+        :return: PeakFitTable
+        """
+        datatypeutility.check_numpy_arrays('Vector X', vec_x, 1, False)
+        datatypeutility.check_numpy_arrays('Matrix Y', matrix_y, 2, False)
+        datatypeutility.check_int_variable('Number of workers', num_workers, (1, multiprocessing.cpu_count() + 1))
+        if matrix_y.shape != (len(sequences), vec_x.shape[0]):
+            raise RuntimeError('Matrix Y of shape {} does not match {} sequences and {} X values'
+                               ''.format(matrix_y.shape, len(sequences), vec_x.shape[0]))
+
+        # starting parameters from the first sequence
+        task_list = list()
+        for group_index, group_spec in enumerate(self._group_specs):
+            fit_range, peak_indexes = group_spec
+            init_params = estimate_peak_group(vec_x, matrix_y[0], fit_range,
+                                              [self._peak_positions[index] for index in peak_indexes],
+                                              self._resolution)
+            task_list.append((group_index, group_spec, init_params, self._chi2_limit))
+        # END-FOR
+
+        fit_table = PeakFitTable(list(sequences), self._peak_positions)
+        num_workers = min(num_workers, len(task_list))
+        if num_workers == 1:
+            _init_worker(vec_x, matrix_y)
+            result_list = [_fit_group_in_worker(task) for task in task_list]
+        else:
+            # spawn but not fork: the caller (GUI) may have Mantid thread pools and other threads running
+            pool = multiprocessing.get_context('spawn').Pool(processes=num_workers, initializer=_init_worker,
+                                                             initargs=(vec_x, matrix_y))
+            try:
+                result_list = pool.map(_fit_group_in_worker, task_list)
+                pool.close()
+            except BaseException:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+        # END-IF-ELSE
+
+        for group_index, values, status in result_list:
+            fit_table.set_peaks(self._group_specs[group_index][1], values, status)
+
+        return fit_table
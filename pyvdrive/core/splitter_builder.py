@@ -0,0 +1,204 @@
+# Array-based event splitters (slicers)
+# Splitters are given as numpy arrays of start time, stop time and target.  They are checked for non-positive
+# durations, overlaps and gaps with vectorized operations and converted to the X/Y vectors of a Workspace2D
+# splitter (X: time boundaries in seconds, Y: target or -1 for the gaps between splitters) such that the splitter
+# workspace is created in one shot instead of adding rows one by one to a TableWorkspace.
+# Overlapped splitters cannot be expressed by a Workspace2D and are written as table rows instead.
+import numpy
+from pyvdrive.core import datatypeutility
+
+# tolerance (second) to tell whether 2 adjacent splitters are overlapped or separated by a gap
+TIME_TOLERANCE = 1.E-9
+
+
+class SplitterArrays(object):
+    """ Splitters as arrays sorted by start time
+    """
+
+    def __init__(self, vec_start, vec_stop, vec_target=None, sort=True):
+        """
+        initialization
+        :param vec_start: start times (second)
+        :param vec_stop: stop times (second)
+        :param vec_target: targets (int or str) or None for auto targets 1, 2, 3, ...
+        :param sort: flag to sort the splitters by start time
+        """
+        vec_start = numpy.asarray(vec_start, dtype='float64')
+        vec_stop = numpy.asarray(vec_stop, dtype='float64')
+        if vec_start.ndim != 1 or vec_start.shape != vec_stop.shape:
+            raise RuntimeError('Splitters start times (shape {}) and stop times (shape {}) must be 1D arrays '
+                               'of same size'.format(vec_start.shape, vec_stop.shape))
+        if vec_start.shape[0] == 0:
+            raise RuntimeError('Splitters cannot be empty')
+        if not (numpy.isfinite(vec_start).all() and numpy.isfinite(vec_stop).all()):
+            raise RuntimeError('Splitters start and stop times must be finite')
+
+        if vec_target is None:
+            vec_target = numpy.arange(1, vec_start.shape[0] + 1)
+        else:
+            vec_target = numpy.asarray(vec_target)
+            if vec_target.shape != vec_start.shape:
+                raise RuntimeError('Splitters targets (shape {}) must have the same shape as start times ({})'
+                                   ''.format(vec_target.shape, vec_start.shape))
+
+        # check duration
+        bad_indexes = numpy.where(vec_stop <= vec_start)[0]
+        if bad_indexes.shape[0] > 0:
+            raise RuntimeError('{} splitters have stop time not after start time.  First: splitter {} ({}, {})'
+                               ''.format(bad_indexes.shape[0], bad_indexes[0], vec_start[bad_indexes[0]],
+                                         vec_stop[bad_indexes[0]]))
+
+        # sort by start time
+        if sort and (vec_start[1:] < vec_start[:-1]).any():
+            sort_indexes = numpy.argsort(vec_start, kind='mergesort')
+            vec_start = vec_start[sort_indexes]
+            vec_stop = vec_stop[sort_indexes]
+            vec_target = vec_target[sort_indexes]
+
+        self._vec_start = vec_start
+        self._vec_stop = vec_stop
+        self._vec_target = vec_target
+
+        return
+
+    @staticmethod
+    def from_list(split_list, auto_target=True):
+        """ create splitters from a list of 2-tuple (start, stop) or 3-tuple (start, stop, target)
+        :param split_list:
+        :param auto_target: flag to use 1, 2, 3, ... as target of the tuples with 2 elements (or None target)
+        :return: SplitterArrays
+        """
+        datatypeutility.check_list('Splitters', split_list)
+        if len(split_list) == 0:
+            raise RuntimeError('Splitters cannot be empty')
+
+        vec_times = numpy.array([split_tup[0:2] for split_tup in split_list], dtype='float64')
+        target_list = list()
+        for index, split_tup in enumerate(split_list):
+            if len(split_tup) >= 3 and split_tup[2] is not None:
+                # user specified target
+                target_list.append(str(split_tup[2]))
+            elif auto_target:
+                target_list.append('{0}'.format(index + 1))
+            else:
+                # not allowing auto target, then must have a coding error
+                raise RuntimeError('Splitter tuple {} has only 2 entries but auto target is turned off!'
+                                   ''.format(index))
+        # END-FOR
+
+        return SplitterArrays(vec_times[:, 0], vec_times[:, 1], numpy.array(target_list))
+
+    @property
+    def number_splitters(self):
+        return self._vec_start.shape[0]
+
+    @property
+    def start_times(self):
+        return self._vec_start
+
+    @property
+    def stop_times(self):
+        return self._vec_stop
+
+    @property
+    def targets(self):
+        return self._vec_target
+
+    @property
+    def target_names(self):
+        """ unique targets in the order of first appearance
+        :return: numpy array
+        """
+        unique_targets, first_indexes = numpy.unique(self._vec_target, return_index=True)
+
+        return unique_targets[numpy.argsort(first_indexes)]
+
+    def find_gaps(self, tolerance=TIME_TOLERANCE):
+        """ find the gaps between adjacent splitters
+        :param tolerance:
+        :return: indexes i that splitter i + 1 starts after splitters 0 to i stop
+        """
+        return numpy.where(self._vec_start[1:] > numpy.maximum.accumulate(self._vec_stop)[:-1] + tolerance)[0]
+
+    def find_overlaps(self, tolerance=TIME_TOLERANCE):
+        """ find the overlaps between adjacent splitters
+        :param tolerance:
+        :return: indexes i that splitter i + 1 starts before any of splitters 0 to i stops
+        """
+        return numpy.where(self._vec_start[1:] < numpy.maximum.accumulate(self._vec_stop)[:-1] - tolerance)[0]
+
+    def has_overlap(self, tolerance=TIME_TOLERANCE):
+        return self.find_overlaps(tolerance).shape[0] > 0
+
+    def get_target_indexes(self):
+        """ get the targets as integers: the targets themselves if they are non-negative integers, otherwise the
+        indexes in target_names
+        :return: 2-tuple: numpy array of int (target index of each splitter), numpy array of target names
+        """
+        target_names = self.target_names
+        try:
+            vec_target_index = self._vec_target.astype('int64')
+            if (vec_target_index.astype(self._vec_target.dtype) == self._vec_target).all() and \
+                    vec_target_index.min() >= 0:
+                return vec_target_index, target_names
+        except ValueError:
+            pass
+
+        sort_indexes = numpy.argsort(target_names)
+        vec_target_index = sort_indexes[numpy.searchsorted(target_names[sort_indexes], self._vec_target)]
+
+        return vec_target_index, target_names
+
+    def to_workspace_2d_vectors(self, tolerance=TIME_TOLERANCE):
+        """ convert to X and Y vectors of a Workspace2D splitter.  Gaps between splitters are filled with target -1
+        :param tolerance:
+        :return: 2-tuple: vec_x (N + 1 time boundaries), vec_y (N targets)
+        """
+        overlap_indexes = self.find_overlaps(tolerance)
+        if overlap_indexes.shape[0] > 0:
+            raise RuntimeError('{} splitters overlap with the next one and cannot be converted to Workspace2D. '
+                               'First: splitter {}'.format(overlap_indexes.shape[0], overlap_indexes[0]))
+
+        vec_target_index, target_names = self.get_target_indexes()
+
+        # position of each splitter in Y: shifted by the number of gaps before it
+        vec_gap = (self._vec_start[1:] > self._vec_stop[:-1] + tolerance).astype('int64')
+        vec_pos = numpy.arange(self.number_splitters) + numpy.concatenate([[0], numpy.cumsum(vec_gap)])
+
+        vec_y = numpy.full(self.number_splitters + vec_gap.sum(), -1., dtype='float64')
+        vec_y[vec_pos] = vec_target_index
+        vec_x = numpy.zeros(vec_y.shape[0] + 1, dtype='float64')
+        # stop times are set before start times such that the boundary of touching splitters is the start time
+        vec_x[vec_pos + 1] = self._vec_stop
+        vec_x[vec_pos] = self._vec_start
+
+        return vec_x, vec_y
+
+
+def generate_constant_time_splitters(start_time, stop_time, time_interval, time_step=None):
+    """ generate splitters of constant duration: [t0, t0 + interval), [t0 + step, t0 + step + interval), ...
+    Splitters are generated until one reaches stop time, which is cut at stop time
+    :param start_time:
+    :param stop_time:
+    :param time_interval: duration of each splitter
+    :param time_step: time between the start times of 2 adjacent splitters.  None for time interval (no overlap)
+    :return: SplitterArrays
+    """
+    datatypeutility.check_float_variable('Start time', start_time, (None, None))
+    datatypeutility.check_float_variable('Stop time', stop_time, (start_time, None))
+    datatypeutility.check_float_variable('Time interval', time_interval, (0., None))
+    if time_step is None:
+        time_step = time_interval
+    datatypeutility.check_float_variable('Time step', time_step, (0., None))
+    if time_step <= 0. or time_interval <= 0.:
+        raise RuntimeError('Time interval {} and step {} must be positive'.format(time_interval, time_step))
+
+    vec_start = numpy.arange(start_time, stop_time, time_step)
+    # no more splitter after the first one reaching the stop time
+    num_splitters = numpy.searchsorted(vec_start + time_interval, stop_time, side='left') + 1
+    vec_start = vec_start[:num_splitters]
+    vec_stop = numpy.minimum(vec_start + time_interval, stop_time)
+    # remove the splitters that are too short due to round-off
+    valid = vec_stop > vec_start + TIME_TOLERANCE
+
+    return SplitterArrays(vec_start[valid], vec_stop[valid], sort=False)
@@ -0,0 +1,121 @@
+# In-memory (numpy) implementation of vanadium peak striping and smoothing
+# It follows Mantid algorithms StripVanadiumPeaks and FFTSmooth (v2) closely enough for previewing
+# processing parameters interactively.  Final results shall still be produced by Mantid.
+import numpy
+
+
+# vanadium reflections in d-spacing (Angstrom)
+VANADIUM_PEAKS_D = [0.5044, 0.5191, 0.5350, 0.5526, 0.5936, 0.6178, 0.6453, 0.6768, 0.7134, 0.7566, 0.8089,
+                    0.8737, 0.9571, 1.0701, 1.2356, 1.5133, 2.1401]
+
+
+def smooth_spectrum(vec_y, smooth_filter='Butterworth', param_n=20, param_order=2, push_to_positive=True):
+    """ Smooth a spectrum with FFT filter as Mantid FFTSmooth with IgnoreXBins=True
+    :param vec_y: numpy array of intensities
+    :param smooth_filter: 'Butterworth' or 'Zeroing'
+    :param param_n: cutoff parameter: 1/n of the frequencies are kept
+    :param param_order: order of Butterworth filter
+    :param push_to_positive: push all the Y values to positive integers as mantid_helper.smooth_vanadium()
+    :return: numpy array of smoothed intensities
+    """
+    # check inputs
+    assert smooth_filter in ['Butterworth', 'Zeroing'], 'Smooth filter {0} is not supported.'.format(smooth_filter)
+    assert isinstance(param_n, int) and param_n >= 1, 'Smoothing parameter "n" must be a positive integer.'
+    assert isinstance(param_order, int), 'Smoothing parameter "order" must be an integer.'
+
+    vec_y = numpy.asarray(vec_y, dtype='float64')
+    num_points = vec_y.shape[0]
+
+    # mirror the spectrum about its end samples as [y(0), y(1), ..., y(n-1), y(n-2), ..., y(1)] to avoid edge
+    # effect.  no sample is duplicated at either end of the periodic extension
+    symmetric_y = numpy.pad(vec_y, (0, max(num_points - 2, 0)), mode='reflect')
+
+    # filter in frequency space
+    freq_y = numpy.fft.rfft(symmetric_y)
+    cutoff = max(freq_y.shape[0] // param_n, 1)
+    if smooth_filter == 'Zeroing':
+        freq_y[cutoff:] = 0.
+    else:
+        ratio = numpy.arange(freq_y.shape[0]) / float(cutoff)
+        freq_y *= 1. / (1. + ratio**(2 * param_order))
+
+    smoothed_y = numpy.fft.irfft(freq_y, n=symmetric_y.shape[0])[:num_points]
+
+    if push_to_positive:
+        smoothed_y = numpy.maximum(1., numpy.trunc(smoothed_y + 1))
+
+    return smoothed_y
+
+
+def strip_vanadium_peaks(vec_d, vec_y, fwhm=7, peak_pos_tol=0.05, background_type='Quadratic',
+                         is_high_background=True, peak_positions=None):
+    """ Strip vanadium peaks by replacing the data around each peak with the background under it
+    The background is fitted from the data on both sides of the peak.
+    :param vec_d: numpy array of d-spacing (point data, increasing)
+    :param vec_y: numpy array of intensities
+    :param fwhm: peak FWHM in number of data points
+    :param peak_pos_tol: tolerance (d-spacing) of the observed peak position to the expected one
+    :param background_type: 'Linear' or 'Quadratic'
+    :param is_high_background: high background flag. The background is always fitted in a window wider than the peak
+    :param peak_positions: None for vanadium peaks or list of peak positions in d-spacing
+    :return: numpy array of intensities with peaks removed
+    """
+    # check inputs
+    assert isinstance(fwhm, int) and fwhm > 0, 'FWHM {0} must be a positive integer.'.format(fwhm)
+    assert background_type in ['Linear', 'Quadratic'], 'Background type {0} is not supported.' \
+                                                       'Candidates are Linear, Quadratic'.format(background_type)
+
+    vec_d = numpy.asarray(vec_d, dtype='float64')[:len(vec_y)]
+    vec_y = numpy.asarray(vec_y, dtype='float64')
+    striped_y = vec_y.copy()
+    if peak_positions is None:
+        peak_positions = VANADIUM_PEAKS_D
+    peak_positions = numpy.asarray(peak_positions, dtype='float64')
+    peak_positions = peak_positions[(peak_positions > vec_d[0]) & (peak_positions < vec_d[-1])]
+
+    poly_order = 2 if background_type == 'Quadratic' else 1
+    half_peak_width = int(numpy.ceil(1.5 * fwhm))
+    background_width = 2 * fwhm if is_high_background else fwhm
+    num_points = striped_y.shape[0]
+
+    # locate peaks: search in tolerance and within FWHM to the expected center
+    peak_range_list = list()
+    is_peak = numpy.zeros(num_points, dtype=bool)
+    center_indexes = numpy.searchsorted(vec_d, peak_positions)
+    for peak_index, exp_center in enumerate(center_indexes):
+        i_start = max(exp_center - fwhm, 0)
+        i_stop = min(exp_center + fwhm + 1, num_points)
+        in_tolerance = numpy.abs(vec_d[i_start:i_stop] - peak_positions[peak_index]) <= peak_pos_tol
+        if not in_tolerance.any():
+            continue
+        search_y = numpy.where(in_tolerance, striped_y[i_start:i_stop], -numpy.inf)
+        center = i_start + int(numpy.argmax(search_y))
+
+        peak_left = max(center - half_peak_width, 0)
+        peak_right = min(center + half_peak_width + 1, num_points)
+        peak_range_list.append((peak_left, peak_right))
+        is_peak[peak_left:peak_right] = True
+    # END-FOR
+
+    # background on both sides of each peak excluding the neighboring peaks
+    non_peak_indexes = numpy.where(~is_peak)[0]
+    for peak_left, peak_right in peak_range_list:
+        i_left = numpy.searchsorted(non_peak_indexes, peak_left)
+        i_right = numpy.searchsorted(non_peak_indexes, peak_right)
+        left_bkgd_indexes = non_peak_indexes[max(i_left - background_width, 0):i_left]
+        right_bkgd_indexes = non_peak_indexes[i_right:i_right + background_width]
+        bkgd_indexes = numpy.concatenate((left_bkgd_indexes, right_bkgd_indexes))
+        if left_bkgd_indexes.shape[0] == 0 or right_bkgd_indexes.shape[0] == 0:
+            # peak at the edge: do not extrapolate a polynomial
+            bkgd_order = 0
+        else:
+            bkgd_order = poly_order
+        if bkgd_indexes.shape[0] <= bkgd_order:
+            continue
+
+        # fit background and replace the peak by background
+        bkgd_coeff = numpy.polyfit(vec_d[bkgd_indexes], vec_y[bkgd_indexes], bkgd_order)
+        striped_y[peak_left:peak_right] = numpy.polyval(bkgd_coeff, vec_d[peak_left:peak_right])
+    # END-FOR
+
+    return striped_y
@@ -1,11 +1,143 @@
 # Methods for processing vanadiums
 import os
+import hashlib
+import json
+import numpy
 from pyvdrive.core import mantid_helper
 from pyvdrive.core import datatypeutility
 from pyvdrive.core import save_vulcan_gsas
+from pyvdrive.core import vanadium_numpy
 import shutil
 
 
+class ProcessedVanadiumCache(object):
+    """
+    Content-addressed cache of processed (peak striped and smoothed) vanadium spectra.
+    The key is the digest of vanadium run number, calibration, input spectra (binning) and processing parameters.
+    Processed spectra, both the peak striped (dSpacing) and the smoothed (TOF), are kept in memory and written to
+    disk (.npz) to be shared among sessions.
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        initialization
+        :param cache_dir: directory for cache files. None for ~/.pyvdrive/vanadium_cache
+        """
+        if cache_dir is None:
+            cache_dir = os.path.expanduser('~/.pyvdrive/vanadium_cache')
+        self._cache_dir = cache_dir
+
+        # key: digest, value: 2-tuple of dictionary (bank ID: (vec_x, vec_y, vec_e)) for smoothed and striped
+        self._memory_cache = dict()
+
+        return
+
+    @property
+    def cache_dir(self):
+        """
+        directory of the cache files
+        :return:
+        """
+        return self._cache_dir
+
+    @staticmethod
+    def generate_key(van_run_number, calibration, input_spectra_dict, process_params):
+        """ Generate the content address of a processed vanadium
+        :param van_run_number: vanadium run number
+        :param calibration: string to identify the calibration (file) used to reduce vanadium
+        :param input_spectra_dict: dictionary (bank ID: (vec_x, vec_y)) of the vanadium spectra to process
+        :param process_params: dictionary of peak striping and smoothing parameters
+        :return: string as the hex digest
+        """
+        datatypeutility.check_dict('Input vanadium spectra', input_spectra_dict)
+        datatypeutility.check_dict('Vanadium processing parameters', process_params)
+
+        digest = hashlib.sha1()
+        digest.update(json.dumps({'run': van_run_number, 'calibration': str(calibration),
+                                  'params': process_params}, sort_keys=True, default=str).encode())
+        for bank_id in sorted(input_spectra_dict.keys()):
+            vec_x, vec_y = input_spectra_dict[bank_id]
+            digest.update(str(bank_id).encode())
+            digest.update(numpy.ascontiguousarray(vec_x, dtype='float64').tobytes())
+            digest.update(numpy.ascontiguousarray(vec_y, dtype='float64').tobytes())
+
+        return digest.hexdigest()
+
+    def _get_cache_file_name(self, key):
+        return os.path.join(self._cache_dir, 'van_{}.npz'.format(key))
+
+    def has(self, key):
+        """
+        check whether a processed vanadium is cached either in memory or on disk
+        :param key:
+        :return:
+        """
+        return key in self._memory_cache or os.path.exists(self._get_cache_file_name(key))
+
+    def load(self, key):
+        """ Load processed vanadium spectra
+        :param key:
+        :return: 2-tuple of dictionary (bank ID: (vec_x, vec_y, vec_e)) for smoothed and peak striped spectra,
+                 or None if not cached.  The striped spectra dictionary is empty for a cache file without them
+        """
+        if key in self._memory_cache:
+            return self._memory_cache[key]
+
+        cache_file_name = self._get_cache_file_name(key)
+        if not os.path.exists(cache_file_name):
+            return None
+
+        bank_data_dict = dict()
+        striped_data_dict = dict()
+        with numpy.load(cache_file_name) as cache_file:
+            for bank_id in cache_file['banks']:
+                bank_data_dict[int(bank_id)] = (cache_file['x_{}'.format(bank_id)],
+                                                cache_file['y_{}'.format(bank_id)],
+                                                cache_file['e_{}'.format(bank_id)])
+                if 'sx_{}'.format(bank_id) in cache_file:
+                    striped_data_dict[int(bank_id)] = (cache_file['sx_{}'.format(bank_id)],
+                                                       cache_file['sy_{}'.format(bank_id)],
+                                                       cache_file['se_{}'.format(bank_id)])
+        self._memory_cache[key] = bank_data_dict, striped_data_dict
+
+        return bank_data_dict, striped_data_dict
+
+    def save(self, key, bank_data_dict, striped_data_dict):
+        """ Save processed vanadium spectra to memory and disk
+        :param key:
+        :param bank_data_dict: dictionary (bank ID: (vec_x, vec_y, vec_e)) of smoothed spectra
+        :param striped_data_dict: dictionary (bank ID: (vec_x, vec_y, vec_e)) of peak striped spectra
+        :return: 2-tuple: boolean (written to disk), error message
+        """
+        datatypeutility.check_dict('Processed vanadium spectra', bank_data_dict)
+        datatypeutility.check_dict('Peak striped vanadium spectra', striped_data_dict)
+
+        self._memory_cache[key] = bank_data_dict, striped_data_dict
+
+        array_dict = {'banks': numpy.array(sorted(bank_data_dict.keys()))}
+        for bank_id, (vec_x, vec_y, vec_e) in bank_data_dict.items():
+            array_dict['x_{}'.format(bank_id)] = vec_x
+            array_dict['y_{}'.format(bank_id)] = vec_y
+            array_dict['e_{}'.format(bank_id)] = vec_e
+        for bank_id, (vec_x, vec_y, vec_e) in striped_data_dict.items():
+            array_dict['sx_{}'.format(bank_id)] = vec_x
+            array_dict['sy_{}'.format(bank_id)] = vec_y
+            array_dict['se_{}'.format(bank_id)] = vec_e
+
+        # write to a temporary file and then rename in order not to leave a partial file to other sessions
+        try:
+            if not os.path.exists(self._cache_dir):
+                os.makedirs(self._cache_dir)
+            cache_file_name = self._get_cache_file_name(key)
+            temp_file_name = '{}.{}.tmp.npz'.format(cache_file_name[:-4], os.getpid())
+            numpy.savez(temp_file_name, **array_dict)
+            os.replace(temp_file_name, cache_file_name)
+        except (IOError, OSError) as io_error:
+            return False, 'Unable to write processed vanadium cache to {}: {}'.format(self._cache_dir, io_error)
+
+        return True, ''
+
+
 class VanadiumProcessingManager(object):
     """
     Controller of the workflow to process vanadium data for calibration purpose
@@ -57,6 +189,17 @@ class VanadiumProcessingManager(object):
         self._striped_peaks_ws_dict = dict()  # [bank id (1, 2, 3)] = ws name
         self._smoothed_ws_dict = dict()  # [bank id (1, 2, 3)] = ws names
 
+        # cache of processed vanadium
+        self._processed_cache = ProcessedVanadiumCache()
+        self._calibration_tag = None   # identify the calibration that vanadium is reduced with
+
+        # preview mode: strip and smooth in numpy (vanadium_numpy) and commit to Mantid on saving
+        self._preview_mode = False
+        self._preview_striped_dict = dict()  # [bank id] = vec_x (dSpacing), vec_y
+        self._preview_smoothed_dict = dict()  # [bank id] = vec_x (TOF), vec_y
+        self._pending_strip_param_dict = dict()  # [bank id] = peak striping parameters to commit
+        self._pending_smooth_param_dict = dict()  # [bank id] = smoothing parameters to commit
+
         return
 
     def __str__(self):
@@ -105,6 +248,9 @@ class VanadiumProcessingManager(object):
         :param bank_id:
         :return:
         """
+        if bank_id in self._preview_striped_dict:
+            return self._preview_striped_dict[bank_id]
+
         if bank_id in self._striped_peaks_ws_dict:
             ws_name = self._striped_peaks_ws_dict[bank_id]
         else:
@@ -122,6 +268,9 @@ class VanadiumProcessingManager(object):
         :param bank_id:
         :return:
         """
+        if bank_id in self._preview_smoothed_dict:
+            return self._preview_smoothed_dict[bank_id]
+
         if bank_id in self._smoothed_ws_dict:
             ws_name = self._smoothed_ws_dict[bank_id]
         else:
@@ -170,8 +319,38 @@ class VanadiumProcessingManager(object):
         """
         return self._smoothed_ws_dict
 
+    def commit_preview(self):
+        """ Strip peaks and smooth with Mantid using the parameters previewed in numpy
+        :return:
+        """
+        for bank_id in sorted(self._pending_strip_param_dict.keys()):
+            peak_fwhm, pos_tolerance, background_type, is_high_background = self._pending_strip_param_dict[bank_id]
+            self._strip_v_peaks_mantid(bank_id, peak_fwhm, pos_tolerance, background_type, is_high_background)
+        for bank_id in sorted(self._pending_smooth_param_dict.keys()):
+            smoother_filter_type, param_n, param_order = self._pending_smooth_param_dict[bank_id]
+            self._smooth_v_spectrum_mantid(bank_id, smoother_filter_type, param_n, param_order)
+
+        self._pending_strip_param_dict.clear()
+        self._pending_smooth_param_dict.clear()
+        self._preview_striped_dict.clear()
+        self._preview_smoothed_dict.clear()
+
+        return
+
+    def set_preview_mode(self, preview):
+        """ Set preview mode, in which vanadium peaks are striped and spectra are smoothed in memory by numpy
+        :param preview: flag
+        :return:
+        """
+        datatypeutility.check_bool_variable('Flag for preview mode', preview)
+        if not preview:
+            self.commit_preview()
+        self._preview_mode = preview
+
+        return
+
     def init_session(self, workspace_name, ipts_number, van_run_number, out_gsas_name,
-                     sample_log_ws_name):
+                     sample_log_ws_name, calibration_tag=None):
         """
         Initialize vanadium processing session
         :param workspace_name:
@@ -179,6 +358,7 @@ class VanadiumProcessingManager(object):
         :param van_run_number:
         :param out_gsas_name:
         :param sample_log_ws_name: required for proton charge
+        :param calibration_tag: None or string (such as calibration file name) to identify the calibration
         :return:
         """
         datatypeutility.check_string_variable('Workspace name', workspace_name)
@@ -208,6 +388,7 @@ class VanadiumProcessingManager(object):
         mantid_helper.mtd_convert_units(self._van_workspace_name, 'dSpacig')
 
         self._sample_log_ws_name = sample_log_ws_name
+        self._calibration_tag = calibration_tag
 
         return
 
@@ -222,31 +403,16 @@ class VanadiumProcessingManager(object):
         :return:
         """
         try:
-            raw_van_ws = mantid_helper.retrieve_workspace(self._van_workspace_name)
+            cache_message = self.process_vanadium_banks(peak_pos_tol=peak_pos_tol, background_type=background_type,
+                                                        is_high_background=is_high_background,
+                                                        smoother_filter_type=smoother_filter_type)[1]
         except RuntimeError as run_err:
             return False, 'Unable to process vanadium due to {}'.format(run_err)
 
-        for ws_index in range(mantid_helper.get_number_spectra(raw_van_ws)):
-            # strip vanadium peaks
-            bank_id = ws_index + 1
-            self.strip_v_peaks(bank_id=ws_index+1, peak_fwhm=self._default_fwhm_dict[bank_id],
-                               pos_tolerance=peak_pos_tol,
-                               background_type=background_type,
-                               is_high_background=is_high_background)
-            # smooth
-            if self._is_shift_case:
-                param_n = self._smooth_param_shift_dict['n'][bank_id]
-                param_order = self._smooth_param_shift_dict['order'][bank_id]
-            else:
-                param_n = self._smooth_param_dict['n'][bank_id]
-                param_order = self._smooth_param_dict['order'][bank_id]
-
-            self.smooth_v_spectrum(bank_id=bank_id, smoother_filter_type=smoother_filter_type,
-                                   param_n=param_n, param_order=param_order)
-        # END-FOR
-
         # save
         message = 'Vanadium {0} has peaks removed and is smoothed.'
+        if cache_message:
+            message += '{}.'.format(cache_message)
         status = True
         if self._output_gsas_name:
             #  save GSAS file
@@ -262,6 +428,103 @@ class VanadiumProcessingManager(object):
 
         return status, message
 
+    def process_vanadium_banks(self, peak_pos_tol=0.1, background_type='Quadratic',
+                               is_high_background=True, smoother_filter_type='Butterworth', use_cache=True):
+        """ Strip vanadium peaks and smooth all the banks.
+        Processed spectra are looked up in and written to the processed vanadium cache.
+        Banks are processed one after another as the Mantid algorithms (such as in-place ConvertUnits) on the
+        workspaces of the same group are not safe to run concurrently
+        :param peak_pos_tol:
+        :param background_type:
+        :param is_high_background:
+        :param smoother_filter_type:
+        :param use_cache: flag to look up and write processed vanadium cache
+        :return: 2-tuple: cache key, error message of writing cache (empty for no error)
+        """
+        raw_van_ws = mantid_helper.retrieve_workspace(self._van_workspace_name, raise_if_not_exist=True)
+        bank_id_list = range(1, mantid_helper.get_number_spectra(raw_van_ws) + 1)
+
+        # processing parameters of all banks
+        bank_param_dict = dict()
+        for bank_id in bank_id_list:
+            if self._is_shift_case:
+                param_n = self._smooth_param_shift_dict['n'][bank_id]
+                param_order = self._smooth_param_shift_dict['order'][bank_id]
+            else:
+                param_n = self._smooth_param_dict['n'][bank_id]
+                param_order = self._smooth_param_dict['order'][bank_id]
+            bank_param_dict[bank_id] = {'fwhm': self._default_fwhm_dict[bank_id], 'n': param_n,
+                                        'order': param_order}
+        # END-FOR
+        process_params = {'banks': bank_param_dict, 'tolerance': peak_pos_tol, 'background': background_type,
+                          'high background': is_high_background, 'smoother': smoother_filter_type}
+
+        # look up the cache
+        input_spectra_dict = dict()
+        for bank_id in bank_id_list:
+            input_spectra_dict[bank_id] = self.get_raw_data(bank_id, 'dSpacing')
+        cache_key = ProcessedVanadiumCache.generate_key(self._van_run_number, self._calibration_tag,
+                                                        input_spectra_dict, process_params)
+        cached_data = self._processed_cache.load(cache_key) if use_cache else None
+        if cached_data is not None and sorted(cached_data[1].keys()) == list(bank_id_list):
+            self._load_processed_vanadium(*cached_data)
+            return cache_key, ''
+
+        # process banks
+        for bank_id in bank_id_list:
+            self._strip_v_peaks_mantid(bank_id=bank_id, peak_fwhm=bank_param_dict[bank_id]['fwhm'],
+                                       pos_tolerance=peak_pos_tol,
+                                       background_type=background_type,
+                                       is_high_background=is_high_background)
+            self._smooth_v_spectrum_mantid(bank_id=bank_id, smoother_filter_type=smoother_filter_type,
+                                           param_n=bank_param_dict[bank_id]['n'],
+                                           param_order=bank_param_dict[bank_id]['order'])
+        # END-FOR
+
+        # write cache
+        if use_cache:
+            bank_data_dict = dict()
+            striped_data_dict = dict()
+            for bank_id in bank_id_list:
+                for ws_dict, data_dict in [(self._smoothed_ws_dict, bank_data_dict),
+                                           (self._striped_peaks_ws_dict, striped_data_dict)]:
+                    workspace = mantid_helper.retrieve_workspace(ws_dict[bank_id])
+                    data_dict[bank_id] = (numpy.array(workspace.readX(0)), numpy.array(workspace.readY(0)),
+                                          numpy.array(workspace.readE(0)))
+            # END-FOR
+            cache_message = self._processed_cache.save(cache_key, bank_data_dict, striped_data_dict)[1]
+        else:
+            cache_message = ''
+
+        return cache_key, cache_message
+
+    def _load_processed_vanadium(self, bank_data_dict, striped_data_dict):
+        """ Set up peak striped and smoothed vanadium workspaces from cached spectra
+        :param bank_data_dict: dictionary (bank ID: (vec_x, vec_y, vec_e)) of smoothed spectra
+        :param striped_data_dict: dictionary (bank ID: (vec_x, vec_y, vec_e)) of peak striped spectra
+        :return:
+        """
+        raw_van_ws = mantid_helper.retrieve_workspace(self._van_workspace_name, raise_if_not_exist=True)
+        for bank_id in sorted(bank_data_dict.keys()):
+            parent_ws_name = raw_van_ws[bank_id-1].name()
+
+            # peak striped: same names as _strip_v_peaks_mantid and _smooth_v_spectrum_mantid
+            striped_ws_name = parent_ws_name + '_NoPeak'
+            vec_x, vec_y, vec_e = striped_data_dict[bank_id]
+            mantid_helper.create_workspace_2d(vec_x, vec_y, vec_e, striped_ws_name, unit_x='dSpacing',
+                                              parent_ws_name=parent_ws_name)
+            self._striped_peaks_ws_dict[bank_id] = striped_ws_name
+
+            # smoothed
+            smoothed_ws_name = striped_ws_name + '_Smoothed'
+            vec_x, vec_y, vec_e = bank_data_dict[bank_id]
+            mantid_helper.create_workspace_2d(vec_x, vec_y, vec_e, smoothed_ws_name, unit_x='TOF',
+                                              parent_ws_name=parent_ws_name)
+            self._smoothed_ws_dict[bank_id] = smoothed_ws_name
+        # END-FOR
+
+        return
+
     def save_vanadium_to_file(self):
         """
         save a processed vanadium (in workspace) to GSAS file
@@ -269,6 +532,9 @@ class VanadiumProcessingManager(object):
               run number must be specified for output file name
         :return: tuple (boolean, str): status, error message
         """
+        # previewed peak striping and smoothing are done with Mantid before saving
+        self.commit_preview()
+
         bank_id_list = sorted(self._smoothed_ws_dict.keys())
         # group workspaces
         bank_ws_name_list = [self._smoothed_ws_dict[bank_id] for bank_id in bank_id_list]
@@ -309,6 +575,30 @@ class VanadiumProcessingManager(object):
         datatypeutility.check_int_variable('Smoothing parameter "n"', param_n, (1, 100))
         datatypeutility.check_int_variable('Smoothing order', param_order, (1, 100))
 
+        if self._preview_mode and ws_name is None:
+            # smooth in memory: smoothing does not depend on X and TOF shall be of the same size as dSpacing
+            vec_x = self.get_raw_data(bank_id, 'TOF')[0]
+            vec_y = self.get_peak_striped_data(bank_id)[1]
+            smoothed_y = vanadium_numpy.smooth_spectrum(vec_y, smoother_filter_type, param_n, param_order,
+                                                        push_to_positive=True)
+            self._preview_smoothed_dict[bank_id] = vec_x, smoothed_y
+            self._pending_smooth_param_dict[bank_id] = smoother_filter_type, param_n, param_order
+            return
+
+        self._smooth_v_spectrum_mantid(bank_id, smoother_filter_type, param_n, param_order, ws_name)
+
+        return
+
+    def _smooth_v_spectrum_mantid(self, bank_id, smoother_filter_type, param_n, param_order, ws_name=None):
+        """
+        smooth vanadium peaks with Mantid
+        :param bank_id:
+        :param smoother_filter_type:
+        :param param_n:
+        :param param_order:
+        :param ws_name:
+        :return:
+        """
         # get workspace
         if ws_name is None:
             ws_name = self._striped_peaks_ws_dict[bank_id]
@@ -346,6 +636,26 @@ class VanadiumProcessingManager(object):
         datatypeutility.check_int_variable('FWHM (number of pixels)', peak_fwhm, (1, 100))
         datatypeutility.check_float_variable('Peak position tolerance', pos_tolerance, (0, None))
 
+        if self._preview_mode:
+            # strip peaks in memory
+            vec_x, vec_y = self.get_raw_data(bank_id, 'dSpacing')
+            striped_y = vanadium_numpy.strip_vanadium_peaks(vec_x, vec_y, peak_fwhm, pos_tolerance,
+                                                            background_type, is_high_background)
+            self._preview_striped_dict[bank_id] = vec_x, striped_y
+            self._pending_strip_param_dict[bank_id] = peak_fwhm, pos_tolerance, background_type, is_high_background
+            return None
+
+        return self._strip_v_peaks_mantid(bank_id, peak_fwhm, pos_tolerance, background_type, is_high_background)
+
+    def _strip_v_peaks_mantid(self, bank_id, peak_fwhm, pos_tolerance, background_type, is_high_background):
+        """ Strip vanadium peaks with Mantid
+        :param bank_id:
+        :param peak_fwhm:
+        :param pos_tolerance:
+        :param background_type:
+        :param is_high_background:
+        :return: output workspace name
+        """
         raw_van_ws = mantid_helper.retrieve_workspace(self._van_workspace_name)
         if mantid_helper.is_workspace_group(self._van_workspace_name):
             input_ws_name = raw_van_ws[bank_id-1].name()
@@ -374,6 +684,8 @@ class VanadiumProcessingManager(object):
         :return:
         """
         self._striped_peaks_ws_dict.clear()
+        self._preview_striped_dict.clear()
+        self._pending_strip_param_dict.clear()
 
         return
 
@@ -382,6 +694,8 @@ class VanadiumProcessingManager(object):
         undo spectra smoothing
         :return:
         """
-        self._smoothed_ws_dict = None
+        self._smoothed_ws_dict.clear()
+        self._preview_smoothed_dict.clear()
+        self._pending_smooth_param_dict.clear()
 
         return
@@ -5,11 +5,14 @@ from dateutil.parser import parse
 import datetime
 from dateutil import tz
 from pyvdrive.core import datatypeutility
-import mantid    # type: ignore
+from pyvdrive.core import lazy_import
 import stat
 import numpy as np  # type: ignore
 import pyvdrive.core.reduce_VULCAN as reduce_VULCAN
 
+# Mantid is imported at the first use
+mantid = lazy_import.lazy_module('mantid', ['mantid.simpleapi'])
+
 __author__ = 'wzz'
 
 #
@@ -1,18 +1,27 @@
 # This is a class to slice and focus data for parallelization (multiple threading)
-from mantid.simpleapi import Load, LoadEventNexus, FilterEvents
-from mantid.simpleapi import AlignDetectors, ConvertUnits
-from mantid.simpleapi import DiffractionFocussing, CreateWorkspace
-from mantid.simpleapi import EditInstrumentGeometry, GeneratePythonScript
+from pyvdrive.core import lazy_import
 import threading
 import os
 import time
 from pyvdrive.core import datatypeutility
 from pyvdrive.core import mantid_helper
+from pyvdrive.core import reduction_profiler
 from pyvdrive.core import reduce_adv_chop
 from pyvdrive.core import vulcan_util
 from pyvdrive.core import file_utilities
 from pyvdrive.core import reduce_VULCAN
 
+# Mantid is imported at the first use
+Load = lazy_import.lazy_attribute('mantid.simpleapi', 'Load')
+LoadEventNexus = lazy_import.lazy_attribute('mantid.simpleapi', 'LoadEventNexus')
+FilterEvents = lazy_import.lazy_attribute('mantid.simpleapi', 'FilterEvents')
+AlignDetectors = lazy_import.lazy_attribute('mantid.simpleapi', 'AlignDetectors')
+ConvertUnits = lazy_import.lazy_attribute('mantid.simpleapi', 'ConvertUnits')
+DiffractionFocussing = lazy_import.lazy_attribute('mantid.simpleapi', 'DiffractionFocussing')
+CreateWorkspace = lazy_import.lazy_attribute('mantid.simpleapi', 'CreateWorkspace')
+EditInstrumentGeometry = lazy_import.lazy_attribute('mantid.simpleapi', 'EditInstrumentGeometry')
+GeneratePythonScript = lazy_import.lazy_attribute('mantid.simpleapi', 'GeneratePythonScript')
+
 
 class SliceFocusVulcan(object):
     """ Class to handle the slice and focus on vulcan data
@@ -266,9 +275,10 @@ class SliceFocusVulcan(object):
         t0 = time.time()
 
         # Align detectors: OpenMP
-        AlignDetectors(InputWorkspace=event_ws_name,
-                       OutputWorkspace=event_ws_name,
-                       CalibrationWorkspace=geometry_calib_ws_name)
+        with reduction_profiler.stage('AlignDetectors', event_ws_name):
+            AlignDetectors(InputWorkspace=event_ws_name,
+                           OutputWorkspace=event_ws_name,
+                           CalibrationWorkspace=geometry_calib_ws_name)
 
         t1 = time.time()
 
@@ -280,14 +290,15 @@ class SliceFocusVulcan(object):
         else:
             is_relative_time = False
 
-        result = FilterEvents(InputWorkspace=event_ws_name,
-                              SplitterWorkspace=split_ws_name, InformationWorkspace=info_ws_name,
-                              OutputWorkspaceBaseName=output_ws_base,
-                              FilterByPulseTime=False,
-                              GroupWorkspaces=True,
-                              OutputWorkspaceIndexedFrom1=True,
-                              SplitSampleLogs=True,
-                              RelativeTime=is_relative_time)
+        with reduction_profiler.stage('FilterEvents', output_ws_base):
+            result = FilterEvents(InputWorkspace=event_ws_name,
+                                  SplitterWorkspace=split_ws_name, InformationWorkspace=info_ws_name,
+                                  OutputWorkspaceBaseName=output_ws_base,
+                                  FilterByPulseTime=False,
+                                  GroupWorkspaces=True,
+                                  OutputWorkspaceIndexedFrom1=True,
+                                  SplitSampleLogs=True,
+                                  RelativeTime=is_relative_time)
 
         # get output workspaces' names
         output_names = mantid_helper.get_filter_events_outputs(result)
@@ -316,35 +327,36 @@ class SliceFocusVulcan(object):
         print('[DB...IMPORTANT] Output workspace number = {0}, workspace per thread = {1}\n'
               'Output workspaces names: {2}'.format(num_outputs, number_ws_per_thread, output_names))
 
-        thread_pool = dict()
-        # create threads and start
-        end_sliced_ws_index = 0  # exclusive last
-        for thread_id in range(self._number_threads):
-            start_sliced_ws_index = end_sliced_ws_index
-            end_sliced_ws_index = min(start_sliced_ws_index + number_ws_per_thread + int(thread_id < extra),
-                                      num_outputs)
-            # call method self.focus_workspace_list() in multiple threading
-            # Note: Tread(target=[method name], args=(method argument 0, method argument 1, ...,)
-            workspace_names_i = output_names[start_sliced_ws_index:end_sliced_ws_index]
-            gsas_workspace_name_list = gsas_names[start_sliced_ws_index:end_sliced_ws_index]
-            thread_pool[thread_id] = threading.Thread(target=self.focus_workspace_list,
-                                                      args=(workspace_names_i, gsas_workspace_name_list,
-                                                            group_ws_name,))
-            thread_pool[thread_id].start()
-            print('[DB] thread {0}: [{1}: {2}) ---> {3} workspaces'.
-                  format(thread_id, start_sliced_ws_index,  end_sliced_ws_index,
-                         end_sliced_ws_index-start_sliced_ws_index))
-        # END-FOR
-
-        # join the threads after the diffraction focus is finished
-        for thread_id in range(self._number_threads):
-            thread_pool[thread_id].join()
-
-        # kill any if still alive
-        for thread_id in range(self._number_threads):
-            thread_i = thread_pool[thread_id]
-            if thread_i is not None and thread_i.isAlive():
-                thread_i._Thread_stop()
+        with reduction_profiler.stage('DiffractionFocus'):
+            thread_pool = dict()
+            # create threads and start
+            end_sliced_ws_index = 0  # exclusive last
+            for thread_id in range(self._number_threads):
+                start_sliced_ws_index = end_sliced_ws_index
+                end_sliced_ws_index = min(start_sliced_ws_index + number_ws_per_thread + int(thread_id < extra),
+                                          num_outputs)
+                # call method self.focus_workspace_list() in multiple threading
+                # Note: Tread(target=[method name], args=(method argument 0, method argument 1, ...,)
+                workspace_names_i = output_names[start_sliced_ws_index:end_sliced_ws_index]
+                gsas_workspace_name_list = gsas_names[start_sliced_ws_index:end_sliced_ws_index]
+                thread_pool[thread_id] = threading.Thread(target=self.focus_workspace_list,
+                                                          args=(workspace_names_i, gsas_workspace_name_list,
+                                                                group_ws_name,))
+                thread_pool[thread_id].start()
+                print('[DB] thread {0}: [{1}: {2}) ---> {3} workspaces'.
+                      format(thread_id, start_sliced_ws_index,  end_sliced_ws_index,
+                             end_sliced_ws_index-start_sliced_ws_index))
+            # END-FOR
+
+            # join the threads after the diffraction focus is finished
+            for thread_id in range(self._number_threads):
+                thread_pool[thread_id].join()
+
+            # kill any if still alive
+            for thread_id in range(self._number_threads):
+                thread_i = thread_pool[thread_id]
+                if thread_i is not None and thread_i.isAlive():
+                    thread_i._Thread_stop()
 
         t3 = time.time()
 
@@ -363,34 +375,37 @@ class SliceFocusVulcan(object):
             print('[ERROR] No output workspace to export to GSAS!')
 
         # write all the processed workspaces to GSAS:  IPTS number and parm_file_name shall be passed
-        run_date_time = vulcan_util.get_run_date(event_ws_name, '')
-        self.write_to_gsas(output_names, ipts_number=gsas_info_dict['IPTS'], parm_file_name=gsas_info_dict['parm file'],
-                           vanadium_gda_name=gsas_info_dict['vanadium'],
-                           gsas_writer=gsas_writer, run_start_date=run_date_time,  # ref_tof_sets=binning_parameters,
-                           gsas_file_index_start=gsas_file_index_start)
-
-        if fullprof:
-            output_dir = self._output_dir
-            # FIXME TODO - TOMORROW 0 - Vanadium workspace for Fullprof?
-            self.write_to_fullprof_files(output_names, None, output_dir)
+        with reduction_profiler.stage('SaveGSAS'):
+            run_date_time = vulcan_util.get_run_date(event_ws_name, '')
+            self.write_to_gsas(output_names, ipts_number=gsas_info_dict['IPTS'],
+                               parm_file_name=gsas_info_dict['parm file'],
+                               vanadium_gda_name=gsas_info_dict['vanadium'],
+                               gsas_writer=gsas_writer, run_start_date=run_date_time,
+                               gsas_file_index_start=gsas_file_index_start)  # ref_tof_sets=binning_parameters
+
+            if fullprof:
+                output_dir = self._output_dir
+                # FIXME TODO - TOMORROW 0 - Vanadium workspace for Fullprof?
+                self.write_to_fullprof_files(output_names, None, output_dir)
 
         # TODO - TONIGHT 1 - put this section to a method
         # TODO FIXME - TODAY 0 -... Debug disable
-        if True:
-            pc_time0 = mantid_helper.get_workspace_property(event_ws_name, 'proton_charge').times[0]
-            # user does not want to HDF5 in same directory.  Need to write to a special directory
-            if self._output_dir.startswith('/SNS/VULCAN/IPTS-'):
-                # on the SNS server, do it in a different way
-                output_dir = vulcan_util.generate_chopped_log_dir(self._output_dir, True)
-            else:
-                output_dir = self._output_dir
-            self.export_split_logs(output_names, gsas_file_index_start=gsas_file_index_start,
-                                   run_start_time=pc_time0,
-                                   output_dir=output_dir)
-        # END-IF
-
-        # write to logs
-        self.write_log_records(output_names, log_type='loadframe')
+        with reduction_profiler.stage('ExportLogs'):
+            if True:
+                pc_time0 = mantid_helper.get_workspace_property(event_ws_name, 'proton_charge').times[0]
+                # user does not want to HDF5 in same directory.  Need to write to a special directory
+                if self._output_dir.startswith('/SNS/VULCAN/IPTS-'):
+                    # on the SNS server, do it in a different way
+                    output_dir = vulcan_util.generate_chopped_log_dir(self._output_dir, True)
+                else:
+                    output_dir = self._output_dir
+                self.export_split_logs(output_names, gsas_file_index_start=gsas_file_index_start,
+                                       run_start_time=pc_time0,
+                                       output_dir=output_dir)
+            # END-IF
+
+            # write to logs
+            self.write_log_records(output_names, log_type='loadframe')
         tf = time.time()
 
         # processing time output
@@ -5,17 +5,85 @@ import os
 import math
 import numpy
 from pyvdrive.core import mantid_helper
-from mantid.simpleapi import CreateGroupingWorkspace
+from pyvdrive.core import lazy_import
 from pyvdrive.core import datatypeutility
 import pandas as pd
 from pyvdrive.core import reduce_VULCAN
 
+# Mantid is imported at the first use
+CreateGroupingWorkspace = lazy_import.lazy_attribute('mantid.simpleapi', 'CreateGroupingWorkspace')
+PreprocessDetectorsToMD = lazy_import.lazy_attribute('mantid.simpleapi', 'PreprocessDetectorsToMD')
+
 
 START_PIXEL_ID = {1: {1: 0, 2: 1, 3: (6468, 62500)},
                   'X1': {},
                   'X2': {}}
 
 
+def calculate_pixels_2theta(vulcan_ws):
+    """ Calculate 2theta of all the pixels (spectra) of a workspace in one array operation.
+    The detector table of all the spectra is computed by Mantid (PreprocessDetectorsToMD) and read as columns
+    :param vulcan_ws: MatrixWorkspace instance
+    :return: 2-tuple: numpy array of 2theta (degree, NaN for spectrum without detector such as monitor) and
+             numpy array of detector IDs (-1 for none), both indexed by workspace index
+    """
+    det_table_name = '_{}_detectors'.format(vulcan_ws.name())
+    det_table = PreprocessDetectorsToMD(InputWorkspace=vulcan_ws.name(), OutputWorkspace=det_table_name)
+    try:
+        ws_index_array = numpy.array(det_table.column('detIDMap'), dtype='int64')
+        two_theta_column = numpy.array(det_table.column('TwoTheta'), dtype='float64')
+        det_id_column = numpy.array(det_table.column('DetectorID'), dtype='int64')
+    finally:
+        mantid_helper.delete_workspace(det_table_name)
+
+    return map_detector_columns(vulcan_ws.getNumberHistograms(), ws_index_array, numpy.degrees(two_theta_column),
+                                det_id_column)
+
+
+def map_detector_columns(num_spectra, ws_index_array, two_theta_column, det_id_column):
+    """ Map the columns of a detector table (one row for each spectrum with detector) to workspace indexes
+    :param num_spectra: number of spectra of the workspace
+    :param ws_index_array: workspace index of each row
+    :param two_theta_column: 2theta (degree) of each row
+    :param det_id_column: detector ID of each row
+    :return: 2-tuple: numpy array of 2theta (NaN for none) and numpy array of detector IDs (-1 for none)
+    """
+    two_theta_array = numpy.full(num_spectra, numpy.nan)
+    two_theta_array[ws_index_array] = two_theta_column
+    det_id_array = numpy.full(num_spectra, -1, dtype='int64')
+    det_id_array[ws_index_array] = det_id_column
+
+    return two_theta_array, det_id_array
+
+
+def assign_2theta_groups(pixel_2theta_array, two_theta_array, start_iws, end_iws):
+    """ Assign the pixels within a range of workspace indexes to 2theta bins.
+    Group i (from 1) holds the pixels with 2theta in (tth[i-1], tth[i]] while the left most boundary is included.
+    Pixels out of range are assigned to group 0, i.e., not grouped
+    :param pixel_2theta_array: 2theta of each pixel indexed by workspace index (NaN for none)
+    :param two_theta_array: 2theta bin boundaries
+    :param start_iws: start workspace index (inclusive)
+    :param end_iws: end workspace index (exclusive)
+    :return: 2-tuple: group ID of each pixel, number of pixels in each 2theta bin (-1 for none) with the same size
+             as 2theta boundaries, i.e., the last one is always -1
+    """
+    num_2theta = two_theta_array.shape[0]
+
+    with numpy.errstate(invalid='ignore'):
+        group_id_array = numpy.digitize(pixel_2theta_array, two_theta_array, right=True)
+        group_id_array[pixel_2theta_array == two_theta_array[0]] = 1
+        in_range = (pixel_2theta_array >= two_theta_array[0]) & (pixel_2theta_array < two_theta_array[-1])
+    ws_index_array = numpy.arange(pixel_2theta_array.shape[0])
+    in_range &= (ws_index_array >= start_iws) & (ws_index_array < end_iws)
+    group_id_array[~in_range] = 0
+
+    # count pixels in each 2theta bin and deal with zero-count-instance
+    num_pixels_array = numpy.bincount(group_id_array, minlength=num_2theta + 1)[1:num_2theta + 1].astype('int')
+    num_pixels_array[num_pixels_array == 0] = -1
+
+    return group_id_array, num_pixels_array
+
+
 def convert_pixels_to_workspace_indexes_v1(pixel_id_list):
     """
     convert pixel IDs to workspace indexes
@@ -321,56 +389,70 @@ def getLogsList(vandbfile):
 
 def group_pixels_2theta(vulcan_ws_name, tth_group_ws_name, start_iws, end_iws,
                         two_theta_bin_range, two_theta_step):
-
-    # create group workspace
-    CreateGroupingWorkspace(InputWorkspace=vulcan_ws_name, GroupDetectorsBy='All',
-                            OutputWorkspace=tth_group_ws_name)
-
+    """ Group pixels within a range of workspace indexes by their 2theta
+    :param vulcan_ws_name: name of the workspace with VULCAN instrument
+    :param tth_group_ws_name: name of the output GroupingWorkspace
+    :param start_iws: start workspace index (inclusive)
+    :param end_iws: end workspace index (exclusive)
+    :param two_theta_bin_range: 2-tuple as 2theta min and max
+    :param two_theta_step: 2theta bin size
+    :return: 3-tuple: 2theta bin boundaries, grouping workspace, number of pixels in each 2theta bin (-1 for none)
+    """
     # Get workspace
     vulcan_ws = mantid_helper.retrieve_workspace(vulcan_ws_name, True)
-    group_ws = mantid_helper.retrieve_workspace(tth_group_ws_name, True)
 
-    # Calculate 2theta for each pixels that is interested
+    # 2theta bins
     two_theta_array = numpy.arange(two_theta_bin_range[0], two_theta_bin_range[1] + two_theta_step,
                                    two_theta_step, dtype='float')
-    num_2theta = two_theta_array.shape[0]
-    num_pixels_array = numpy.zeros(shape=two_theta_array.shape, dtype='int')
-
-    # source and sample position
-    source = vulcan_ws.getInstrument().getSource().getPos()
-    sample = vulcan_ws.getInstrument().getSample().getPos()
-    # Calculate 2theta for each detectors
-    for iws in range(0, vulcan_ws.getNumberHistograms()):
-        if iws < start_iws or iws >= end_iws:
-            # set to group 0 to ignore
-            group_ws.dataY(iws)[0] = 0
 
-        else:
-            # interested
-            det_i = vulcan_ws.getDetector(iws).getPos()
-            two_theta_i = (det_i - sample).angle(sample - source) * 180. / numpy.pi
-            if two_theta_i < two_theta_array[0] or two_theta_i >= two_theta_array[-1]:
-                group_ws.dataY(iws)[0] = 0
-            elif two_theta_i == two_theta_array[0]:
-                group_ws.dataY(iws)[0] = 1
-                num_pixels_array[0] += 1
-            else:
-                i_2theta = numpy.searchsorted(two_theta_array, [two_theta_i])[0]
-                if i_2theta <= 0 or i_2theta >= num_2theta:
-                    raise RuntimeError('Programming error!')
-                group_ws.dataY(iws)[0] = i_2theta
-                num_pixels_array[i_2theta-1] += 1
-        # END-IF-ELSE
-    # END-FOR
+    # Calculate 2theta for each pixel and assign groups
+    pixel_2theta_array, det_id_array = calculate_pixels_2theta(vulcan_ws)
+    group_id_array, num_pixels_array = assign_2theta_groups(pixel_2theta_array, two_theta_array, start_iws, end_iws)
 
-    # deal with zero-count-instance
-    num_pixels_array[numpy.where(num_pixels_array < 0.1)] = -1
+    # create group workspace in one step: each non-empty 2theta bin is a group of detectors
+    group_str = build_2theta_grouping_string(det_id_array, group_id_array, num_pixels_array)
+    if len(group_str) == 0:
+        raise RuntimeError('There is no pixel in workspace index range [{}, {}) with 2theta in [{}, {})'
+                           ''.format(start_iws, end_iws, two_theta_array[0], two_theta_array[-1]))
+    CreateGroupingWorkspace(InputWorkspace=vulcan_ws_name, CustomGroupingString=group_str,
+                            OutputWorkspace=tth_group_ws_name)
+    group_ws = mantid_helper.retrieve_workspace(tth_group_ws_name, True)
 
     return two_theta_array, group_ws, num_pixels_array
 
 
-def group_pixels_2theta_geometry(template_virtual_geometry_dict, ws_index_range, num_2theta):
-
+def build_2theta_grouping_string(det_id_array, group_id_array, num_pixels_array):
+    """ Build the custom grouping string of CreateGroupingWorkspace for the 2theta groups.
+    A group cannot be empty.  Thus only the 2theta bins with pixels are groups, i.e., focused spectrum i is the i-th
+    non-empty 2theta bin.  The bin of each spectrum is given by numpy.where(num_pixels_array > 0)[0], which is
+    used to name the output of each 2theta bin (SaveVulcanGSS.save_2theta_group)
+    :param det_id_array: detector ID of each pixel
+    :param group_id_array: group ID (2theta bin index from 1, 0 for not grouped) of each pixel
+    :param num_pixels_array: number of pixels in each 2theta bin (-1 for none)
+    :return: string such as '1+2+3,7+8'.  empty string for no group
+    """
+    # sort the pixels by group once and split
+    order = numpy.argsort(group_id_array, kind='stable')
+    sorted_group_ids = group_id_array[order]
+    sorted_det_ids = det_id_array[order]
+
+    group_str_list = list()
+    for group_id in numpy.where(num_pixels_array > 0)[0] + 1:
+        i_start, i_stop = numpy.searchsorted(sorted_group_ids, [group_id, group_id + 1])
+        group_str_list.append('+'.join(sorted_det_ids[i_start:i_stop].astype(str)))
+
+    return ','.join(group_str_list)
+
+
+def group_pixels_2theta_geometry(template_virtual_geometry_dict, ws_index_range, num_2theta,
+                                 two_theta_array=None):
+    """ Construct the virtual instrument geometry for the 2theta groups
+    :param template_virtual_geometry_dict: 3-bank virtual geometry dictionary
+    :param ws_index_range: workspace index range
+    :param num_2theta: number of 2theta groups (i.e., focused spectra)
+    :param two_theta_array: None or 2theta of each group to set as polar angle
+    :return: dictionary for EditInstrumentGeometry
+    """
     if ws_index_range[1] <= 3234:
         bank = 1
     elif ws_index_range[1] < 6468:
@@ -378,12 +460,13 @@ def group_pixels_2theta_geometry(template_virtual_geometry_dict, ws_index_range,
     else:
         bank = 3
 
-    print(template_virtual_geometry_dict.keys())
-
     group_geometry_dict = {'L1': template_virtual_geometry_dict['L1']}
-    for geom_item in ['Polar', 'SpectrumIDs', 'L2', 'Azimuthal']:
+    for geom_item in ['Polar', 'L2', 'Azimuthal']:
         item_value = template_virtual_geometry_dict[geom_item][bank-1]
         group_geometry_dict[geom_item] = [item_value] * num_2theta
+    group_geometry_dict['SpectrumIDs'] = list(range(1, num_2theta + 1))
+    if two_theta_array is not None:
+        group_geometry_dict['Polar'] = list(two_theta_array)
 
     return group_geometry_dict
 
@@ -27,6 +27,8 @@ from pyvdrive.core import mantid_helper
 from pyvdrive.interface.gui.pvipythonwidget import IPythonWorkspaceViewer
 from pyvdrive.core import vdrivehelper
 from pyvdrive.core import datatypeutility
+from pyvdrive.core import live_accumulator
+from pyvdrive.core import live_replay
 from pyvdrive.interface.gui import GuiUtility
 
 # include this try/except block to remap QString needed when using IPython
@@ -76,7 +78,7 @@ class VulcanLiveDataView(QMainWindow):
         self._liveSetupDialog = None
         self._myChildWindows = list()
 
-        # collection of workspace names
+        # collection of workspace names (only used if ADS observer is not supported)
         self._workspaceSet = set()
 
         # define data structure by setting some default
@@ -92,20 +94,14 @@ class VulcanLiveDataView(QMainWindow):
         self._myIncrementalWorkspaceList = [
             None] * self._myIncrementalWorkspaceNumber  # a holder for workspace names
         self._myIncrementalListIndex = 0  # This is always the next index to write except in add...()
-        # summed workspace list and index for accumulated workspaces
-        self._myAccumulationWorkspaceList = [
-            None] * self._myAccumulationWorkspaceNumber  # name of summed workspaces
-        self._myAccumulationListIndex = 0
+        # accumulations of the incremental workspaces in memory
+        self._accumulationBuffer = live_accumulator.LiveAccumulationBuffer(self._myAccumulationWorkspaceNumber,
+                                                                           int(self._myMaxIncrementalNumber))
 
         # GSAS workspaces recorded in dictionary: key = run number, value = workspace name
         self._myGSASWorkspaceDict = dict()
         self._myMaxGSASWorkspaceNumber = 100  # only the latest will be recorded.
 
-        # workspace manager for accumulating operation
-        # workspace that is currently in accumulation
-        self._inAccumulationWorkspaceName = None
-        self._inAccumulationIncrementalWorkspaceList = list()  # list of accumulated workspace
-
         # about previous round pot
         self._plotPrevCycleName = None
 
@@ -140,6 +136,9 @@ class VulcanLiveDataView(QMainWindow):
         # other time
         self._liveStartTimeStamp = None  # shall be of time numpy.datetime64
 
+        # latency and dropped live outputs of the updates
+        self._updateMonitor = live_replay.LiveUpdateMonitor()
+
         # start UI
         ui_path = os.path.join(os.path.dirname(__file__), "gui/LiveDataView.ui")
         self.ui = load_ui(ui_path, baseinstance=self)
@@ -379,7 +378,8 @@ class VulcanLiveDataView(QMainWindow):
 
         # set the lists
         self._myIncrementalWorkspaceList = [None] * self._myIncrementalWorkspaceNumber
-        self._myAccumulationWorkspaceList = [None] * self._myAccumulationWorkspaceNumber
+        self._accumulationBuffer = live_accumulator.LiveAccumulationBuffer(self._myAccumulationWorkspaceNumber,
+                                                                           int(self._myMaxIncrementalNumber))
 
         return
 
@@ -699,6 +699,9 @@ class VulcanLiveDataView(QMainWindow):
         # enable the start-live-data button
         self.ui.pushButton_startLiveReduction.setEnabled(True)
 
+        # statistics of the updates
+        self.write_log('information', self._updateMonitor.report())
+
         return
 
     def evt_bank_view_change_unit(self):
@@ -738,70 +741,13 @@ class VulcanLiveDataView(QMainWindow):
         return list()
 
     # TEST TODO/Newly Implemented Method
-    def get_accumulation_workspaces(self, last_n_round):
-        """ get the last N round of accumulation workspaces
-        Note of application:
-        (1) get sample logs:  the latest incremental workspace has been added to current/last accumulated workspace
-        :param last_n_round:
-        :return: 2-tuple: list as workspace names and list as indexes of workspaces
+    @staticmethod
+    def get_accumulation_name(acc_index):
+        """ get the name of an accumulation for display and for the workspace created from it
+        :param acc_index:
+        :return:
         """
-        # check inputs
-        assert isinstance(last_n_round, int), 'Last N ({0}) round for accumulated workspaces must be given by ' \
-                                              'an integer, but not a {1}.'.format(
-                                                  last_n_round, type(last_n_round))
-
-        # if less than 0, then it means that all the available workspace shall be contained
-        if last_n_round <= 0:
-            last_n_round = self._myAccumulationWorkspaceNumber
-
-        # get list of workspace to plot
-        ws_name_list = list()
-        ws_index_list = list()
-        try:
-            print('[DB...BAT...BAT] Index = {0} '
-                  'Workspace Name = {1}'.format(self._myAccumulationListIndex,
-                                                self._myAccumulationWorkspaceList[self._myAccumulationListIndex]))
-        except IndexError as index_err:
-            raise RuntimeError('In get_accumulation_workspaces(), _myAccumulationListIndex = {} out of {} '
-                               'range of _myAccumulationWorksapceList.  Error info: {}'
-                               ''.format(self._myAccumulationListIndex, len(self._myAccumulationWorkspaceList),
-                                         index_err))
-
-        for ws_count in range(last_n_round):
-            # get accumulation workspace list index
-            acc_list_index = self._myAccumulationListIndex - 1 - ws_count
-            if acc_list_index < 0:
-                acc_list_index += self._myAccumulationWorkspaceNumber
-                if acc_list_index < 0:
-                    raise RuntimeError('Accumulation list index {0} is still less than 0 after add {1}.'
-                                       ''.format(acc_list_index, self._myAccumulationWorkspaceNumber))
-            # END-IF
-
-            # get workspace name
-            try:
-                ws_name_i = self._myAccumulationWorkspaceList[acc_list_index]
-                # check
-                if ws_name_i is None:
-                    # no more workspace (range is too big)
-                    break
-                elif mantid_helper.workspace_does_exist(ws_name_i) is False:
-                    # this is weird!  shouldn't be removed
-                    break
-                else:
-                    ws_name_list.append(ws_name_i)
-                    ws_index_list.append(acc_list_index)
-            except IndexError as index_err:
-                raise RuntimeError('Index {0} is out of incremental workspace range {1} due to {2}.'
-                                   ''.format(acc_list_index, len(self._myAccumulationWorkspaceList),
-                                             index_err))
-            # END-TRY-EXCEPT
-        # END-FOR
-
-        # reverse the order
-        ws_name_list.reverse()
-        ws_index_list.reverse()
-
-        return ws_name_list, ws_index_list
+        return 'Accumulated_{0:05d}'.format(acc_index)
 
     def get_incremental_workspaces(self, last_n_round):
         """
@@ -854,41 +800,8 @@ class VulcanLiveDataView(QMainWindow):
         self.write_log('debug', 'Get Last {0} Accumulated Data'.format(last))
 
         acc_data_dict = dict()
-        prev_acc_index = self._myAccumulationListIndex
-        debug_info = ''
-        for inverse_index in range(last):
-            # start from self._myAccumulationListIndex - 1
-            list_index = self._myAccumulationListIndex % self._myAccumulationWorkspaceNumber - 1 - inverse_index
-            try:
-                ws_name_i = self._myAccumulationWorkspaceList[list_index]
-            except IndexError as index_err:
-                raise RuntimeError('Inverted workspace index {0} is converted to workspace index {1} '
-                                   'and out of range [0, {2}) due to {3}.'
-                                   ''.format(inverse_index, list_index, len(self._myAccumulationWorkspaceList),
-                                             index_err))
-
-            if ws_name_i is None:
-                # no workspace is set for that
-                break
-
-            # get the accumulation index of the workspace
-            acc_index = int(ws_name_i.split('_')[-1])
-            debug_info += '{0}: {1} | '.format(acc_index, ws_name_i)
-            if acc_index >= prev_acc_index:
-                # buffer is smaller than the number of acc required and limit is reached
-                break
-            else:
-                prev_acc_index = acc_index
-
-            # get data from memory
-            data_set_dict, current_unit = mantid_helper.get_data_from_workspace(workspace_name=ws_name_i,
-                                                                                bank_id=bank_id, target_unit='dSpacing',
-                                                                                point_data=True, start_bank_id=1)
-            acc_data_dict[acc_index] = data_set_dict[bank_id]
-        # END-FOR
-
-        # write conclusion message
-        self.write_log('debug', debug_info)
+        for acc_index, data_set in self._accumulationBuffer.get_last_n_data(last, bank_id - 1).items():
+            acc_data_dict[acc_index] = data_set[0], data_set[1]
 
         return acc_data_dict
 
@@ -906,19 +819,8 @@ class VulcanLiveDataView(QMainWindow):
         if not 1 <= bank_id <= 3:
             raise RuntimeError('Bank ID {0} is out of range.'.format(bank_id))
 
-        # get the last N workspaces
-        ws_name_list, ws_index_list = self.get_accumulation_workspaces(last)
-
-        # get data
-        data_set = dict()
-        for index, ws_name in enumerate(ws_name_list):
-            data_set_dict, current_unit = mantid_helper.get_data_from_workspace(workspace_name=ws_name,
-                                                                                bank_id=bank_id, target_unit='dSpacing',
-                                                                                point_data=True, start_bank_id=1)
-            data_set[ws_index_list[index]] = data_set_dict[bank_id]
-        # END-FOR
-
-        return data_set
+        # get the last N accumulations
+        return self._accumulationBuffer.get_last_n_data(last, bank_id - 1)
 
     def hide_data_previous_cycle(self):
         """
@@ -931,6 +833,34 @@ class VulcanLiveDataView(QMainWindow):
 
         return
 
+    def get_accumulation_spectra(self, acc_index, target_unit):
+        """ get the spectra of all banks of an accumulation in the target unit.  A workspace is created from
+        the accumulation buffer only if the unit is not dSpacing
+        :param acc_index:
+        :param target_unit:
+        :return: list of 2-tuple (vector X, vector Y) for bank 1, 2, 3, ...
+        """
+        if target_unit == 'dSpacing':
+            spectra_list = list()
+            for ws_index in range(self._accumulationBuffer.number_spectra):
+                vec_x, vec_y, vec_e = self._accumulationBuffer.get_data(acc_index, ws_index, point_data=False)
+                spectra_list.append((vec_x[:len(vec_y)], vec_y))
+            return spectra_list
+
+        # convert unit by Mantid on a temporary workspace
+        temp_ws_name = '_temp_acc_ws_{0}'.format(random.randint(1, 10000))
+        try:
+            self._controller.create_accumulation_workspace(self._accumulationBuffer, acc_index, temp_ws_name)
+            target_ws, is_new_ws = self._controller.convert_unit(temp_ws_name, target_unit, temp_ws_name)
+            spectra_list = list()
+            for ws_index in range(target_ws.getNumberHistograms()):
+                vec_y = target_ws.readY(ws_index)[:]
+                spectra_list.append((target_ws.readX(ws_index)[:len(vec_y)], vec_y))
+        finally:
+            self._controller.delete_workspace(temp_ws_name, no_throw=True)
+
+        return spectra_list
+
     def plot_data_in_accumulation(self):
         """ plot data that is in accumulation
         :return:
@@ -940,15 +870,18 @@ class VulcanLiveDataView(QMainWindow):
         self.write_log('information',
                        'Plot in-accumulation data of unit {0}'.format(target_unit))
         # check
-        if self._inAccumulationWorkspaceName is None:
-            self.write_log('warning', 'No in-accumulation workspace in ADS.')
+        curr_acc_index = self._accumulationBuffer.current_index
+        if curr_acc_index < 0:
+            self.write_log('warning', 'No in-accumulation data.')
             return
 
-        # get the workspace names
-        in_sum_name = '_temp_curr_ws_{0}'.format(random.randint(1, 10000))
-        in_sum_ws, is_new_ws = self._controller.convert_unit(self._inAccumulationWorkspaceName, target_unit,
-                                                             in_sum_name)
-        in_sum_ws_name = in_sum_ws.name()
+        # get the spectra
+        try:
+            spectra_list = self.get_accumulation_spectra(curr_acc_index, target_unit)
+        except RuntimeError as run_err:
+            self.write_log('error', 'Unable to get data from accumulation {0} due to {1}'
+                                    ''.format(self.get_accumulation_name(curr_acc_index), run_err))
+            return
 
         # use vanadium or not
         norm_by_van = self.ui.checkBox_normByVanadium.isChecked()
@@ -956,25 +889,19 @@ class VulcanLiveDataView(QMainWindow):
         # plot
         for bank_id in range(1, 4):
             # get data
-            try:
-                vec_y_i = in_sum_ws.readY(bank_id-1)[:]
-
-                # Normalize by vanadium: only acted on the vector to plot
-                if norm_by_van:
-                    vec_y_van = self._controller.get_vanadium(bank_id)
-                    vec_y_i = vec_y_i / vec_y_van
-
-                vec_x_i = in_sum_ws.readX(bank_id-1)[:len(vec_y_i)]
-                color_i = self._bankColorDict[bank_id]
-                label_i = 'in-accumulation bank {0}'.format(bank_id)
-                if norm_by_van:
-                    label_i += ': normalized by vanadium'
-                self._mainGraphicDict[bank_id].plot_current_plot(vec_x_i, vec_y_i, color_i, label_i, target_unit,
-                                                                 auto_scale_y=False)
-            except RuntimeError as run_err:
-                self.write_log('error', 'Unable to get data from workspace {0} due to {1}'
-                                        ''.format(in_sum_ws_name, run_err))
-                return
+            vec_x_i, vec_y_i = spectra_list[bank_id - 1]
+
+            # Normalize by vanadium: only acted on the vector to plot
+            if norm_by_van:
+                vec_y_van = self._controller.get_vanadium(bank_id)
+                vec_y_i = vec_y_i / vec_y_van
+
+            color_i = self._bankColorDict[bank_id]
+            label_i = 'in-accumulation bank {0}'.format(bank_id)
+            if norm_by_van:
+                label_i += ': normalized by vanadium'
+            self._mainGraphicDict[bank_id].plot_current_plot(vec_x_i, vec_y_i, color_i, label_i, target_unit,
+                                                             auto_scale_y=False)
 
             if target_unit == 'TOF':
                 self._mainGraphicDict[bank_id].setXYLimit(0, 70000)
@@ -982,14 +909,11 @@ class VulcanLiveDataView(QMainWindow):
                 self._mainGraphicDict[bank_id].setXYLimit(0, 5.0)
         # END-FOR
 
-        if is_new_ws:
-            self._controller.delete_workspace(in_sum_name)
-
         return
 
     def plot_data_previous_cycle(self):
         """
-        plot data collected and reduced in previous accumulated workspace
+        plot data collected and reduced in previous accumulation
         this method has no idea whether it should keep the previous reduced plot or not
         :return:
         """
@@ -1005,18 +929,17 @@ class VulcanLiveDataView(QMainWindow):
             return
         # END-IF
 
-        # get the previous-N cycle accumulated workspace's name: remember that currentIndex is 1 beyond what it is
-        prev_ws_index = (self._myAccumulationListIndex - 1 -
-                         int(self.ui.lineEdit_showPrevNCycles.text()))
-        prev_ws_index %= self._myAccumulationWorkspaceNumber
-        if self._myAccumulationWorkspaceList[prev_ws_index] is None:
-            message = 'There are only {0} previously accumulated and reduced workspace. ' \
-                      'Unable to access previously {1}-th workspace.' \
-                      ''.format(len(self._myAccumulationWorkspaceList), abs(prev_ws_index) - 1)
+        # get the previous-N cycle accumulation
+        prev_acc_index = self._accumulationBuffer.current_index - int(self.ui.lineEdit_showPrevNCycles.text())
+        if not self._accumulationBuffer.has_accumulation(prev_acc_index):
+            message = 'There are only {0} previously accumulated and reduced data. ' \
+                      'Unable to access previously {1}-th accumulation.' \
+                      ''.format(len(self._accumulationBuffer.get_accumulation_indexes(-1)) - 1,
+                                int(self.ui.lineEdit_showPrevNCycles.text()))
             self.write_log('error', message)
             return
         else:
-            prev_ws_name = self._myAccumulationWorkspaceList[prev_ws_index]
+            prev_ws_name = self.get_accumulation_name(prev_acc_index)
         # END-IF-ELSE
 
         # skip if the previous plotted is sam
@@ -1032,25 +955,24 @@ class VulcanLiveDataView(QMainWindow):
 
         # get new unit
         target_unit = str(self.ui.comboBox_currUnits.currentText())
-        prev_ws_name_tmp = '_temp_prev_ws_{0}'.format(random.randint(1, 10000))
-        prev_ws, is_new_ws = self._controller.convert_unit(
-            prev_ws_name, target_unit, prev_ws_name_tmp)
+        try:
+            spectra_list = self.get_accumulation_spectra(prev_acc_index, target_unit)
+        except RuntimeError as run_err:
+            self.write_log('error', 'Unable to get data from accumulation {0} due to {1}'
+                                    ''.format(prev_ws_name, run_err))
+            self._plotPrevCycleName = None
+            return
 
         # plot
         line_label = '{0}'.format(prev_ws_name)
         norm_by_van = self.ui.checkBox_normByVanadium.isChecked()
         for bank_id in range(1, 4):
-            vec_y = prev_ws.readY(bank_id-1)[:]
+            vec_x, vec_y = spectra_list[bank_id - 1]
             if norm_by_van:
                 vec_y_van = self._controller.get_vanadium(bank_id)
                 vec_y = vec_y / vec_y_van
-            vec_x = prev_ws.readX(bank_id-1)[:len(vec_y)]
             self._mainGraphicDict[bank_id].plot_previous_run(vec_x, vec_y, 'black', line_label)
 
-        # clean
-        if is_new_ws:
-            self._controller.delete_workspace(prev_ws_name_tmp)
-
         return
 
     def load_sample_log(self, y_axis_name, last_n_accumulation, relative_time=None):
@@ -1068,16 +990,17 @@ class VulcanLiveDataView(QMainWindow):
         if last_n_accumulation is None:
             # append mode implicitly
             ws_name_list = self.get_incremental_workspaces(last_n_round=0)
+            time_vec, log_value_vec, last_pulse_time = self._controller.parse_sample_log(
+                ws_name_list, y_axis_name)
+            if time_vec is None:
+                raise RuntimeError('No log value found in {}'.format(ws_name_list))
         else:
             # new log mode implicitly
-            # get the workspace name list: get the last N round of workspace from the beginning of live data
-            ws_name_list, index_list = self.get_accumulation_workspaces(last_n_accumulation)
-
-        # get log values
-        time_vec, log_value_vec, last_pulse_time = self._controller.parse_sample_log(
-            ws_name_list, y_axis_name)
-        if time_vec is None:
-            raise RuntimeError('No log value found in {}'.format(ws_name_list))
+            # get the last N accumulations from the beginning of live data
+            time_vec, log_value_vec = self._accumulationBuffer.get_sample_log(y_axis_name, last_n_accumulation)
+            if time_vec is None:
+                raise RuntimeError('No log value {} found in last {} accumulations'
+                                   ''.format(y_axis_name, last_n_accumulation))
 
         # convert the vector of time
         if relative_time is not None:
@@ -1104,7 +1027,7 @@ class VulcanLiveDataView(QMainWindow):
 
         if self._controller.has_loaded_logs(ipts_number, self._2dStartRunNumber, curr_run_number):
             self._controller.get_loaded_logs(self._2dStartRunNumber, curr_run_number,
-                                             self._inAccumulationWorkspaceName)
+                                             self.get_accumulation_name(self._accumulationBuffer.current_index))
         else:
             self._controller.load_nexus_sample_logs(ipts_number, self._2dStartRunNumber, curr_run_number,
                                                     run_on_thread=True)
@@ -1222,8 +1145,7 @@ class VulcanLiveDataView(QMainWindow):
 
         elif y_axis_name.startswith('* Peak:'):
             # integrate peak for all the accumulated runs
-            accumulation_ws_list, index_list = self.get_accumulation_workspaces(last_n_round=-1)
-            self._controller.integrate_peaks(accumulated_workspace_list=accumulation_ws_list,
+            self._controller.integrate_peaks(accumulation_buffer=self._accumulationBuffer,
                                              d_min=d_min, d_max=d_max,
                                              norm_by_vanadium=norm_by_van)
 
@@ -1496,6 +1418,21 @@ class VulcanLiveDataView(QMainWindow):
 
         return
 
+    def set_replay_source(self, nexus_file_name, num_chunks):
+        """ replay a recorded event NeXus file instead of listening to the beamline, e.g., to benchmark the
+        live view.  The file is split to num_chunks chunks and one chunk is emitted per update
+        :param nexus_file_name:
+        :param num_chunks:
+        :return:
+        """
+        datatypeutility.check_file_name(nexus_file_name, check_exist=True, note='Event NeXus file to replay')
+        datatypeutility.check_int_variable('Number of chunks to replay', num_chunks, (1, None))
+
+        self._controller.set_replay_source(nexus_file_name, num_chunks, self._myUpdateTimePeriod)
+        self.write_log('information', 'Replay {} in {} chunks'.format(nexus_file_name, num_chunks))
+
+        return
+
     def set_refresh_rate(self, update_period):
         """
         set the refresh rate
@@ -1556,7 +1493,7 @@ class VulcanLiveDataView(QMainWindow):
         return
 
     def sum_incremental_workspaces(self, workspace_i):
-        """sum up the incremental workspace to an accumulated workspace
+        """sum up the incremental workspace to the accumulation in progress in the accumulation buffer
         :param workspace_i: a MatrixWorkspace instance
         :return:
         """
@@ -1566,57 +1503,30 @@ class VulcanLiveDataView(QMainWindow):
             raise RuntimeError('Input workspace {0} of type {1} is not a MatrixWorkspace: Error {2}'
                                ''.format(workspace_i, type(workspace_i), att_err))
 
-        if self._inAccumulationWorkspaceName is None or \
-                len(self._inAccumulationIncrementalWorkspaceList) == self._myMaxIncrementalNumber:
-            # reset if pre-existing of accumulated workspace. It is a time of a new accumulation workspace
-            self._inAccumulationIncrementalWorkspaceList = list()
-
-            # clone workspace
-            accumulate_name = 'Accumulated_{0:05d}'.format(self._myAccumulationListIndex)
-            mantid_helper.clone_workspace(ws_name, accumulate_name)
-            self._inAccumulationWorkspaceName = accumulate_name
-
-            # add to list
-            list_index = self._myAccumulationListIndex % self._myAccumulationWorkspaceNumber
-
-            if self._myAccumulationWorkspaceList[list_index] is not None:
-                old_ws_name = self._myAccumulationWorkspaceList[list_index]
-                self.write_log('information', 'Delete old workspace {0}'.format(old_ws_name))
-                self._controller.delete_workspace(old_ws_name)
-            self._myAccumulationWorkspaceList[list_index] = accumulate_name
+        # the first incremental workspace is kept for its instrument
+        self._controller.set_accumulation_template(ws_name)
 
+        # Y and E are copied to the buffer in place.  all the spectra are rebinned to the same X
+        try:
+            pulse_time = workspace_i.run().getProperty('proton_charge').times[-1]
+        except (RuntimeError, IndexError):
+            pulse_time = None
+        is_new = self._accumulationBuffer.add_increment(workspace_i.readX(0)[:], workspace_i.extractY(),
+                                                        workspace_i.extractE(), pulse_time=pulse_time,
+                                                        log_dict=self._controller.get_time_series_logs(workspace_i))
+
+        if is_new:
             # restart timer
             self._accStartTime = datetime.now()
 
-            # increase list index
-            self._myAccumulationListIndex += 1
-
             # set the info
-            self.ui.lineEdit_inAccWsName.setText(self._inAccumulationWorkspaceName)
-            self.ui.spinBox_currentIndex.setValue(self._myAccumulationListIndex)
-
-        else:
-            # add to existing accumulation workspace
-            ws_in_acc = mantid_helper.retrieve_workspace(
-                self._inAccumulationWorkspaceName, raise_if_not_exist=True)
-
-            # more check on histogram number and spectrum size
-            if ws_in_acc.getNumberHistograms() != workspace_i.getNumberHistograms():
-                raise RuntimeError('Accumulated workspace {0} has different number of spectra ({1}) than the '
-                                   'incremental workspace {2} ({3}).'
-                                   ''.format(self._inAccumulationWorkspaceName,
-                                             ws_in_acc.getNumberHistograms(),
-                                             workspace_i.getNumberHistograms.name(),
-                                             workspace_i.getNumberHistograms()))
-            # END-IF (test)
-
-            # sum 2 workspaces together
-            self._controller.sum_workspaces([self._inAccumulationWorkspaceName, ws_name],
-                                            self._inAccumulationWorkspaceName)
-        # END-IF-ELSE
+            acc_index = self._accumulationBuffer.current_index
+            self.ui.lineEdit_inAccWsName.setText(self.get_accumulation_name(acc_index))
+            self.ui.spinBox_currentIndex.setValue(acc_index + 1)
+        # END-IF
 
-        # update the list of source accumulated workspace
-        self._inAccumulationIncrementalWorkspaceList.append(ws_name)
+        self.write_log('debug', 'Incremental workspace {0} is added to {1}'
+                                ''.format(ws_name, self.get_accumulation_name(self._accumulationBuffer.current_index)))
 
         return
 
@@ -1657,11 +1567,21 @@ class VulcanLiveDataView(QMainWindow):
             self._2dMode = 'acc'  #
             # --------------------------------------------
 
+            # image is rebuilt if the data set is changed, such as from accumulations to runs
+            if self._2dMode == 'runs':
+                data_key = self._2dMode, self._2dStartRunNumber
+            else:
+                data_key = self._2dMode
+
             if self._2dMode == 'unit':
                 data_set_dict = self.get_last_n_round_data(last=last_n_run, bank_id=bank_id)
             elif self._2dMode == 'acc':
-                # plot accumulations
-                data_set_dict = self.get_last_n_acc_data(last_n_run, bank_id=bank_id)
+                # plot accumulations: the image of last N accumulations is on canvas.  only the newest is appended
+                if self._contourFigureDict[bank_id].number_rows == last_n_run and \
+                        self._contourFigureDict[bank_id].data_key == data_key:
+                    data_set_dict = self.get_last_n_acc_data(2, bank_id=bank_id)
+                else:
+                    data_set_dict = self.get_last_n_acc_data(last_n_run, bank_id=bank_id)
             elif self._2dMode == 'runs':
                 data_set_dict = self.get_last_n_runs_data(last_n_run, bank_id=bank_id)
             else:
@@ -1670,7 +1590,8 @@ class VulcanLiveDataView(QMainWindow):
             # plot
             if len(data_set_dict) > 1:
                 if bank_id in bank_id_list:
-                    self._contourFigureDict[bank_id].plot_contour(data_set_dict)
+                    self._contourFigureDict[bank_id].plot_contour(data_set_dict, num_rows=last_n_run,
+                                                                  data_key=data_key)
                 else:
                     pass
             # END-IF
@@ -1684,24 +1605,31 @@ class VulcanLiveDataView(QMainWindow):
         :param i_signal: signal integer from event
         :return:
         """
-        # refresh with workspace list
-        try:
-            ws_name_list = self._controller.get_workspaces()
-        except RuntimeError as run_err:
-            self.write_log('error', 'Unable to get workspaces due to {0}'.format(run_err))
-            return
+        # new workspaces notified by ADS observer
+        new_ws_name_list = self._controller.get_new_workspaces()
 
-        # check whether there is any new workspace in ADS
-        ws_name_set = set(ws_name_list)
-        diff_set = ws_name_set - self._workspaceSet
-        if len(diff_set) > 0:
-            new_ws_name_list = list(diff_set)
-            self._workspaceSet = ws_name_set
-        else:
-            new_ws_name_list = list()
+        if new_ws_name_list is None:
+            # ADS observer is not supported: refresh with workspace list
+            try:
+                ws_name_list = self._controller.get_workspaces()
+            except RuntimeError as run_err:
+                self.write_log('error', 'Unable to get workspaces due to {0}'.format(run_err))
+                return
 
-        # process new workspace
-        self.process_new_workspaces(new_ws_name_list)
+            # check whether there is any new workspace in ADS
+            ws_name_set = set(ws_name_list)
+            diff_set = ws_name_set - self._workspaceSet
+            if len(diff_set) > 0:
+                new_ws_name_list = list(diff_set)
+                self._workspaceSet = ws_name_set
+            else:
+                new_ws_name_list = list()
+        # END-IF
+
+        # process new workspace: in place unit conversion and rebin shall not be notified as new workspaces
+        start_time = time.time()
+        with self._controller.suppress_workspace_notifications():
+            self.process_new_workspaces(new_ws_name_list)
         if len(new_ws_name_list) > 0:
             # update 2D
             self._update2DCounter += 1
@@ -1711,6 +1639,11 @@ class VulcanLiveDataView(QMainWindow):
         total_index = self._controller.get_live_counter()
         self.ui.spinBox_totalIndex.setValue(total_index)
 
+        # record the latency of the update and the live outputs replaced before being processed
+        num_outputs = len([ws_name for ws_name in new_ws_name_list if ws_name.startswith('output')])
+        if num_outputs > 0:
+            self._updateMonitor.record(time.time() - start_time, total_index, num_outputs)
+
         # print '[UI-DB] Acc Index = {0}, Total Index = {1}'.format(self._currAccumulateIndex, total_index)
 
         # some counter += 1
@@ -10,12 +10,12 @@ try:
     from PyQt5 import QtCore as QtCore
     from PyQt5.QtWidgets import QVBoxLayout
     from PyQt5.uic import loadUi as load_ui
-    from PyQt5.QtWidgets import QMainWindow, QButtonGroup, QFileDialog
+    from PyQt5.QtWidgets import QMainWindow, QButtonGroup, QFileDialog, QInputDialog
 except ImportError:
     from PyQt4 import QtCore as QtCore
     from PyQt4.QtGui import QVBoxLayout
     from PyQt4.uic import loadUi as load_ui
-    from PyQt4.QtGui import QMainWindow, QButtonGroup, QFileDialog  # noqa: F401
+    from PyQt4.QtGui import QMainWindow, QButtonGroup, QFileDialog, QInputDialog  # noqa: F401
 
 try:
     _fromUtf8 = QtCore.QString.fromUtf8
@@ -26,7 +26,10 @@ except AttributeError:
 from pyvdrive.interface.gui import GuiUtility
 from pyvdrive.interface.gui.vdrivetreewidgets import VdriveRunManagerTree
 from pyvdrive.interface.gui.samplelogview import LogGraphicsView
+from pyvdrive.interface.gui.samplelogview import COLOR_LIST
 from pyvdrive.core import datatypeutility
+from pyvdrive.core import log_decimation
+from pyvdrive.core import cyclic_slicer
 from pyvdrive.interface import ReducedDataView
 from pyvdrive.interface import LoadMTSLogWindow
 from pyvdrive.interface import QuickChopDialog
@@ -133,7 +136,7 @@ class WindowLogPicker(QMainWindow):
         # menu actions
         self.ui.actionExit.triggered.connect(self.evt_quit_no_save)
 
-        # TODO - TONIGHT 1: pushButton_cyclic_helper
+        self.ui.pushButton_cyclic_helper.clicked.connect(self.do_setup_cyclic_slicer)
 
         self.ui.actionOpenH5Log.triggered.connect(self.do_load_h5_log)
         self.ui.actionIPython_Command_Console.triggered.connect(self.do_launch_console_view)
@@ -959,6 +962,60 @@ class WindowLogPicker(QMainWindow):
 
         return
 
+    def do_setup_cyclic_slicer(self):
+        """
+        Set up the slicers of a cyclic (strobescope) sample log: each cycle is sliced by log value if minimum,
+        maximum and step of log value are given, or otherwise into phase bins
+        :return:
+        """
+        if self._curr_run_number is None:
+            GuiUtility.pop_dialog_error(self, 'No run is loaded')
+            return
+
+        # log name might be with information
+        log_name = str(self.ui.comboBox_logNames.currentText()).split('(')[0].strip()
+        min_log_value = GuiUtility.parse_float(self.ui.lineEdit_minSlicerLogValue)
+        max_log_value = GuiUtility.parse_float(self.ui.lineEdit_maxSlicerLogValue)
+        log_value_step = GuiUtility.parse_float(self.ui.lineEdit_slicerLogValueStep)
+
+        if min_log_value is None or max_log_value is None or log_value_step is None:
+            # phase bins
+            num_phase_bins, status = QInputDialog.getInt(self, 'Strobescope (cyclic)',
+                                                         'Number of phase bins in each cycle of {}:'.format(log_name),
+                                                         10, 1, 1000)
+            if not status:
+                return
+            log_boundaries = None
+            rising = True
+        elif log_value_step <= 0. or max_log_value <= min_log_value:
+            GuiUtility.pop_dialog_error(self, 'Log value step {} must be positive and maximum {} must be larger '
+                                              'than minimum {}'.format(log_value_step, max_log_value, min_log_value))
+            return
+        else:
+            num_phase_bins = None
+            log_boundaries = numpy.arange(min_log_value, max_log_value + 0.5 * log_value_step, log_value_step)
+            rising = str(self.ui.comboBox_logChangeDirection.currentText()) != 'Decrease'
+        # END-IF-ELSE
+
+        splitters = self.generate_cyclic_slicer(log_name, '{}_cyclic'.format(log_name),
+                                                num_phase_bins=num_phase_bins, log_boundaries=log_boundaries,
+                                                rising=rising)
+        if splitters is None:
+            return
+
+        # show the slicers colored by phase or log value bin
+        vec_times, vec_targets = splitters.to_workspace_2d_vectors()
+        target_color_dict = dict()
+        for target in set(vec_targets) - {-1}:
+            target_color_dict[target] = COLOR_LIST[int(target) % len(COLOR_LIST)]
+        self.ui.graphicsView_main.remove_slicers()
+        try:
+            self.ui.graphicsView_main.highlight_cyclic_slicers(vec_times, vec_targets, target_color_dict)
+        except RuntimeError as run_err:
+            GuiUtility.pop_dialog_error(self, 'Unable to show cyclic slicers: {}'.format(run_err))
+
+        return
+
     def do_setup_uniform_slicer(self):
         """
         Set up (apply) the log value or time chopping
@@ -1211,6 +1268,49 @@ class WindowLogPicker(QMainWindow):
 
         return
 
+    def generate_cyclic_slicer(self, log_name, slicer_name, num_phase_bins=None, log_boundaries=None, rising=True,
+                               num_smooth_points=5):
+        """ generate slicers for a cyclic sample log: each cycle is split into phase bins (equal duration) or
+        by log value boundaries on its rising or falling edge.  Target is the index of phase or log value bin
+        :param log_name:
+        :param slicer_name:
+        :param num_phase_bins: number of phase bins.  None for slicing by log value
+        :param log_boundaries: increasing log values to slice by log value
+        :param rising: flag to slice the rising edge of each cycle by log value
+        :param num_smooth_points: number of points to smooth the log before locating cycles
+        :return: SplitterArrays or None for failure
+        """
+        if (num_phase_bins is None) == (log_boundaries is None):
+            GuiUtility.pop_dialog_error(self, 'Either number of phase bins or log boundaries shall be given')
+            return None
+
+        vec_times, vec_value = self.get_sample_log_data(log_name)
+        try:
+            vec_min_indexes, vec_max_indexes = cyclic_slicer.locate_cycles(vec_value, num_smooth_points)
+            if num_phase_bins is None:
+                splitters = cyclic_slicer.generate_log_value_splitters(vec_times, vec_value, vec_min_indexes,
+                                                                       vec_max_indexes, log_boundaries, rising)
+            else:
+                splitters = cyclic_slicer.generate_phase_splitters(vec_times, vec_min_indexes, num_phase_bins)
+        except RuntimeError as run_err:
+            GuiUtility.pop_dialog_error(self, 'Unable to locate cycles of {}: {}'.format(log_name, run_err))
+            return None
+
+        chopper = self.get_controller().project.get_chopper(self._curr_run_number)
+        status, slice_tag = chopper.generate_events_filter_manual(run_number=self._curr_run_number,
+                                                                  split_list=splitters,
+                                                                  relative_time=True,
+                                                                  splitter_tag=slicer_name)
+        if not status:
+            GuiUtility.pop_dialog_error(self, 'Failed to generate cyclic data slicer due to {0}.'.format(slice_tag))
+            return None
+
+        self._currSlicerKey = slice_tag
+        message = 'Cyclic splitters set up for {} cycles (key: {})'.format(vec_max_indexes.shape[0], slice_tag)
+        self.ui.label_slicerSetupInfo.setText(message)
+
+        return splitters
+
     def get_controller(self):
         """
         Get the workflow controller
@@ -1458,9 +1558,14 @@ class WindowLogPicker(QMainWindow):
             new_min_x = GuiUtility.parse_float(self.ui.lineEdit_minX, True, None)
             new_max_x = GuiUtility.parse_float(self.ui.lineEdit_maxX, True, None)
 
-            # adjust the resolution
-            plot_x, plot_y = self.adjust_log_resolution(vec_x, vec_y, use_num_res, use_time_res, resolution,
-                                                        new_min_x, new_max_x)
+            # maximum number of points to plot: the log is decimated by the canvas with the minimum and maximum
+            # values kept such that zoom and pan are able to show details
+            min_x = vec_x[0] if new_min_x is None else max(vec_x[0], new_min_x)
+            max_x = vec_x[-1] if new_max_x is None else min(vec_x[-1], new_max_x)
+            if use_time_res:
+                max_points = max(int((max_x - min_x + 0.) / resolution), 1)
+            else:
+                max_points = max(int(resolution), 1)
 
             # overlay?
             if self.ui.checkBox_overlay.isChecked() is False:
@@ -1468,7 +1573,9 @@ class WindowLogPicker(QMainWindow):
                 self.ui.graphicsView_main.reset()
 
             # plot
-            self.ui.graphicsView_main.plot_sample_log(plot_x, plot_y, log_name, '', 'Time (s)')
+            self.ui.graphicsView_main.plot_sample_log(vec_x, vec_y, log_name, '', 'Time (s)', max_points=max_points)
+            if new_min_x is not None or new_max_x is not None:
+                self.ui.graphicsView_main.setXYLimit(xmin=min_x, xmax=max_x)
 
         else:
             # other solution
@@ -1535,16 +1642,9 @@ class WindowLogPicker(QMainWindow):
             # maximum number
             num_target_pt = int(resolution)
 
-        num_raw_points = i_stop - i_start
-        if num_raw_points < num_target_pt * 2:
-            pt_skip = 1
-        else:
-            pt_skip = int(num_raw_points / num_target_pt)
-
-        plot_x = vec_x[i_start:i_stop:pt_skip]
-        plot_y = vec_y[i_start:i_stop:pt_skip]
-
-        # print 'Input vec_x = ', vec_x, 'vec_y = ', vec_y, i_start, i_stop, pt_skip, len(plot_x)
+        # decimate by keeping first, minimum, maximum and last points of each bucket such that spikes are kept
+        num_buckets = max(num_target_pt // 4, 1)
+        plot_x, plot_y = log_decimation.decimate_min_max(vec_x[i_start:i_stop], vec_y[i_start:i_stop], num_buckets)
 
         return plot_x, plot_y
 
@@ -600,7 +600,7 @@ class PeakPickerWindow(QMainWindow):
 
         # List all peaks if any is selected
         num_phases_used = 0
-        reflection_list = list()
+        phase_list = list()
         err_msg = ''
 
         # always: 1, 2, 3
@@ -619,14 +619,15 @@ class PeakPickerWindow(QMainWindow):
             except AssertionError as e:
                 err_msg += 'Phase %d cannot be used due to %s.' % (i_phase, str(e))
                 continue
-
-            # Calculate peaks' positions
-            sub_list = self._myController.calculate_peaks_position(phase, min_d, max_d)
-            # for peak_tup in sub_list:
-            #     print peak_tup[1], peak_tup[0]
-            reflection_list.extend(sub_list)
+            phase_list.append(phase)
         # END-FOR
 
+        # Calculate peaks' positions of all the selected phases (cached)
+        reflection_list = list()
+        if len(phase_list) > 0:
+            for sub_list in self._myController.calculate_phases_peaks_position(phase_list, min_d, max_d):
+                reflection_list.extend(sub_list)
+
         # Check result
         if len(err_msg) > 0:
             # Phase selected but not valid
@@ -1,11 +1,10 @@
 from pyvdrive.core import datatypeutility
+from pyvdrive.core.vanadium_numpy import VANADIUM_PEAKS_D
 from pyvdrive.interface.gui import GuiUtility
 import os
 import numpy
 
 
-VANADIUM_PEAKS_D = [0.5044, 0.5191, 0.5350, 0.5526, 0.5936, 0.6178, 0.6453, 0.6768, 0.7134, 0.7566, 0.8089,
-                    0.8737, 0.9571, 1.0701, 1.2356, 1.5133, 2.1401]
 UNIT = {'d': 'dSpacing', 'tof': 'TOF'}
 
 
@@ -202,11 +201,19 @@ class PeakPickerWindowChildVanadium(object):
 
         # call
         processor = self._myController.project.vanadium_processing_manager
+        try:
+            calibration_tag = self._myController.project.get_calibration_tag(log_ws_name, data_key)
+        except RuntimeError:
+            # calibration is unknown: processed vanadium is cached without calibration
+            calibration_tag = None
         try:
             processor.init_session(workspace_name=data_key, ipts_number=self._ipts_number,
                                    van_run_number=self._run_number,
                                    out_gsas_name=temp_out_gda_name,
-                                   sample_log_ws_name=log_ws_name)
+                                   sample_log_ws_name=log_ws_name,
+                                   calibration_tag=calibration_tag)
+            # preview parameters' changes in memory and process with Mantid upon saving
+            processor.set_preview_mode(True)
         except RuntimeError as run_err:
             GuiUtility.pop_dialog_error(self._parent, 'Unable to initialize a vanadium processing sesson due to {}'
                                         ''.format(run_err))
@@ -1789,6 +1789,20 @@ class GeneralPurposedDataViewWindow(QMainWindow):
 
         return total_pc
 
+    def get_proton_charges(self, ipts_number, run_number, chop_seq_vec):
+        """ get proton charges of multiple chopped sequences of a run
+        :param ipts_number:
+        :param run_number:
+        :param chop_seq_vec: array-like of chop sequences (starting from 1)
+        :return: numpy array
+        """
+        datatypeutility.check_int_variable('IPTS number', ipts_number, (1, 999999))
+        datatypeutility.check_int_variable('Run number', run_number, (1, 99999999))
+
+        pc_vec = numpy.asarray(self._sliced_log_dict[run_number]['start'][1]['ProtonCharge'], dtype='float64')
+
+        return pc_vec[numpy.asarray(chop_seq_vec, dtype='int64') - 1]
+
     @staticmethod
     def guess_run_number(gsas_path):
         """
@@ -2192,57 +2206,29 @@ class GeneralPurposedDataViewWindow(QMainWindow):
         :param main_only:
         :return:
         """
-        def construct_chopped_data(chop_data_key, chop_sequences, bank_index, do_pc_norm,
-                                   do_van_norm, vanadium_vector):
+        def construct_chopped_data(chop_data_key, chop_sequences, bank_index, do_pc_norm, vanadium_vector):
             """
             construct the chopped data into MATRIX to plot contour and 3D
             :param chop_data_key: get_chopped_sequence_data(chop_data_key, seq)
             :param chop_sequences:
             :param bank_index:
             :param do_pc_norm:
-            :param do_van_norm:
-            :param vanadium_vector:
-            :return: 2-tuple: chopped sequence list and data set list
+            :param vanadium_vector: None for not normalizing by vanadium
+            :return: ChoppedDataCube
             """
-            # construct input for contour plot
-            data_sets = list()
-            new_seq_list = list()
-            error_msg = ''
-            for chop_seq_i in chop_sequences:
-                try:
-                    data = self._myController.project.get_chopped_sequence_data(chop_data_key, chop_seq_i,
-                                                                                bank_index)
-                    vec_x_i, vec_y_i = data
-
-                    # normalize by proton charge
-                    if do_pc_norm:
-                        p_charge_i = self.get_proton_charge(
-                            self._iptsNumber, self._currRunNumber, chop_seq_i)
-                        vec_y_i /= p_charge_i
-                    # normalize by vanadium spectrum
-                    if do_van_norm:
-                        vec_y_i /= vanadium_vector
-
-                    data_sets.append((vec_x_i, vec_y_i))
-                    new_seq_list.append(chop_seq_i)
-                except (RuntimeError, KeyError) as run_err_i:
-                    error_msg += 'Unable to load chopped sequence {}: {}\n'.format(
-                        chop_seq_i, run_err_i)
-            # END-FOR
-
-            if len(new_seq_list) == 0:
-                raise RuntimeError('There is no available data from {}:\n{}'.format(
-                    chop_data_key, error_msg))
+            data_cube, error_msg = self._myController.project.get_chopped_data_cube(chop_data_key, chop_sequences,
+                                                                                    bank_index)
             if error_msg != '':
                 GuiUtility.pop_dialog_error(self, error_msg)
 
-            # check ... FIXME TODO - TONIGHT 0 - delete this session after debugging/problem being fixed
-            for data_set in data_sets:
-                print('min = {} @ {},  max = {} @ {}'
-                      ''.format(data_set[1].min(), numpy.argmin(data_set[1]),
-                                data_set[1].max(), numpy.argmax(data_set[1])))
+            # set up normalization vectors
+            if do_pc_norm:
+                data_cube.set_proton_charges(self.get_proton_charges(self._iptsNumber, self._currRunNumber,
+                                                                     data_cube.sequences))
+            if vanadium_vector is not None:
+                data_cube.set_vanadium(vanadium_vector)
 
-            return new_seq_list, data_sets
+            return data_cube
 
         def get_single_bank_data(chop_run_key, curr_seq_index, bank_id_i, do_pc_norm, proton_charge,
                                  do_van_norm, van_vector_bank_i):
@@ -2422,22 +2408,22 @@ class GeneralPurposedDataViewWindow(QMainWindow):
                     van_vec_y_i = None
                 # END-IF
                 try:
-                    seq_list, data_set_list = construct_chopped_data(chop_key, seq_list, bank_id, pc_norm,
-                                                                     van_norm, van_vec_y_i)
+                    data_cube = construct_chopped_data(chop_key, seq_list, bank_id, pc_norm, van_vec_y_i)
                 except RuntimeError as run_err:
                     GuiUtility.pop_dialog_error(
                         self, 'Unable to plot chopped data due to {}'.format(run_err))
                     return
+                matrix_y = data_cube.get_normalized_matrix(pc_norm, van_norm)
 
                 # 2D Contours
                 child_2d_window = self.launch_contour_view()
                 child_2d_window.set_x_range(min_x, max_x)
-                child_2d_window.plot_contour(seq_list, data_set_list)
+                child_2d_window.plot_contour_matrix(data_cube.vec_x, data_cube.sequences, matrix_y)
 
                 # 3D Line
                 if plot3d:
                     child_3d_window = self.launch_3d_view()
-                    child_3d_window.plot_runs_3d(seq_list, data_set_list)
+                    child_3d_window.plot_matrix_3d(data_cube.vec_x, data_cube.sequences, matrix_y)
             # END-FOR
         # END-IF
 
@@ -33,23 +33,27 @@ from pyvdrive.interface.gui.vdrivetreewidgets import FileSystemTreeView
 from pyvdrive.interface.gui.vdrivetablewidgets import VdriveRunTableWidget
 from pyvdrive.interface.gui.vdrivetablewidgets import TimeSegmentsTable
 from pyvdrive.core import file_utilities
-from pyvdrive.interface import PeakPickWindow
-from pyvdrive.interface import snapgraphicsview
-from pyvdrive.interface import ReducedDataView
+from pyvdrive.core import lazy_import
 from pyvdrive.interface.gui import GuiUtility
-from pyvdrive.interface import AddRunsIPTS
-from pyvdrive.interface import LogPickerWindow
-from pyvdrive.interface import LogSnapView
 from pyvdrive.interface.vcommand_processor import VdriveCommandProcessor
-from pyvdrive.interface import VDrivePlotDataBinning
-from pyvdrive.interface import configwindow
 from pyvdrive.interface import config
-from pyvdrive.interface.gui.workspaceviewwidget import WorkspaceViewWidget
 
 """ import PyVDrive library """
 import pyvdrive as PyVDrive
 import pyvdrive.core.VDriveAPI as VdriveAPI
 
+# child windows are imported when they are launched for the first time
+PeakPickWindow = lazy_import.lazy_module('pyvdrive.interface.PeakPickWindow')
+snapgraphicsview = lazy_import.lazy_module('pyvdrive.interface.snapgraphicsview')
+ReducedDataView = lazy_import.lazy_module('pyvdrive.interface.ReducedDataView')
+AddRunsIPTS = lazy_import.lazy_module('pyvdrive.interface.AddRunsIPTS')
+LogPickerWindow = lazy_import.lazy_module('pyvdrive.interface.LogPickerWindow')
+LogSnapView = lazy_import.lazy_module('pyvdrive.interface.LogSnapView')
+VDrivePlotDataBinning = lazy_import.lazy_module('pyvdrive.interface.VDrivePlotDataBinning')
+configwindow = lazy_import.lazy_module('pyvdrive.interface.configwindow')
+# the workspace view (IPython terminal) imports IPython and Mantid
+WorkspaceViewWidget = lazy_import.lazy_attribute('pyvdrive.interface.gui.workspaceviewwidget', 'WorkspaceViewWidget')
+
 __author__ = 'wzz'
 
 # Define enumerate
@@ -754,9 +758,9 @@ class VdriveMainWindow(QMainWindow):
         sort_order = self.ui.checkBox_runsOrderDescend.isChecked()
 
         if sort_order is False:
-            self.ui.tableWidget_selectedRuns.sortByColumn(0, 0)
+            self.ui.tableWidget_selectedRuns.sort_by_column(0, 0)
         else:
-            self.ui.tableWidget_selectedRuns.sortByColumn(0, 1)
+            self.ui.tableWidget_selectedRuns.sort_by_column(0, 1)
 
         return
 
@@ -444,19 +444,24 @@ class AtomicReduction2DViewer(QMainWindow):
         assert len(size_set) == 1, 'All the reduced data must have equal sizes but not %s.' % str(size_set)
         vec_x = data_set_list[0][0]
 
-        # build mesh
-        grid_x, grid_y = np.meshgrid(vec_x, y_indexes)
+        # build matrix
+        matrix_y = np.array([data_set[1] for data_set in data_set_list], dtype='float')
 
-        matrix_y = np.ndarray(grid_x.shape, dtype='float')
-        for i in range(len(y_indexes)):
-            matrix_y[i] = data_set_list[i][1]
+        self.plot_contour_matrix(vec_x, np.array(y_indexes), matrix_y)
 
-        n = len(y_indexes)
-        vec_y = np.ndarray(shape=(n,), dtype='int')
-        for i in range(n):
-            vec_y[i] = y_indexes[i]
+        return
+
+    def plot_contour_matrix(self, vec_x, vec_y, matrix_y):
+        """
+        plot 2D contour figure from a matrix
+        :param vec_x: vector for X axis
+        :param vec_y: indexes for Y axis.  It can be (1) run numbers  (2) chop sequences
+        :param matrix_y: 2D array (size of Y, size of X) for intensities
+        :return:
+        """
+        datatypeutility.check_numpy_arrays('Matrix of intensities', matrix_y, 2, False)
 
-        self.ui.graphicsView_mainPlot.canvas.add_contour_plot(vec_x, np.array(y_indexes), matrix_y)
+        self.ui.graphicsView_mainPlot.canvas.add_contour_plot(vec_x, vec_y, matrix_y)
 
         return
 
@@ -514,25 +519,26 @@ class AtomicReduction3DViewer(QMainWindow):
         assert len(sequences) == len(data_set_list), 'blabla not equal'
 
         # convert
-        line_points = data_set_list[0][0].size
-        line_number = len(sequences)
+        matrix_y = np.array([data_set[1] for data_set in data_set_list], dtype='float')
 
-        sequence_vec = np.array(sequences)
-        matrix_shape = line_number, line_points
+        self.plot_matrix_3d(data_set_list[0][0], np.array(sequences), matrix_y)
 
-        sequence_matrix = np.ndarray(matrix_shape, dtype='float')
-        vec_x_matrix = np.ndarray(matrix_shape, dtype='float')
-        vec_y_matrix = np.ndarray(matrix_shape, dtype='float')
+        return
 
-        for i in range(line_number):
-            sequence_matrix[i] = sequence_vec[i]
-            vec_x_matrix[i] = data_set_list[i][0]
-            vec_y_matrix[i] = data_set_list[i][1]
-        # END-FOR(i)
+    def plot_matrix_3d(self, vec_x, sequences, matrix_y):
+        """
+        plot the lines of a matrix in 3D
+        :param vec_x: vector X shared by all the lines
+        :param sequences: vector of run numbers or chop sequences
+        :param matrix_y: 2D array (number of sequences, size of X)
+        :return:
+        """
+        datatypeutility.check_numpy_arrays('Matrix of intensities', matrix_y, 2, False)
 
-        flatten_vec_seq = sequence_matrix.flatten()
-        flatten_vec_x = vec_x_matrix.flatten()
-        flatten_vec_y = vec_y_matrix.flatten()
+        num_lines, line_points = matrix_y.shape
+        flatten_vec_seq = np.repeat(np.asarray(sequences, dtype='float'), line_points)
+        flatten_vec_x = np.tile(vec_x, num_lines)
+        flatten_vec_y = matrix_y.ravel()
 
         self.ui.graphicsView_mainPlot.plot_surface_lines(
             flatten_vec_seq, flatten_vec_x, flatten_vec_y)
@@ -569,7 +569,7 @@ class DiffractionPlotView(mplgraphicsview.MplGraphicsView):
         #     right_index -= 1
 
         line_id = self.add_plot_1d(vec_x[left_index:right_index], vec_y[left_index:right_index], color=color,
-                                   marker=None, line_width=2)
+                                   marker=None, line_width=2, animated=True)
 
         self._highlightsPlotIDList.append(line_id)
 
@@ -5,6 +5,8 @@ from pyvdrive.interface.gui.mplgraphicsview import MplGraphicsView
 from pyvdrive.interface.gui.mplgraphicsview1d import MplGraphicsView1D
 from pyvdrive.interface.gui.mplgraphicsview2d import MplGraphicsView2D
 from pyvdrive.core import datatypeutility
+from pyvdrive.core import image_raster
+from pyvdrive.core import log_decimation
 
 
 class GeneralPurpose1DView(MplGraphicsView1D):
@@ -269,6 +271,10 @@ class GeneralPurpose1DView(MplGraphicsView1D):
         if color is None:
             color = 'blue'
 
+        # decimate the log to the resolution of canvas with minimum and maximum kept
+        time_vec, value_vec = log_decimation.decimate_min_max(numpy.asarray(time_vec), numpy.asarray(value_vec),
+                                                              max(self.width(), 100))
+
         # plot (new or update)
         if update:
             if is_main:
@@ -360,6 +366,9 @@ class Live2DView(MplGraphicsView2D):
         """
         super(Live2DView, self).__init__(parent)
 
+        # raster of the last N patterns
+        self._imageRaster = None
+
         return
 
     # TEST - 20180730
@@ -369,70 +378,84 @@ class Live2DView(MplGraphicsView2D):
         """
         super(Live2DView, self).evt_toolbar_home()
 
-        # zoom the image back???
+        # rebin the raster back to the full X range
+        if self._imageRaster is not None:
+            vec_x = self._imageRaster.vec_x
+            self._imageRaster.set_x_range(max(0.3, vec_x[0]), min(3.0, vec_x[-1]), self._get_number_pixels())
+            self.canvas.update_raster_image(self._imageRaster)
+
+        return
+
+    def evt_zoom_released(self):
+        """ event for zoom is released: rebin the raster to the zoomed-in X range
+        @return:
+        """
+        super(Live2DView, self).evt_zoom_released()
+
+        if self._imageRaster is not None and self._zoomInXRange is not None:
+            self._imageRaster.set_x_range(self._zoomInXRange[0], self._zoomInXRange[1], self._get_number_pixels())
+            self.canvas.update_raster_image(self._imageRaster)
 
         return
 
-    def plot_contour(self, data_set_dict):
-        """ Plot 2D data as a contour plot
-        :param data_set_dict: dictionary such that
+    def _get_number_pixels(self):
+        """ get the number of pixels along X of the canvas for rebinning
+        :return:
+        """
+        return max(self.canvas.get_width_height()[0], 100)
+
+    def plot_contour(self, data_set_dict, num_rows=None, data_key=None):
+        """ Plot 2D data as an image.  Only the patterns newer than the last one on the image are appended if
+        the image has been plotted with the same X and data set
+        :param data_set_dict: dictionary such that key = accumulation index, value = (vec_x, vec_y)
+        :param num_rows: number of patterns (last N) shown.  None for the number of patterns in data_set_dict
+        :param data_key: key of the data set such as 2D mode.  The image is rebuilt if it is changed
         :return:
         """
-        # Check inputs
         # Check inputs
         datatypeutility.check_dict('Input data set', data_set_dict)
+        if num_rows is None:
+            num_rows = len(data_set_dict)
 
-        # TEST/TODO - Find out the status in real time test
-        print('[DB...FIND] About to plot contour... Is Zoom From Home = {}, Home XY Limit = {}, '
-              'Current X limit = {}'.format(self._isZoomedFromHome, self._homeXYLimit,
-                                            self._zoomInXRange))
-
-        # record current setup
-        if self.has_image_on_canvas():
-            print('[DB...BAT] Do I have Image? {}'.format(self.has_image_on_canvas()))
-            self._zoomInXRange = self.canvas.getXLimit()
-
-        # construct the vectors for 2D contour plot
-        x_list = sorted(data_set_dict.keys())
-        vec_x = data_set_dict[x_list[0]][0]
-        vec_y = numpy.array(x_list)
-        size_x = len(vec_x)
-
-        # create matrix on mesh
-        grid_shape = len(vec_y), len(vec_x)
-        matrix_y = numpy.ndarray(grid_shape, dtype='float')
-        matrix_index = 0
-        for index in vec_y:
-            # vector X
-            vec_x_i = data_set_dict[index][0]
-            if len(vec_x_i) != size_x:
-                raise RuntimeError('Unable to form a contour plot because {0}-th vector has a different size {1} '
-                                   'than first size {2}'.format(index, len(vec_x_i), size_x))
-            # END-IF
-            # vector Y: each row will have the value of a pattern
-
-            matrix_y[matrix_index] = data_set_dict[index][1]
-            matrix_index += 1
+        # X range of a new image: user defined unless zoomed in
+        vec_x = data_set_dict[min(data_set_dict.keys())][0]
+        if self._zoomInXRange is None:
+            x_range = max(0.3, vec_x[0]), min(3.0, vec_x[-1])
+        else:
+            x_range = self._zoomInXRange
 
-        # END-FOR
+        self._imageRaster, new_image = image_raster.update_raster(self._imageRaster, data_set_dict, num_rows,
+                                                                  self._get_number_pixels(), x_range, data_key)
 
         # plot
-        self.canvas.add_contour_plot(vec_x, vec_y, matrix_y)
-
-        if self._zoomInXRange is None:
-            # no zoom in: set to user defined
-            x_min = 0.3
-            x_max = 3.0
+        if new_image:
+            self.canvas.add_raster_image(self._imageRaster)
         else:
-            # zoom is pressed down and already zoomed
-            x_min = self._zoomInXRange[0]
-            x_max = self._zoomInXRange[1]
-        self.setXYLimit(xmin=x_min, xmax=x_max)
+            self.canvas.update_raster_image(self._imageRaster)
 
         # update flag
         self._hasImage = True
 
         return
+
+    @property
+    def number_rows(self):
+        """ number of patterns (last N) of the image.  0 for no image
+        :return:
+        """
+        if self._imageRaster is None:
+            return 0
+        return self._imageRaster.number_rows
+
+    @property
+    def data_key(self):
+        """ key of the data set on the image.  None for no image
+        :return:
+        """
+        if self._imageRaster is None:
+            return None
+        return self._imageRaster.data_key
+
 # END-DEF-CLASS ()
 
 
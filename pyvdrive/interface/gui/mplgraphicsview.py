@@ -4,19 +4,23 @@ import numpy as np
 
 try:
     import qtconsole.inprocess  # noqa: F401
-    from PyQt5.QtCore import pyqtSignal
+    from PyQt5.QtCore import pyqtSignal, QTimer
     from PyQt5.QtWidgets import QWidget, QSizePolicy, QVBoxLayout
     from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
     from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar2
 except ImportError:
     from PyQt4.QtGui import QWidget, QSizePolicy, QVBoxLayout
-    from PyQt4.QtCore import pyqtSignal
+    from PyQt4.QtCore import pyqtSignal, QTimer
     from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg as FigureCanvas
     from matplotlib.backends.backend_qt4agg import NavigationToolbar2QT as NavigationToolbar2
 
 from matplotlib.figure import Figure
+from matplotlib.collections import Collection, LineCollection
 import matplotlib.image
 
+# interval (ms) to coalesce the requests to redraw animated artists (indicators, pickers and highlights)
+BLIT_INTERVAL = 10
+
 MplLineStyles = ['-', '--', '-.', ':', 'None', ' ', '']
 MplLineMarkers = [
     ". (point         )",
@@ -422,19 +426,20 @@ class MplGraphicsView(QWidget):
 
         return
 
-    def add_line_set(self, vec_set, color, marker, line_style, line_width):
+    def add_line_set(self, vec_set, color, marker, line_style, line_width, animated=False):
         """ Add a set of line and manage together
         :param vec_set:
         :param color:
         :param marker:
         :param line_style:
         :param line_width:
+        :param animated: flag to redraw the lines by blitting as they are updated
         :return:
         """
         key_list = list()
         for vec_x, vec_y in vec_set:
             temp_key = self._myCanvas.add_plot_1d(vec_x, vec_y, color=color, marker=marker,
-                                                  line_style=line_style, line_width=line_width)
+                                                  line_style=line_style, line_width=line_width, animated=animated)
             assert isinstance(temp_key, int)
             assert temp_key >= 0
             key_list.append(temp_key)
@@ -442,7 +447,7 @@ class MplGraphicsView(QWidget):
         return key_list
 
     def add_plot_1d(self, vec_x, vec_y, y_err=None, color=None, label='', x_label=None, y_label=None,
-                    marker=None, marker_size=None, line_style=None, line_width=1, show_legend=True):
+                    marker=None, marker_size=None, line_style=None, line_width=1, show_legend=True, animated=False):
         """
         Add a 1-D plot to canvas
         :param vec_x:
@@ -456,6 +461,7 @@ class MplGraphicsView(QWidget):
         :param line_style:
         :param line_width:
         :param show_legend:
+        :param animated: flag to redraw the line by blitting (for highlights updated frequently)
         :return:
         """
         # check whether the input is empty
@@ -470,7 +476,7 @@ class MplGraphicsView(QWidget):
 
         line_key = self._myCanvas.add_plot_1d(vec_x[:len(vec_y)], vec_y, y_err, color, label, x_label, y_label,
                                               marker, marker_size,
-                                              line_style, line_width, show_legend)
+                                              line_style, line_width, show_legend, animated)
 
         # record min/max
         self._statDict[line_key] = min(vec_x), max(vec_x), min(vec_y), max(vec_y)
@@ -478,6 +484,48 @@ class MplGraphicsView(QWidget):
 
         return line_key
 
+    def add_line_collection(self, segment_list, color_list, line_width=1):
+        """
+        Add a set of line segments as one single plot (matplotlib LineCollection) to canvas
+        :param segment_list: list of 2D array (N x 2) as (x, y) of each segment
+        :param color_list: list of colors (one for each segment) or a single color
+        :param line_width:
+        :return: key of the plot (same as a 1D line)
+        """
+        if len(segment_list) == 0:
+            raise RuntimeError('Unable to add a line collection without any segment')
+
+        line_key = self._myCanvas.add_line_collection(segment_list, color_list, line_width)
+
+        # record min/max
+        vec_x = np.concatenate([segment[:, 0] for segment in segment_list])
+        vec_y = np.concatenate([segment[:, 1] for segment in segment_list])
+        self._statDict[line_key] = vec_x.min(), vec_x.max(), vec_y.min(), vec_y.max()
+        self._my1DPlotDict[line_key] = ''
+
+        return line_key
+
+    def add_scatter(self, vec_x, vec_y, color_list, marker='o', marker_size=3):
+        """
+        Add scattered points with individual colors as one single plot (matplotlib PathCollection) to canvas
+        :param vec_x:
+        :param vec_y:
+        :param color_list: list of colors (one for each point) or a single color
+        :param marker:
+        :param marker_size:
+        :return: key of the plot (same as a 1D line)
+        """
+        if len(vec_x) == 0:
+            raise RuntimeError('Unable to add a scatter plot without any point')
+
+        line_key = self._myCanvas.add_scatter(vec_x, vec_y, color_list, marker, marker_size)
+
+        # record min/max
+        self._statDict[line_key] = min(vec_x), max(vec_x), min(vec_y), max(vec_y)
+        self._my1DPlotDict[line_key] = ''
+
+        return line_key
+
     def add_plot_1d_right(self, vec_x, vec_y, color=None, label='', marker=None, line_style=None, line_width=1):
         """
         Add 1 line (1-d plot) to right axis
@@ -533,7 +581,7 @@ class MplGraphicsView(QWidget):
         canvas_line_index = self.add_line_set(vec_set, color=color,
                                               marker=self._myIndicatorsManager.get_marker(),
                                               line_style=self._myIndicatorsManager.get_line_style(),
-                                              line_width=1)
+                                              line_width=1, animated=True)
         self._myIndicatorsManager.set_canvas_line_index(my_id, canvas_line_index)
 
         return my_id
@@ -563,7 +611,7 @@ class MplGraphicsView(QWidget):
         canvas_line_index = self._myCanvas.add_plot_1d(vec_x=vec_x, vec_y=vec_y,
                                                        color=color, marker=self._myIndicatorsManager.get_marker(),
                                                        line_style=self._myIndicatorsManager.get_line_style(),
-                                                       line_width=1)
+                                                       line_width=1, animated=True)
 
         self._myIndicatorsManager.set_canvas_line_index(my_id, canvas_line_index)
 
@@ -605,7 +653,7 @@ class MplGraphicsView(QWidget):
         canvas_line_index = self._myCanvas.add_plot_1d(vec_x=vec_x, vec_y=vec_y,
                                                        color=color, marker=self._myIndicatorsManager.get_marker(),
                                                        line_style=self._myIndicatorsManager.get_line_style(),
-                                                       line_width=1)
+                                                       line_width=1, animated=True)
         # add to 1DPlotDict too
         self._my1DPlotDict[canvas_line_index] = my_id
 
@@ -1133,6 +1181,16 @@ class Qt4MplCanvas(FigureCanvas):
         self._lineDict = {}
         self._lineIndex = 0
 
+        # blitting: the static background is cached after each full draw.  Animated lines (indicators, pickers
+        # and highlights) are redrawn on top of it.  Requests to redraw them are coalesced by a timer.
+        self._animatedKeySet = set()
+        self._background = None
+        self._blitTimer = QTimer(self)
+        self._blitTimer.setSingleShot(True)
+        self._blitTimer.setInterval(BLIT_INTERVAL)
+        self._blitTimer.timeout.connect(self._blit)
+        self.mpl_connect('draw_event', self._on_draw_event)
+
         # legend and color bar
         self._colorBar = None
         self._isLegendOn = False
@@ -1165,7 +1223,7 @@ class Qt4MplCanvas(FigureCanvas):
         return
 
     def add_plot_1d(self, vec_x, vec_y, y_err=None, color=None, label="", x_label=None, y_label=None,
-                    marker=None, marker_size=None, line_style=None, line_width=1, show_legend=True):
+                    marker=None, marker_size=None, line_style=None, line_width=1, show_legend=True, animated=False):
         """
         :param vec_x: numpy array X
         :param vec_y: numpy array Y
@@ -1178,6 +1236,7 @@ class Qt4MplCanvas(FigureCanvas):
         :param line_style:
         :param line_width:
         :param show_legend:
+        :param animated: flag to exclude the line from the cached background and redraw it by blitting
         :return: new key
         """
         # Check input
@@ -1222,7 +1281,7 @@ class Qt4MplCanvas(FigureCanvas):
         if plot_error is False:
             # return: list of matplotlib.lines.Line2D object
             r = self.axes.plot(vec_x, vec_y, color=color, marker=marker, markersize=marker_size, linestyle=line_style,
-                               label=label, linewidth=line_width)
+                               label=label, linewidth=line_width, animated=animated)
         else:
             r = self.axes.errorbar(vec_x, vec_y, yerr=y_err, color=color, marker=marker, markersize=marker_size,
                                    linestyle=line_style,
@@ -1250,6 +1309,50 @@ class Qt4MplCanvas(FigureCanvas):
             for i_r in range(len(r)):
                 msg += 'r[%d] = %s\n' % (i_r, str(r[i_r]))
             raise NotImplementedError(msg)
+        if animated and plot_error is False:
+            self._animatedKeySet.add(line_key)
+
+        # Flush/commit
+        self.draw()
+
+        return line_key
+
+    def add_line_collection(self, segment_list, color_list, line_width=1):
+        """
+        Add a set of line segments as one single matplotlib LineCollection
+        :param segment_list: list of 2D array (N x 2) as (x, y) of each segment
+        :param color_list: list of colors (one for each segment) or a single color
+        :param line_width:
+        :return: new key
+        """
+        collection = LineCollection(segment_list, colors=color_list, linewidths=line_width)
+        self.axes.add_collection(collection, autolim=False)
+
+        return self._register_collection(collection)
+
+    def add_scatter(self, vec_x, vec_y, color_list, marker='o', marker_size=3):
+        """
+        Add scattered points with individual colors as one single matplotlib PathCollection
+        :param vec_x:
+        :param vec_y:
+        :param color_list: list of colors (one for each point) or a single color
+        :param marker:
+        :param marker_size:
+        :return: new key
+        """
+        collection = self.axes.scatter(vec_x, vec_y, c=color_list, marker=marker, s=marker_size**2)
+
+        return self._register_collection(collection)
+
+    def _register_collection(self, collection):
+        """
+        Register a collection to line dictionary such that it can be removed as a 1D line
+        :param collection:
+        :return: new key
+        """
+        line_key = self._lineIndex
+        self._lineDict[line_key] = collection
+        self._lineIndex += 1
 
         # Flush/commit
         self.draw()
@@ -1414,11 +1517,15 @@ class Qt4MplCanvas(FigureCanvas):
     def clear_all_1d_plots(self):
         """ Remove all lines from the canvas
         """
-        for ikey in self._lineDict.keys():
+        for ikey in list(self._lineDict.keys()):
             plot = self._lineDict[ikey]
             if plot is None:
                 continue
-            if isinstance(plot, tuple) is False:
+            if isinstance(plot, Collection):
+                # line collection or scatter
+                plot.remove()
+                del self._lineDict[ikey]
+            elif isinstance(plot, tuple) is False:
                 try:
                     self.axes.lines.remove(plot)
                 except ValueError as e:
@@ -1435,6 +1542,7 @@ class Qt4MplCanvas(FigureCanvas):
                 del self._lineDict[ikey]
             # ENDIF(plot)
         # ENDFOR
+        self._animatedKeySet.clear()
 
         self._setup_legend()
 
@@ -1601,7 +1709,11 @@ class Qt4MplCanvas(FigureCanvas):
         lines = self.axes.lines
         assert isinstance(lines, list), 'Lines must be list'
 
-        if plot_key in self._lineDict:
+        if plot_key in self._lineDict and isinstance(self._lineDict[plot_key], Collection):
+            # line collection or scatter
+            self._lineDict[plot_key].remove()
+            del self._lineDict[plot_key]
+        elif plot_key in self._lineDict:
             try:
                 self.axes.lines.remove(self._lineDict[plot_key])
             except ValueError as r_error:
@@ -1610,6 +1722,7 @@ class Qt4MplCanvas(FigureCanvas):
                 raise RuntimeError(error_message)
             # remove the plot key from dictionary
             del self._lineDict[plot_key]
+            self._animatedKeySet.discard(plot_key)
         else:
             raise RuntimeError('Line with ID {} is not recorded.'.format(plot_key))
 
@@ -1679,10 +1792,80 @@ class Qt4MplCanvas(FigureCanvas):
             label = line.get_label()
         line.set_label(label)
 
+        if ikey in self._animatedKeySet:
+            # animated line (indicator) is not in legend: redraw it by blitting
+            self.request_blit()
+            return
+
         self._setup_legend()
 
         # commit
-        self.draw()
+        self.draw_idle()
+
+        return
+
+    def request_blit(self):
+        """
+        Request to redraw the animated lines over the cached background.
+        Requests within BLIT_INTERVAL are coalesced to one redraw
+        :return:
+        """
+        if not self._blitTimer.isActive():
+            self._blitTimer.start()
+
+        return
+
+    def _blit(self):
+        """
+        Restore the cached static background and redraw the animated lines only
+        :return:
+        """
+        if self._background is None:
+            # no background cached yet: full draw shall cache it
+            self.draw_idle()
+            return
+
+        self.restore_region(self._background)
+        self._draw_animated_lines()
+        self.blit(self.fig.bbox)
+
+        return
+
+    def _draw_animated_lines(self):
+        """
+        Draw the animated lines
+        :return:
+        """
+        for line_key in sorted(self._animatedKeySet):
+            self.fig.draw_artist(self._lineDict[line_key])
+
+        return
+
+    def _on_draw_event(self, event):
+        """
+        Handling event of a full draw: cache the static background (the animated lines are not drawn)
+        and then draw the animated lines on top of it
+        :param event:
+        :return:
+        """
+        self._background = self.copy_from_bbox(self.fig.bbox)
+        self._draw_animated_lines()
+
+        return
+
+    def set_line_data(self, ikey, vec_x, vec_y):
+        """
+        Set the data of a line without redrawing the canvas, for example, in a call back during zoom or pan
+        :param ikey:
+        :param vec_x:
+        :param vec_y:
+        :return:
+        """
+        if ikey not in self._lineDict:
+            raise KeyError('Line ID {} does not existing MPL existing keys: {}'
+                           ''.format(ikey, self._lineDict.keys()))
+
+        self._lineDict[ikey].set_data(vec_x, vec_y)
 
         return
 
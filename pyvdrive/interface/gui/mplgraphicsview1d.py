@@ -1347,8 +1347,8 @@ class Qt4MplCanvasMultiFigure(FigureCanvas):
 
         self._setup_legend(row_index, col_index, is_main=is_on_main)
 
-        # commit
-        self.draw()
+        # commit: coalesce the redraws of frequent updates (live data) to one
+        self.draw_idle()
 
         return
 
@@ -16,6 +16,7 @@ except ImportError:
 
 from matplotlib.figure import Figure
 import matplotlib.image
+from pyvdrive.core import image_raster
 
 MplLineStyles = ['-', '--', '-.', ':', 'None', ' ', '']
 MplLineMarkers = [
@@ -522,7 +523,10 @@ class Qt4Mpl2DCanvas(FigureCanvas):
         if use_contour:
             self._imagePlot = self.axes.contourf(grid_x, grid_y, matrix_z, 100)
         else:
-            self._imagePlot = self.axes.imshow(matrix_z,
+            # rebin to the pixels of canvas on a uniform X grid, which is what imshow assumes
+            image = image_raster.rebin_to_pixels(np.asarray(vec_x), matrix_z, grid_x.min(), grid_x.max(),
+                                                 max(self.get_width_height()[0], 100))
+            self._imagePlot = self.axes.imshow(image,
                                                extent=[grid_x.min(), grid_x.max(),
                                                        grid_y.min(), grid_y.max()],
                                                interpolation='none')
@@ -588,6 +592,39 @@ class Qt4Mpl2DCanvas(FigureCanvas):
 
         return
 
+    def add_raster_image(self, raster):
+        """ add (or replace) the image plot by a raster of patterns
+        :param raster: ImageRaster instance
+        :return:
+        """
+        self.axes.clear()
+        self._imagePlot = self.axes.imshow(raster.image, extent=raster.extent, origin='lower',
+                                           interpolation='nearest', aspect='auto')
+        self.axes.set_xlim(raster.x_range[0], raster.x_range[1])
+
+        self.draw_idle()
+
+        return
+
+    def update_raster_image(self, raster):
+        """ update the image plot by the raster in place with set_data() instead of re-plotting
+        :param raster: ImageRaster instance
+        :return:
+        """
+        if self._imagePlot is None or not isinstance(self._imagePlot, matplotlib.image.AxesImage):
+            self.add_raster_image(raster)
+            return
+
+        image = raster.image
+        self._imagePlot.set_data(image)
+        self._imagePlot.set_extent(raster.extent)
+        if image.size > 0:
+            self._imagePlot.set_clim(image.min(), image.max())
+
+        self.draw_idle()
+
+        return
+
     def add_image_file(self, imagefilename):
         """ Add an image by file
         """
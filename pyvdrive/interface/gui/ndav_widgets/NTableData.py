@@ -0,0 +1,348 @@
+# N(DAV)TableData
+# Column-wise numpy storage of a table for NTableModel.  Each column is a numpy array ('int', 'float', 'str' or
+# 'checkbox').  Sorting and filtering are done on a vector of row indexes (the view) without moving the data.
+# Rows and cells are addressed by their index in the view.  Cells are only formatted to text when requested.
+import numpy
+
+COLUMN_DTYPES = {'int': 'int64',
+                 'float': 'float64',
+                 'double': 'float64',
+                 'str': 'object',
+                 'checkbox': 'bool'}
+
+
+class NTableData(object):
+    """ Table of numpy columns with a sorted and filtered view
+    """
+
+    def __init__(self, column_tup_list):
+        """
+        initialization
+        :param column_tup_list: list of 2-tuple as string (column name) and string (data type)
+        """
+        assert isinstance(column_tup_list, list) and len(column_tup_list) > 0, \
+            'Columns {} must be given by a non-empty list'.format(column_tup_list)
+
+        self._column_names = list()
+        self._column_types = list()
+        for col_name, col_type in column_tup_list:
+            if col_type not in COLUMN_DTYPES:
+                raise RuntimeError('Column {} has type {} not in supported types {}'
+                                   ''.format(col_name, col_type, sorted(COLUMN_DTYPES.keys())))
+            self._column_names.append(col_name)
+            self._column_types.append(col_type)
+        # END-FOR
+
+        self._columns = [numpy.zeros(0, dtype=COLUMN_DTYPES[col_type]) for col_type in self._column_types]
+
+        # view: indexes of the rows (in storage) shown, sort key and filter
+        self._view_rows = numpy.zeros(0, dtype='int64')
+        self._sort_column = None
+        self._sort_descending = False
+        self._filter_column = None
+        self._filter_function = None
+
+        return
+
+    @property
+    def column_names(self):
+        return self._column_names[:]
+
+    @property
+    def column_types(self):
+        return self._column_types[:]
+
+    @property
+    def number_columns(self):
+        return len(self._column_names)
+
+    @property
+    def number_rows(self):
+        """ number of rows in the view (i.e., after filtering)
+        :return:
+        """
+        return self._view_rows.shape[0]
+
+    @property
+    def number_total_rows(self):
+        """ number of rows in storage
+        :return:
+        """
+        return self._columns[0].shape[0]
+
+    @property
+    def sort_column(self):
+        return self._sort_column
+
+    def _check_column(self, col_index):
+        if not 0 <= col_index < self.number_columns:
+            raise RuntimeError('Column index {} is out of range [0, {})'.format(col_index, self.number_columns))
+
+    def _check_view_rows(self, row_indexes):
+        """ convert row indexes of the view to storage indexes
+        :param row_indexes: integer or array-like
+        :return: integer or numpy array
+        """
+        num_rows = self.number_rows
+        if numpy.any(numpy.asarray(row_indexes) < 0) or numpy.any(numpy.asarray(row_indexes) >= num_rows):
+            raise RuntimeError('Row index {} is out of range [0, {})'.format(row_indexes, num_rows))
+
+        return self._view_rows[row_indexes]
+
+    def _convert_column(self, col_index, values):
+        """ convert the values of a column to its numpy type.  blank value (None or '') of a float column is NaN
+        :param col_index:
+        :param values: array-like
+        :return: numpy array
+        """
+        col_type = self._column_types[col_index]
+        if col_type == 'str':
+            vec_values = numpy.empty(len(values), dtype='object')
+            vec_values[:] = [str(value) for value in values]
+        elif col_type in ['float', 'double'] and not isinstance(values, numpy.ndarray):
+            vec_values = numpy.array([numpy.nan if value is None or value == '' else value for value in values],
+                                     dtype='float64')
+        else:
+            vec_values = numpy.asarray(values, dtype=COLUMN_DTYPES[col_type])
+
+        return vec_values
+
+    def _update_view(self):
+        """ rebuild the view from the filter and the sort key
+        :return:
+        """
+        view_rows = numpy.arange(self.number_total_rows)
+
+        if self._filter_function is not None:
+            mask = numpy.asarray(self._filter_function(self._columns[self._filter_column]), dtype='bool')
+            view_rows = view_rows[mask]
+
+        if self._sort_column is not None:
+            order = numpy.argsort(self._columns[self._sort_column][view_rows], kind='mergesort')
+            if self._sort_descending:
+                order = order[::-1]
+            view_rows = view_rows[order]
+
+        self._view_rows = view_rows
+
+        return
+
+    def append_columns(self, column_value_list):
+        """ append rows given as one array-like per column (bulk)
+        :param column_value_list: list of array-like with the same size
+        :return: number of rows appended
+        """
+        if len(column_value_list) != self.number_columns:
+            raise RuntimeError('Input number of columns ({}) is different from column number ({}).'
+                               ''.format(len(column_value_list), self.number_columns))
+        new_columns = [self._convert_column(col_index, values) for col_index, values in enumerate(column_value_list)]
+        num_new_rows = new_columns[0].shape[0]
+        if any(new_column.shape[0] != num_new_rows for new_column in new_columns):
+            raise RuntimeError('Input columns have different sizes: {}'
+                               ''.format([new_column.shape[0] for new_column in new_columns]))
+
+        for col_index, new_column in enumerate(new_columns):
+            self._columns[col_index] = numpy.concatenate([self._columns[col_index], new_column])
+        self._update_view()
+
+        return num_new_rows
+
+    def append_rows(self, row_value_list):
+        """ append rows (bulk)
+        :param row_value_list: list of rows, each of which is a list of values of all columns
+        :return: number of rows appended
+        """
+        if len(row_value_list) == 0:
+            return 0
+        for row_values in row_value_list:
+            if len(row_values) != self.number_columns:
+                raise RuntimeError('Input number of values ({}) is different from column number ({}).'
+                                   ''.format(len(row_values), self.number_columns))
+
+        return self.append_columns([list(column_values) for column_values in zip(*row_value_list)])
+
+    def find_rows(self, col_index, values):
+        """ find the first row in the view having each value in a column
+        :param col_index:
+        :param values: list of values
+        :return: numpy array of row indexes (in view) with -1 for the value not found
+        """
+        self._check_column(col_index)
+        vec_column = self._columns[col_index][self._view_rows]
+
+        row_indexes = numpy.zeros(len(values), dtype='int64') - 1
+        for i_value, value in enumerate(values):
+            matched = numpy.where(vec_column == value)[0]
+            if matched.shape[0] > 0:
+                row_indexes[i_value] = matched[0]
+        # END-FOR
+
+        return row_indexes
+
+    def format_value(self, row_index, col_index, num_decimal=7):
+        """ format the value of a cell to text
+        :param row_index:
+        :param col_index:
+        :param num_decimal: number of decimal points for float
+        :return: string. checkbox is formatted to empty string
+        """
+        value = self._columns[col_index][self._view_rows[row_index]]
+        col_type = self._column_types[col_index]
+
+        if col_type == 'checkbox':
+            value_str = ''
+        elif col_type in ['float', 'double']:
+            value_str = '' if numpy.isnan(value) else ('{0:.%df}' % num_decimal).format(value)
+        else:
+            value_str = str(value)
+
+        return value_str
+
+    def get_column(self, col_index):
+        """ get the values of a column in the order of the view
+        :param col_index:
+        :return: numpy array (copy)
+        """
+        self._check_column(col_index)
+
+        return self._columns[col_index][self._view_rows]
+
+    def get_rows(self, col_index, value):
+        """ get the rows in the view having a value in a column, e.g., all the checked rows
+        :param col_index:
+        :param value:
+        :return: list of row indexes
+        """
+        self._check_column(col_index)
+
+        return numpy.where(self._columns[col_index][self._view_rows] == value)[0].tolist()
+
+    def get_value(self, row_index, col_index, allow_blank=False):
+        """ get the value of a cell as python int, float, str or bool
+        :param row_index:
+        :param col_index:
+        :param allow_blank: blank float cell is returned as None if True
+        :return:
+        """
+        self._check_column(col_index)
+        value = self._columns[col_index][self._check_view_rows(row_index)]
+
+        col_type = self._column_types[col_index]
+        if col_type == 'int':
+            value = int(value)
+        elif col_type in ['float', 'double']:
+            if numpy.isnan(value):
+                if not allow_blank:
+                    raise RuntimeError('Cell ({}, {}) is blank'.format(row_index, col_index))
+                value = None
+            else:
+                value = float(value)
+        elif col_type == 'checkbox':
+            value = bool(value)
+
+        return value
+
+    def insert_rows(self, row_index, row_value_list):
+        """ insert rows before a row of the view.  if the view is sorted, the new rows are placed by the sort key
+        :param row_index: row index in view; number of rows to append
+        :param row_value_list: list of rows
+        :return:
+        """
+        if row_index == self.number_rows:
+            return self.append_rows(row_value_list)
+        storage_index = self._check_view_rows(row_index)
+
+        new_columns = [self._convert_column(col_index, column_values)
+                       for col_index, column_values in enumerate(zip(*row_value_list))]
+        for col_index, new_column in enumerate(new_columns):
+            self._columns[col_index] = numpy.insert(self._columns[col_index], storage_index, new_column)
+        self._update_view()
+
+        return len(row_value_list)
+
+    def remove_rows(self, row_index_list):
+        """ remove rows of the view
+        :param row_index_list: list of row indexes in view
+        :return:
+        """
+        if len(row_index_list) == 0:
+            return
+        storage_indexes = self._check_view_rows(numpy.asarray(row_index_list, dtype='int64'))
+
+        for col_index in range(self.number_columns):
+            self._columns[col_index] = numpy.delete(self._columns[col_index], storage_indexes)
+        self._update_view()
+
+        return
+
+    def remove_all_rows(self):
+        """ remove all the rows including those filtered out
+        :return:
+        """
+        self._columns = [column[:0] for column in self._columns]
+        self._update_view()
+
+        return
+
+    def set_column_values(self, col_index, values, row_index_list=None):
+        """ set the values of a column in the view (bulk)
+        :param col_index:
+        :param values: a single value or array-like in the order of the view (or of row_index_list)
+        :param row_index_list: None for all the rows in view
+        :return:
+        """
+        self._check_column(col_index)
+        if row_index_list is None:
+            storage_indexes = self._view_rows
+        else:
+            storage_indexes = self._check_view_rows(numpy.asarray(row_index_list, dtype='int64'))
+
+        if numpy.isscalar(values) or values is None:
+            values = [values] * storage_indexes.shape[0]
+        self._columns[col_index][storage_indexes] = self._convert_column(col_index, values)
+        if col_index in [self._sort_column, self._filter_column]:
+            self._update_view()
+
+        return
+
+    def set_filter(self, col_index, filter_function):
+        """ show only the rows passing a filter on a column
+        :param col_index: None to remove filter
+        :param filter_function: function to map the numpy array of the column to a boolean array
+        :return:
+        """
+        if col_index is None:
+            self._filter_column = None
+            self._filter_function = None
+        else:
+            self._check_column(col_index)
+            self._filter_column = col_index
+            self._filter_function = filter_function
+        self._update_view()
+
+        return
+
+    def set_value(self, row_index, col_index, value):
+        """ set the value of a cell
+        :param row_index:
+        :param col_index:
+        :param value:
+        :return:
+        """
+        self.set_column_values(col_index, [value], [row_index])
+
+        return
+
+    def sort(self, col_index, descending=False):
+        """ sort the view by a column (stable)
+        :param col_index: None to restore the order in storage
+        :param descending:
+        :return:
+        """
+        if col_index is not None:
+            self._check_column(col_index)
+        self._sort_column = col_index
+        self._sort_descending = descending
+        self._update_view()
+
+        return
@@ -0,0 +1,453 @@
+#pylint: disable=C0103,R0904  # noqa: E265
+# N(DAV)TableView
+# QTableView over a QAbstractTableModel backed by numpy columns (NTableData).  Cells are formatted only when the
+# view paints them, and rows are added, removed or updated in bulk with one model signal per operation instead
+# of one QTableWidgetItem per cell.  The view keeps the API of NTableWidget.
+#
+try:
+    import qtconsole.inprocess  # noqa: F401
+    from PyQt5 import QtCore
+    from PyQt5.QtWidgets import QTableView, QAbstractItemView
+except ImportError:
+    from PyQt4 import QtCore
+    from PyQt4.QtGui import QTableView, QAbstractItemView
+from pyvdrive.interface.gui.ndav_widgets.NTableData import NTableData
+
+
+class NTableModel(QtCore.QAbstractTableModel):
+    """
+    Table model over NTableData
+    """
+    def __init__(self, column_tup_list, parent=None, num_decimal=7):
+        """
+        initialization
+        :param column_tup_list: list of 2-tuple as string (column name) and string (data type)
+        :param parent:
+        :param num_decimal: number of decimal points for floating
+        """
+        super(NTableModel, self).__init__(parent)
+
+        self._tableData = NTableData(column_tup_list)
+        self._numDecimal = num_decimal
+
+        return
+
+    @property
+    def table_data(self):
+        return self._tableData
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._tableData.number_rows
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._tableData.number_columns
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """ cell value for the view: formatted lazily
+        :param index:
+        :param role:
+        :return:
+        """
+        if not index.isValid():
+            return None
+
+        row_index = index.row()
+        col_index = index.column()
+        is_checkbox = self._tableData.column_types[col_index] == 'checkbox'
+
+        if role == QtCore.Qt.DisplayRole and not is_checkbox:
+            return self._tableData.format_value(row_index, col_index, self._numDecimal)
+        elif role == QtCore.Qt.CheckStateRole and is_checkbox:
+            if self._tableData.get_value(row_index, col_index):
+                return QtCore.Qt.Checked
+            return QtCore.Qt.Unchecked
+
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if self._tableData.column_types[index.column()] == 'checkbox':
+            flags |= QtCore.Qt.ItemIsUserCheckable
+
+        return flags
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self._tableData.column_names[section]
+
+        return str(section + 1)
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        """ only check boxes can be changed from the view
+        :param index:
+        :param value:
+        :param role:
+        :return:
+        """
+        if not index.isValid() or role != QtCore.Qt.CheckStateRole:
+            return False
+
+        self._tableData.set_value(index.row(), index.column(), value == QtCore.Qt.Checked)
+        self.dataChanged.emit(index, index)
+
+        return True
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """ sort the view of the table (called by QTableView's header)
+        :param column:
+        :param order:
+        :return:
+        """
+        self.layoutAboutToBeChanged.emit()
+        self._tableData.sort(column, descending=order == QtCore.Qt.DescendingOrder)
+        self.layoutChanged.emit()
+
+        return
+
+    def append_columns(self, column_value_list):
+        """ append rows given as one array-like per column in one operation
+        :param column_value_list:
+        :return:
+        """
+        self.beginResetModel()
+        try:
+            self._tableData.append_columns(column_value_list)
+        finally:
+            self.endResetModel()
+
+        return
+
+    def append_rows(self, row_value_list):
+        """ append rows in one operation
+        :param row_value_list: list of rows
+        :return:
+        """
+        if len(row_value_list) == 0:
+            return
+
+        # rows of a sorted table are not appended at the end
+        self.beginResetModel()
+        try:
+            self._tableData.append_rows(row_value_list)
+        finally:
+            self.endResetModel()
+
+        return
+
+    def insert_rows(self, row_index, row_value_list):
+        self.beginResetModel()
+        try:
+            self._tableData.insert_rows(row_index, row_value_list)
+        finally:
+            self.endResetModel()
+
+        return
+
+    def remove_rows(self, row_index_list):
+        self.beginResetModel()
+        try:
+            self._tableData.remove_rows(row_index_list)
+        finally:
+            self.endResetModel()
+
+        return
+
+    def remove_all_rows(self):
+        self.beginResetModel()
+        self._tableData.remove_all_rows()
+        self.endResetModel()
+
+        return
+
+    def set_column_values(self, col_index, values, row_index_list=None):
+        """ set the values of a column (bulk)
+        :param col_index:
+        :param values:
+        :param row_index_list:
+        :return:
+        """
+        self.layoutAboutToBeChanged.emit()
+        try:
+            self._tableData.set_column_values(col_index, values, row_index_list)
+        finally:
+            self.layoutChanged.emit()
+        if self._tableData.number_rows > 0:
+            self.dataChanged.emit(self.index(0, col_index), self.index(self._tableData.number_rows - 1, col_index))
+
+        return
+
+    def set_filter(self, col_index, filter_function):
+        self.beginResetModel()
+        self._tableData.set_filter(col_index, filter_function)
+        self.endResetModel()
+
+        return
+
+
+class NTableView(QTableView):
+    """
+    NdavTableView: QTableView with NTableModel and the methods of NTableWidget
+    """
+    def __init__(self, parent):
+        """
+
+        :param parent:
+        :return:
+        """
+        QTableView.__init__(self, parent)
+
+        self._myParent = parent
+        self._myModel = None
+
+        self._statusColName = 'Status'
+
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+
+        return
+
+    @property
+    def table_data(self):
+        """ numpy storage of the table
+        :return: NTableData
+        """
+        return self._myModel.table_data
+
+    def _get_status_column(self):
+        """ get the index of the status (check box) column
+        :return:
+        """
+        if self._statusColName not in self.table_data.column_names:
+            raise RuntimeError('Status column {} is not set up in table with columns {}'
+                               ''.format(self._statusColName, self.table_data.column_names))
+
+        return self.table_data.column_names.index(self._statusColName)
+
+    def append_row(self, row_value_list, type_list=None, num_decimal=7):
+        """
+        append a row to the table
+        :param row_value_list:
+        :param type_list: not used.  types are defined in init_setup()
+        :param num_decimal: not used.  number of decimal points is defined in init_setup()
+        :return: 2-tuple as (boolean, message)
+        """
+        return self.append_rows([row_value_list])
+
+    def append_columns(self, column_value_list):
+        """
+        append multiple rows given as one array-like (e.g., numpy array) per column
+        :param column_value_list: list of array-like with the same size
+        :return: 2-tuple as (boolean, message)
+        """
+        try:
+            self._myModel.append_columns(column_value_list)
+        except (RuntimeError, ValueError, TypeError) as run_err:
+            return False, str(run_err)
+
+        return True, ''
+
+    def append_rows(self, row_value_list):
+        """
+        append multiple rows to the table at once
+        :param row_value_list: list of rows
+        :return: 2-tuple as (boolean, message)
+        """
+        try:
+            self._myModel.append_rows(row_value_list)
+        except (RuntimeError, ValueError, TypeError) as run_err:
+            return False, str(run_err)
+
+        return True, ''
+
+    def columnCount(self):
+        return self._myModel.columnCount()
+
+    def delete_rows(self, row_number_list):
+        """ Delete rows
+        :param row_number_list:
+        :return:
+        """
+        assert isinstance(row_number_list, list)
+        self._myModel.remove_rows(row_number_list)
+
+        return
+
+    def get_cell_value(self, row_index, col_index, allow_blank=False):
+        """
+        Get cell value
+        :param row_index:
+        :param col_index:
+        :param allow_blank:
+        :return: int/float/string/bool or None if allow_blank
+        """
+        return self.table_data.get_value(row_index, col_index, allow_blank)
+
+    def get_column_index(self, column_name):
+        """
+        Get column index by column name
+        :param column_name:
+        :return:
+        """
+        assert isinstance(column_name, str)
+
+        return self.table_data.column_names.index(column_name)
+
+    def get_row_value(self, row_index):
+        """
+        :param row_index:
+        :return: list of objects
+        """
+        if row_index < 0 or row_index >= self.rowCount():
+            raise IndexError('Index of row (%d) is out of range.' % row_index)
+
+        return [self.table_data.get_value(row_index, i_col, allow_blank=True)
+                for i_col in range(self.columnCount())]
+
+    def get_selected_rows(self, status=True):
+        """ Get the rows whose status (check box) is same as given status
+        :param status:
+        :return: list of row indexes that are selected
+        """
+        assert isinstance(status, bool)
+
+        return self.table_data.get_rows(self._get_status_column(), status)
+
+    def init_setup(self, column_tup_list, num_decimal=7):
+        """ Initial setup
+        :param column_tup_list: list of 2-tuple as string (column name) and string (data type)
+        :param num_decimal: number of decimal points for floating
+        :return:
+        """
+        assert isinstance(column_tup_list, list)
+        assert len(column_tup_list) > 0
+
+        # set default status column name
+        for c_name, c_type in column_tup_list:
+            if c_type == 'checkbox':
+                self._statusColName = c_name
+
+        self._myModel = NTableModel(column_tup_list, self, num_decimal)
+        self.setModel(self._myModel)
+
+        return
+
+    def remove_all_rows(self):
+        """
+        Remove all rows
+        :return:
+        """
+        self._myModel.remove_all_rows()
+
+        return
+
+    def remove_rows(self, row_number_list):
+        """ Remove rows
+        :param row_number_list:
+        :return: string as error message
+        """
+        assert isinstance(row_number_list, list)
+
+        num_rows = self.rowCount()
+        error_message = ''
+        for row_number in row_number_list:
+            if row_number >= num_rows:
+                error_message += 'Row %d is out of range.\n' % row_number
+        self._myModel.remove_rows([row_number for row_number in row_number_list if row_number < num_rows])
+
+        return error_message
+
+    def rowCount(self):
+        return self._myModel.rowCount()
+
+    def select_all_rows(self, status):
+        """
+        select or deselect all rows in the table
+        :param status:
+        :return: 2-tuple as (True, None) or (False, error message)
+        """
+        try:
+            status_col_index = self._get_status_column()
+        except RuntimeError as run_err:
+            return False, str(run_err)
+
+        self._myModel.set_column_values(status_col_index, bool(status))
+
+        return True, None
+
+    def set_column_values(self, col_index, values, row_index_list=None):
+        """ set values of a column at once
+        :param col_index:
+        :param values: single value or array-like
+        :param row_index_list: None for all rows
+        :return:
+        """
+        self._myModel.set_column_values(col_index, values, row_index_list)
+
+        return
+
+    def set_filter(self, col_index, filter_function):
+        """ show only the rows passing a filter
+        :param col_index: None to remove the filter
+        :param filter_function: function to map the numpy array of the column to a boolean array
+        :return:
+        """
+        self._myModel.set_filter(col_index, filter_function)
+
+        return
+
+    def set_status_column_name(self, name):
+        """
+        set the name of the status (check box) column
+        :param name:
+        :return:
+        """
+        assert isinstance(name, str), 'Given status column name must be a string but not %s.' % str(type(name))
+        assert name in self.table_data.column_names
+
+        self._statusColName = name
+
+        return
+
+    def sort_by_column(self, column_index, sort_order=0):
+        """
+        sort the rows by a column
+        :param column_index:
+        :param sort_order: 0 for ascending, 1 for descending
+        :return:
+        """
+        assert isinstance(column_index, int), \
+            'column_index must be an integer but not %s.' % str(type(column_index))
+        if column_index < 0:
+            column_index += self.columnCount()
+        assert sort_order == 0 or sort_order == 1
+
+        if sort_order == 0:
+            self.sortByColumn(column_index, QtCore.Qt.AscendingOrder)
+        else:
+            self.sortByColumn(column_index, QtCore.Qt.DescendingOrder)
+
+        return
+
+    def update_cell_value(self, row, col, value, number_decimal=7):
+        """
+        Update the value of a cell
+        :param row:
+        :param col:
+        :param value:
+        :param number_decimal: not used.  number of decimal points is defined in init_setup()
+        :return:
+        """
+        self._myModel.set_column_values(col, [value], [row])
+
+        return
+
+    # NTableWidget.set_value_cell()
+    set_value_cell = update_cell_value
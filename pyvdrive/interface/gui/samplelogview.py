@@ -10,7 +10,7 @@ except ImportError:
     from PyQt4.QtGui import QMenu, QAction, QCursor
 from pyvdrive.interface.gui import mplgraphicsview
 from pyvdrive.core import datatypeutility
-from pyvdrive.core import vdrivehelper
+from pyvdrive.core import log_decimation
 
 COLOR_LIST = ['red', 'green', 'black', 'cyan', 'magenta', 'yellow']
 
@@ -76,10 +76,15 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
         # container for segments plot
         self._splitterSegmentsList = list()
 
+        # decimated sample log: pyramid of the current log and maximum number of points to plot
+        self._currLogPyramid = None
+        self._currLogMaxPoints = None
+
         # define the event handling methods
         self._myCanvas.mpl_connect('button_press_event', self.on_mouse_press_event)
         self._myCanvas.mpl_connect('button_release_event', self.on_mouse_release_event)
         self._myCanvas.mpl_connect('motion_notify_event', self.on_mouse_motion)
+        self._myCanvas.axes.callbacks.connect('xlim_changed', self.evt_x_limit_changed)
 
         return
 
@@ -139,6 +144,17 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
 
         return nearest_picker_distance, nearest_picker_id
 
+    def _get_decimation_buckets(self):
+        """ number of buckets to decimate sample log: one bucket per pixel of the canvas unless the user
+        specifies a maximum number of points (each bucket has up to 4 points)
+        :return:
+        """
+        num_buckets = max(int(self._myCanvas.axes.bbox.width), 100)
+        if self._currLogMaxPoints is not None:
+            num_buckets = min(num_buckets, max(self._currLogMaxPoints // 4, 1))
+
+        return num_buckets
+
     def _remove_picker_from_range_dictionary(self, picker_id_to_remove):
         """
         remove an entry in the dictionary by value
@@ -272,6 +288,20 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
 
         return
 
+    def evt_x_limit_changed(self, axes):
+        """ re-decimate the sample log plotted for the new X range as zoom or pan
+        :param axes:
+        :return:
+        """
+        if self._currLogPyramid is None or self._currPlotID is None:
+            return
+
+        min_x, max_x = axes.get_xlim()
+        vec_x, vec_y = self._currLogPyramid.query(min_x, max_x, self._get_decimation_buckets())
+        self._myCanvas.set_line_data(self._currPlotID, vec_x, vec_y)
+
+        return
+
     def on_mouse_press_event(self, event):
         """
         determine whether the mode is on
@@ -482,13 +512,16 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
 
         return
 
-    def plot_sample_log(self, vec_x, vec_y, sample_log_name, plot_label, sample_log_name_x='Time'):
+    def plot_sample_log(self, vec_x, vec_y, sample_log_name, plot_label, sample_log_name_x='Time', max_points=None):
         """ plot sample log
+        The log is decimated to the resolution of the canvas (or max_points) by keeping the minimum and maximum
+        of each bucket and re-decimated as zoom and pan.
         :param vec_x:
         :param vec_y:
         :param sample_log_name: on Y-axis
         :param plot_label: label of log to plot
         :param sample_log_name_x: on X-axis
+        :param max_points: maximum number of points to plot. None for the resolution of the canvas
         :return:
         """
         # check
@@ -510,7 +543,17 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
         # add plot and register
         self.reset()
 
-        plot_id = self.add_plot_1d(vec_x, vec_y, x_label=sample_log_name_x,
+        # decimate log with time as X-axis
+        if max_points is not None:
+            datatypeutility.check_int_variable('Maximum number of points', max_points, (1, None))
+        self._currLogMaxPoints = max_points
+        if sample_log_name_x.startswith('Time'):
+            self._currLogPyramid = log_decimation.LogDecimationPyramid(vec_x, vec_y)
+            plot_x, plot_y = self._currLogPyramid.query(None, None, self._get_decimation_buckets())
+        else:
+            plot_x, plot_y = vec_x, vec_y
+
+        plot_id = self.add_plot_1d(plot_x, plot_y, x_label=sample_log_name_x,
                                    y_label=sample_log_name,
                                    label=plot_label, marker='.', color='blue', show_legend=True)
         self.set_title(title=plot_label)
@@ -606,6 +649,7 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
         self.clear_all_lines()
         self._currPlotID = None
         self._curr_log_name = None
+        self._currLogPyramid = None
 
         return
 
@@ -683,79 +727,38 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
 
         return
 
-    # TODO - TONIGHT 190 - It is meant to replace show_slicers
     def show_slicers_repetitions(self, vec_slicers_times, vec_target_ws):
+        """ show slicers with repeated targets by coloring the plotted sample log points by target
+        :param vec_slicers_times: slicers' boundaries (histogram)
+        :param vec_target_ws: target of each slicer (integer or string).  -1 or '-1' for not interested
+        :return:
+        """
+        # check state
+        if self._currPlotID is None:
+            raise RuntimeError('No sample log is plot now')
 
-        # TODO - FIXME - TODAY 190 - Need a use case for target as REAL string
-        vec_target_ws = vec_target_ws.astype('int16')
-        unique_target_ws_set = set(vec_target_ws)
-        # num_segments = len(unique_target_ws_set)
-        segment_list = sorted(list(unique_target_ws_set))
-        if -1 in segment_list:
-            minus_one_index = segment_list.index(-1)
-            segment_list.pop(minus_one_index)
-
-        print('[DB...BAT] Segments: {}'.format(segment_list))
-
-        # construct the data sets for each segments
-        seg_dict = dict()
-        for seg_id in segment_list:
-            seg_dict[seg_id] = None
-        # END-FOR
+        vec_target_ws = np.asarray(vec_target_ws)
+        is_ignored = log_decimation.is_ignored_target(vec_target_ws)
+        segment_list = np.unique(vec_target_ws[~is_ignored])
+        if segment_list.shape[0] == 0:
+            return
 
         vec_log_times, vec_log_value = self.canvas().get_data(self._currPlotID)
 
-        print('[DEBUG...BAT] Log X and Y: size = {}, {}'.format(vec_log_times.shape, vec_log_value.shape))
-
-        for i_target in range(vec_target_ws.shape[0] - 1):
-            # ignore the non-interesting section
-            if vec_target_ws[i_target] == -1:
-                continue
-            else:
-                target_name_i = vec_target_ws[i_target]
-
-            # from start and stop time to get the index for the current (plotted) log
-            t_start = vec_slicers_times[i_target]
-            t_stop = vec_slicers_times[i_target + 1]
-
-            # time_index_list = np.searchsorted(vec_log_times, [t_start, t_stop])  # TODO-TEST - replaced!
-            time_index_list = vdrivehelper.search_sorted_nearest(vec_log_times, [t_start, t_stop])
-            log_time0_index, log_timef_index = time_index_list
-
-            # # find the nearest
-            # if t_start - vec_log_times[log_time0_index-1] < vec_log_times[log_time0_index] - t_start:
-            #     log_time0_index -= 1
-            # if t_stop - vec_log_times[log_timef_index-1] < vec_log_times[log_timef_index] - t_stop:
-            #     log_timef_index -= 1
-
-            # construct the vector: get the partial for plot
-            vec_x_i = vec_log_times[log_time0_index:log_timef_index+1]
-            vec_y_i = vec_log_value[log_time0_index:log_timef_index+1]
-
-            print('[DB...BAT] Locate: Time range {}, {} @ ({}, {}) and ({}, {})'
-                  ''.format(t_start, t_stop, vec_log_times[log_time0_index], vec_log_value[log_time0_index],
-                            vec_log_times[log_timef_index], vec_log_value[log_time0_index]))
-
-            if seg_dict[target_name_i] is None:
-                seg_dict[target_name_i] = vec_x_i, vec_y_i
-            else:
-                new_vec_x = np.concatenate([seg_dict[target_name_i][0], vec_x_i])
-                new_vec_y = np.concatenate([seg_dict[target_name_i][1], vec_y_i])
-                seg_dict[target_name_i] = new_vec_x, new_vec_y
-        # END-FOR
+        # locate the slicer of each log point with one search
+        slicer_indexes = np.searchsorted(vec_slicers_times, vec_log_times, side='right') - 1
+        is_shown = (slicer_indexes >= 0) & (slicer_indexes < vec_target_ws.shape[0])
+        is_shown[is_shown] = ~is_ignored[slicer_indexes[is_shown]]
+        if not is_shown.any():
+            return
 
-        # Plot
-        num_color = len(COLOR_LIST)  # ['red', 'green', 'black', 'cyan', 'magenta', 'yellow']
-        for seg_index, target_index in enumerate(segment_list):
-            color_i = COLOR_LIST[seg_index % num_color]
-            vec_x_plot, vec_y_plot = seg_dict[seg_index]
+        # color by the order of target
+        color_indexes = np.searchsorted(segment_list, vec_target_ws[slicer_indexes[is_shown]]) % len(COLOR_LIST)
+        color_list = np.array(COLOR_LIST)[color_indexes]
 
-            # plot
-            seg_plot_index = self.add_plot_1d(vec_x_plot, vec_y_plot, color=color_i,
-                                              marker='o', marker_size=3,
-                                              line_style='none', line_width=2)
-            self._splitterSegmentsList.append(seg_plot_index)
-        # END-FOR
+        seg_plot_index = self.add_scatter(vec_log_times[is_shown], vec_log_value[is_shown], color_list,
+                                          marker='o', marker_size=3)
+        self._splitterSegmentsList.append(seg_plot_index)
 
         return
 
@@ -766,7 +769,6 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
         :param target_color_dict:
         :return:
         """
-        # TODO - TODAY 0 - Implement this in order not to mess up with highlight_slicers()
         # check state
         if self._currPlotID is None:
             raise RuntimeError('No sample log is plot now')
@@ -775,57 +777,29 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
             raise RuntimeError('Assumption that input is a histogram! Now vec x size = {},'
                                'vec y size = {}'.format(vec_times.shape, vec_targets.shape))
 
-        # get data from the figure
-        # Note: remove_all_lines() is nevered call in this class and LogPickerWindow
-        # TODO - TONIGHT 0 - Make this work!  This is where the bug coming from!
+        # get data from the parent as the plotted log is decimated
         full_log_vec_x, full_log_vec_y = self._myParent.get_sample_log_data(self._curr_log_name)
-        curr_vec_x, curr_vec_y = full_log_vec_x, full_log_vec_y
-        # END-IF
-
-        num_seg_to_show = vec_targets.shape[0]
 
-        for i_seg in range(num_seg_to_show):
-            # get start time and stop time
-            # skip the ignored ones
-            if vec_targets[i_seg] == '-1' or vec_targets[i_seg] == -1:
-                continue  # skip
-
-            # from start and stop time to get the index for the current (plotted) log
-            t_start = vec_times[i_seg]
-            t_stop = vec_times[i_seg + 1]
-
-            time_index_list = vdrivehelper.search_sorted_nearest(curr_vec_x, [t_start, t_stop])
-            log_time0_index, log_timef_index = time_index_list
-
-            # construct the vector: get the partial for plot
-            vec_x_i = curr_vec_x[log_time0_index:log_timef_index+1]
-            vec_y_i = curr_vec_y[log_time0_index:log_timef_index+1]
-
-            print('[DB...BAT] Locate: Time range {}, {} @ ({}, {}) and ({}, {})'
-                  ''.format(t_start, t_stop, curr_vec_x[log_time0_index], curr_vec_y[log_time0_index],
-                            curr_vec_x[log_timef_index], curr_vec_y[log_timef_index]))
-
-            # plot
-            target_name = vec_targets[i_seg]
-            color_i = target_color_dict[target_name]
-
-            seg_plot_index = self.add_plot_1d(vec_x_i, vec_y_i, marker=None, line_style='-', color=color_i,
-                                              line_width=2)
+        segment_list, seg_indexes = log_decimation.build_slicer_segments(full_log_vec_x, full_log_vec_y,
+                                                                         vec_times, vec_targets)
+        if len(segment_list) == 0:
+            return
 
-            self._splitterSegmentsList.append(seg_plot_index)
-        # END-FOR
+        color_list = [target_color_dict[target_name] for target_name in np.asarray(vec_targets)[seg_indexes]]
+        seg_plot_index = self.add_line_collection(segment_list, color_list, line_width=2)
+        self._splitterSegmentsList.append(seg_plot_index)
 
         return
 
-    def highlight_slicers(self, vec_times, vec_target_ws, color=None, max_segment_to_show=20):
+    def highlight_slicers(self, vec_times, vec_target_ws, color=None, max_segment_to_show=None):
         """
         show slicers on the canvas by plotting segment of sample logs
         :param vec_times:
         :param vec_target_ws:
+        :param color: None for coloring by target
+        :param max_segment_to_show: None for showing all the segments
         :return:
         """
-        print('[DB...BAT] Vector of times: {}'.format(vec_times))
-
         # check state
         if self._currPlotID is None:
             return True, 'No plot on the screen yet.'
@@ -834,67 +808,31 @@ class LogGraphicsView(mplgraphicsview.MplGraphicsView):
             raise NotImplementedError('Assumption that input is a histogram! Now vec x size = {},'
                                       'vec y size = {}'.format(vec_times.shape, vec_target_ws.shape))
 
-        # get data from the figure
-        # TODO - TODAY 190 - Check whether remove_all_lines() is ever called
-        print('[DB...BAT] Current Plot ID = {}'.format(self._currPlotID))
-        vec_x, vec_y = self.canvas().get_data(self._currPlotID)
-
-        print('[DB...BAT] Sample log vector X range: {}, {}'.format(vec_x[0], vec_x[-1]))
-        print('[DB...BAT] Slicer times range: {}, {}'.format(vec_times[0], vec_times[-1]))
-
-        num_color = len(COLOR_LIST)
-
         # if there are too many slicing segments, then only shows the first N segments
         if max_segment_to_show is None:
             num_seg_to_show = len(vec_target_ws)
         else:
-            datatypeutility.check_int_variable('Maximum segment to show', max_segment_to_show, (1, 100000))
+            datatypeutility.check_int_variable('Maximum segment to show', max_segment_to_show, (1, None))
             num_seg_to_show = min(len(vec_target_ws), max_segment_to_show)
 
-        for i_seg in range(num_seg_to_show):
-            # get start time and stop time
-            # skip the ignored ones
-            if vec_target_ws[i_seg] == '-1' or vec_target_ws[i_seg] == -1:
-                continue  # skip
-
-            x_start = vec_times[i_seg]
-            x_stop = vec_times[i_seg+1]
-            print('[DB...BAT] Segment {}: Time range = {}, {}'.format(i_seg, x_start, x_stop))
-
-            # get start time and stop time's index
-            i_start = (np.abs(vec_x - x_start)).argmin()
-            i_stop = (np.abs(vec_x - x_stop)).argmin()
-            if i_start == i_stop:
-                # empty!
-                print('[SampleLogView WARNING] splitter start @ {} ({}), stop @ {} ({}). '
-                      'Unable to generate time segment vector. FYI from index {} to {}: {}'
-                      ''.format(x_start, i_start, x_stop, i_stop, i_start-1, i_stop+1, vec_x[i_start-1:i_stop+2]))
-                continue
-            elif i_start > i_stop:
-                raise RuntimeError('It is impossible to have start index {0} > stop index {1}'
-                                   ''.format(i_start, i_stop))
-
-            print('[DB...BAT] Segment {}: Index range = {}, {}'.format(i_seg, i_start, i_stop))
-
-            # get the partial for plot
-            vec_x_i = vec_x[i_start:i_stop+1]
-            vec_y_i = vec_y[i_start:i_stop+1]
-
-            # plot
-            color_index = vec_target_ws[i_seg]
-            if color is None:
-                if isinstance(color_index, int):
-                    color_i = COLOR_LIST[color_index % num_color]
-                else:
-                    color_i = COLOR_LIST[i_seg % num_color]
+        # get data from the figure
+        vec_x, vec_y = self.canvas().get_data(self._currPlotID)
+        segment_list, seg_indexes = log_decimation.build_slicer_segments(vec_x, vec_y,
+                                                                         vec_times[:num_seg_to_show + 1],
+                                                                         vec_target_ws[:num_seg_to_show])
+
+        if len(segment_list) > 0:
+            # color by target if target is integer.  otherwise by slicer index
+            target_vec = np.asarray(vec_target_ws)[seg_indexes]
+            if color is not None:
+                color_list = color
+            elif np.issubdtype(target_vec.dtype, np.integer):
+                color_list = np.array(COLOR_LIST)[target_vec % len(COLOR_LIST)]
             else:
-                color_i = color
-
-            seg_plot_index = self.add_plot_1d(vec_x_i, vec_y_i, marker=None, line_style='-', color=color_i,
-                                              line_width=2)
-
+                color_list = np.array(COLOR_LIST)[seg_indexes % len(COLOR_LIST)]
+            seg_plot_index = self.add_line_collection(segment_list, color_list, line_width=2)
             self._splitterSegmentsList.append(seg_plot_index)
-        # END-FOR
+        # END-IF
 
         status = True
         error_msg = None
@@ -1,8 +1,9 @@
 import pyvdrive.interface.gui.ndav_widgets.NTableWidget as NdavTable
+import pyvdrive.interface.gui.ndav_widgets.NTableView as NdavTableView
 from pyvdrive.core import datatypeutility
 
 
-class DataSlicerSegmentTable(NdavTable.NTableWidget):
+class DataSlicerSegmentTable(NdavTableView.NTableView):
     """
     """
     TableSetupList = [('Start', 'float'),
@@ -13,7 +14,7 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
     def __init__(self, parent):
         """
         """
-        NdavTable.NTableWidget.__init__(self, parent)
+        NdavTableView.NTableView.__init__(self, parent)
 
         # Initialize some variables
         self._colIndexStart = -1
@@ -51,11 +52,12 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
         :return: None
         """
         num_rows = self.rowCount()
+        if num_rows <= 1:
+            return
 
         # fill the stop time by next row's start time
-        for ir in range(num_rows-1):
-            stop_time = self.get_cell_value(ir + 1, self._colIndexStart)
-            self.set_value_cell(ir, self._colIndexStop, stop_time)
+        vec_start = self.table_data.get_column(self._colIndexStart)
+        self.set_column_values(self._colIndexStop, vec_start[1:], list(range(num_rows - 1)))
 
         return
 
@@ -63,17 +65,7 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
         """ Return the sorted starting times
         :return:
         """
-        num_rows = self.rowCount()
-        start_time_list = list()
-
-        for ir in range(num_rows):
-            start_time = self.get_cell_value(ir, 0)
-            start_time_list.append(start_time)
-
-        start_time_list.sort()
-        print('[DB] Start Times: ', start_time_list)
-
-        return start_time_list
+        return sorted(self.table_data.get_column(self._colIndexStart).tolist())
 
     def get_splitter(self, row_number):
         """
@@ -91,7 +83,7 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
 
         # get result
         start_time = self.get_cell_value(row_number, 0)
-        stop_time = self.get_cell_value(row_number, 1)
+        stop_time = self.get_cell_value(row_number, 1, allow_blank=True)
         target = self.get_cell_value(row_number, 2)
 
         return start_time, stop_time, target
@@ -102,14 +94,11 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
         Note: splitters are relative time to run_start in unit of second
         :return: a list of 3-tuple as start time, stop time relative to run start
         """
-        split_tup_list = list()
-
         num_rows = self.rowCount()
-        for ir in range(num_rows):
-            selected = self.get_cell_value(ir, self._colIndexSelect)
-            if not selected:
-                continue
+        selected_rows = self.get_selected_rows(True)
 
+        split_tup_list = list()
+        for ir in selected_rows:
             # get start and stop time
             start_time = self.get_cell_value(ir, self._colIndexStart)
             stop_time = self.get_cell_value(ir, self._colIndexStop, allow_blank=True)
@@ -144,22 +133,14 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
         self.update_cell_value(row_number, self._colIndexStart, time_segments[0][0])
         self.update_cell_value(row_number, self._colIndexStop, time_segments[0][1])
 
-        # Insert the rest by inserting rows and set values
+        # Insert the rest as new rows after the original one at once
+        new_row_list = list()
         for index in range(1, len(time_segments)):
-            start_time = -0.1
-            stop_time = -0.1
-            target = ''
-            self.insert_row(row_number + 1, [start_time, stop_time, target, False])
+            target = time_segments[index][2] if len(time_segments[index]) >= 3 else ''
+            new_row_list.append([time_segments[index][0], time_segments[index][1], target, True])
         # END-FOR
-
-        # set value to all the rows belonged to that
-        for index in range(1, len(time_segments)):
-            self.update_cell_value(row_number + index, self._colIndexStart, time_segments[index][0])
-            self.update_cell_value(row_number + index, self._colIndexStop, time_segments[index][1])
-            if len(time_segments[index]) >= 3:
-                target = time_segments[index][2]
-                self.update_cell_value(row_number + index, self._colIndexTargetWS, target)
-            self.update_cell_value(row_number + index, self._colIndexSelect, True)
+        if len(new_row_list) > 0:
+            self._myModel.insert_rows(row_number + 1, new_row_list)
 
         return True, ''
 
@@ -195,6 +176,7 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
         self.remove_all_rows()
 
         # check it is type 1 (list of times) or type 2 (list of splitters)
+        row_list = list()
         if isinstance(time_slicer_list[0], tuple) or isinstance(time_slicer_list[0], list):
             # type 2: splitters
             for slicer_index, time_slicer_tup in enumerate(time_slicer_list):
@@ -203,20 +185,19 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
                                        ''.format(slicer_index, time_slicer_tup))
                 elif len(time_slicer_tup) == 2 or time_slicer_tup[2] is None:
                     # use automatic slicer order index as target workspace
-                    self.append_row([time_slicer_tup[0], time_slicer_tup[1], slicer_index+1, True])
+                    row_list.append([time_slicer_tup[0], time_slicer_tup[1], slicer_index+1, True])
                 else:
                     # use user specified as target workspace
-                    self.append_row([time_slicer_tup[0], time_slicer_tup[1], time_slicer_tup[2],
-                                     True])
+                    row_list.append([time_slicer_tup[0], time_slicer_tup[1], time_slicer_tup[2], True])
                 # END-IF-ELSE
             # END-FOR
+            self.append_rows(row_list)
         else:
             # type 1: list of time stamps: set time
-            for i_time in range(len(time_slicer_list)-1):
-                start_time = time_slicer_list[i_time]
-                stop_time = time_slicer_list[i_time+1]
-                self.append_row([start_time, stop_time, i_time, True])
-        # END-FOR
+            num_slicers = len(time_slicer_list) - 1
+            self.append_columns([time_slicer_list[:-1], time_slicer_list[1:], range(num_slicers),
+                                 [True] * num_slicers])
+        # END-IF-ELSE
 
         return
 
@@ -227,8 +208,7 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
         :param target:
         :return:
         """
-        for i_row in row_number_list:
-            self.update_cell_value(i_row, self._colIndexTargetWS, target)
+        self.set_column_values(self._colIndexTargetWS, target, row_number_list)
 
         return
 
@@ -256,20 +236,9 @@ class DataSlicerSegmentTable(NdavTable.NTableWidget):
     def sort_by_start_time(self):
         """ Sort table by start time and ignore the other columns
         """
-        # Get the values of the first column to a new list
-        num_rows = self.rowCount()
-        start_time_list = list()
-        for i_row in range(num_rows):
-            start_time = self.get_cell_value(i_row, self._colIndexStart)
-            start_time_list.append(start_time)
-        # END-FOR(i_row)
-
-        # Sort list
-        start_time_list.sort()
-
-        # Update the sorted list to table
-        for i_row in range(num_rows):
-            self.update_cell_value(i_row, self._colIndexStart, start_time_list[i_row])
+        vec_start = self.table_data.get_column(self._colIndexStart)
+        vec_start.sort()
+        self.set_column_values(self._colIndexStart, vec_start)
 
         return
 
@@ -897,13 +866,13 @@ Run_Selection_Table_Setup = [('Run Number', 'int'),
                              ('', 'checkbox')]
 
 
-class VdriveRunTableWidget(NdavTable.NTableWidget):
+class VdriveRunTableWidget(NdavTableView.NTableView):
     """
     """
     def __init__(self, parent):
         """
         """
-        NdavTable.NTableWidget.__init__(self, parent)
+        NdavTableView.NTableView.__init__(self, parent)
 
     def append_runs(self, run_list):
         """
@@ -911,8 +880,7 @@ class VdriveRunTableWidget(NdavTable.NTableWidget):
         :param run_list:
         :return:
         """
-        for run in run_list:
-            self.append_row([run, False])
+        self.append_columns([run_list, [False] * len(run_list)])
 
         return
 
@@ -923,12 +891,9 @@ class VdriveRunTableWidget(NdavTable.NTableWidget):
         row_num_list = self.get_selected_rows()
         col_index_run = Run_Selection_Table_Setup.index(('Run Number', 'int'))
 
-        run_number_list = list()
-        for i_row in sorted(row_num_list):
-            run_number = self.get_cell_value(i_row, col_index_run)
-            run_number_list.append(run_number)
+        vec_runs = self.table_data.get_column(col_index_run)
 
-        return run_number_list
+        return vec_runs[sorted(row_num_list)].tolist()
 
     def get_rows_by_run(self, run_list):
         """ Get row number/index for specified run numbers
@@ -937,19 +902,7 @@ class VdriveRunTableWidget(NdavTable.NTableWidget):
         """
         assert isinstance(run_list, list)
 
-        row_number_list = list()
-        num_rows = self.rowCount()
-        for run_number in run_list:
-            match_row_number = -1
-            for i_row in range(num_rows):
-                temp_row_number = self.get_cell_value(i_row, 0)
-                if run_number == temp_row_number:
-                    match_row_number = i_row
-                    break
-            row_number_list.append(match_row_number)
-        # END-FOR
-
-        return row_number_list
+        return self.table_data.find_rows(0, run_list).tolist()
 
     def setup(self):
         """
@@ -2,6 +2,8 @@ from pyvdrive.core import datatypeutility
 from pyvdrive.interface.gui import GuiUtility
 from mantid.simpleapi import CreateWorkspace, SmoothData, mtd
 from pyvdrive.core import mantid_helper
+from pyvdrive.core import cyclic_slicer
+from pyvdrive.core import splitter_builder
 from numpy import argrelextrema
 import numpy
 import h5py
@@ -121,18 +123,8 @@ class CyclicEventFilterSetupHelper(object):
         check_statistic(maxima_times_vec, maxima_value_vec, level='debug')
 
         # Step 2: map from smoothed data to raw data (real maxima)
-        max_index_set = set()
-        for max_index_i in local_maxima_indexes:
-            # search the nearby N = 5 points
-            i_start = max_index_i - num_neighbors
-            i_stop = max_index_i + num_neighbors
-            max_index_i = numpy.argmax(raw_vec_value[i_start:i_stop])
-            max_index_set.add(max_index_i + i_start)
-        # END-FOR
-
-        # convert to vector: set the max_index_set back to local_maxima_indexes
-        local_maxima_indexes = numpy.array(
-            sorted(list(max_index_set)))  # this local_maxima_indexes is optimized from previous local_maxima_indexes
+        # this local_maxima_indexes is optimized from previous local_maxima_indexes
+        local_maxima_indexes = cyclic_slicer.refine_local_maxima(raw_vec_value, local_maxima_indexes, num_neighbors)
         maxima_times_vec = raw_vec_times[local_maxima_indexes]
         maxima_value_vec = raw_vec_value[local_maxima_indexes]
 
@@ -149,26 +141,8 @@ class CyclicEventFilterSetupHelper(object):
 
         # Step 3: find (real) minima by finding minimum between 2 neighboring local maxima
         local_minima_indexes = numpy.ndarray(shape=(maxima_value_vec.shape[0] + 1,), dtype='int64')
-        for i_cycle in range(len(local_maxima_indexes) - 1):
-            # locate the minima
-            start_index_i = local_maxima_indexes[i_cycle]
-            stop_index_i = local_maxima_indexes[i_cycle + 1]
-            print('# index: start = {}, stop = {}, # points = {}'.format(start_index_i, stop_index_i,
-                                                                         stop_index_i - start_index_i))
-            vec_x_i = raw_vec_times[start_index_i:stop_index_i]
-            vec_y_i = raw_vec_value[start_index_i:stop_index_i]
-            print('[DEBUG] Cycle {}: Start @ {}, {}, Stop @ {}, {}'
-                  ''.format(i_cycle, vec_x_i[0], vec_y_i[0], vec_x_i[-1], vec_y_i[-1]))
-
-            # find local minima
-            min_index_i = numpy.argmin(vec_y_i)
-            print('[DEBUG]  {}-th Local minimum: X = {}, Y = {} @ index = {} ... total index = {}'
-                  ''.format(i_cycle + 1, vec_x_i[min_index_i], vec_y_i[min_index_i], min_index_i,
-                            start_index_i + min_index_i))
-
-            # store the result
-            local_minima_indexes[i_cycle + 1] = start_index_i + min_index_i
-        # END-FOR
+        local_minima_indexes[1:-1] = cyclic_slicer.segment_arg_extrema(raw_vec_value, local_maxima_indexes,
+                                                                       find_max=False)
 
         # add the first and last local minimum as the cycle starts and ends at lower temperature
         cycle_indexes_size = local_minima_indexes[2] - local_minima_indexes[1]
@@ -258,91 +232,47 @@ class CyclicEventFilterSetupHelper(object):
 
         return sample_log_dict
 
-    def export_event_splitters(self, splitter_list, file_name):
-        # check times
-        time_dict = dict()
-
-        # output buffer
-        output = '# start time (s)    stop time (s)    target\n'
-        for splitter in splitter_list:
-            start_time, stop_time, target = splitter
-
-            output += '%-15s %-15s %d\n' % ('{:.2f}'.format(start_time),
-                                            '{:.2f}'.format(stop_time), target)
-
-            if target not in time_dict:
-                time_dict[target] = 0
-            time_dict[target] += stop_time - start_time
-        # END-FOR
-
-        split_file = open(file_name, 'w')
-        split_file.write(output)
-        split_file.close()
+    def export_event_splitters(self, splitters, file_name):
+        """ export splitters to an ASCII file
+        :param splitters: SplitterArrays
+        :param file_name:
+        :return:
+        """
+        assert isinstance(splitters, splitter_builder.SplitterArrays), 'Splitters {} must be SplitterArrays but ' \
+                                                                       'not {}'.format(splitters, type(splitters))
+
+        vec_target_index, target_names = splitters.get_target_indexes()
+        splitter_table = numpy.zeros(splitters.number_splitters, dtype=[('start', 'f8'), ('stop', 'f8'),
+                                                                        ('target', 'U32')])
+        splitter_table['start'] = splitters.start_times
+        splitter_table['stop'] = splitters.stop_times
+        splitter_table['target'] = splitters.targets
+        numpy.savetxt(file_name, splitter_table, fmt='%-15.2f %-15.2f %s',
+                      header='start time (s)    stop time (s)    target', comments='# ')
 
         # output the time
-        for target in sorted(time_dict.keys()):
-            print('{}:  {}  seconds'.format(target, time_dict[target]))
+        vec_duration = numpy.bincount(vec_target_index, weights=splitters.stop_times - splitters.start_times)
+        for target_index in numpy.unique(vec_target_index):
+            print('{}:  {}  seconds'.format(splitters.targets[vec_target_index == target_index][0],
+                                            vec_duration[target_index]))
 
         return
 
     # TODO FIXME TONIGHT - This shall be moved to chop utility
     def set_cyclic_filters(self, raw_ws_name, local_minima_indexes, local_maxima_indexes, log_boundaries,
                            rising):
+        """ split the rising (or falling) edge of each cycle by log value boundaries
+        :param raw_ws_name:
+        :param local_minima_indexes:
+        :param local_maxima_indexes:
+        :param log_boundaries:
+        :param rising:
+        :return: SplitterArrays (target is the index of log value section)
+        """
         raw_ws = mtd[raw_ws_name]
 
-        # prototype for create the event filters
-        raw_vec_x = raw_ws.readX(0)
-        raw_vec_y = raw_ws.readY(0)
-
-        # skip for loop
-        # rising edge
-
-        splitter_list = list()  # start time, stop time, index
-        num_log_sections = log_boundaries.shape[0] - 1
-        splitter_index_list = list()
-
-        for i_cycle in range(local_maxima_indexes.shape[0]):
-            # each cycle
-            i_start = local_minima_indexes[i_cycle]
-            i_stop = local_maxima_indexes[i_cycle]
-
-            # local splitter boundaries indexes
-            splitter_index_vec = numpy.array([i_start, i_stop])
-
-            log_0 = log_boundaries[0]
-            pre_index = i_start + numpy.searchsorted(raw_vec_y[i_start:i_stop], log_0)
-            splitter_index_list.append(pre_index)
-
-            for i_log in range(num_log_sections):
-                log_i = log_boundaries[i_log + 1]
-                # index_i = numpy.searchsorted(raw_vec_y[i_start:i_stop], log_i)
-                # index_i += i_start
-                index_i = i_start + numpy.searchsorted(raw_vec_y[i_start:i_stop], log_i)
-                splitter_index_list.append(index_i)
-
-                # create entry
-                start_time_i = raw_vec_x[pre_index]
-                stop_time_i = raw_vec_x[index_i]
-
-                splitter_list.append([start_time_i, stop_time_i, i_log])
-
-                # print (index_i, type(index_i))
-                # splitter_index_vec = numpy.sort(splitter_index_vec)
-
-                # update
-                pre_index = index_i
-                # END-FOR (single cycle)
-        # END-IF
-
-        # debug output
-        if True:
-            splitter_index_vec = numpy.array(splitter_index_list)
-            splitter_times = raw_vec_x[splitter_index_vec]
-            splitter_refs = raw_vec_y[splitter_index_vec]
-            CreateWorkspace(DataX=splitter_times, DataY=splitter_refs, NSpec=1)
-        # END-IF
-
-        return splitter_list
+        return cyclic_slicer.generate_log_value_splitters(raw_ws.readX(0), raw_ws.readY(0), local_minima_indexes,
+                                                          local_maxima_indexes, log_boundaries, rising)
 
     def test_load_process_(self):
         """
@@ -16,6 +16,7 @@ from pyvdrive.interface.vdrive_commands import vmerge
 from pyvdrive.interface.vdrive_commands import view
 from pyvdrive.interface.vdrive_commands import vpeak
 from pyvdrive.interface.vdrive_commands import process_vcommand
+from pyvdrive.interface.vdrive_commands import command_engine
 from pyvdrive.core import datatypeutility
 import time
 from pyvdrive.core import vulcan_util
@@ -60,79 +61,21 @@ class VdriveCommandProcessor(object):
     @staticmethod
     def parse_command_arguments(command, command_args):
         """ Parse command arguments and store to a dictionary, whose key is argument key and
-        value is argument value.
-        Rules:
-        1. a valid argument is in format as: key=value.
-        2. two arguments are separated by a comma ','.
-        3. list is supported by using '~' other than ','
+        value is argument value.  See command_engine.parse_command_arguments
         :param command:
         :param command_args:
         :return:
         """
-        arg_dict = dict()
-        for index, term in enumerate(command_args):
-            term = term.strip()
-            if len(term) == 0:
-                # empty string. might appear at the end of the command
-                continue
-
-            items = term.split('=', 1)
-            if len(items) == 2:
-                # force command argument to be UPPER case in order to support case-insensitive syntax
-                command_arg = items[0].upper()
-
-                # special treatment for typical user type
-                if command_arg == 'ITPS':
-                    print('[WARNING] Argument ITPS is not supported. Auto correct it to IPTS.')
-                    command_arg = 'IPTS'
-
-                # process argument value: remove ' and "
-                arg_value = items[1]
-                arg_value = arg_value.replace('\'', '')
-                arg_value = arg_value.replace('"', '')
-
-                # set
-                arg_dict[command_arg] = arg_value
-            else:
-                err_msg = 'command %s %d-th term <%s> is not valid. Must have a = sign!' % (
-                    command, index, term)
-                return False, err_msg
-            # END-IF
-        # END-FOR
-
-        return True, arg_dict
+        return command_engine.parse_command_arguments(command, command_args)
 
     @staticmethod
     def pre_process_idl_command(idl_command):
-        """ Pre-process IDL command such that
-        1. list bracket [] will be identified and string inside will have ',' replaced by '~'
-        2. list bracket []'s sequence will checked
+        """ Pre-process IDL command such that list bracket [] will be identified and string inside will have ','
+        replaced by '~'.  See command_engine.pre_process_idl_command
         :param idl_command:
         :return:
         """
-        datatypeutility.check_string_variable('IDL command', idl_command)
-
-        # check equal of bracket
-        if idl_command.count(']') != idl_command.count('['):
-            raise RuntimeError('Found unpaired list bracket [ and ] in {}'.format(idl_command))
-
-        # replace
-        num_bracket = idl_command.count(']')
-        for bracket_index in range(num_bracket):
-            left_index = idl_command.index('[')
-            right_index = idl_command.index(']')
-            if left_index > right_index:
-                raise RuntimeError(
-                    'In ILD command {}, list bracket\' order is reversed.'.format(idl_command))
-
-            list_str = idl_command[left_index+1:right_index]
-            list_str = list_str.replace(',', '~')
-
-            # construct new command
-            idl_command = idl_command[:left_index] + list_str + idl_command[right_index+1:]
-        # END-FOR
-
-        return idl_command
+        return command_engine.pre_process_idl_command(idl_command)
 
     def process_commands(self, vdrive_command):
         """ Process commands string. The work include
@@ -454,6 +397,10 @@ class VdriveCommandProcessor(object):
                                          main_only=False,
                                          plot3d=processor.plot_3d)
 
+            # fit peaks sequentially across the chopped sequences: in-memory chopped runs require the whole chop-key
+            if processor.do_fit_peaks_sequentially:
+                status, message = processor.fit_peaks_sequentially(chop_key, chop_seq_list)
+
         elif len(processor.get_run_tuple_list()) == 1:
             # raw/original/non-chopped run situation
             view_window.set_run_number(run_number)
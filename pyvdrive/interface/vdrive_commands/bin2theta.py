@@ -1,10 +1,5 @@
 import os
 from pyvdrive.interface.vdrive_commands.process_vcommand import VDriveCommand
-try:
-    from PyQt5.QtCore import pyqtSignal
-except (ImportError, RuntimeError) as import_err:
-    print('CHOP: {}'.format(import_err))
-    from PyQt4.QtCore import pyqtSignal
 
 
 Panel_2Theta_Ranges = {'WEST': (79., 101),
@@ -26,8 +21,6 @@ class BinBy2Theta(VDriveCommand):
                      'PANEL', 'MIN', 'MAX', 'STEP', 'SCALE',
                      'BINFOLDER', 'DRYRUN', 'FULLPROF']
 
-    reduceSignal = pyqtSignal(str)  # signal to send out
-
     ArgsDocDict = {
         'IPTS': 'IPTS number',
         'RUNS': 'First run number',
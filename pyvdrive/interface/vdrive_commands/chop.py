@@ -6,13 +6,6 @@ import time
 from pyvdrive.interface.vdrive_commands.process_vcommand import VDriveCommand
 from pyvdrive.interface.vdrive_commands.process_vcommand import convert_string_to
 from pyvdrive.core import datatypeutility
-try:
-    from PyQt5 import QtCore
-    # from PyQt5.QtCore import pyqtSignal
-except (ImportError, RuntimeError) as import_err:
-    print('CHOP: {}'.format(import_err))
-    from PyQt4 import QtCore
-    # from PyQt4.QtCore import pyqtSignal
 
 
 class VdriveChop(VDriveCommand):
@@ -24,8 +17,6 @@ class VdriveChop(VDriveCommand):
                      'PULSETIME', 'DT', 'RUNV', 'ROI', 'MASK', 'NEXUS', 'STARTTIME', 'STOPTIME',
                      'NUMBANKS', 'SAVECHOPPED2NEXUS', 'IPARM', 'DRYRUN', 'FULLPROF']
 
-    reduceSignal = QtCore.pyqtSignal(str)  # signal to send out
-
     ArgsDocDict = {
         'IPTS': 'IPTS number',
         'RUNS': 'First run number',
@@ -57,11 +48,12 @@ class VdriveChop(VDriveCommand):
                              'Default is 0 (as False)'
     }
 
-    def __init__(self, controller, command_args, main_window, ipts_number=None, run_number_list=None):
+    def __init__(self, controller, command_args, main_window=None, ipts_number=None, run_number_list=None):
         """
         Initialization
         :param controller:
         :param command_args:
+        :param main_window: main window to send the summary to (vdrive_command_return).  None for headless
         :param ipts_number:
         :param run_number_list:
         """
@@ -85,10 +77,6 @@ class VdriveChop(VDriveCommand):
         self._write_to_fullprof = False
         self._user_know_beam_down = True
 
-        # define signal
-        # TODO - NIGHT - Do this one step by one step: Long exec separate thread
-        self.reduceSignal.connect(self._main_window.vdrive_command_return)
-
         return
 
     # TODO - NIGHT - Code quality
@@ -810,8 +798,9 @@ class VdriveChop(VDriveCommand):
             sum_msg += 'Run {}: duration = {}: {}\n'.format(run_number, duration_chop, message)
         # END-FOR (run_number)
 
-        # TODO/THINK/ISSUE/55 - shall a signal be emit???
-        self.reduceSignal.emit(sum_msg)
+        # send the summary to the main window
+        if self._main_window is not None:
+            self._main_window.vdrive_command_return(sum_msg)
 
         return final_success, sum_msg
 
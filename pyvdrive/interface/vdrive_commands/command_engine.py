@@ -0,0 +1,407 @@
+# Headless engine to execute VDRIVE (IDL) commands against VDriveAPI without Qt
+# It is the GUI-free counterpart of VdriveCommandProcessor for scripted batch jobs (e.g., on cluster nodes).
+# A file of commands can be executed by a pool of worker processes: consecutive commands that reduce data
+# (VBIN, CHOP, 2THETABIN and VPEAK) on different runs are independent and executed concurrently, while any
+# other command (e.g., MERGE and INFO) or a command on a run that is being processed waits for the previous
+# commands to finish.
+# Example:
+#   python -m pyvdrive.interface.vdrive_commands.command_engine commands.txt --nproc 4
+#   python -m pyvdrive.interface.vdrive_commands.command_engine -c "VBIN, IPTS=22752, RUNS=171834"
+import sys
+import argparse
+import multiprocessing
+import pyvdrive.core.VDriveAPI as VdriveAPI
+from pyvdrive.core import datatypeutility
+from pyvdrive.core import file_utilities
+from pyvdrive.interface.vdrive_commands import process_vcommand
+from pyvdrive.interface.vdrive_commands import bin2theta
+from pyvdrive.interface.vdrive_commands import chop
+from pyvdrive.interface.vdrive_commands import show_info
+from pyvdrive.interface.vdrive_commands import vbin
+from pyvdrive.interface.vdrive_commands import vmerge
+from pyvdrive.interface.vdrive_commands import view
+from pyvdrive.interface.vdrive_commands import vpeak
+
+# commands that can be executed concurrently if they work on different runs
+PARALLEL_COMMANDS = ['VBIN', 'VDRIVEBIN', 'CHOP', '2THETABIN', 'VPEAK']
+
+# engine of a worker process
+_worker_engine = None
+
+
+def pre_process_idl_command(idl_command):
+    """ Pre-process IDL command such that
+    1. list bracket [] will be identified and string inside will have ',' replaced by '~'
+    2. list bracket []'s sequence will checked
+    :param idl_command:
+    :return:
+    """
+    datatypeutility.check_string_variable('IDL command', idl_command)
+
+    # check equal of bracket
+    if idl_command.count(']') != idl_command.count('['):
+        raise RuntimeError('Found unpaired list bracket [ and ] in {}'.format(idl_command))
+
+    # replace
+    num_bracket = idl_command.count(']')
+    for bracket_index in range(num_bracket):
+        left_index = idl_command.index('[')
+        right_index = idl_command.index(']')
+        if left_index > right_index:
+            raise RuntimeError(
+                'In ILD command {}, list bracket\' order is reversed.'.format(idl_command))
+
+        list_str = idl_command[left_index+1:right_index]
+        list_str = list_str.replace(',', '~')
+
+        # construct new command
+        idl_command = idl_command[:left_index] + list_str + idl_command[right_index+1:]
+    # END-FOR
+
+    return idl_command
+
+
+def parse_command_arguments(command, command_args):
+    """ Parse command arguments and store to a dictionary, whose key is argument key and
+    value is argument value.
+    Rules:
+    1. a valid argument is in format as: key=value.
+    2. two arguments are separated by a comma ','.
+    3. list is supported by using '~' other than ','
+    :param command:
+    :param command_args:
+    :return:
+    """
+    arg_dict = dict()
+    for index, term in enumerate(command_args):
+        term = term.strip()
+        if len(term) == 0:
+            # empty string. might appear at the end of the command
+            continue
+
+        items = term.split('=', 1)
+        if len(items) == 2:
+            # force command argument to be UPPER case in order to support case-insensitive syntax
+            command_arg = items[0].upper()
+
+            # special treatment for typical user type
+            if command_arg == 'ITPS':
+                print('[WARNING] Argument ITPS is not supported. Auto correct it to IPTS.')
+                command_arg = 'IPTS'
+
+            # process argument value: remove ' and "
+            arg_value = items[1]
+            arg_value = arg_value.replace('\'', '')
+            arg_value = arg_value.replace('"', '')
+
+            # set
+            arg_dict[command_arg] = arg_value
+        else:
+            err_msg = 'command %s %d-th term <%s> is not valid. Must have a = sign!' % (
+                command, index, term)
+            return False, err_msg
+        # END-IF
+    # END-FOR
+
+    return True, arg_dict
+
+
+def split_command(vdrive_command):
+    """ split a VDRIVE command to command name (upper case) and argument terms
+    :param vdrive_command:
+    :return: 2-tuple: command (str), list of argument terms (str)
+    """
+    datatypeutility.check_string_variable('VDRIVE (IDL) command', vdrive_command, None)
+
+    # pre-process in order to  accept list in bracket [...]
+    command_script = pre_process_idl_command(vdrive_command).split(',')
+
+    return command_script[0].strip().upper(), command_script[1:]
+
+
+def get_run_keys(arg_dict):
+    """ get the runs (or files) that a command works on, in order to tell whether 2 commands are independent.
+    Runs are given by RUNS/RUNE, RUNLIST or RUNFILE; the vanadium run RUNV and the event file NEXUS are
+    counted as runs too.  An empty set means that the runs are not known
+    :param arg_dict: command arguments
+    :return: set of run keys (str)
+    """
+    datatypeutility.check_dict('VDRIVE command arguments', arg_dict)
+
+    run_keys = set()
+    if 'RUNS' in arg_dict:
+        run_terms = [term.strip() for term in arg_dict['RUNS'].split('~')]
+        try:
+            if 'RUNE' in arg_dict:
+                run_terms = [str(run) for run in range(int(run_terms[0]), int(arg_dict['RUNE']) + 1)]
+            else:
+                run_terms = [str(int(term)) for term in run_terms]
+        except ValueError:
+            # invalid run numbers shall be reported by the command
+            pass
+        run_keys.update(run_terms)
+    if 'RUNLIST' in arg_dict:
+        run_terms = arg_dict['RUNLIST'].replace('~', '&').split('&')
+        run_keys.update([term.strip() for term in run_terms if len(term.strip()) > 0])
+    if 'RUNFILE' in arg_dict:
+        try:
+            run_keys.update([str(run) for run in file_utilities.read_merge_run_file(arg_dict['RUNFILE'])])
+        except (RuntimeError, IOError, OSError):
+            # unreadable run file shall be reported by the command
+            pass
+    if 'RUNV' in arg_dict:
+        run_keys.add(arg_dict['RUNV'].strip())
+    if 'NEXUS' in arg_dict:
+        run_keys.add(arg_dict['NEXUS'].strip())
+
+    return run_keys
+
+
+def schedule_commands(command_list):
+    """ group a list of commands to stages.  The commands in a stage are independent and can be executed
+    concurrently.  Stages are executed in order.
+    :param command_list: list of VDRIVE commands
+    :return: list of list of indexes of command_list
+    """
+    datatypeutility.check_list('VDRIVE commands', command_list)
+
+    stage_list = list()
+    current_stage = list()
+    current_run_keys = set()
+    for index, vdrive_command in enumerate(command_list):
+        # commands that cannot be parsed are executed alone to report the error
+        try:
+            command, command_args = split_command(vdrive_command)
+            status, arg_dict = parse_command_arguments(command, command_args)
+        except RuntimeError:
+            status, command, arg_dict = False, None, None
+
+        if status and command in PARALLEL_COMMANDS:
+            run_keys = get_run_keys(arg_dict)
+        else:
+            run_keys = set()
+
+        if len(run_keys) > 0:
+            if len(run_keys & current_run_keys) == 0:
+                current_stage.append(index)
+                current_run_keys.update(run_keys)
+                continue
+            # same run as a command in the stage: wait
+            stage_list.append(current_stage)
+            current_stage = [index]
+            current_run_keys = run_keys
+        else:
+            # barrier: any other command or a command on unknown runs
+            if len(current_stage) > 0:
+                stage_list.append(current_stage)
+            stage_list.append([index])
+            current_stage = list()
+            current_run_keys = set()
+        # END-IF-ELSE
+    # END-FOR
+
+    if len(current_stage) > 0:
+        stage_list.append(current_stage)
+
+    return stage_list
+
+
+def read_command_file(command_file_name):
+    """ read VDRIVE commands from a text file: one command per line.  Empty lines and lines starting with #
+    are skipped
+    :param command_file_name:
+    :return: list of commands
+    """
+    datatypeutility.check_file_name(command_file_name, check_exist=True, note='VDRIVE command file')
+
+    command_list = list()
+    with open(command_file_name, 'r') as command_file:
+        for line in command_file:
+            line = line.strip()
+            if len(line) == 0 or line.startswith('#'):
+                continue
+            command_list.append(line)
+    # END-WITH
+
+    return command_list
+
+
+def _init_worker(instrument):
+    """ initialize a worker process with its own engine (and thus VDriveAPI)
+    :param instrument:
+    :return:
+    """
+    global _worker_engine
+    _worker_engine = HeadlessCommandEngine(instrument=instrument)
+
+    return
+
+
+def _execute_in_worker(vdrive_command):
+    """ execute a command in a worker process
+    :param vdrive_command:
+    :return: 2-tuple (status, message)
+    """
+    return _worker_engine.execute(vdrive_command)
+
+
+class HeadlessCommandEngine(object):
+    """ Execute VDRIVE commands against VDriveAPI without any GUI
+    """
+
+    def __init__(self, controller=None, instrument='VULCAN'):
+        """
+        initialization
+        :param controller: VDriveAPI instance or None to create one at the first command
+        :param instrument:
+        """
+        if controller is not None and not isinstance(controller, VdriveAPI.VDriveAPI):
+            raise RuntimeError('Controller must be a VDriveAPI instance but not a {}'.format(type(controller)))
+        datatypeutility.check_string_variable('Instrument', instrument)
+
+        self._myController = controller
+        self._instrument = instrument
+
+        # command name: method to create the command processor
+        self._command_dict = {'VBIN': vbin.VBin,
+                              'VDRIVEBIN': vbin.VBin,
+                              'AUTO': vbin.AutoReduce,
+                              'CHOP': chop.VdriveChop,
+                              'MERGE': vmerge.VdriveMerge,
+                              'VIEW': view.VdriveView,
+                              'VDRIVEVIEW': view.VdriveView,
+                              'VPEAK': vpeak.VanadiumPeak,
+                              'INFO': show_info.RunsInfoQuery,
+                              '2THETABIN': bin2theta.BinBy2Theta}
+
+        return
+
+    @property
+    def controller(self):
+        """ VDriveAPI instance.  It is created at the first call
+        :return:
+        """
+        if self._myController is None:
+            self._myController = VdriveAPI.VDriveAPI(self._instrument)
+
+        return self._myController
+
+    @property
+    def supported_commands(self):
+        return sorted(self._command_dict.keys())
+
+    def execute(self, vdrive_command):
+        """ execute one VDRIVE command
+        :param vdrive_command: command in IDL format, such as VBIN, IPTS=1000, RUNS=2000
+        :return: 2-tuple (status, message)
+        """
+        try:
+            command, command_args = split_command(vdrive_command)
+        except RuntimeError as parse_err:
+            return False, str(parse_err)
+
+        if command not in self._command_dict:
+            return False, 'Command {} is not in supported command list: {}' \
+                          ''.format(command, self.supported_commands)
+
+        status, arg_dict = parse_command_arguments(command, command_args)
+        if not status:
+            return False, arg_dict
+
+        try:
+            processor = self._command_dict[command](self.controller, arg_dict)
+        except process_vcommand.CommandKeyError as comm_err:
+            return False, str(comm_err)
+
+        if len(arg_dict) == 0:
+            # if there is no argument, just print out the help information
+            return True, processor.get_help()
+
+        try:
+            status, message = processor.exec_cmd()
+        except RuntimeError as run_err:
+            return False, 'Unable to execute VDRIVE command due to {}'.format(run_err)
+
+        # the commands (or their options) that show results in windows
+        if command in ['VIEW', 'VDRIVEVIEW'] and status and len(message) == 0:
+            status, message = False, 'Command {} requires GUI (Lava/VDrivePlot) to view data'.format(command)
+        elif message == 'pop':
+            status, message = False, 'Command {} with given options requires GUI (Lava/VDrivePlot)'.format(command)
+
+        return status, message
+
+    def run_commands(self, command_list, num_workers=1):
+        """ execute a list of commands.  Independent commands are executed concurrently if there are more than
+        1 workers
+        :param command_list: list of VDRIVE commands
+        :param num_workers: number of worker processes
+        :return: list of 3-tuple (command, status, message) in the order of command_list
+        """
+        datatypeutility.check_list('VDRIVE commands', command_list)
+        datatypeutility.check_int_variable('Number of workers', num_workers, (1, multiprocessing.cpu_count() + 1))
+
+        result_list = [None] * len(command_list)
+        stage_list = schedule_commands(command_list)
+
+        pool = None
+        if num_workers > 1 and max([len(stage) for stage in stage_list] + [0]) > 1:
+            pool = multiprocessing.get_context('spawn').Pool(processes=num_workers, initializer=_init_worker,
+                                                             initargs=(self._instrument,))
+
+        try:
+            for stage in stage_list:
+                stage_commands = [command_list[index] for index in stage]
+                if pool is None or len(stage) == 1:
+                    stage_results = [self.execute(vdrive_command) for vdrive_command in stage_commands]
+                else:
+                    stage_results = pool.map(_execute_in_worker, stage_commands)
+                for index, (status, message) in zip(stage, stage_results):
+                    print('[INFO] {}: {}'.format(command_list[index], status))
+                    result_list[index] = command_list[index], status, message
+            # END-FOR
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        # END-TRY
+
+        return result_list
+
+    def run_file(self, command_file_name, num_workers=1):
+        """ execute the commands in a text file
+        :param command_file_name:
+        :param num_workers: number of worker processes
+        :return: list of 3-tuple (command, status, message)
+        """
+        return self.run_commands(read_command_file(command_file_name), num_workers)
+
+
+def main(argv):
+    """ execute VDRIVE commands without GUI
+    :param argv:
+    :return: number of failed commands
+    """
+    parser = argparse.ArgumentParser(description='Execute VDRIVE commands without GUI')
+    parser.add_argument('command_file', nargs='?', default=None, help='text file with one VDRIVE command per line')
+    parser.add_argument('-c', '--command', action='append', default=list(), help='VDRIVE command to execute')
+    parser.add_argument('--nproc', type=int, default=1, help='number of worker processes for independent commands')
+    parser.add_argument('--instrument', default='VULCAN', help='instrument name')
+    args = parser.parse_args(argv)
+
+    command_list = args.command[:]
+    if args.command_file is not None:
+        command_list.extend(read_command_file(args.command_file))
+
+    engine = HeadlessCommandEngine(instrument=args.instrument)
+    result_list = engine.run_commands(command_list, args.nproc)
+
+    num_failed = 0
+    for vdrive_command, status, message in result_list:
+        print('{}\n  [{}] {}'.format(vdrive_command, 'DONE' if status else 'FAILED', message))
+        num_failed += int(not status)
+
+    return num_failed
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,13 +1,9 @@
 # Set up path to PyVDrive
 import os
+import multiprocessing
 import pyvdrive.core.VDriveAPI as VdriveAPI
 from pyvdrive.core import datatypeutility
 from pyvdrive.core import file_utilities
-try:
-    from PyQt5.QtCore import QObject
-except (ImportError, RuntimeError) as import_err:
-    print('Process_VCommand: {}'.format(import_err))
-    from PyQt4.QtCore import QObject
 from typing import List, Dict
 
 
@@ -28,6 +24,25 @@ def convert_string_to(string, datatype):
     return value
 
 
+def parse_number_processes(nproc_str):
+    """
+    parse the number of worker processes (argument NPROC)
+    :param nproc_str:
+    :return: integer between 1 and number of CPUs
+    """
+    try:
+        num_processes = int(str(nproc_str).strip())
+    except ValueError:
+        raise RuntimeError('NPROC must be a positive integer')
+    if num_processes < 1:
+        raise RuntimeError('NPROC must be a positive integer')
+    elif num_processes > multiprocessing.cpu_count():
+        raise RuntimeError('NPROC {} must be no larger than number of CPUs {}.'
+                           ''.format(num_processes, multiprocessing.cpu_count()))
+
+    return num_processes
+
+
 class CommandKeyError(Exception):
     """
     Self-defined VDRIVE command key error
@@ -41,9 +56,10 @@ class CommandKeyError(Exception):
         return
 
 
-class VDriveCommand(QObject):
+class VDriveCommand(object):
     """
-    Base class to process VDRIVE commands
+    Base class to process VDRIVE commands.  It does not depend on Qt such that the commands can be executed
+    without GUI (see command_engine)
     """
     SupportedArgs: List[str] = list()
     ArgsDocDict: Dict[str, str] = dict()
@@ -55,7 +71,7 @@ class VDriveCommand(QObject):
         :param command_args:
         """
         # call base init
-        super(VDriveCommand, self).__init__(None)
+        super(VDriveCommand, self).__init__()
 
         # check input
         assert isinstance(controller, VdriveAPI.VDriveAPI), 'Controller must be a VdriveAPI.VDriveAPI' \
@@ -1,5 +1,6 @@
 import os
 from pyvdrive.interface.vdrive_commands.process_vcommand import VDriveCommand
+from pyvdrive.interface.vdrive_commands.process_vcommand import parse_number_processes
 import pyvdrive.core.vulcan_util as vulcan_util
 from pyvdrive.core import datatypeutility
 
@@ -89,7 +90,7 @@ class VBin(VDriveCommand):
     SupportedArgs = ['IPTS', 'RUN', 'CHOPRUN', 'RUNE', 'RUNS', 'BANKS', 'BINW',
                      'RUNV', 'IPARM', 'ONEBANK', 'NOMASK', 'TAG', 'TAGDIR',
                      'BINFOLDER', 'MYTOFMIN', 'MYTOFMAX', 'OUTPUT', 'GROUP', 'VERSION',
-                     'ROI', 'MASK', 'RUNFILE', 'RUNLIST', 'MERGE']
+                     'ROI', 'MASK', 'RUNFILE', 'RUNLIST', 'MERGE', 'NPROC']
     # NOTE: Here is the list of arguments that will not be supported in March-2019 release
     #       'SKIPXML', 'FOCUS_EW', 'FullProf', 'NoGSAS', 'PlotFlag', 'VDRIVEBIN'
 
@@ -111,6 +112,7 @@ class VBin(VDriveCommand):
         'BINFOLDER': 'User specified output directory. Default will be under /SNS/VULCAN/IPTS-???/shared/bin',
         'OUTPUT': 'User specified output directory. Default will be under /SNS/VULCAN/IPTS-???/shared/bin',
         'VERSION': 'User specified version of reduction algorithm.  Mantid conventional = 1, PyVDrive simplified = 2',
+        'NPROC': 'Number of processes to reduce runs in parallel (VERSION=2 without merging).  Default is 1.',
     }
 
     def __init__(self, controller, command_args):
@@ -233,6 +235,15 @@ class VBin(VDriveCommand):
         else:
             reduction_alg_ver = 2
 
+        # number of processes to reduce runs in parallel
+        if 'NPROC' in self._commandArgsDict:
+            try:
+                num_workers = parse_number_processes(self._commandArgsDict['NPROC'])
+            except RuntimeError as run_err:
+                return False, str(run_err)
+        else:
+            num_workers = 1
+
         # scan the runs with data archive manager and add the runs to project
         # TODO - NIGHT - use_chop_data can be from a class instance for MERGE
         if use_chop_data:
@@ -272,13 +283,18 @@ class VBin(VDriveCommand):
                 if not status:
                     return False, msg
 
-            # set flag
+            # set flag and load the calibration of the queued runs in background while the first one is reduced
             run_number_list = list()
             for run_info in run_info_list:
                 run_number_list.append(run_info['run'])
+            if len(run_number_list) > 1 and isinstance(bank_group, int):
+                self._controller.set_calibration_prefetch(bank_group)
+            else:
+                self._controller.set_calibration_prefetch(None)
             self._controller.set_runs_to_reduce(run_number_list)
 
             # reduce by regular runs
+            self._controller.set_reduction_workers(num_workers)
             status, message = self._controller.reduce_data_set(auto_reduce=False, output_directory=output_dir,
                                                                merge_banks=merge_to_one_bank,
                                                                vanadium=van_run,
@@ -291,6 +307,10 @@ class VBin(VDriveCommand):
                                                                roi_list=roi_file_names,
                                                                mask_list=mask_file_names,
                                                                no_cal_mask=no_mask)
+            # timing of each run is reported only if the runs are reduced successfully
+            reduction_report = self._controller.get_reduction_report()
+            if status and reduction_report:
+                message += '\n{}'.format(reduction_report)
         # END-IF-ELSE
 
         # NIGHT - TODO - NEED a new class instance and method
@@ -8,7 +8,13 @@
 # View sequential data in 2D contour and 3D surface: (short name: VIEW)
 # VIEW, IPTS=####, RUNS=####, RUNE=#### [,CHOPRUN=####] [, MinV=#.#, MaxV=#.#,
 # RUNV=####, NORM=1 , PCSENV=1]
+#
+# Purpose 3:
+# Fit peaks sequentially across the chopped sequences: each sequence's fit starts from the previous one
+# VIEW, IPTS=####, CHOPRUN=####, RUNS=#, RUNE=##, PEAKPOS=[#.#,#.#], FITPEAK=file name [, NPROC=#]
+import os
 from pyvdrive.interface.vdrive_commands.process_vcommand import VDriveCommand
+from pyvdrive.interface.vdrive_commands.process_vcommand import parse_number_processes
 from pyvdrive.core import vulcan_util
 
 
@@ -20,7 +26,7 @@ class VdriveView(VDriveCommand):
     Process command VIEW or VDRIVEVIEW
     """
     SupportedArgs = ['IPTS', 'RUNS', 'RUNE', 'CHOPRUN', 'RUNV', 'MINV', 'MAXV', 'NORM', 'DIR', 'SHOW',
-                     'PEAK', '3D']
+                     'PEAK', '3D', 'FITPEAK', 'PEAKPOS', 'NPROC']
 
     ArgsDocDict = {
         'IPTS': 'IPTS number',
@@ -35,7 +41,11 @@ class VdriveView(VDriveCommand):
         'PEAK': 'Integrate peak and output value. PEAK=1: output to console. Otherwise, output '
                 'to the file name',
         'SHOW': 'Launch the reduced-data viewer',
-        '3D': 'Flag to show 3D line plot for chopped runs'
+        '3D': 'Flag to show 3D line plot for chopped runs',
+        'FITPEAK': 'Fit peaks given by PEAKPOS sequentially across the chopped sequences and write the fitted '
+                   'parameters to this file',
+        'PEAKPOS': 'Peak positions (d-spacing) to fit, such as [1.17,1.24,2.03]',
+        'NPROC': 'Number of processes to fit peak groups in parallel.  Default is 1.'
     }
 
     def __init__(self, controller, command_args, ipts_number=None, run_number_list=None):
@@ -80,6 +90,11 @@ class VdriveView(VDriveCommand):
         # plot 3D
         self._plot_3d = False
 
+        # sequential peak fitting
+        self._fitPeakFileName = None
+        self._fitPeakPositions = None
+        self._numWorkers = 1
+
         return
 
     def exec_cmd(self):
@@ -213,6 +228,24 @@ class VdriveView(VDriveCommand):
                     self._outputPeakValueToConsole = False
         # END-IF ('PEAK')
 
+        # Fit peaks sequentially
+        if 'FITPEAK' in self._commandArgsDict:
+            if not self._isChoppedRun:
+                return False, 'FITPEAK is only supported for chopped run (CHOPRUN)'
+            if 'PEAKPOS' not in self._commandArgsDict:
+                return False, 'FITPEAK requires peak positions given by PEAKPOS'
+            self._fitPeakFileName = str(self._commandArgsDict['FITPEAK']).strip()
+            try:
+                self._fitPeakPositions = self.get_argument_as_list('PEAKPOS', float)
+            except ValueError as value_err:
+                return False, 'PEAKPOS {} cannot be parsed: {}'.format(self._commandArgsDict['PEAKPOS'], value_err)
+            if 'NPROC' in self._commandArgsDict:
+                try:
+                    self._numWorkers = parse_number_processes(self._commandArgsDict['NPROC'])
+                except RuntimeError as run_err:
+                    return False, str(run_err)
+        # END-IF ('FITPEAK')
+
         # determine unit according to MinV or MaxV
         if self._maxX is not None:
             # use maximum X to determine the unit
@@ -322,6 +355,7 @@ class VdriveView(VDriveCommand):
         help_str += '> VIEW,IPTS=14094,RUNS=96450,RUNE=96451\n'
         help_str += '> view,IPTS=13183,choprun=68607, runs=1, rune=15\n'
         help_str += '> VIEW,IPTS=18420,RUNS=136558,MINV=0.5,MAXV=2.5,NORM=1\n'
+        help_str += '> VIEW,IPTS=13183,CHOPRUN=68607,RUNS=1,RUNE=1000,PEAKPOS=[1.17,2.03],FITPEAK=fit.txt\n'
 
         return help_str
 
@@ -360,6 +394,68 @@ class VdriveView(VDriveCommand):
         """
         return self._reducedDataDir
 
+    def fit_peaks_sequentially(self, chop_data_key, chop_seq_list):
+        """
+        fit peaks of each bank sequentially across the chopped sequences and write the parameters to files
+        :param chop_data_key: run number (loaded from GSAS) or tuple (reduced in memory)
+        :param chop_seq_list: list of chopped sequences
+        :return: 2-tuple: status, message
+        """
+        chop_seq_list = list(chop_seq_list)
+        if len(chop_seq_list) == 0:
+            return False, 'There is no chopped sequence to fit peaks'
+
+        project = self._controller.project
+        base_name, extension = os.path.splitext(self._fitPeakFileName)
+        message = ''
+        try:
+            for bank_id in project.get_chopped_data_bank_list(chop_data_key, chop_seq_list[0]):
+                fit_table, error_msg = project.fit_peaks_sequentially(chop_data_key, chop_seq_list, bank_id,
+                                                                      self._fitPeakPositions,
+                                                                      num_workers=self._numWorkers)
+                bank_file_name = '{0}_bank{1}{2}'.format(base_name, bank_id, extension)
+                fit_table.save(bank_file_name)
+                message += 'Bank {0}: {1} of {2} peak fits succeeded. Saved to {3}\n{4}' \
+                           ''.format(bank_id, fit_table.status.sum(), fit_table.status.size, bank_file_name,
+                                     error_msg)
+            # END-FOR
+        except (RuntimeError, ValueError, AssertionError) as run_err:
+            return False, 'Unable to fit peaks sequentially: {0}'.format(run_err)
+
+        return True, message
+
+    @property
+    def do_fit_peaks_sequentially(self):
+        """
+        whether peaks are fitted sequentially across the chopped sequences
+        :return:
+        """
+        return self._fitPeakFileName is not None
+
+    @property
+    def fit_peak_file_name(self):
+        """
+        output file of the sequentially fitted peak parameters
+        :return:
+        """
+        return self._fitPeakFileName
+
+    @property
+    def fit_peak_positions(self):
+        """
+        peak positions to fit sequentially
+        :return:
+        """
+        return self._fitPeakPositions[:]
+
+    @property
+    def number_workers(self):
+        """
+        number of processes to fit peaks
+        :return:
+        """
+        return self._numWorkers
+
     @property
     def output_peak_parameters_to_console(self):
         """
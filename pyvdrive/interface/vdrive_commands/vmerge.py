@@ -47,6 +47,7 @@ class VdriveMerge(VBin):
         :return:
         """
         help_str = 'MERGE: Merge runs and reduce the merged data.\n'
+        help_str += '       Each run is added to the merged data as soon as it is reduced.\n'
 
         for arg_str in self.SupportedArgs:
             help_str += '  %-10s: ' % arg_str
@@ -113,11 +113,18 @@ class VanadiumPeak(VDriveCommand):
                 sample_log_ws_name = self._controller.load_meta_data(self._iptsNumber, self._vanRunNumber, None)
             else:
                 sample_log_ws_name = None
+            try:
+                calibration_tag = self._controller.project.get_calibration_tag(sample_log_ws_name,
+                                                                               self._myVanDataKey)
+            except RuntimeError:
+                # calibration is unknown: processed vanadium is cached without calibration
+                calibration_tag = None
             self._controller.project.vanadium_processing_manager.init_session(self._myVanDataKey,
                                                                               self._iptsNumber,
                                                                               self._vanRunNumber,
                                                                               out_file_name,
-                                                                              sample_log_ws_name)
+                                                                              sample_log_ws_name,
+                                                                              calibration_tag=calibration_tag)
         elif not do_launch_gui:
             return False, 'IPTS number and run number is not given!'
         else:
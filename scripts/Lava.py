@@ -1,6 +1,4 @@
 import sys
-import pyvdrive
-from pyvdrive.interface.gui.mantidipythonwidget import MantidIPythonWidget  # noqa: F401
 import os
 try:
     from PyQt5.QtWidgets import QDialog, QApplication  # type: ignore
@@ -10,10 +8,13 @@ except ImportError:
     from PyQt4.uic import loadUi as load_ui  # type: ignore
 
 # from pyvdrive.interface.gui import ui_LaunchManager
-from pyvdrive.interface.VDrivePlot import VdriveMainWindow
-import pyvdrive.interface.LiveDataView
-import pyvdrive.interface.PeakPickWindow as PeakPickWindow
-import pyvdrive.interface.ExperimentRecordView as ev
+from pyvdrive.core import lazy_import
+
+# tool windows (and thus Mantid and IPython) are imported when the tool is launched
+VDrivePlot = lazy_import.lazy_module('pyvdrive.interface.VDrivePlot')
+LiveDataView = lazy_import.lazy_module('pyvdrive.interface.LiveDataView')
+PeakPickWindow = lazy_import.lazy_module('pyvdrive.interface.PeakPickWindow')
+ev = lazy_import.lazy_module('pyvdrive.interface.ExperimentRecordView')
 
 #  Script used to start the VDrive reduction GUI from MantidPlot
 
@@ -54,14 +55,24 @@ class LauncherManager(QDialog):
         self.ui.pushButton_reducedDataViewer.clicked.connect(self.do_launch_viewer)
         self.ui.pushButton_terminal.clicked.connect(self.do_launch_terminal)
 
-        # initialize main window (may not be shown though)
-        self._mainReducerWindow = VdriveMainWindow()  # the main ui class in this file is called MainWindow
+        # main window (may not be shown though) is created when any tool requires it
+        self._mainReducerWindow = None
 
         self._myPeakPickerWindow = None
         self._myLogPickerWindow = None
 
         return
 
+    @property
+    def main_reducer_window(self):
+        """ get the main reducer window (VdriveMainWindow) and create it at the first call
+        :return:
+        """
+        if self._mainReducerWindow is None:
+            self._mainReducerWindow = VDrivePlot.VdriveMainWindow()
+
+        return self._mainReducerWindow
+
     def do_exit(self):
         """
         exit the application
@@ -76,19 +87,23 @@ class LauncherManager(QDialog):
         launch the log picker window
         :return:
         """
-        self._mainReducerWindow.do_launch_log_picker_window()
+        self.main_reducer_window.do_launch_log_picker_window()
 
         if not self.ui.checkBox_keepOpen.isChecked():
             self.close()
 
         return
 
-    def do_launch_live_view(self, auto_start):
+    def do_launch_live_view(self, auto_start, replay_file_name=None, replay_chunks=60):
         """ launch live view
         :param auto_start: flag to start the live view automatically
+        :param replay_file_name: None for the beamline or event NeXus file to replay
+        :param replay_chunks: number of chunks (updates) to replay the NeXus file in
         :return:
         """
-        live_view = pyvdrive.interface.LiveDataView.VulcanLiveDataView(self._mainReducerWindow, None)
+        live_view = LiveDataView.VulcanLiveDataView(self.main_reducer_window, None)
+        if replay_file_name is not None:
+            live_view.set_replay_source(replay_file_name, replay_chunks)
 
         live_view.show()
         # start live
@@ -102,9 +117,9 @@ class LauncherManager(QDialog):
         :return:
         """
 
-        self._myPeakPickerWindow = PeakPickWindow.PeakPickerWindow(self._mainReducerWindow,
-                                                                   self._mainReducerWindow.get_controller())
-        # self._myPeakPickerWindow.set_controller(self._mainReducerWindow.get_controller())
+        self._myPeakPickerWindow = PeakPickWindow.PeakPickerWindow(self.main_reducer_window,
+                                                                   self.main_reducer_window.get_controller())
+        # self._myPeakPickerWindow.set_controller(self.main_reducer_window.get_controller())
         self._myPeakPickerWindow.show()
 
         if not self.ui.checkBox_keepOpen.isChecked():
@@ -117,7 +132,7 @@ class LauncherManager(QDialog):
 
         :return:
         """
-        self._mainReducerWindow.menu_workspaces_view()
+        self.main_reducer_window.menu_workspaces_view()
 
         if not self.ui.checkBox_keepOpen.isChecked():
             self.close()
@@ -129,7 +144,7 @@ class LauncherManager(QDialog):
         launch the main VDrivePlot window
         :return:
         """
-        self._mainReducerWindow.show()
+        self.main_reducer_window.show()
 
         if not self.ui.checkBox_keepOpen.isChecked():
             self.close()
@@ -151,7 +166,7 @@ class LauncherManager(QDialog):
         launch reduced data view
         :return:
         """
-        self._mainReducerWindow.do_launch_reduced_data_viewer()
+        self.main_reducer_window.do_launch_reduced_data_viewer()
 
         if not self.ui.checkBox_keepOpen.isChecked():
             self.close()
@@ -173,7 +188,7 @@ def lava_app():
 
 # get arguments
 args = sys.argv
-if len(args) == 2:
+if len(args) >= 2:
     option = args[1]
 else:
     option = '-t'
@@ -198,6 +213,7 @@ if option in ['-h', '--help']:
     print('  --main (-m): launch main PyVDrive GUI control panel')
     print('  --live (-l): launch live data view interface in auto mode')
     print('  --live-prof: launch live data view interface in professional mode')
+    print('  --replay FILE [CHUNKS]: launch live data view replaying an event NeXus file in CHUNKS (60) updates')
     print('  --record: launch experimental record manager')
     sys.exit(1)
 
@@ -227,6 +243,25 @@ elif option in ['--live', '-l']:
     launcher.do_launch_live_view(auto_start)
     launcher.close()
 
+elif option in ['--replay']:
+    # live view widget on a recorded run
+    replay_usage = 'Usage: lava --replay VULCAN_xxx_event.nxs [number of chunks (positive integer)]'
+    if len(args) < 3:
+        print(replay_usage)
+        sys.exit(-1)
+    if len(args) > 3:
+        try:
+            num_chunks = int(args[3])
+        except ValueError:
+            num_chunks = 0
+        if num_chunks <= 0:
+            print(replay_usage)
+            sys.exit(-1)
+    else:
+        num_chunks = 60
+    launcher.do_launch_live_view(True, replay_file_name=args[2], replay_chunks=num_chunks)
+    launcher.close()
+
 elif option in ['--record']:
     launcher.do_launch_record_view()
     launcher.close()
@@ -0,0 +1,98 @@
+import pytest
+from pyvdrive.core import auto_reduction_worker
+from pyvdrive.core import reduce_VULCAN
+
+
+class _FakeADS(object):
+    def __init__(self, ws_names):
+        self.ws_names = set(ws_names)
+
+    def getObjectNames(self):
+        return sorted(self.ws_names)
+
+    def doesExist(self, ws_name):
+        return ws_name in self.ws_names
+
+
+class _FakeMantid(object):
+    def __init__(self, ads):
+        self._ads = ads
+
+    def DeleteWorkspace(self, Workspace):
+        self._ads.ws_names.remove(Workspace)
+
+
+class _FakeReductionSetup(object):
+    def set_event_file(self, event_file):
+        self._event_file = event_file
+
+    def get_focus_file(self):
+        return 'VULCAN_calibrate.h5'
+
+    def get_vanadium_info(self):
+        van_run_number = int(self._event_file.split('_')[1])
+        return van_run_number, 'van.gda', 'tag'
+
+    def check_validity(self):
+        return True, ''
+
+    def __getattr__(self, name):
+        # other setup methods do nothing
+        return lambda *args: None
+
+
+def test_bad_run_does_not_stop_worker(monkeypatch):
+    """ Test that the worker continues after a run failing to reduce and keeps only one vanadium
+    """
+    ads = _FakeADS(['characterizations'])
+    monkeypatch.setattr(auto_reduction_worker, 'AnalysisDataService', ads)
+    monkeypatch.setattr(auto_reduction_worker, 'mantidsimple', _FakeMantid(ads))
+    monkeypatch.setattr(reduce_VULCAN, 'ReductionSetup', _FakeReductionSetup)
+
+    class FakeReducer(object):
+        def __init__(self, reduction_setup):
+            self._event_file = reduction_setup._event_file
+
+        def execute_vulcan_reduction(self, output_logs):
+            van_run_number = int(self._event_file.split('_')[1])
+            ads.ws_names.update(['Vanadium_{}_tag'.format(van_run_number), 'VULCAN_{}'.format(van_run_number)])
+            if 'bad' in self._event_file:
+                raise RuntimeError('no proton charge')
+            return True, 'Reduced'
+
+    monkeypatch.setattr(reduce_VULCAN, 'ReduceVulcanData', FakeReducer)
+
+    worker = auto_reduction_worker.AutoReductionWorker()
+    for nexus_file_name in ['VULCAN_1_bad.nxs.h5', 'VULCAN_2_event.nxs', 'VULCAN_3_event.nxs']:
+        worker._task_queue.put((nexus_file_name, '/tmp'))
+    worker._task_queue.put(None)
+    worker.run_forever()
+
+    assert [record[2] for record in worker.records] == [False, True, True]
+    assert 'no proton charge' in worker.records[0][3]
+    assert ads.getObjectNames() == ['Vanadium_3_tag', 'characterizations']
+
+
+def test_programming_error_is_raised(monkeypatch):
+    """ Test that an error other than a reduction failure is not swallowed by the worker
+    """
+    ads = _FakeADS(['characterizations'])
+    monkeypatch.setattr(auto_reduction_worker, 'AnalysisDataService', ads)
+    monkeypatch.setattr(auto_reduction_worker, 'mantidsimple', _FakeMantid(ads))
+    monkeypatch.setattr(reduce_VULCAN, 'ReductionSetup', _FakeReductionSetup)
+
+    class BuggyReducer(object):
+        def __init__(self, reduction_setup):
+            pass
+
+        def execute_vulcan_reduction(self, output_logs):
+            ads.ws_names.add('VULCAN_1')
+            raise KeyError('proton_charge')
+
+    monkeypatch.setattr(reduce_VULCAN, 'ReduceVulcanData', BuggyReducer)
+
+    worker = auto_reduction_worker.AutoReductionWorker()
+    with pytest.raises(KeyError):
+        worker.process('VULCAN_1_event.nxs', '/tmp')
+    # workspaces of the run are still cleaned
+    assert ads.getObjectNames() == ['characterizations']
@@ -0,0 +1,36 @@
+from pyvdrive.core import mantid_helper
+from pyvdrive.core import reductionmanager
+
+
+def test_load_and_acquire(monkeypatch):
+    """ Test that calibration workspaces loaded and acquired in one operation are not evicted in between
+    """
+    monkeypatch.setattr(mantid_helper, 'get_workspaces_memory', lambda ws_names, unit: 10.)
+    monkeypatch.setattr(mantid_helper, 'workspace_does_exist', lambda ws_name: False)
+
+    def load_calibration():
+        calib_ws_collection = reductionmanager.DetectorCalibrationWorkspaces()
+        calib_ws_collection.calibration = 'calib'
+        calib_ws_collection.mask = 'mask'
+        calib_ws_collection.grouping = 'grouping'
+        return calib_ws_collection
+
+    # the calibration just loaded is kept even if it is not referenced.  it is evicted by the next one
+    pool = reductionmanager.CalibrationWorkspacePool(memory_budget=0.)
+    calib_ws_collection = pool.load(('2018', 7), load_calibration)
+    assert calib_ws_collection.calibration == 'calib'
+    assert ('2018', 7) in pool
+    pool.load(('2019', 3), load_calibration)
+    assert ('2018', 7) not in pool
+    assert ('2019', 3) in pool
+    pool.memory_budget = 0.
+    assert ('2019', 3) not in pool
+
+    calib_ws_collection = pool.load(('2019', 3), load_calibration, acquire=True)
+    assert calib_ws_collection.calibration == 'calib'
+    assert ('2019', 3) in pool
+    pool.load(('2019', 3), load_calibration, acquire=True)
+    pool.release(('2019', 3))
+    assert ('2019', 3) in pool
+    pool.release(('2019', 3))
+    assert ('2019', 3) not in pool
@@ -0,0 +1,37 @@
+import pytest
+import numpy
+from pyvdrive.core.chopped_data_cube import ChoppedDataCube
+
+
+def test_normalization():
+    """ Test normalizing chopped data cube by proton charge and vanadium
+    """
+    vec_x = numpy.linspace(0.5, 3.0, 1000)
+    sequences = list(range(1, 2001))
+    data_cube = ChoppedDataCube(vec_x, sequences)
+    for row_index in range(len(sequences)):
+        data_cube.set_sequence_data(row_index, numpy.zeros(1000) + 10. * (row_index + 1))
+    assert data_cube.shape == (2000, 1000)
+
+    # normalization is not set yet
+    with pytest.raises(RuntimeError):
+        data_cube.get_normalized_matrix(True, False)
+
+    data_cube.set_proton_charges(numpy.arange(1, 2001) * 2.)
+    data_cube.set_vanadium(numpy.zeros(1000) + 5.)
+    numpy.testing.assert_allclose(data_cube.get_normalized_matrix(True, True), 1.)
+    numpy.testing.assert_allclose(data_cube.get_normalized_matrix(False, False)[9], 100.)
+
+    vec_x_10, vec_y_10 = data_cube.get_sequence_data(10, pc_norm=True)
+    assert vec_x_10 is vec_x
+    numpy.testing.assert_allclose(vec_y_10, 5.)
+
+    # select a subset of sequences
+    sub_cube = data_cube.select([0, 9, 99])
+    assert sub_cube.sequences.tolist() == [1, 10, 100]
+    numpy.testing.assert_allclose(sub_cube.get_normalized_matrix(True, True), 1.)
+
+    with pytest.raises(RuntimeError):
+        data_cube.set_sequence_data(0, numpy.zeros(999))
+    with pytest.raises(RuntimeError):
+        data_cube.get_index(3000)
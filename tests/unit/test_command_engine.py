@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pyvdrive.interface.vdrive_commands import command_engine
+
+NO_QT_SCRIPT = """
+import sys
+from pyvdrive.interface.vdrive_commands import command_engine
+engine = command_engine.HeadlessCommandEngine()
+status, message = engine.execute('VPLOT, IPTS=1000, RUNS=2000')
+assert not status and 'VPLOT' in message, message
+sys.exit(len([name for name in sys.modules if name.startswith(('PyQt4', 'PyQt5', 'qtpy'))]))
+"""
+
+
+def test_no_qt_import():
+    """ Test that the headless engine does not import Qt in a fresh interpreter
+    """
+    root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([root_dir] + [env[key] for key in ['PYTHONPATH'] if key in env])
+    assert subprocess.call([sys.executable, '-c', NO_QT_SCRIPT], env=env) == 0
+
+
+def test_schedule_commands():
+    """ Test grouping independent commands to stages
+    """
+    assert command_engine.get_run_keys({'IPTS': '1000', 'RUNS': '2000', 'RUNE': '2002'}) == {'2000', '2001', '2002'}
+    assert command_engine.get_run_keys({'RUNS': '2000~2005'}) == {'2000', '2005'}
+    assert command_engine.get_run_keys({'RUNLIST': '2000~2001'}) == {'2000', '2001'}
+    assert command_engine.get_run_keys({'RUNLIST': '2000 & 2001'}) == {'2000', '2001'}
+    assert command_engine.get_run_keys({'IPTS': '1000', 'RUNV': '3000'}) == {'3000'}
+    assert command_engine.get_run_keys({'IPTS': '1000'}) == set()
+
+    command_list = ['VBIN, IPTS=1000, RUNS=2000',
+                    'vbin, IPTS=1000, RUNS=2001, RUNE=2002',
+                    'CHOP, IPTS=1000, RUNS=2003, DBIN=60',
+                    'VBIN, IPTS=1000, RUNS=2002',
+                    'MERGE, IPTS=1000, RUNLIST=[2000, 2001]',
+                    'VBIN, IPTS=1000, RUNS=2000',
+                    'VBIN, IPTS 1000',
+                    'VPEAK, IPTS=1000, RUNV=3000',
+                    'VBIN, IPTS=1000, RUNS=2004, RUNV=3000',
+                    'VBIN, IPTS=1000, RUNLIST=[2005, 2006]',
+                    'VBIN, IPTS=1000, RUNS=2007',
+                    'VBIN, IPTS=1000',
+                    'VBIN, IPTS=1000, RUNS=2008']
+    stage_list = command_engine.schedule_commands(command_list)
+    assert stage_list == [[0, 1, 2], [3], [4], [5], [6], [7], [8, 9, 10], [11], [12]]
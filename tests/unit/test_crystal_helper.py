@@ -0,0 +1,40 @@
+import numpy
+from pyvdrive.core import crystal_helper
+
+
+def test_merge_reflections():
+    """ Test merging degenerated reflections
+    """
+    vec_d = numpy.array([1.0, 2.00002, 1.5, 2.0, 1.00001])
+    hkl_matrix = numpy.array([[1, 1, 1], [1, 0, 0], [1, 1, 0], [0, 1, 0], [-1, 1, 1]])
+
+    reflection_list = crystal_helper.merge_reflections(vec_d, hkl_matrix, 0.0001)
+    assert [round(ref[0], 3) for ref in reflection_list] == [2.0, 1.5, 1.0]
+    assert reflection_list[0][1] == [[1, 0, 0], [0, 1, 0]]
+    assert reflection_list[2][1] == [[1, 1, 1], [-1, 1, 1]]
+
+
+def test_reflection_cache():
+    """ Test reflection cache serving zoomed in d-spacing range without recalculation
+    """
+    call_list = list()
+
+    def cubic_reflections(unit_cell, min_d, max_d):
+        # simple cubic (100), (110), (111), (200)
+        call_list.append((unit_cell.key, min_d, max_d))
+        hkl_matrix = numpy.array([[1, 0, 0], [1, 1, 0], [1, 1, 1], [2, 0, 0]])
+        vec_d = unit_cell.get_cell_parameters()[0] / numpy.sqrt((hkl_matrix ** 2).sum(axis=1))
+        in_range = (vec_d >= min_d) & (vec_d <= max_d)
+        return vec_d[in_range], hkl_matrix[in_range]
+
+    cache = crystal_helper.ReflectionCache(cubic_reflections)
+    unit_cell = crystal_helper.UnitCell(crystal_helper.UnitCell.PRIMITIVE, 4.)
+    assert len(cache.get_merged_reflections(unit_cell, 1., 5.)) == 4
+    assert len(cache.get_merged_reflections(unit_cell, 2.1, 3.)) == 2
+    assert len(call_list) == 1
+
+    # different lattice and wider range
+    other_cell = crystal_helper.UnitCell(crystal_helper.UnitCell.PRIMITIVE, 3.)
+    phases_reflections = cache.get_phases_reflections([unit_cell, other_cell], 0.5, 5.)
+    assert [len(reflections) for reflections in phases_reflections] == [4, 4]
+    assert len(call_list) == 3
@@ -0,0 +1,56 @@
+import numpy
+from pyvdrive.core import cyclic_slicer
+
+
+def test_locate_cycles():
+    """ Test locating cycles of a noisy sine wave log by level crossing and local maxima
+    """
+    vec_times, vec_value = cyclic_slicer.generate_sine_log(100000, 20, noise=5.)
+
+    vec_min_indexes, vec_max_indexes = cyclic_slicer.locate_cycles(vec_value, 11)
+    assert vec_max_indexes.shape[0] == 20
+    assert vec_min_indexes.shape[0] == 21
+    # maxima at the middle of each 5000-second cycle and minima in between
+    assert numpy.abs(vec_times[vec_max_indexes] - (numpy.arange(20) * 5000. + 2500.)).max() < 250.
+    assert numpy.abs(vec_times[vec_min_indexes[1:-1]] - numpy.arange(1, 20) * 5000.).max() < 250.
+
+    # local maxima: noise wiggles on the top of each cycle are not cycles
+    peak_min_indexes, peak_max_indexes = cyclic_slicer.locate_cycles(vec_value, 11, method='peak',
+                                                                     lower_limit=vec_value.mean())
+    assert peak_max_indexes.shape[0] == 20
+    assert peak_min_indexes.shape[0] == 21
+    assert numpy.abs(vec_times[peak_max_indexes] - (numpy.arange(20) * 5000. + 2500.)).max() < 250.
+
+    # noise-free
+    vec_times, vec_value = cyclic_slicer.generate_sine_log(100000, 20, noise=0.)
+    peak_min_indexes, peak_max_indexes = cyclic_slicer.locate_cycles(vec_value, 5, method='peak')
+    assert peak_max_indexes.shape[0] == 20
+    assert peak_min_indexes.shape[0] == 21
+
+
+def test_cyclic_splitters():
+    """ Test splitting cycles by phase and by log value
+    """
+    vec_times, vec_value = cyclic_slicer.generate_sine_log(100000, 10, noise=0.)
+    vec_min_indexes, vec_max_indexes = cyclic_slicer.locate_cycles(vec_value, 1)
+
+    phase_splitters = cyclic_slicer.generate_phase_splitters(vec_times, vec_min_indexes, 4)
+    assert phase_splitters.number_splitters == 40
+    assert phase_splitters.targets[:5].tolist() == [0, 1, 2, 3, 0]
+    assert not phase_splitters.has_overlap()
+
+    log_boundaries = [200., 400., 600., 800., 1000.]
+    rising_splitters = cyclic_slicer.generate_log_value_splitters(vec_times, vec_value, vec_min_indexes,
+                                                                  vec_max_indexes, log_boundaries, rising=True)
+    falling_splitters = cyclic_slicer.generate_log_value_splitters(vec_times, vec_value, vec_min_indexes,
+                                                                   vec_max_indexes, log_boundaries, rising=False)
+    for splitters in [rising_splitters, falling_splitters]:
+        assert splitters.number_splitters == 40
+        vec_start_index = numpy.searchsorted(vec_times, splitters.start_times)
+        vec_stop_index = numpy.searchsorted(vec_times, splitters.stop_times)
+        vec_middle = vec_value[(vec_start_index + vec_stop_index) // 2]
+        vec_target = splitters.targets
+        assert (vec_middle > numpy.array(log_boundaries)[vec_target]).all()
+        assert (vec_middle < numpy.array(log_boundaries)[vec_target + 1]).all()
+    assert rising_splitters.targets[:4].tolist() == [0, 1, 2, 3]
+    assert falling_splitters.targets[:4].tolist() == [3, 2, 1, 0]
@@ -0,0 +1,64 @@
+import numpy
+from pyvdrive.core import image_raster
+
+
+def test_rebin_to_pixels():
+    """ Test rebinning patterns on non-uniform X to uniform pixels
+    """
+    vec_x = numpy.logspace(numpy.log10(0.3), numpy.log10(3.0), 20000)
+    matrix_y = numpy.random.RandomState(0).uniform(0, 1, (3, 20000))
+    matrix_y[1, 12345] = 100.
+
+    image = image_raster.rebin_to_pixels(vec_x, matrix_y, 0.3, 3.0, 500)
+    assert image.shape == (3, 500)
+    assert image.max() == 100.
+    assert image[1].argmax() == int((vec_x[12345] - 0.3) / (2.7 / 500))
+
+    # mean of a constant pattern; pixels narrower than bins take the next data point
+    image = image_raster.rebin_to_pixels(vec_x[:100], numpy.ones(100), 0.3, 0.31, 2000, mode='mean')
+    numpy.testing.assert_allclose(image, 1.)
+
+
+def test_append_row():
+    """ Test appending patterns to the ring buffer of raster
+    """
+    vec_x = numpy.linspace(0.5, 2.5, 1000)
+    raster = image_raster.ImageRaster(vec_x, 3, 100)
+    raster.set_x_range(0.5, 2.5)
+    assert raster.last_label is None
+
+    for acc_index in range(1, 5):
+        raster.append_row(acc_index, numpy.zeros(1000) + acc_index)
+    assert raster.last_label == 4
+    numpy.testing.assert_array_equal(raster.row_labels, [2, 3, 4])
+    numpy.testing.assert_array_equal(raster.image[:, 0], [2., 3., 4.])
+    assert raster.extent == (0.5, 2.5, -0.5, 2.5)
+
+    # zoom in
+    raster.set_x_range(1.0, 1.5, 50)
+    assert raster.image.shape == (3, 50)
+    numpy.testing.assert_array_equal(raster.image[:, -1], [2., 3., 4.])
+
+
+def test_update_raster():
+    """ Test that updating raster refreshes the accumulation in progress and is reset by a new data set
+    """
+    vec_x = numpy.linspace(0.5, 2.5, 1000)
+    acc_dict = dict([(acc_index, (vec_x, numpy.zeros(1000) + acc_index)) for acc_index in [1, 2, 3]])
+    raster, is_new = image_raster.update_raster(None, acc_dict, 3, 100, (0.5, 2.5), 'acc')
+    assert is_new
+    numpy.testing.assert_array_equal(raster.image[:, 0], [1., 2., 3.])
+
+    # accumulation 3 in progress gets more counts
+    acc_dict = {2: (vec_x, numpy.zeros(1000) + 2), 3: (vec_x, numpy.zeros(1000) + 30)}
+    updated_raster, is_new = image_raster.update_raster(raster, acc_dict, 3, 100, (0.5, 2.5), 'acc')
+    assert updated_raster is raster and not is_new
+    numpy.testing.assert_array_equal(raster.image[:, 0], [1., 2., 30.])
+
+    # same X and number of rows but another mode: rows are not mixed
+    runs_dict = dict([(run_number, (vec_x, numpy.zeros(1000) - run_number)) for run_number in [2, 3]])
+    runs_raster, is_new = image_raster.update_raster(raster, runs_dict, 3, 100, (0.5, 2.5), ('runs', 2))
+    assert is_new
+    assert runs_raster.data_key == ('runs', 2)
+    numpy.testing.assert_array_equal(runs_raster.row_labels, [2, 3])
+    numpy.testing.assert_array_equal(runs_raster.image[:, 0], [-2., -3.])
@@ -0,0 +1,69 @@
+import numpy
+import pytest
+from pyvdrive.core import io_peak_file
+
+
+def test_peak_file_round_trip(tmpdir):
+    """ Test exporting peaks (single and overlapped) to a GSAS peak file and importing back
+    """
+    peak_manager = io_peak_file.GSASPeakFileManager()
+    peak_manager.add_peak(bank=1, name='111', position=2.05, width=0.02, group_id=None)
+    peak_manager.add_peak(bank=1, name='200', position=1.17, width=0.012, group_id=None)
+    peak_manager.add_peak(bank=1, name='210', position=1.24, width=0.013, group_id=[1.17])
+    peak_manager.add_peak(bank=2, name='111', position=0.0825, width=0.001, group_id=None)
+    with pytest.raises(RuntimeError):
+        peak_manager.add_peaks([2], ['111'], [1.5], [0.01], [0])
+    peak_manager.delete_peak(2, '111')
+    peak_manager.add_peak(bank=2, name='111', position=0.0825, width=0.001, group_id=None)
+
+    file_name = str(tmpdir.join('peak.txt'))
+    peak_manager.export_peaks(file_name)
+    lines = open(file_name).read().split('\n')
+    assert lines[0] == io_peak_file.BANK_HEADER
+    assert lines[1].split() == ['1', '111', '1', '2.050', '0.020']
+    assert lines[2].split() == ['1', '210', '2', '1.240', '1.170', '0.013']
+    assert lines[3].split() == ['1', '200', '2', '1.170', '1.240', '0.012']
+    assert lines[5].split() == ['2', '111', '1', '0.08250', '0.001']
+
+    import_manager = io_peak_file.GSASPeakFileManager()
+    import_manager.import_peaks(file_name)
+    assert import_manager.get_peaks() == peak_manager.get_peaks()
+    assert import_manager.get_peaks()[1] == [1, '210', 1.24, 0.013, [1.17]]
+    peak_array = import_manager.get_peak_array()
+    assert peak_array['group'][1] == peak_array['group'][2] != peak_array['group'][0]
+
+
+def test_format_significant_4():
+    """ Test formatting positions in arrays
+    """
+    vec_str = io_peak_file.format_significant_4_array(numpy.array([0.012345, 0.12345, 1.2345]))
+    assert vec_str.tolist() == [io_peak_file.format_significant_4(x) for x in [0.012345, 0.12345, 1.2345]]
+    with pytest.raises(RuntimeError):
+        io_peak_file.format_significant_4_array([12.])
+
+
+def test_example_peak_file_round_trip(tmpdir):
+    """ Test importing and exporting the example peak file, whose overlapped peaks may not have their own lines
+    """
+    # example is in the module's header comments
+    example_lines = [line[2:] for line in open(io_peak_file.__file__).read().split('\n')[:33]
+                     if line.startswith(('# $', '# 1', '# 2'))]
+    example_name = str(tmpdir.join('example.txt'))
+    with open(example_name, 'w') as example_file:
+        example_file.write('\n'.join(example_lines) + '\n')
+
+    peak_manager = io_peak_file.GSASPeakFileManager()
+    peak_manager.import_peaks(example_name)
+    assert peak_manager.get_number_peaks() == 16
+    assert [1, 'bcc110', 2.101, 0.03, [2.07]] in peak_manager.get_peaks()
+    assert [2, 'Fcc200', 1.879, 0.035, None] in peak_manager.get_peaks()
+
+    export_name = str(tmpdir.join('export.txt'))
+    peak_manager.export_peaks(export_name)
+
+    def parse_lines(file_name):
+        return sorted([tuple([line.split()[0], line.split()[1]] + [float(term) for term in line.split()[2:]])
+                       for line in open(file_name).read().split('\n')
+                       if len(line.strip()) > 0 and not line.startswith('$')])
+
+    assert parse_lines(export_name) == parse_lines(example_name)
@@ -0,0 +1,40 @@
+import sys
+from pyvdrive.core import lazy_import
+from pyvdrive.core import import_benchmark
+
+
+def test_lazy_module_and_attribute(tmp_path, monkeypatch):
+    """ Test that a module is imported at the first use of the proxies
+    """
+    module_file = tmp_path / 'pyvdrive_lazy_example.py'
+    module_file.write_text('class Peak(object):\n    pass\n\n\ndef square(x):\n    return x * x\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'pyvdrive_lazy_example', raising=False)
+
+    example = lazy_import.lazy_module('pyvdrive_lazy_example')
+    square = lazy_import.lazy_attribute('pyvdrive_lazy_example', 'square')
+    Peak = lazy_import.lazy_attribute('pyvdrive_lazy_example', 'Peak')
+    assert not lazy_import.is_imported('pyvdrive_lazy_example')
+
+    assert square(3) == 9
+    assert lazy_import.is_imported('pyvdrive_lazy_example')
+    assert isinstance(example.Peak(), Peak)
+    assert example.square(2) == 4
+
+
+def test_parse_import_time():
+    """ Test parsing the report of python -X importtime
+    """
+    report = 'import time: self [us] | cumulative | imported package\n' \
+             'import time:       100 |        100 |   numpy.core\n' \
+             'import time:       300 |        400 | numpy\n' \
+             'import time:        50 |         50 | pyvdrive\n' \
+             'Traceback (most recent call last):\n'
+    record_list = import_benchmark.parse_import_time(report)
+    assert [(record.module, record.depth) for record in record_list] == \
+        [('numpy.core', 1), ('numpy', 0), ('pyvdrive', 0)]
+
+    summary = import_benchmark.summarize_import_time(record_list, num_top=1)
+    assert abs(summary['total'] - 450.E-6) < 1.E-12
+    assert summary['top_modules'] == [('numpy', 300.E-6)]
+    assert summary['heavy_modules'] == []
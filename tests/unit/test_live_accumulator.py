@@ -0,0 +1,45 @@
+import numpy
+import pytest
+from pyvdrive.core import live_accumulator
+
+
+def test_add_increment():
+    """ Test summing increments into the ring buffer of accumulations
+    """
+    acc_buffer = live_accumulator.LiveAccumulationBuffer(max_accumulations=3, max_increments=2)
+    vec_x = numpy.linspace(0.3, 3.5, 11)
+    assert acc_buffer.current_index == -1
+
+    for i_incr in range(9):
+        matrix_y = numpy.zeros((3, 10)) + i_incr
+        log_dict = {'temperature': (numpy.array([i_incr * 10.]), numpy.array([300. + i_incr]))}
+        is_new = acc_buffer.add_increment(vec_x, matrix_y, numpy.ones((3, 10)), pulse_time=i_incr, log_dict=log_dict)
+        assert is_new == (i_incr % 2 == 0)
+    # END-FOR
+
+    # accumulation 4 is in progress with increment 8.  accumulation 0 and 1 are dropped
+    assert acc_buffer.current_index == 4
+    assert acc_buffer.get_accumulation_indexes(-1) == [2, 3, 4]
+    assert not acc_buffer.has_accumulation(1)
+    assert acc_buffer.is_complete(3) and not acc_buffer.is_complete(4)
+    with pytest.raises(RuntimeError):
+        acc_buffer.get_data(0, 0)
+
+    vec_x_p, vec_y, vec_e = acc_buffer.get_data(3, 1)
+    numpy.testing.assert_allclose(vec_x_p, 0.5 * (vec_x[1:] + vec_x[:-1]))
+    numpy.testing.assert_allclose(vec_y, 6. + 7.)
+    numpy.testing.assert_allclose(vec_e, numpy.sqrt(2.))
+    assert acc_buffer.get_pulse_time(3) == 7
+
+    data_dict = acc_buffer.get_last_n_data(2, 2)
+    assert sorted(data_dict.keys()) == [3, 4]
+    numpy.testing.assert_allclose(data_dict[4][1], 8.)
+
+    vec_time, vec_value = acc_buffer.get_sample_log('temperature', 2)
+    numpy.testing.assert_allclose(vec_time, [60., 70., 80.])
+    numpy.testing.assert_allclose(vec_value, [306., 307., 308.])
+    assert acc_buffer.get_sample_log('pressure', -1) == (None, None)
+
+    # increment with different shape
+    with pytest.raises(RuntimeError):
+        acc_buffer.add_increment(vec_x[:6], numpy.zeros((3, 5)), numpy.zeros((3, 5)))
@@ -0,0 +1,113 @@
+import h5py
+import numpy
+from pyvdrive.core import live_replay
+
+
+def create_event_nexus(file_name, num_pulses=600, events_per_pulse=20):
+    """ Create a small event NeXus file with 2 banks and a sample log (60 Hz pulses)
+    """
+    random = numpy.random.RandomState(1)
+    with h5py.File(file_name, 'w') as nexus_h5:
+        entry = nexus_h5.create_group('entry')
+        entry.create_dataset('start_time', data=[b'2020-01-01T00:00:00.000000-05:00'])
+        for bank_name in ['bank1', 'bank2']:
+            events = entry.create_group('{}_events'.format(bank_name))
+            events.create_dataset('event_time_zero', data=numpy.arange(num_pulses) / 60.)
+            events.create_dataset('event_index', data=numpy.arange(num_pulses) * events_per_pulse)
+            events.create_dataset('event_time_offset',
+                                  data=random.uniform(6000., 55000., num_pulses * events_per_pulse))
+        log_group = entry.create_group('DASlogs/temperature')
+        log_group.create_dataset('time', data=numpy.arange(10.))
+        log_group.create_dataset('value', data=300. + numpy.arange(10.))
+
+
+def test_replay_event_nexus(tmpdir):
+    """ Test replaying an event NeXus file in chunks
+    """
+    nexus_name = str(tmpdir.join('VULCAN_1_event.nxs'))
+    create_event_nexus(nexus_name)
+
+    source = live_replay.EventNexusReplaySource(nexus_name, chunk_seconds=2.)
+    assert source.number_chunks == 5
+    chunk_list = list(source.iter_chunks())
+    assert len(chunk_list) == 5
+    assert chunk_list[0].matrix_y.shape == (2, source._vec_x.shape[0] - 1)
+    assert source._vec_x[0] == live_replay.LIVE_D_BINNING[0]
+    # events of TOF between 6000 and 55000 micro-seconds are all within d-spacing 0.3 to 3.5 Angstrom
+    assert sum(chunk.matrix_y.sum() for chunk in chunk_list) == 2 * 600 * 20
+    numpy.testing.assert_array_equal(chunk_list[1].log_dict['temperature'][1], [302., 303.])
+
+    result = live_replay.benchmark_live_processing(source)
+    assert result.processed_updates == 5 and result.dropped_updates == 0
+    assert result.memory_peak > 0
+
+
+def test_live_view_processor():
+    """ Test that replayed chunks are accumulated and the accumulation in progress is on the 2D image
+    """
+    source = live_replay.SyntheticLiveSource(8, num_banks=2, counts_per_chunk=1000)
+    processor = live_replay.LiveViewProcessor(max_accumulations=5, increments_per_accumulation=3, last_n_2d=3,
+                                              num_pixels=200)
+    result = live_replay.benchmark_live_processing(source, processor.process)
+    assert result.processed_updates == 8
+    # peak memory includes the accumulation slabs: 5 accumulations x 2 banks for Y and E^2
+    num_bins = source._vec_x.shape[0] - 1
+    assert result.memory_peak >= 2 * 5 * 2 * num_bins * 8
+
+    # chunks 0-2, 3-5 and 6-7 (in progress) are summed to accumulations 0, 1 and 2
+    acc_buffer = processor.accumulation_buffer
+    assert acc_buffer.current_index == 2
+    assert not acc_buffer.is_complete(2)
+    for spec_index in range(2):
+        raster = processor.get_raster(spec_index)
+        numpy.testing.assert_array_equal(raster.row_labels, [0, 1, 2])
+        assert raster.data_key == 'acc'
+        # the last row is the accumulation in progress with all of its 2 chunks
+        assert raster.image[-1].max() == acc_buffer.get_data(2, spec_index)[1].max()
+
+
+class FakeClock(object):
+    """ Clock whose time advances only by sleep()
+    """
+    def __init__(self):
+        self.now = 0.
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_benchmark_dropped_updates():
+    """ Test counting updates dropped by a slow consumer
+    """
+    source = live_replay.SyntheticLiveSource(10, chunk_seconds=10.)
+    clock = FakeClock()
+
+    processed_list = list()
+
+    def process(chunk):
+        processed_list.append(chunk.index)
+        clock.sleep(0.026)
+
+    # a chunk arrives every 0.01 seconds while processing takes 0.026 seconds: a chunk is dropped if the next one
+    # has arrived before it is processed.  The last chunk is always processed
+    result = live_replay.benchmark_live_processing(source, process, speedup=1000., clock=clock)
+    assert processed_list == [0, 2, 5, 7, 9]
+    assert result.processed_updates == 5
+    assert result.dropped_updates == 5
+    numpy.testing.assert_allclose(result.latencies, 0.026)
+
+
+def test_update_monitor():
+    """ Test counting live outputs replaced before the live view processes them
+    """
+    monitor = live_replay.LiveUpdateMonitor()
+    monitor.record(0.1, live_counter=1)
+    monitor.record(0.2, live_counter=2)
+    monitor.record(0.3, live_counter=5)
+    monitor.record(0.2, live_counter=7, num_updates=2)
+    assert monitor.processed_updates == 4
+    assert monitor.dropped_updates == 2
+    assert 'Dropped updates: 2' in monitor.report()
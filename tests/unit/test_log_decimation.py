@@ -0,0 +1,87 @@
+import numpy
+from pyvdrive.core import log_decimation
+
+
+def generate_log(num_points=200000):
+    """ Generate a synthetic sample log with a few spikes
+    :return: vector time, vector value, list of spike indexes
+    """
+    vec_x = numpy.linspace(0., 3600., num_points)
+    vec_y = numpy.sin(vec_x / 100.) + numpy.random.RandomState(0).normal(0, 0.01, num_points)
+    spike_indexes = [1234, 98765, 150001]
+    vec_y[spike_indexes[0]] = 10.
+    vec_y[spike_indexes[1]] = -10.
+    vec_y[spike_indexes[2]] = 20.
+
+    return vec_x, vec_y, spike_indexes
+
+
+def test_decimate_min_max():
+    """ Test decimation by buckets keeping minimum and maximum
+    """
+    vec_x, vec_y, spike_indexes = generate_log()
+
+    dec_x, dec_y = log_decimation.decimate_min_max(vec_x, vec_y, 1000)
+    assert dec_x.shape[0] <= 4 * 1000
+    assert dec_x[0] == vec_x[0] and dec_x[-1] == vec_x[-1]
+    assert numpy.all(numpy.diff(dec_x) > 0)
+    for spike_index in spike_indexes:
+        assert vec_x[spike_index] in dec_x
+    assert dec_y.max() == vec_y.max() and dec_y.min() == vec_y.min()
+
+    # sparse log is not decimated
+    dec_x, dec_y = log_decimation.decimate_min_max(vec_x[:100], vec_y[:100], 1000)
+    assert dec_x.shape[0] == 100
+
+
+def test_pyramid_query():
+    """ Test querying multi-resolution pyramid in zoomed ranges
+    """
+    vec_x, vec_y, spike_indexes = generate_log()
+    pyramid = log_decimation.LogDecimationPyramid(vec_x, vec_y)
+    assert pyramid.number_levels > 10
+
+    # full range
+    dec_x, dec_y = pyramid.query(None, None, 500)
+    assert dec_x.shape[0] <= 4 * 2 * 500
+    assert dec_y.max() == 20. and dec_y.min() == -10.
+
+    # zoom in to a range with spike
+    min_x, max_x = vec_x[90000], vec_x[110000]
+    dec_x, dec_y = pyramid.query(min_x, max_x, 500)
+    assert dec_x.shape[0] <= 4 * 2 * 500 + 8
+    assert dec_x[0] <= min_x and dec_x[-1] >= max_x
+    assert dec_y.min() == -10.
+
+    # zoom in so much that raw data is returned
+    dec_x, dec_y = pyramid.query(vec_x[1000], vec_x[1100], 500)
+    numpy.testing.assert_array_equal(dec_y, vec_y[999:1102])
+
+
+def test_build_slicer_segments():
+    """ Test building the segments of a log split by slicers with gaps, ignored targets and out-of-log slicers
+    """
+    vec_x = numpy.arange(11.)
+    vec_y = 2. * vec_x
+
+    # slicers: starts before the log, has no log entry, not interested, ends after the log and is out of the log
+    vec_times = numpy.array([-5., 2., 2.5, 3., 20., 30.])
+    vec_targets = numpy.array([0, 1, -1, 2, 3])
+    segment_list, seg_indexes = log_decimation.build_slicer_segments(vec_x, vec_y, vec_times, vec_targets)
+
+    assert seg_indexes.tolist() == [0, 1, 3]
+    expected_ranges = [(0., 2.), (2., 2.5), (3., 10.)]
+    for segment, (start_x, stop_x) in zip(segment_list, expected_ranges):
+        assert segment.shape[1] == 2
+        assert segment[0, 0] == start_x and segment[-1, 0] == stop_x
+        numpy.testing.assert_allclose(segment[:, 1], 2. * segment[:, 0])
+        assert numpy.all(numpy.diff(segment[:, 0]) >= 0.)
+    # slicer without log entry is connected to its neighbors by interpolated points
+    numpy.testing.assert_allclose(segment_list[1][-1], [2.5, 5.])
+    # all log entries in the slicer are included
+    assert set(numpy.arange(3., 11.)) <= set(segment_list[2][:, 0])
+
+    # string targets
+    segment_list, seg_indexes = log_decimation.build_slicer_segments(vec_x, vec_y, vec_times,
+                                                                     ['a', 'b', '-1', 'c', 'd'])
+    assert seg_indexes.tolist() == [0, 1, 3]
@@ -0,0 +1,81 @@
+import numpy
+import pytest
+from pyvdrive.core import mantid_helper
+from pyvdrive.core.merge_accumulator import SampleLogSummary
+from pyvdrive.core.merge_accumulator import StreamingRunMerger
+
+
+def test_sample_log_summary():
+    """ Test folding the sample logs of runs one by one into the summary
+    """
+    run_logs = [{'temperature': numpy.array([300., 301., 302.]), 'strain': numpy.array([0.1])},
+                {'temperature': numpy.array([350., 352.]), 'strain': numpy.array([])},
+                {'temperature': numpy.array([299.])}]
+
+    summary = SampleLogSummary()
+    for log_dict in run_logs:
+        summary.add_run(log_dict)
+
+    assert summary.number_runs == 3
+    assert summary.log_names == ['temperature', 'strain']
+
+    all_temperatures = numpy.concatenate([log_dict['temperature'] for log_dict in run_logs])
+    temp_summary = summary.get_summary('temperature')
+    assert temp_summary['count'] == 6
+    assert temp_summary['min'] == 299. and temp_summary['max'] == 352.
+    numpy.testing.assert_allclose(temp_summary['mean'], all_temperatures.mean())
+    numpy.testing.assert_allclose(temp_summary['std'], all_temperatures.std())
+    assert summary.get_summary('strain')['count'] == 1
+
+    with pytest.raises(RuntimeError):
+        summary.get_summary('pressure')
+
+
+def test_streaming_run_merger(monkeypatch):
+    """ Test folding runs into histograms of 2 binnings while the runs' events are deleted right away
+    """
+    # workspaces in ADS: events (list of TOF arrays, one per spectrum) or histogram (edges, Y and E^2)
+    ads = dict()
+    monkeypatch.setattr(mantid_helper, 'workspace_does_exist', lambda ws_name: ws_name in ads)
+    monkeypatch.setattr(mantid_helper, 'get_sample_log_arrays', lambda ws_name: ads[ws_name]['logs'])
+    monkeypatch.setattr(mantid_helper, 'mtd_convert_units', lambda ws_name, unit: None)
+    monkeypatch.setattr(mantid_helper, 'delete_workspace', lambda ws_name: ads.pop(ws_name))
+
+    def rebin(ws_name, params, preserve, output_ws_name):
+        matrix_y = numpy.array([numpy.histogram(events, params)[0] for events in ads[ws_name]['events']])
+        ads[output_ws_name] = {'x': params, 'y': matrix_y.astype('float64'), 'e2': matrix_y.astype('float64'),
+                               'logs': ads[ws_name]['logs']}
+
+    def plus_workspaces(lhs_ws_name, rhs_ws_name, out_ws_name):
+        assert numpy.allclose(ads[lhs_ws_name]['x'], ads[rhs_ws_name]['x'])
+        ads[out_ws_name] = {'x': ads[lhs_ws_name]['x'], 'y': ads[lhs_ws_name]['y'] + ads[rhs_ws_name]['y'],
+                            'e2': ads[lhs_ws_name]['e2'] + ads[rhs_ws_name]['e2'], 'logs': dict()}
+
+    monkeypatch.setattr(mantid_helper, 'rebin', rebin)
+    monkeypatch.setattr(mantid_helper, 'plus_workspaces', plus_workspaces)
+
+    bin_params_list = [numpy.linspace(5000., 70000., 101), numpy.linspace(5000., 70000., 201)]
+    merger = StreamingRunMerger(bin_params_method=lambda ws_name: bin_params_list)
+    random = numpy.random.RandomState(2)
+    all_events = [list(), list(), list()]
+    for run_number in range(1000, 1004):
+        ws_name = 'VULCAN_{}_events'.format(run_number)
+        ads[ws_name] = {'events': [random.uniform(5000., 70000., 1000) for _ in range(3)],
+                        'logs': {'temperature': numpy.array([300. + run_number - 1000])}}
+        for spec_index in range(3):
+            all_events[spec_index].append(ads[ws_name]['events'][spec_index])
+        merger.add_run(run_number, ws_name)
+
+        # no events are kept
+        assert len([name for name in ads if 'events' in ads[name]]) == 0
+        assert sorted(ads.keys()) == sorted(merger.workspace_names)
+    # END-FOR
+
+    assert merger.workspace_names == ['VULCAN_1000_events', 'VULCAN_1000_events_1']
+    for merged_ws_name, bin_params in zip(merger.workspace_names, bin_params_list):
+        expected_y = [numpy.histogram(numpy.concatenate(events), bin_params)[0] for events in all_events]
+        numpy.testing.assert_allclose(ads[merged_ws_name]['y'], expected_y)
+
+    report = merger.report(log_names=['temperature', 'pressure'])
+    assert 'temperature: mean = 301.5' in report
+    assert 'pressure' not in report
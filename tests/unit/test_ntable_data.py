@@ -0,0 +1,52 @@
+import numpy
+import pytest
+from pyvdrive.interface.gui.ndav_widgets.NTableData import NTableData
+
+
+def test_bulk_append_and_values():
+    """ Test appending rows and columns at once and reading cells
+    """
+    table = NTableData([('Start', 'float'), ('Stop', 'float'), ('Target', 'str'), ('', 'checkbox')])
+    table.append_rows([[0., 10., 1, True], [10., '', 2, False]])
+    table.append_columns([numpy.arange(20., 50., 10.), numpy.arange(30., 60., 10.), range(3, 6), [True] * 3])
+
+    assert table.number_rows == 5
+    assert table.get_value(1, 1, allow_blank=True) is None
+    with pytest.raises(RuntimeError):
+        table.get_value(1, 1)
+    assert table.get_value(4, 2) == '5'
+    assert table.format_value(0, 0, 3) == '0.000'
+    assert table.get_rows(3, True) == [0, 2, 3, 4]
+
+    # set a column at once
+    table.set_column_values(3, False)
+    assert table.get_rows(3, True) == []
+    table.set_column_values(1, numpy.array([1., 2.]), [0, 1])
+    numpy.testing.assert_allclose(table.get_column(1), [1., 2., 30., 40., 50.])
+
+
+def test_sort_filter_remove():
+    """ Test sorting and filtering the view and removing rows of the view
+    """
+    table = NTableData([('Run Number', 'int'), ('', 'checkbox')])
+    table.append_columns([[170003, 170001, 170004, 170002], [False] * 4])
+
+    table.sort(0)
+    assert table.get_column(0).tolist() == [170001, 170002, 170003, 170004]
+    table.sort(0, descending=True)
+    assert table.find_rows(0, [170002, 169999]).tolist() == [2, -1]
+
+    # new rows follow the sort key
+    table.append_rows([[170000, True]])
+    assert table.get_column(0)[-1] == 170000
+
+    table.set_filter(0, lambda vec_runs: vec_runs % 2 == 0)
+    assert table.get_column(0).tolist() == [170004, 170002, 170000]
+
+    # rows are addressed in the view
+    table.remove_rows([0, 2])
+    assert table.number_rows == 1
+    assert table.number_total_rows == 3
+    table.set_filter(None, None)
+    table.sort(None)
+    assert table.get_column(0).tolist() == [170003, 170001, 170002]
@@ -0,0 +1,56 @@
+import datetime
+import os
+from pyvdrive.core import mantid_helper
+from pyvdrive.core import parallel_reduction
+from pyvdrive.core import reductionmanager
+from pyvdrive.core import vulcan_util
+
+
+class _FakeGSASWriter(object):
+    def import_vanadium(self, van_gsas_name):
+        return 'van_ws'
+
+    def save(self, ws_name, gsas_file_name, **kwargs):
+        with open(gsas_file_name, 'w') as gsas_file:
+            gsas_file.write(ws_name)
+
+
+class _FakeReductionManager(object):
+    def __init__(self, instrument):
+        self.gsas_writer = _FakeGSASWriter()
+
+    def reduce_event_nexus(self, run_number, **kwargs):
+        if run_number == 2:
+            raise RuntimeError('No events')
+        return 'VULCAN_{}'.format(run_number), 'Reduced'
+
+
+def test_reduce_runs_serially(monkeypatch, tmpdir):
+    """ Test that a single worker reduces the runs in the calling process and reports a failed run
+    """
+    monkeypatch.setattr(reductionmanager, 'ReductionManager', _FakeReductionManager)
+    monkeypatch.setattr(vulcan_util, 'get_run_date', lambda ws_name, raw_file_name: datetime.datetime(2019, 3, 1))
+    deleted_ws_names = list()
+    monkeypatch.setattr(mantid_helper, 'workspace_does_exist', lambda ws_name: ws_name not in deleted_ws_names)
+    monkeypatch.setattr(mantid_helper, 'delete_workspace', lambda ws_name: deleted_ws_names.append(ws_name))
+
+    task_list = list()
+    for run_number in [1, 2]:
+        raw_file_name = str(tmpdir.join('VULCAN_{}_event.nxs'.format(run_number)))
+        open(raw_file_name, 'w').close()
+        task_list.append(parallel_reduction.RunReductionTask(1234, run_number, raw_file_name, 'dSpacing', None, 3,
+                                                             None, None, False,
+                                                             str(tmpdir.join('{}.gda'.format(run_number))),
+                                                             True, None))
+    # END-FOR
+
+    reducer = parallel_reduction.ParallelRunReducer(1)
+    result_list = reducer.reduce_runs(task_list)
+
+    assert [result.run_number for result in result_list] == [1, 2]
+    assert result_list[0].status
+    assert not result_list[1].status
+    assert 'No events' in result_list[1].message
+    assert os.path.exists(task_list[0].gsas_file_name)
+    assert not os.path.exists(task_list[1].gsas_file_name)
+    assert deleted_ws_names == ['VULCAN_1']
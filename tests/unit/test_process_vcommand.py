@@ -0,0 +1,15 @@
+import multiprocessing
+import pytest
+from pyvdrive.interface.vdrive_commands import process_vcommand
+
+
+def test_parse_number_processes():
+    """ Test parsing NPROC
+    """
+    assert process_vcommand.parse_number_processes(' 1 ') == 1
+    assert process_vcommand.parse_number_processes(multiprocessing.cpu_count()) == multiprocessing.cpu_count()
+    for bad_nproc in ['two', '1.5', '0', '-2']:
+        with pytest.raises(RuntimeError, match='NPROC must be a positive integer'):
+            process_vcommand.parse_number_processes(bad_nproc)
+    with pytest.raises(RuntimeError, match='no larger than number of CPUs'):
+        process_vcommand.parse_number_processes(multiprocessing.cpu_count() + 1)
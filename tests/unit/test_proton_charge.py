@@ -0,0 +1,44 @@
+import pytest
+import numpy
+import h5py
+from pyvdrive.core.proton_charge import ProtonChargeTable
+
+
+def create_archive(archive_dir):
+    """ Create a fake archive with a NeXus file of run 1234 and chopped data record of run 1235 in IPTS-21
+    :param archive_dir: py.path.local
+    :return:
+    """
+    nexus_dir = archive_dir.mkdir('IPTS-21').mkdir('nexus')
+    nexus_h5 = h5py.File(str(nexus_dir.join('VULCAN_1234.nxs.h5')), 'w')
+    nexus_h5.create_group('entry').create_dataset('proton_charge', data=numpy.array([1.5E12]))
+    nexus_h5.close()
+
+    record_dir = archive_dir.join('IPTS-21').mkdir('shared').mkdir('ChoppedData').mkdir('1235')
+    with open(str(record_dir.join('1235sampleenv_chopped_mean.txt')), 'w') as record_file:
+        for seq in [3, 1, 2]:
+            record_file.write('{}\t{}\t{}\n'.format(seq, seq * 100., 300 + seq))
+
+
+def test_proton_charge_table(tmpdir):
+    """ Test looking up proton charges of single run and chopped run and saving the table
+    """
+    archive_dir = tmpdir.mkdir('archive')
+    create_archive(archive_dir)
+    table_file_name = str(tmpdir.join('pc_table.txt'))
+
+    pc_table = ProtonChargeTable(str(archive_dir), table_file_name)
+    assert pc_table.get_proton_charge(21, 1234) == 1.5E12
+    numpy.testing.assert_allclose(pc_table.get_proton_charges(21, 1235, [3, 1, 2, 1]), [300., 100., 200., 100.])
+    assert pc_table.get_proton_charge(21, 1235, 2) == 200.
+    with pytest.raises(RuntimeError):
+        pc_table.get_proton_charges(21, 1235, [1, 4])
+    with pytest.raises(RuntimeError):
+        pc_table.get_proton_charge(21, 1236)
+
+    # load from saved table without archive
+    archive_dir.remove()
+    pc_table2 = ProtonChargeTable(str(archive_dir), table_file_name)
+    assert pc_table2.has_run(21, 1235, chopped=True) and pc_table2.has_run(21, 1234, chopped=False)
+    assert pc_table2.get_proton_charge(21, 1234) == 1.5E12
+    numpy.testing.assert_allclose(pc_table2.get_proton_charges(21, 1235, numpy.array([2, 3])), [200., 300.])
@@ -0,0 +1,73 @@
+import json
+import threading
+import pytest
+from pyvdrive.core import reduction_profiler
+
+
+def test_stage_records(tmpdir):
+    """ Test recording nested stages and exporting to JSON
+    """
+    reduction_profiler.clear_profilers()
+    profiler = reduction_profiler.start_profiling(12345, record_memory=False)
+
+    @reduction_profiler.profile_stage('Focus')
+    def focus():
+        return sum(range(1000))
+
+    with reduction_profiler.stage('Reduce'):
+        with reduction_profiler.stage('Load'):
+            pass
+        assert focus() == 499500
+    with pytest.raises(RuntimeError):
+        with reduction_profiler.stage('SaveGSAS'):
+            raise RuntimeError('Unable to write')
+
+    records = profiler.records
+    assert [(record.name, record.level) for record in records] == [('Reduce', 0), ('Load', 1), ('Focus', 1),
+                                                                   ('SaveGSAS', 0)]
+    assert records[3].error == 'Unable to write'
+    assert profiler.total_wall_time == pytest.approx(records[0].wall_time + records[3].wall_time)
+    assert reduction_profiler.get_profiler(12345) is profiler
+    assert profiler.report().count('(failed)') == 1
+
+    # export next to GSAS file
+    json_name = reduction_profiler.save_profile_next_to(12345, str(tmpdir.join('12345.gda')))
+    assert json_name == str(tmpdir.join('12345_timing.json'))
+    with open(json_name, 'r') as json_file:
+        profile_dict = json.load(json_file)
+    assert profile_dict['key'] == '12345'
+    assert [stage['name'] for stage in profile_dict['stages']] == ['Reduce', 'Load', 'Focus', 'SaveGSAS']
+
+    # no profiler: nothing recorded
+    reduction_profiler.clear_profilers()
+    with reduction_profiler.stage('Reduce') as record:
+        assert record is None
+    assert reduction_profiler.save_profile_next_to(12345, str(tmpdir)) is None
+
+
+def test_profilers_of_threads():
+    """ Test that runs profiled in concurrent threads record stages to their own profilers
+    """
+    reduction_profiler.clear_profilers()
+    barrier = threading.Barrier(2)
+
+    def reduce_run(run_number):
+        reduction_profiler.start_profiling(run_number, record_memory=False)
+        # both threads have started profiling before any stage is recorded
+        barrier.wait()
+        with reduction_profiler.stage('Load{}'.format(run_number)):
+            barrier.wait()
+        with reduction_profiler.stage('Focus{}'.format(run_number)):
+            pass
+
+    thread_list = [threading.Thread(target=reduce_run, args=(run_number,)) for run_number in [1, 2]]
+    for thread in thread_list:
+        thread.start()
+    for thread in thread_list:
+        thread.join()
+
+    for run_number in [1, 2]:
+        records = reduction_profiler.get_profiler(run_number).records
+        assert [record.name for record in records] == ['Load{}'.format(run_number), 'Focus{}'.format(run_number)]
+    # the main thread has no current profiler
+    assert reduction_profiler.get_profiler() is None
@@ -0,0 +1,31 @@
+import numpy
+import pytest
+from pyvdrive.core import save_vulcan_gsas
+
+
+def test_write_bank_arrays():
+    """ Test writing a GSAS SLOG bank from arrays with and without vanadium
+    """
+    vec_x = 5000. * 1.001 ** numpy.arange(5)
+    vec_y = numpy.array([1., 4., 0., 9., 16.])
+    vec_e = numpy.sqrt(vec_y)
+    write_bank = save_vulcan_gsas.SaveVulcanGSS._write_slog_bank_gsas_arrays
+
+    bank_buffer = write_bank(vec_x, vec_y, vec_e, None, None, geometry=(43.754, 90., 16372.), spectrum_index=0,
+                             gsas_bank_id=2)
+    lines = bank_buffer.split('\n')[:-1]
+    assert all(len(line) == 80 for line in lines)
+    assert lines[2].split() == ['BANK', '2', '5', '5', 'SLOG', '5000.0', '5020.0', '0.0010000', '0', 'FXYE']
+    assert [float(value) for value in lines[4].split()] == [5005.0, 4.0, 2.0]
+
+    # normalized by vanadium
+    van_vec_y = numpy.array([2., 2., 2., 3., 4.])
+    bank_buffer = write_bank(vec_x, vec_y, vec_e, van_vec_y, numpy.sqrt(van_vec_y), geometry=(43.754, 90., 16372.),
+                             spectrum_index=0, gsas_bank_id=1)
+    vec_norm = numpy.array([[float(value) for value in line.split()][1] for line in bank_buffer.split('\n')[3:-1]])
+    numpy.testing.assert_allclose(vec_norm, vec_y / van_vec_y, atol=1.E-5)
+
+    # logarithm binning cannot start from zero
+    with pytest.raises(RuntimeError):
+        write_bank(vec_x - 5000., vec_y, vec_e, None, None, geometry=(43.754, 90., 16372.), spectrum_index=0,
+                   gsas_bank_id=1)
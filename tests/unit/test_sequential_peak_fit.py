@@ -0,0 +1,81 @@
+import multiprocessing
+import numpy
+from pyvdrive.core import sequential_peak_fit
+
+
+def test_sequential_peak_fit(tmpdir):
+    """ Test fitting shifting peaks (single and overlapped) across sequences
+    """
+    vec_x = numpy.arange(1.0, 2.5, 0.0005)
+    peak_positions = [1.17, 1.24, 2.03]
+    vec_strain = numpy.linspace(0., 0.01, 20)
+    random = numpy.random.RandomState(1)
+    matrix_y = numpy.zeros((vec_strain.shape[0], vec_x.shape[0]))
+    for i_seq, strain in enumerate(vec_strain):
+        params = [20., 0.]
+        for peak_pos in peak_positions:
+            params.extend([500., peak_pos * (1. + strain), 0.004 * peak_pos])
+        matrix_y[i_seq] = random.poisson(sequential_peak_fit.multi_gaussian(vec_x, *params))
+    # END-FOR
+
+    fitter = sequential_peak_fit.SequentialPeakFitter(peak_positions)
+    assert sorted([peak_indexes for _, peak_indexes in fitter.group_specs]) == [[0, 1], [2]]
+
+    fit_table = fitter.fit(vec_x, matrix_y, list(range(20)))
+    assert fit_table.values.shape == (20, 3, len(sequential_peak_fit.PARAMETER_NAMES))
+    assert fit_table.status.all()
+    numpy.testing.assert_allclose(fit_table.get_parameter('centre'), numpy.outer(1. + vec_strain, peak_positions),
+                                  atol=1.E-3)
+
+    # peak groups fitted by spawned workers (if there are more than 1 CPU)
+    parallel_table = fitter.fit(vec_x, matrix_y, list(range(20)), num_workers=min(2, multiprocessing.cpu_count()))
+    numpy.testing.assert_allclose(parallel_table.values, fit_table.values)
+
+    # one line per sequence and peak
+    file_name = str(tmpdir.join('fit.txt'))
+    fit_table.save(file_name)
+    assert numpy.loadtxt(file_name).shape == (60, 3 + len(sequential_peak_fit.PARAMETER_NAMES) + 1)
+
+
+def test_view_fit_peaks(tmpdir, monkeypatch):
+    """ Test VIEW FITPEAK on a chopped run loaded from GSAS files, from command to the files of fitted parameters
+    """
+    from pyvdrive.core import VDriveAPI
+    from pyvdrive.core import mantid_helper
+    from pyvdrive.interface.vdrive_commands import view
+
+    # 5 chopped sequences of 2 banks with a peak shifting in d-spacing
+    vec_x = numpy.arange(1.0, 2.5, 0.0005)
+    data_dict = dict()
+    for seq_index in range(5):
+        vec_y = sequential_peak_fit.multi_gaussian(vec_x, 20., 0., 500., 2.03 * (1 + 0.001 * seq_index), 0.008)
+        data_dict['G2000_{}'.format(seq_index)] = vec_y
+
+    # Mantid workspaces are replaced by the arrays above
+    monkeypatch.setattr(mantid_helper, 'get_data_banks', lambda ws_name, start_bank_id=1: [1, 2])
+    monkeypatch.setattr(mantid_helper, 'get_data_from_workspace',
+                        lambda ws_name, bank_id, unit: ({bank_id: (vec_x, data_dict[ws_name])}, unit))
+
+    controller = VDriveAPI.VDriveAPI('VULCAN')
+    controller.project._loadedDataManager._chopped_gsas_dict[2000] = {
+        seq_index: ('G2000_{}'.format(seq_index), '{}.gda'.format(seq_index), None) for seq_index in range(5)}
+
+    file_name = str(tmpdir.join('fit.txt'))
+    processor = view.VdriveView(controller, {'IPTS': '1000', 'CHOPRUN': '2000', 'RUNS': '0', 'RUNE': '4',
+                                             'PEAKPOS': '2.03', 'FITPEAK': file_name})
+    status, message = processor.exec_cmd()
+    assert status, message
+
+    status, message = processor.fit_peaks_sequentially(2000, range(5))
+    assert status, message
+    for bank_id in [1, 2]:
+        fit_table = numpy.loadtxt(str(tmpdir.join('fit_bank{}.txt'.format(bank_id))))
+        assert fit_table.shape[0] == 5
+
+    # not loaded chopped run and too many processes are reported but not raised
+    status, message = processor.fit_peaks_sequentially(2001, range(5))
+    assert not status
+    processor = view.VdriveView(controller, {'IPTS': '1000', 'CHOPRUN': '2000', 'RUNS': '0', 'RUNE': '4',
+                                             'PEAKPOS': '2.03', 'FITPEAK': file_name, 'NPROC': '1000'})
+    status, message = processor.exec_cmd()
+    assert not status and 'NPROC' in message
@@ -0,0 +1,40 @@
+import numpy
+import pytest
+from pyvdrive.core import splitter_builder
+
+
+def test_splitters_to_workspace_2d():
+    """ Test converting splitters with gaps and string targets to Workspace2D vectors
+    """
+    splitters = splitter_builder.SplitterArrays.from_list([(5., 6., 'b'), (0., 1., 'a'), (1., 3.)])
+    assert splitters.targets.tolist() == ['a', '3', 'b']
+    assert splitters.find_gaps().tolist() == [1]
+    assert not splitters.has_overlap()
+
+    vec_x, vec_y = splitters.to_workspace_2d_vectors()
+    numpy.testing.assert_allclose(vec_x, [0., 1., 3., 5., 6.])
+    numpy.testing.assert_allclose(vec_y, [0, 1, -1, 2])
+
+    # invalid splitters
+    with pytest.raises(RuntimeError):
+        splitter_builder.SplitterArrays([0., 2.], [1., 2.])
+    with pytest.raises(RuntimeError):
+        splitter_builder.SplitterArrays.from_list([(0., 1.)], auto_target=False)
+
+
+def test_many_splitters():
+    """ Test constant time splitters with and without overlap
+    """
+    splitters = splitter_builder.generate_constant_time_splitters(0., 1.E5, 1.)
+    assert splitters.number_splitters == 100000
+    vec_x, vec_y = splitters.to_workspace_2d_vectors()
+    assert vec_x.shape[0] == 100001
+    numpy.testing.assert_allclose(vec_y, numpy.arange(1, 100001))
+
+    # overlapped
+    splitters = splitter_builder.generate_constant_time_splitters(0., 10., 4., 2.)
+    numpy.testing.assert_allclose(splitters.start_times, [0., 2., 4., 6.])
+    numpy.testing.assert_allclose(splitters.stop_times, [4., 6., 8., 10.])
+    assert splitters.find_overlaps().tolist() == [0, 1, 2]
+    with pytest.raises(RuntimeError):
+        splitters.to_workspace_2d_vectors()
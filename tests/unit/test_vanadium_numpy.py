@@ -0,0 +1,99 @@
+import pytest
+import numpy
+from pyvdrive.core import vanadium_numpy
+
+
+def generate_vanadium_spectrum():
+    """ Generate a synthetic vanadium spectrum in d-spacing with vanadium peaks on a smooth background
+    :return: vector d, vector Y (with peaks and noise), vector background
+    """
+    vec_d = numpy.arange(0.45, 2.6, 0.0005)
+    vec_bkgd = 1000. * numpy.exp(-vec_d) + 200.
+    vec_y = vec_bkgd.copy()
+    for peak_pos in vanadium_numpy.VANADIUM_PEAKS_D:
+        vec_y += 300. * numpy.exp(-0.5 * ((vec_d - peak_pos) / 0.0015)**2)
+    vec_y += numpy.random.RandomState(0).normal(0, 3., vec_y.shape)
+
+    return vec_d, vec_y, vec_bkgd
+
+
+def test_smooth_spectrum():
+    """ Test smoothing with numpy
+    """
+    vec_d, vec_y, vec_bkgd = generate_vanadium_spectrum()
+
+    # constant spectrum is not changed by either filter
+    flat_y = numpy.zeros_like(vec_d) + 100.
+    for smooth_filter in ['Butterworth', 'Zeroing']:
+        smoothed_y = vanadium_numpy.smooth_spectrum(flat_y, smooth_filter, 20, 2, push_to_positive=False)
+        numpy.testing.assert_allclose(smoothed_y, flat_y, rtol=1.E-10)
+
+    # spectrum with flat edges is not distorted at either end
+    vec_x = numpy.arange(vec_d.shape[0]) * numpy.pi / (vec_d.shape[0] - 1)
+    cosine_y = 100. + 50. * numpy.cos(vec_x)
+    smoothed_y = vanadium_numpy.smooth_spectrum(cosine_y, 'Zeroing', 20, 2, push_to_positive=False)
+    numpy.testing.assert_allclose(smoothed_y, cosine_y, rtol=1.E-10)
+
+    # noise is removed
+    noisy_y = vec_bkgd + numpy.random.RandomState(1).normal(0, 5., vec_bkgd.shape)
+    smoothed_y = vanadium_numpy.smooth_spectrum(noisy_y, 'Butterworth', 20, 2, push_to_positive=False)
+    assert numpy.abs(smoothed_y - vec_bkgd).std() < numpy.abs(noisy_y - vec_bkgd).std() / 2
+
+    # push to positive integers
+    smoothed_y = vanadium_numpy.smooth_spectrum(noisy_y - 1000., 'Butterworth', 20, 2, push_to_positive=True)
+    assert smoothed_y.min() >= 1.
+    numpy.testing.assert_array_equal(smoothed_y, numpy.round(smoothed_y))
+
+
+def test_strip_vanadium_peaks():
+    """ Test striping vanadium peaks with numpy
+    """
+    vec_d, vec_y, vec_bkgd = generate_vanadium_spectrum()
+
+    striped_y = vanadium_numpy.strip_vanadium_peaks(vec_d, vec_y, fwhm=7, peak_pos_tol=0.01,
+                                                    background_type='Quadratic')
+
+    # peaks (300 counts high) are removed down to noise level
+    assert numpy.abs(vec_y - vec_bkgd).max() > 250.
+    assert numpy.abs(striped_y - vec_bkgd).max() < 20.
+
+
+@pytest.mark.parametrize('smooth_filter, param_n, param_order', [('Butterworth', 20, 2),
+                                                                 ('Butterworth', 10, 4),
+                                                                 ('Zeroing', 5, 2)])
+def test_smooth_parity_mantid(smooth_filter, param_n, param_order):
+    """ Test smoothing in numpy against Mantid FFTSmooth via mantid_helper.smooth_vanadium()
+    """
+    pytest.importorskip('mantid.simpleapi')
+    from pyvdrive.core import mantid_helper
+
+    vec_d, vec_y, vec_bkgd = generate_vanadium_spectrum()
+    mantid_helper.create_workspace_2d(vec_d * 10000., vec_y, numpy.sqrt(vec_y), 'van_parity_smooth', unit_x='TOF')
+    mantid_helper.smooth_vanadium('van_parity_smooth', 'van_parity_smooth', smooth_filter=smooth_filter,
+                                  param_n=param_n, param_order=param_order, push_to_positive=True)
+    mantid_y = mantid_helper.retrieve_workspace('van_parity_smooth').readY(0)
+
+    numpy_y = vanadium_numpy.smooth_spectrum(vec_y, smooth_filter, param_n, param_order, push_to_positive=True)
+
+    # integer truncation may differ by 1 count
+    numpy.testing.assert_allclose(numpy_y, mantid_y, atol=1.)
+
+
+def test_strip_peaks_parity_mantid():
+    """ Test vanadium peak striping in numpy against Mantid StripVanadiumPeaks
+    """
+    pytest.importorskip('mantid.simpleapi')
+    from pyvdrive.core import mantid_helper
+
+    vec_d, vec_y, vec_bkgd = generate_vanadium_spectrum()
+    mantid_helper.create_workspace_2d(vec_d, vec_y, numpy.sqrt(vec_y), 'van_parity_strip', unit_x='dSpacing')
+    out_ws_dict = mantid_helper.strip_vanadium_peaks('van_parity_strip', 'van_parity_strip_no_peak',
+                                                     bank_list=[1], fwhm=7, peak_pos_tol=0.01,
+                                                     background_type='Quadratic', is_high_background=True)
+    mantid_y = mantid_helper.retrieve_workspace(out_ws_dict[1]).readY(0)
+
+    numpy_y = vanadium_numpy.strip_vanadium_peaks(vec_d, vec_y, fwhm=7, peak_pos_tol=0.01,
+                                                  background_type='Quadratic', is_high_background=True)
+
+    # both shall be close to the background within a few sigma of noise (about 1% of background)
+    numpy.testing.assert_allclose(numpy_y, mantid_y, rtol=0.03)
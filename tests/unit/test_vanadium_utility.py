@@ -0,0 +1,99 @@
+import numpy
+from pyvdrive.core import mantid_helper
+from pyvdrive.core import vanadium_utility
+
+
+class _FakeWorkspace(object):
+    def __init__(self, name, vec_x, vec_y):
+        self._name = name
+        self._vec_x = numpy.array(vec_x)
+        self._vec_y = numpy.array(vec_y)
+
+    def id(self):
+        return 'Workspace2D'
+
+    def name(self):
+        return self._name
+
+    def readX(self, index):
+        return self._vec_x
+
+    def readY(self, index):
+        return self._vec_y
+
+    def readE(self, index):
+        return numpy.sqrt(self._vec_y)
+
+
+class _FakeGroup(list):
+    def id(self):
+        return 'WorkspaceGroup'
+
+
+def test_processed_vanadium_cache(monkeypatch, tmpdir):
+    """ Test that a processed vanadium loaded from cache has peak striped and smoothed spectra of all banks
+    """
+    ads = dict()
+    vec_d = numpy.linspace(0.5, 2.5, 11)
+    ads['van'] = _FakeGroup([_FakeWorkspace('van_{}'.format(bank_id), vec_d, vec_d * bank_id)
+                             for bank_id in [1, 2, 3]])
+    for workspace in ads['van']:
+        ads[workspace.name()] = workspace
+
+    def copy_workspace(input_ws_name, output_ws_name, scale):
+        in_ws = ads[input_ws_name]
+        ads[output_ws_name] = _FakeWorkspace(output_ws_name, in_ws.readX(0), in_ws.readY(0) * scale)
+
+    monkeypatch.setattr(mantid_helper, 'retrieve_workspace', lambda ws_name, raise_if_not_exist=False: ads[ws_name])
+    monkeypatch.setattr(mantid_helper, 'is_workspace_group', lambda ws_name: ws_name == 'van')
+    monkeypatch.setattr(mantid_helper, 'convert_to_point_data', lambda ws_name: None)
+
+    def convert_units(ws_name, unit, out_ws_name=None):
+        if out_ws_name is not None:
+            copy_workspace(ws_name, out_ws_name, 1.)
+
+    def strip_peaks(input_ws_name, output_ws_name, **kwargs):
+        copy_workspace(input_ws_name, output_ws_name, 0.5)
+
+    monkeypatch.setattr(mantid_helper, 'mtd_convert_units', convert_units)
+    monkeypatch.setattr(mantid_helper, 'strip_vanadium_peaks', strip_peaks)
+    monkeypatch.setattr(mantid_helper, 'smooth_vanadium', lambda **kwargs: None)
+    monkeypatch.setattr(mantid_helper, 'create_workspace_2d',
+                        lambda vec_x, vec_y, vec_e, ws_name, unit_x, parent_ws_name:
+                        ads.update({ws_name: _FakeWorkspace(ws_name, vec_x, vec_y)}))
+
+    def create_processor():
+        processor = vanadium_utility.VanadiumProcessingManager(None)
+        processor._processed_cache = vanadium_utility.ProcessedVanadiumCache(str(tmpdir.join('cache')))
+        processor.init_session('van', 1234, 5678, str(tmpdir.join('5678-s.gda')), 'van_log',
+                               calibration_tag='VULCAN_calibrate_2019_06_27.h5')
+        return processor
+
+    processor = create_processor()
+    cache_key, cache_message = processor.process_vanadium_banks()
+    assert cache_message == ''
+    numpy.testing.assert_allclose(processor.get_peak_striped_data(2)[1], vec_d)
+
+    # cache hit in a new session, i.e., in memory cache is empty
+    for ws_name in [ws_name for ws_name in ads if ws_name.count('NoPeak')]:
+        del ads[ws_name]
+    monkeypatch.setattr(mantid_helper, 'strip_vanadium_peaks', None)
+    processor = create_processor()
+    assert processor.process_vanadium_banks() == (cache_key, '')
+    assert sorted(processor.get_peak_striped_vanadium().keys()) == [1, 2, 3]
+    numpy.testing.assert_allclose(processor.get_peak_striped_data(2)[1], vec_d)
+    numpy.testing.assert_allclose(processor.get_peak_smoothed_data(3)[1], vec_d * 1.5)
+
+
+def test_cache_write_error(tmpdir):
+    """ Test that failing to write processed vanadium cache is reported to the caller
+    """
+    not_dir = tmpdir.join('file')
+    not_dir.write('')
+    cache = vanadium_utility.ProcessedVanadiumCache(str(not_dir))
+    vec_x = numpy.arange(5.)
+    status, message = cache.save('key', {1: (vec_x, vec_x, vec_x)}, {1: (vec_x, vec_x, vec_x)})
+    assert not status
+    assert 'Unable to write processed vanadium cache' in message
+    # still cached in memory
+    assert cache.load('key')[0][1][0] is vec_x
@@ -0,0 +1,52 @@
+import numpy
+from pyvdrive.core import mantid_helper
+from pyvdrive.core import vulcan_util
+
+
+class _FakeDetectorTable(object):
+    def __init__(self, column_dict):
+        self._column_dict = column_dict
+
+    def column(self, name):
+        return list(self._column_dict[name])
+
+
+class _FakeWorkspace(object):
+    def __init__(self, num_spectra):
+        self._num_spectra = num_spectra
+
+    def name(self):
+        return 'vulcan'
+
+    def getNumberHistograms(self):
+        return self._num_spectra
+
+
+def test_group_pixels_2theta(monkeypatch):
+    """ Test grouping pixels by 2theta on a stub geometry with a monitor and an empty 2theta bin
+    """
+    # workspace index 0 is a monitor; pixels 1-8 are at 2theta 80.5, 81.5, ... 87.5 with 84.x missing
+    pixel_2theta = numpy.array([80.5, 81.5, 82.5, 83.5, 85.5, 86.5, 87.5, 100.])
+    det_table = _FakeDetectorTable({'detIDMap': numpy.arange(1, 9),
+                                    'TwoTheta': numpy.radians(pixel_2theta),
+                                    'DetectorID': numpy.arange(1, 9) + 1000})
+    monkeypatch.setattr(vulcan_util, 'PreprocessDetectorsToMD', lambda InputWorkspace, OutputWorkspace: det_table)
+    deleted_list = list()
+    monkeypatch.setattr(mantid_helper, 'delete_workspace', lambda ws_name: deleted_list.append(ws_name))
+
+    two_theta_array, det_id_array = vulcan_util.calculate_pixels_2theta(_FakeWorkspace(9))
+    assert numpy.isnan(two_theta_array[0]) and det_id_array[0] == -1
+    numpy.testing.assert_allclose(two_theta_array[1:], pixel_2theta)
+    assert deleted_list == ['_vulcan_detectors']
+
+    # 2theta bins of 2 degrees from 80 to 88; the last pixel (workspace index 8) is out of workspace index range
+    tth_bins = numpy.arange(80., 88. + 2., 2.)
+    group_id_array, num_pixels_array = vulcan_util.assign_2theta_groups(two_theta_array, tth_bins, 0, 8)
+    numpy.testing.assert_array_equal(group_id_array, [0, 1, 1, 2, 2, 3, 4, 4, 0])
+    numpy.testing.assert_array_equal(num_pixels_array, [2, 2, 1, 2, -1])
+
+    # remove the pixel in bin 3: bin 4 is the 3rd group
+    group_id_array[5] = 0
+    num_pixels_array[2] = -1
+    group_str = vulcan_util.build_2theta_grouping_string(det_id_array, group_id_array, num_pixels_array)
+    assert group_str == '1001+1002,1003+1004,1006+1007'